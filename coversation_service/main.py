@@ -1,4 +1,6 @@
 
+from elgen_common.logging_conf import logging_config, setup_logging
+from elgen_common.logging_middleware import RouterLoggingMiddleware
 from fastapi import FastAPI
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
@@ -6,8 +8,6 @@ from uvicorn import Server, Config
 
 from configuration.config import app_config
 from configuration.injection_container import DependencyContainer
-from configuration.logging_conf import logging_config
-from configuration.logging_middleware import RouterLoggingMiddleware
 from configuration.logging_setup import logger
 from source.apis.chat_api import chat_router
 from source.apis.conversation_api import conversation_router
@@ -19,6 +19,8 @@ from source.exceptions.validation_exceptions import QuestionLengthExceededError
 from source.middlewares.app_middlewares import middlewares
 from source.schemas.common import AppEnv
 
+setup_logging()
+
 
 def get_application() -> FastAPI:
     application = FastAPI(
@@ -1,12 +1,13 @@
+import asyncio
 import logging
 
+from elgen_common.logging_conf import logging_config, setup_logging
+from elgen_common.logging_middleware import RouterLoggingMiddleware
 from fastapi import FastAPI
 from uvicorn import Config, Server
 
 from configuration.config import app_config
 from configuration.injection import InjectionContainer
-from configuration.logging_conf import logging_config
-from configuration.logging_middleware import RouterLoggingMiddleware
 from source import middlewares
 from source.apis.chat_suggestions_api import chat_suggestion_router
 from source.apis.chats_router import chats_router
@@ -16,10 +17,10 @@ from source.apis.keycloak_router import keycloak_router
 from source.apis.sources_router import sources_router
 from source.apis.workspace_router import workspace_router
 from source.middlewares.app_middlewares import middlewares
+from source.utils.http_sessions import upstream_sessions
 
+setup_logging()
 logger = logging.getLogger(__name__)
-handler = logging.StreamHandler()
-logger.addHandler(handler)
 
 
 def get_application() -> FastAPI:
@@ -48,6 +49,36 @@ app.include_router(conversations_router, tags=["Conversations"])
 app.include_router(keycloak_router, tags=["Users"])
 app.include_router(ingest_router, tags=['Ingestion'])
 
+
+@app.on_event("startup")
+async def open_upstream_sessions():
+    await upstream_sessions.open([app_config.CONVERSATION_SERVICE_URL, app_config.SOURCES_SERVICE_URL,
+                                  app_config.FILE_HANDLER_URL,
+                                  app.injection_container.keycloak_service_configuration.SERVER_URL()])
+
+
+@app.on_event("startup")
+async def start_rate_limit_write_back():
+    rate_limit_service = app.injection_container.rate_limit_service()
+    if rate_limit_service is None:
+        return
+    rate_limit_service.rate_limit_store.init_database()
+    app.state.rate_limit_write_back = asyncio.create_task(rate_limit_service.write_back_periodically(
+        lambda: app.injection_container.keycloak_service().write_back_rate_limits()))
+
+
+@app.on_event("shutdown")
+async def stop_rate_limit_write_back():
+    if (write_back_task := getattr(app.state, "rate_limit_write_back", None)) is None:
+        return
+    write_back_task.cancel()
+    await app.injection_container.keycloak_service().write_back_rate_limits()
+
+
+@app.on_event("shutdown")
+async def close_upstream_sessions():
+    await upstream_sessions.close()
+
 if __name__ == '__main__':
     server = Server(
         Config(app=app, host=app.injection_container.bff_configuration.HOST(),
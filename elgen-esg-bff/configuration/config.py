@@ -24,6 +24,36 @@ class BFFSettings(BaseSettings):
     ENCRYPTION_KEY: str = Field(env="ENCRYPTION_KEY", default="MDEyMzQ1Njc4OTAxMjM0NTY3ODkwMTIzNDU2Nzg5MDE=")
     NONCE_ENCRYPTION_PARAM: str = Field(env="NONCE_ENCRYPTION_PARAM", default="MDEyMzQ1Njc4OTAx")
     RESPONSE_CHUNK_SIZE: int = Field(env="RESPONSE_CHUNK_SIZE", default=1024)
+    FILE_STREAM_CHUNK_SIZE: int = Field(env="FILE_STREAM_CHUNK_SIZE", default=256 * 1024,
+                                        description="Bytes read at once from a file uploaded or downloaded through "
+                                                    "the BFF")
+    SOURCE_LIMITS_CACHE_TTL: float = Field(env="SOURCE_LIMITS_CACHE_TTL", default=60,
+                                           description="Seconds the sources limits of the models are used before "
+                                                       "being read again, the writes through this process are seen "
+                                                       "at once")
+    SOURCE_LIMITS_CACHE_SIZE: int = Field(env="SOURCE_LIMITS_CACHE_SIZE", default=1000,
+                                          description="Sources limits kept in memory")
+    WORKSPACE_TYPE_CACHE_TTL: float = Field(env="WORKSPACE_TYPE_CACHE_TTL", default=300,
+                                            description="Seconds the type of a workspace is used before being read "
+                                                        "again, the updates through this process are seen at once")
+    WORKSPACE_TYPE_CACHE_SIZE: int = Field(env="WORKSPACE_TYPE_CACHE_SIZE", default=10000,
+                                           description="Workspace types kept in memory")
+    LOCAL_RETRIEVAL_TIMEOUT: float = Field(env="LOCAL_RETRIEVAL_TIMEOUT", default=20,
+                                           description="Seconds the combined retrieval waits for the source documents "
+                                                       "before returning the web sources alone")
+    WEB_RETRIEVAL_TIMEOUT: float = Field(env="WEB_RETRIEVAL_TIMEOUT", default=20,
+                                         description="Seconds the combined retrieval waits for the web sources before "
+                                                     "returning the source documents alone")
+    UPSTREAM_POOL_SIZE: int = Field(env="UPSTREAM_POOL_SIZE", default=100,
+                                    description="Maximum open connections to each upstream service")
+    UPSTREAM_KEEPALIVE_TIMEOUT: float = Field(env="UPSTREAM_KEEPALIVE_TIMEOUT", default=30,
+                                              description="Seconds an idle connection to an upstream is kept open")
+    UPSTREAM_DNS_CACHE_TTL: int = Field(env="UPSTREAM_DNS_CACHE_TTL", default=300,
+                                        description="Seconds the resolved addresses of the upstreams are reused")
+    STREAM_DISCONNECT_CHECK_INTERVAL: float = Field(env="STREAM_DISCONNECT_CHECK_INTERVAL", default=0.5,
+                                                    description="Seconds between two checks of the client connection "
+                                                                "while an answer is relayed")
+
 
 class PactSettings(BaseSettings):
     PACT_URL: str = Field(env="PACT_URL", default="http://127.0.0.1")
@@ -55,12 +85,81 @@ class KeyCloakServiceConfiguration(BaseSettings):
     DEFAULT_RATE_LIMIT: str = Field(env="DEFAULT_RATE_LIMIT", default="100")
     REFRESH_GRANT_TYPE: str = Field(env="REFRESH_GRANT_TYPE", default="refresh_token")
     JWT_ALGORITHM: str = Field(env="JWT_ALGORITHM", default="HS256")
+    LOCAL_TOKEN_VERIFICATION: bool = Field(env="LOCAL_TOKEN_VERIFICATION", default=True,
+                                           description="Verify the signed access tokens against the realm JWKS "
+                                                       "instead of introspecting each of them on keycloak")
+    JWKS_CACHE_TTL: int = Field(env="JWKS_CACHE_TTL", default=3600,
+                                description="Seconds the realm signing keys are used before being fetched again")
+    JWKS_MIN_REFRESH_INTERVAL: float = Field(env="JWKS_MIN_REFRESH_INTERVAL", default=10,
+                                             description="Minimum seconds between two fetches of the realm keys "
+                                                         "triggered by tokens signed with an unknown key")
+    TOKEN_AUDIENCE: str | None = Field(env="TOKEN_AUDIENCE", default=None,
+                                       description="Audience required in the verified tokens, not checked if unset")
+    TOKEN_ISSUER: str | None = Field(env="TOKEN_ISSUER", default=None,
+                                     description="Issuer required in the verified tokens, not checked if unset as "
+                                                 "it depends on the hostname the front end reaches keycloak with")
+    TOKEN_LEEWAY: int = Field(env="TOKEN_LEEWAY", default=10,
+                              description="Seconds of clock skew tolerated on the expiry of the verified tokens")
+    INTROSPECTION_CACHE_SIZE: int = Field(env="INTROSPECTION_CACHE_SIZE", default=10000,
+                                          description="Introspected tokens kept in memory")
+    INTROSPECTION_CACHE_TTL: float = Field(env="INTROSPECTION_CACHE_TTL", default=30,
+                                           description="Seconds an active introspected token is trusted without "
+                                                       "asking keycloak again, bounds the delay to see a revocation")
+    INTROSPECTION_NEGATIVE_CACHE_TTL: float = Field(env="INTROSPECTION_NEGATIVE_CACHE_TTL", default=5,
+                                                    description="Seconds a rejected token is refused without "
+                                                                "asking keycloak again")
+    OIDC_DISCOVERY_CACHE_TTL: int = Field(env="OIDC_DISCOVERY_CACHE_TTL", default=3600,
+                                          description="Seconds the realm openid configuration is used before being "
+                                                      "fetched again")
+    ADMIN_TOKEN_REFRESH_MARGIN: int = Field(env="ADMIN_TOKEN_REFRESH_MARGIN", default=30,
+                                            description="Seconds before its expiry the shared admin token is renewed")
+    USER_DIRECTORY_TTL: float = Field(env="USER_DIRECTORY_TTL", default=10,
+                                      description="Seconds between two steps of the incremental background refresh "
+                                                  "of the directory of the realm users")
+    USER_DIRECTORY_REFRESH_PAGES: int = Field(env="USER_DIRECTORY_REFRESH_PAGES", default=2,
+                                              description="Pages of users read again by a step of the incremental "
+                                                          "refresh of the directory")
+    USER_DIRECTORY_PAGE_SIZE: int = Field(env="USER_DIRECTORY_PAGE_SIZE", default=500,
+                                          description="Users read from keycloak per request when reading the "
+                                                      "directory")
+    USER_DIRECTORY_LOOKUP_CONCURRENCY: int = Field(env="USER_DIRECTORY_LOOKUP_CONCURRENCY", default=10,
+                                                   description="Concurrent lookups by ID of the users missing from "
+                                                               "the directory")
 
     DEFAULT_CLIENT_DURATION: int = Field(env="DEFAULT_USE_DURATION",
                                          description="maximum use duration by days for clients",
                                          default=30)
 
 
+class RateLimitConfiguration(BaseSettings):
+    """Storage of the daily conversations and questions counters of the users"""
+    RATE_LIMIT_STORE: str = Field(env="RATE_LIMIT_STORE", default="memory",
+                                  description="memory to keep the counters in the process, postgres to share them "
+                                              "between the workers and instances, keycloak to keep the previous "
+                                              "read-modify-write of the user attributes")
+    RATE_LIMIT_DB_HOST: str = Field(env="RATE_LIMIT_DB_HOST", default="localhost")
+    RATE_LIMIT_DB_PORT: int = Field(env="RATE_LIMIT_DB_PORT", default=5433)
+    RATE_LIMIT_DB_NAME: str = Field(env="RATE_LIMIT_DB_NAME", default="elgen_esg_cb_database")
+    RATE_LIMIT_DB_USER: str = Field(env="RATE_LIMIT_DB_USER", default="root")
+    RATE_LIMIT_DB_PASSWORD: str = Field(env="RATE_LIMIT_DB_PASSWORD", default="root")
+    RATE_LIMIT_STORE_RETRY_INTERVAL: float = Field(env="RATE_LIMIT_STORE_RETRY_INTERVAL", default=30,
+                                                   description="Seconds the counters are kept in the process after "
+                                                               "the postgres store failed, before trying it again")
+    RATE_LIMIT_PROFILE_CACHE_SIZE: int = Field(env="RATE_LIMIT_PROFILE_CACHE_SIZE", default=10000,
+                                               description="Users whose daily limits are kept in memory")
+    RATE_LIMIT_PROFILE_CACHE_TTL: float = Field(env="RATE_LIMIT_PROFILE_CACHE_TTL", default=300,
+                                                description="Seconds the daily limits of a user read from keycloak "
+                                                            "are used before being read again")
+    RATE_LIMIT_WRITE_BACK_INTERVAL: float = Field(env="RATE_LIMIT_WRITE_BACK_INTERVAL", default=60,
+                                                  description="Seconds between two copies of the changed counters "
+                                                              "to the keycloak user attributes shown by the UI")
+
+    @property
+    def db_url(self):
+        return f"postgresql://{self.RATE_LIMIT_DB_HOST}:{self.RATE_LIMIT_DB_PORT}/{self.RATE_LIMIT_DB_NAME}" \
+               f"?user={self.RATE_LIMIT_DB_USER}&password={self.RATE_LIMIT_DB_PASSWORD}"
+
+
 class KeyCloakHelperConfiguration(BaseSettings):
     ADMIN_GROUP_NAME: str = Field(env="ADMIN_GROUP_NAME", default="admins_group")
     USERS_GROUP_NAME: str = Field(env="USERS_GROUP_NAME", default="users_group")
@@ -1,16 +1,23 @@
 import logging
 
 from dependency_injector.containers import DeclarativeContainer, WiringConfiguration
-from dependency_injector.providers import Configuration, Factory
+from dependency_injector.providers import Configuration, Factory, Object, Selector, Singleton
 
 import source
-from configuration.config import BFFSettings, KeyCloakHelperConfiguration, KeyCloakServiceConfiguration
+from configuration.config import BFFSettings, KeyCloakHelperConfiguration, KeyCloakServiceConfiguration, \
+    RateLimitConfiguration
+from source.helpers.cache_helpers import CoalescingCache, LRUCache
 from source.services.chat_suggestions_service import ChatSuggestionsService
 from source.services.chats_service import ChatService
 from source.services.conversation_service import ConversationService
 from source.services.ingestion_services import IngestionService
 from source.services.keycloak_service import KeycloakService
+from source.services.keycloak_session_service import KeycloakSessionService
+from source.services.rate_limit_service import RateLimitService
+from source.services.rate_limit_store import FailoverRateLimitStore, InMemoryRateLimitStore, PostgresRateLimitStore
 from source.services.sources_service import SourceService
+from source.services.token_verification_service import TokenVerificationService
+from source.services.user_directory_service import UserDirectoryService
 from source.services.workspace_service import WorkspaceService
 
 logger = logging.getLogger()
@@ -33,20 +40,62 @@ class InjectionContainer(DeclarativeContainer):
 
     ingestion_service = Factory(IngestionService, config=bff_configuration)
 
+    source_limits_cache = Singleton(
+        LRUCache,
+        max_size=bff_configuration.SOURCE_LIMITS_CACHE_SIZE,
+        ttl=bff_configuration.SOURCE_LIMITS_CACHE_TTL)
+    workspace_types_cache = Singleton(
+        CoalescingCache,
+        max_size=bff_configuration.WORKSPACE_TYPE_CACHE_SIZE,
+        ttl=bff_configuration.WORKSPACE_TYPE_CACHE_TTL)
+
     keycloak_helper_configuration = Configuration(pydantic_settings=[KeyCloakHelperConfiguration()])
     keycloak_service_configuration = Configuration(pydantic_settings=[KeyCloakServiceConfiguration()])
+    token_verification_service = Singleton(
+        TokenVerificationService,
+        keycloak_service_configuration=keycloak_service_configuration)
+    keycloak_session_service = Singleton(
+        KeycloakSessionService,
+        keycloak_service_configuration=keycloak_service_configuration)
+    user_directory_service = Singleton(
+        UserDirectoryService,
+        keycloak_service_configuration=keycloak_service_configuration)
+    rate_limit_configuration = Configuration(pydantic_settings=[RateLimitConfiguration()])
+    rate_limit_service = Selector(
+        rate_limit_configuration.RATE_LIMIT_STORE,
+        memory=Singleton(
+            RateLimitService,
+            rate_limit_store=Singleton(InMemoryRateLimitStore),
+            rate_limit_configuration=rate_limit_configuration),
+        postgres=Singleton(
+            RateLimitService,
+            rate_limit_store=Singleton(
+                FailoverRateLimitStore,
+                primary=Singleton(PostgresRateLimitStore, db_url=Singleton(RateLimitConfiguration).provided.db_url),
+                fallback=Singleton(InMemoryRateLimitStore),
+                retry_interval=rate_limit_configuration.RATE_LIMIT_STORE_RETRY_INTERVAL),
+            rate_limit_configuration=rate_limit_configuration),
+        keycloak=Object(None))
     keycloak_service = Factory(
         KeycloakService,
-        keycloak_service_configuration=keycloak_service_configuration)
+        keycloak_service_configuration=keycloak_service_configuration,
+        token_verification_service=token_verification_service,
+        keycloak_session_service=keycloak_session_service,
+        user_directory_service=user_directory_service,
+        rate_limit_service=rate_limit_service,
+        source_limits_cache=source_limits_cache)
 
     chat_service = Factory(
         ChatService,
         config=bff_configuration,
-        keycloak_service=keycloak_service
+        keycloak_service=keycloak_service,
+        source_limits_cache=source_limits_cache,
+        workspace_types_cache=workspace_types_cache
     )
     workspace_service = Factory(
         WorkspaceService,
         config=bff_configuration,
+        workspace_types_cache=workspace_types_cache
     )
 
     chat_suggestion_service = Factory(
@@ -1,7 +1,7 @@
 from uuid import UUID
 
 from dependency_injector.wiring import inject, Provide
-from fastapi import APIRouter, Security, Depends, Query, Path, Body
+from fastapi import APIRouter, Security, Depends, Query, Path, Body, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from configuration.injection import InjectionContainer
@@ -44,14 +44,16 @@ async def create_chat_suggestion(
 @inject
 async def get_suggestions_per_workspace(
         workspace_id: UUID = Query(..., alias='workspaceId'),
+        if_none_match: str | None = Header(None, alias="If-None-Match"),
         credentials: HTTPAuthorizationCredentials = Security(security),
         keycloak_service: KeycloakService = Depends(
             Provide[InjectionContainer.keycloak_service]),
         chat_suggestion_service: ChatSuggestionsService = Depends(Provide[InjectionContainer.chat_suggestion_service])
 ):
     """
-    Get list of suggested questions for specific workspace
+    Get list of suggested questions for specific workspace, 304 without body if they still have the If-None-Match ETag
     :param workspace_id
+    :param if_none_match: ETag of the suggestions the client already has
     :param credentials:
     :param keycloak_service:
     :param chat_suggestion_service:
@@ -59,7 +61,7 @@ async def get_suggestions_per_workspace(
     """
     payload = await keycloak_service.check_auth(credentials)
     keycloak_service.check_user_role(payload, [ClientRole.SUPER_ADMIN, ClientRole.ADMIN, ClientRole.USER])
-    return await chat_suggestion_service.get_suggestions_per_workspace(workspace_id)
+    return await chat_suggestion_service.get_suggestions_per_workspace(workspace_id, if_none_match=if_none_match)
 
 
 @chat_suggestion_router.delete("/{suggestion_id}", response_model=UpdateStatusDataModel)
@@ -18,7 +18,8 @@ from source.exceptions.custom_exceptions import SchemaError, UserInformationForm
 from source.schemas.answer_schemas import AnswerRatingRequest, AnswerRatingResponse, AnswerUpdatingRequest, \
     VersionedAnswerResponse
 from source.schemas.api_schemas import AnswerOutputSchema, ModelInfoSchema, SourceResponse, PromptOutputSchema, \
-    QuestionLimitOutputSchema, QuestionInput, ModelPostInfoSchema, ModelSourcesUpdateSchema, ChatModelsOutputSchema
+    QuestionLimitOutputSchema, QuestionInput, ModelPostInfoSchema, ModelSourcesUpdateSchema, ChatModelsOutputSchema, \
+    RetrievedSourcesResponse
 from source.schemas.common import QueryDepth
 from source.schemas.conversation_schemas import QuestionInputSchema, AnswerSchema
 from source.schemas.keycloak_schemas import KeycloakAttribute, ClientRole
@@ -66,21 +67,27 @@ async def add_question(
     """
     payload = await keycloak_service.check_auth(credentials)
     user_id = str(payload.dict().get("sub"))
-    if not await keycloak_service.check_user_limit(user_id=user_id,
-                                                   attribute_to_check=KeycloakAttribute.QUESTIONS):
-        raise QuestionsLimitApiException
     try:
-        created_question = await chat_service.add_question(user_id=user_id,
-                                                           conversation_id=conversation_id,
-                                                           question=question,
-                                                           skip_doc=True if workspace_type == WorkspaceTypesEnum.database else skip_doc,
-                                                           skip_web=True if workspace_type == WorkspaceTypesEnum.database else skip_web,
-                                                           use_classification=use_classification,
-                                                           workspace_id=workspace_id
-                                                           )
+        updated_rate_limit = await keycloak_service.reserve_rate_limit(user_id, KeycloakAttribute.QUESTIONS)
+        if updated_rate_limit is None:
+            raise QuestionsLimitApiException
+        try:
+            created_question = await chat_service.add_question(user_id=user_id,
+                                                               conversation_id=conversation_id,
+                                                               question=question,
+                                                               skip_doc=True if workspace_type == WorkspaceTypesEnum.database else skip_doc,
+                                                               skip_web=True if workspace_type == WorkspaceTypesEnum.database else skip_web,
+                                                               use_classification=use_classification,
+                                                               workspace_id=workspace_id
+                                                               )
+        except Exception:
+            await keycloak_service.update_rate_limit(user_id, KeycloakAttribute.QUESTIONS,
+                                                     incrementation_condition=True)
+            raise
         if isinstance(created_question, NotOkServiceResponse):
+            await keycloak_service.update_rate_limit(user_id, KeycloakAttribute.QUESTIONS,
+                                                     incrementation_condition=True)
             return created_question
-        updated_rate_limit = await keycloak_service.update_rate_limit(user_id, KeycloakAttribute.QUESTIONS)
         created_question.questions_remaining = int(updated_rate_limit.user_actual_limits.questions_limit[0])
         return created_question
     except (UserInformationFormatError, IndexError, ValidationError):
@@ -238,6 +245,40 @@ async def get_source_from_web(
         raise HTTPException(status_code=status.s, detail="Unexpected error")
 
 
+@chats_router.post("/sources", response_model=RetrievedSourcesResponse)
+@inject
+async def get_sources(
+        credentials: HTTPAuthorizationCredentials = Security(security),
+        keycloak_service: KeycloakService = Depends(Provide[InjectionContainer.keycloak_service]),
+        question: QuestionInput = Body(...),
+        model_code: str = Header(description="The model code to use later on with the sources",
+                                 alias="model-code"),
+        local_sources_count: int | None = Query(
+            description="the count of local sources to fetch, if this param is not set then it will be set to the value "
+                        "specified for the provided model, 0 to skip them", ge=0, default=None,
+            alias="localSourcesCount"),
+        web_sources_count: int | None = Query(
+            description="the count of web sources to fetch, if this param is not set then it will be set to the value "
+                        "specified for the provided model, 0 to skip them", ge=0, default=None,
+            alias="webSourcesCount"),
+        workspace_id: UUID = Query(..., description="workspace id of the user", alias="workspaceId"),
+        chat_service: ChatService = Depends(Provide[InjectionContainer.chat_service])
+):
+    """
+    Fetch the source documents and the web sources of a question concurrently and save them at once, a failed or timed
+    out retrieval is returned empty with its reason in its detail
+    """
+    payload = await keycloak_service.check_auth(credentials)
+    user_id = str(payload.dict().get("sub"))
+    try:
+        return await chat_service.get_sources(user_id=user_id, question=question, model_code=model_code,
+                                              local_sources_count=local_sources_count,
+                                              web_sources_count=web_sources_count, workspace_id=workspace_id)
+    except SchemaError as error:
+        logging.error(f"unexpected error occurred when getting the sources {error}")
+        raise HTTPException(status_code=500, detail="Unexpected error") from error
+
+
 @chats_router.get("/prompt/{question_id}", response_model=PromptOutputSchema)
 @inject
 async def create_prompt(
@@ -82,13 +82,17 @@ async def create_conversation(
     """
     payload = await keycloak_service.check_auth(credentials)
     user_id = str(payload.dict().get("sub"))
-    if not await keycloak_service.check_user_limit(user_id=user_id,
-                                                   attribute_to_check=KeycloakAttribute.CONVERSATIONS):
-        raise ConversationsLimitApiException
     try:
-        conversation = await conversation_service.create_conversation(user_id=user_id, title=title_input,
-                                                                      workspace_id=workspace_id)
-        updated_rate_limit = await keycloak_service.update_rate_limit(user_id, KeycloakAttribute.CONVERSATIONS)
+        updated_rate_limit = await keycloak_service.reserve_rate_limit(user_id, KeycloakAttribute.CONVERSATIONS)
+        if updated_rate_limit is None:
+            raise ConversationsLimitApiException
+        try:
+            conversation = await conversation_service.create_conversation(user_id=user_id, title=title_input,
+                                                                          workspace_id=workspace_id)
+        except Exception:
+            await keycloak_service.update_rate_limit(user_id, KeycloakAttribute.CONVERSATIONS,
+                                                     incrementation_condition=True)
+            raise
         return ConversationIdLimitOutputSchema(id=conversation.id, conversations_remaining=int(
             updated_rate_limit.user_actual_limits.conversations_limit[0]))
     except (UserInformationFormatError, IndexError, ValidationError):
@@ -1,7 +1,7 @@
 from uuid import UUID
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Body, Depends, Security, Path, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, Security, Path, HTTPException, Query, Header
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from configuration.injection import InjectionContainer
@@ -43,11 +43,12 @@ async def download_sources(
         credentials: HTTPAuthorizationCredentials = Security(security),
         keycloak_service: KeycloakService = Depends(Provide[InjectionContainer.keycloak_service]),
         file_id: UUID = Path(),
+        range_header: str | None = Header(None, alias="Range", description="the part of the file to download"),
         source_service: SourceService = Depends(Provide[InjectionContainer.sources_service])
 ):
     payload = await keycloak_service.check_auth(credentials)
     user_id = str(payload.dict().get("sub"))
-    return await source_service.download_document(file_id=file_id)
+    return await source_service.download_document(file_id=file_id, range_header=range_header)
 
 
 @sources_router.get("/count", response_model=IngestedFilesCountOutput)
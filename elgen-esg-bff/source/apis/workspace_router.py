@@ -72,6 +72,8 @@ async def get_available_workspaces_per_user(
 @inject
 async def get_users_in_workspace(
         workspace_id: UUID = Path(..., title="Workspace ID"),
+        offset: int = Query(0, ge=0, description="Number of users to skip"),
+        limit: int | None = Query(None, ge=1, description="Maximum number of users to return, all if not set"),
         credentials: HTTPAuthorizationCredentials = Security(security),
         workspace_service: WorkspaceService = Depends(
             Provide[InjectionContainer.workspace_service]),
@@ -80,6 +82,8 @@ async def get_users_in_workspace(
     """
     get all users infos from keycloak
     :param workspace_id:
+    :param offset:
+    :param limit:
     :param workspace_service:
     :param keycloak_service:
     :param credentials:
@@ -90,7 +94,7 @@ async def get_users_in_workspace(
         keycloak_service.check_user_role(payload, [ClientRole.SUPER_ADMIN])
         all_users_ids = await workspace_service.get_users_in_workspace(workspace_id=workspace_id)
         users = await keycloak_service.get_workspace_users(users_ids=all_users_ids.get("users_ids", []))
-        return UserInfoWorkspaceAPIResponse(users=users)
+        return UserInfoWorkspaceAPIResponse.from_users(users, offset=offset, limit=limit)
     except UserRolesNotDefined as error:
         raise UserRolesNotDefinedApiError(
             detail="Users Roles are not assigned yet",
@@ -116,6 +120,8 @@ async def get_users_in_workspace(
 @inject
 async def get_unavailable_users_in_workspace(
         workspace_id: UUID = Path(..., title="Workspace ID"),
+        offset: int = Query(0, ge=0, description="Number of users to skip"),
+        limit: int | None = Query(None, ge=1, description="Maximum number of users to return, all if not set"),
         credentials: HTTPAuthorizationCredentials = Security(security),
         workspace_service: WorkspaceService = Depends(
             Provide[InjectionContainer.workspace_service]),
@@ -124,6 +130,8 @@ async def get_unavailable_users_in_workspace(
     """
     get all users infos from keycloak
     :param workspace_id:
+    :param offset:
+    :param limit:
     :param workspace_service:
     :param keycloak_service:
     :param credentials:
@@ -136,7 +144,7 @@ async def get_unavailable_users_in_workspace(
         users = await keycloak_service.get_workspace_non_included_users(
             users_ids=all_existing_users_ids.get("users_ids",
                                                  []))
-        return UserInfoWorkspaceAPIResponse(users=users)
+        return UserInfoWorkspaceAPIResponse.from_users(users, offset=offset, limit=limit)
     except UserRolesNotDefined as error:
         raise UserRolesNotDefinedApiError(
             detail="Users Roles are not assigned yet",
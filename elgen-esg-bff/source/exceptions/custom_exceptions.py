@@ -120,3 +120,12 @@ class ModelConfigError(Exception):
 
     def __init__(self, detail: str = "Could not get the model's source configuration"):
         self.detail = detail
+
+
+class RateLimitStoreError(Exception):
+    """
+    Exception raised when the rate limit counters cannot be read or changed
+    """
+
+    def __init__(self, detail: str = "error reading the user limits"):
+        self.detail = detail
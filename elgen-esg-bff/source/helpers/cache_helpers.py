@@ -0,0 +1,84 @@
+import asyncio
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class LRUCache:
+    """
+    In process least recently used cache whose entries also expire ttl seconds after being set,
+    shared across requests through a Singleton provider
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expiry, value = entry
+            if expiry < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CoalescingCache(LRUCache):
+    """
+    LRUCache whose misses are loaded once, the concurrent callers missing the same key wait for the running load
+    instead of starting their own. The failed loads are not kept, the next caller loads the key again.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        super().__init__(max_size=max_size, ttl=ttl)
+        self._loads: dict[Hashable, asyncio.Future] = {}
+
+    def _forget_load(self, key: Hashable, load: asyncio.Future) -> None:
+        if self._loads.get(key) is load:
+            del self._loads[key]
+
+    async def _load_and_set(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        value = await load()
+        # the value of a load started before the key was popped is returned to its callers but not kept
+        if self._loads.get(key) is asyncio.current_task():
+            self.set(key, value)
+        return value
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        if (value := self.get(key)) is not None:
+            return value
+        if (running_load := self._loads.get(key)) is None:
+            running_load = self._loads[key] = asyncio.ensure_future(self._load_and_set(key, load))
+            running_load.add_done_callback(lambda done_load: self._forget_load(key, done_load))
+        # a cancelled caller does not cancel the load the others are waiting for
+        return await asyncio.shield(running_load)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        self._loads.pop(key, None)
+        return super().pop(key, default)
@@ -9,6 +9,12 @@ class RequestMethod(str, Enum):
     PATCH = "patch"
 
 
+class RateLimitStoreType(str, Enum):
+    MEMORY = "memory"
+    POSTGRES = "postgres"
+    KEYCLOAK = "keycloak"
+
+
 class LimitType(str, Enum):
     CONVERSATION = "conversation"
     QUESTIONS = "questions"
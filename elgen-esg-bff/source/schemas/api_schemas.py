@@ -16,6 +16,13 @@ class SourceResponse(CamelModel):
         description="A field containing details on the data usually success if we have data or failed for an empty data list")
 
 
+class RetrievedSourcesResponse(CamelModel):
+    local_sources: SourceResponse = Field(
+        description="The source documents, empty with the reason in their detail if their retrieval failed")
+    web_sources: SourceResponse = Field(
+        description="The web sources, empty with the reason in their detail if their retrieval failed")
+
+
 class AnswerOutputSchema(CamelModel):
     question_id: UUID = Field(..., description='The question id for the answer output', alias='id')
     answer: AnswerSchema = Field(..., description='The answer for the question identified by the question_id')
@@ -84,6 +91,8 @@ class QuestionSchema(QuestionInput):
     local_sources: list[SourceSchema] | None = Field(description="the local document sources", default=None)
     web_sources: list[WebSourceSchema] | None = Field(description="the external web sources", default=None)
     is_specific: bool | None = Field(description="question classification specific or not", default=True)
+    classified: bool | None = Field(description="false when the question is returned before its classification "
+                                                "completed or after it failed", default=True)
 
     class Config:
         allow_population_by_field_name = True
@@ -137,6 +137,14 @@ class PlatformUsers(BaseModel):
 
 class UserInfoWorkspaceAPIResponse(BaseModel):
     users: list[UserInfoWorkspace] = Field([], description="list of users in a workspace")
+    total: int | None = Field(None, description="number of users matching the request, set when a page is requested")
+
+    @classmethod
+    def from_users(cls, users: list[UserInfoWorkspace], offset: int = 0, limit: int | None = None):
+        """The users from offset, at most limit of them, all the users when no page is requested"""
+        if not offset and limit is None:
+            return cls(users=users)
+        return cls(users=users[offset:None if limit is None else offset + limit], total=len(users))
 
 
 class UserRegistrationData(BaseUserModel):
@@ -16,6 +16,8 @@ class WorkspaceInput(BaseModel):
                                                        alias='classificationChangeEnabled')
     stop_answer_process: bool | None = Field(None, description="Enable/disable classification",
                                              alias='stopAnswerProcess')
+    answer_cache_enabled: bool | None = Field(None, description="Reuse the answers to repeated questions",
+                                              alias='answerCacheEnabled')
     available_model_codes: list[str] | None = Field(None, description="List of available models for a workspace",
                                                     alias="models")
     source_type_id: UUID | None = Field(None, description="Type of source", alias='sourceTypeId')
@@ -65,6 +67,8 @@ class GenericWorkspaceOutputModel(WorkspaceOutput):
                                                        alias='classificationChangeEnabled')
     stop_answer_process: bool | None = Field(None, description="Enable/disable classification",
                                              alias='stopAnswerProcess')
+    answer_cache_enabled: bool | None = Field(None, description="Reuse the answers to repeated questions",
+                                              alias='answerCacheEnabled')
     available_model_codes: list[str] = Field(..., description="List of available models for a workspace",
                                              alias="models")
     workspace_type: WorkspaceTypeModel | None = Field(None, description="workspace type data", alias="type")
@@ -1,12 +1,15 @@
 from uuid import UUID
 
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from source.exceptions.commons import NotOkServiceResponse
 
 from source.models.enums import RequestMethod
-from source.schemas.chat_suggestions_schemas import ChatSuggestion, WorkspaceChatSuggestions
+from source.schemas.chat_suggestions_schemas import ChatSuggestion
 from source.schemas.common import UpdateStatusDataModel
 from source.schemas.conversation_schemas import QuestionInputSchema
-from source.utils.utils import make_request
+from source.utils.utils import make_request, stream_request
 
 
 class ChatSuggestionsService:
@@ -34,19 +37,26 @@ class ChatSuggestionsService:
             body=jsonable_encoder(suggestion.dict())
         )
 
-    async def get_suggestions_per_workspace(self, workspace_id: UUID) -> WorkspaceChatSuggestions:
+    async def get_suggestions_per_workspace(self, workspace_id: UUID,
+                                            if_none_match: str | None = None
+                                            ) -> StreamingResponse | NotOkServiceResponse:
         """
-        Get list of suggested questions for specific workspace
+        Get list of suggested questions for specific workspace, relayed as the conversation service answers it: with
+        its ETag, and as a 304 without body when the If-None-Match ETag is still the current one
         Args:
             workspace_id (UUID): The id of the workspace
+            if_none_match (str): ETag of the suggestions the client already has
 
         Returns:
-            WorkspaceChatSuggestions: list of suggested questions
+            StreamingResponse: the WorkspaceChatSuggestions list of suggested questions
         """
-        return await make_request(
+        return await stream_request(
             service_url=self.config["CONVERSATION_SERVICE_URL"],
-            uri=f"/workspaces/suggestion?workspace_id={workspace_id}",
-            method=RequestMethod.GET)
+            uri="/workspaces/suggestion",
+            query_params={"workspace_id": str(workspace_id)},
+            headers={"If-None-Match": if_none_match} if if_none_match else None,
+            media_type="application/json",
+            response_headers={"Cache-Control": "no-cache"})
 
     async def delete_suggestion_by_id(self, suggestion_id: UUID) -> UpdateStatusDataModel:
         """
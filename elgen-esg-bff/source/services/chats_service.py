@@ -1,10 +1,13 @@
+import asyncio
 import json
 import logging
-from typing import AsyncGenerator
+import time
+from typing import AsyncGenerator, Awaitable, Callable
 from uuid import UUID
 
-import httpx
 from aiohttp import ClientSession
+from circuitbreaker import CircuitBreakerError
+from elgen_common.tracing import tracer, RETRIEVAL_SEARCH_SPAN, StreamedGenerationTracer
 from fastapi import HTTPException, status, Request
 from fastapi.encoders import jsonable_encoder
 from loguru import logger
@@ -13,25 +16,31 @@ from pydantic import ValidationError
 from configuration.config import app_config
 from source.exceptions.commons import NotOkServiceResponse
 from source.exceptions.custom_exceptions import SchemaError, UserInformationFormatError, ModelConfigError
+from source.helpers.cache_helpers import CoalescingCache, LRUCache
 from source.models.enums import RequestMethod
 from source.schemas.answer_schemas import AnswerRatingRequest, AnswerRatingResponse, AnswerUpdatingRequest, \
     VersionedAnswerResponse
 from source.schemas.api_schemas import SourceResponse, AnswerOutputSchema, ModelInfoSchema, PromptOutputSchema, \
     QuestionInput, ModelPostInfoSchema, ModelSourcesUpdateSchema, ChatModelsOutputSchema, \
-    QuestionLimitOutputSchema
+    QuestionLimitOutputSchema, RetrievedSourcesResponse
 from source.schemas.common import QueryDepth
 from source.schemas.conversation_schemas import QuestionInputSchema, AnswerSchema
 from source.schemas.source_schemas import SourceSchema, WebSourceSchema, SourceLimitSchema
 from source.schemas.streaming_answer_schema import ModelStreamingErrorResponse
 from source.schemas.workspace_schemas import WorkspaceTypeModel, WorkspaceTypesEnum
 from source.services.keycloak_service import KeycloakService
+from source.utils.http_sessions import upstream_sessions
 from source.utils.utils import make_request
 
 
 class ChatService:
-    def __init__(self, config: dict, keycloak_service: KeycloakService) -> None:
+    def __init__(self, config: dict, keycloak_service: KeycloakService,
+                 source_limits_cache: LRUCache | None = None,
+                 workspace_types_cache: CoalescingCache | None = None) -> None:
         self.config = config
         self.__keycloak_service = keycloak_service
+        self.source_limits_cache = source_limits_cache
+        self.workspace_types_cache = workspace_types_cache
 
     async def add_question(self, user_id: str, conversation_id: str, question: QuestionInputSchema, skip_doc: bool,
                            skip_web: bool, workspace_id: UUID,
@@ -96,24 +105,36 @@ class ChatService:
 
     async def add_model(self, model_info_input: ModelPostInfoSchema) -> ModelInfoSchema:
         """Add a new model with a unique model code"""
-        return await make_request(
+        response = await make_request(
             service_url=self.config.get("CONVERSATION_SERVICE_URL"),
             uri=self.config.get("MODELS_ENDPOINT"),
             method=RequestMethod.POST,
             body=model_info_input.dict()
         )
+        self.invalidate_model_source_limits(model_info_input.code)
+        return response
 
     async def patch_model(self, model_info_input: ModelSourcesUpdateSchema) -> ModelInfoSchema:
         """Patch an existing model to alter the max web and max local attributes"""
-        return await make_request(
+        response = await make_request(
             service_url=self.config.get("CONVERSATION_SERVICE_URL"),
             uri=self.config.get("MODELS_ENDPOINT"),
             method=RequestMethod.PATCH,
             body=model_info_input.dict()
 
         )
+        self.invalidate_model_source_limits(model_info_input.code)
+        return response
+
+    def invalidate_model_source_limits(self, model_code: str) -> None:
+        if self.source_limits_cache is not None:
+            self.source_limits_cache.pop(("model_source_limits", model_code))
 
     async def get_model_config_per_model_code(self, model_code: str) -> SourceLimitSchema:
+        """Sources limits of the model, cached when a source limits cache is given"""
+        if self.source_limits_cache is not None and \
+                (source_limits := self.source_limits_cache.get(("model_source_limits", model_code))) is not None:
+            return source_limits
         model_info_url = self.config.get("MODELS_ENDPOINT")
         source_config = await make_request(
             service_url=self.config.get("CONVERSATION_SERVICE_URL"),
@@ -122,12 +143,47 @@ class ChatService:
             query_params={"model_code": model_code},
         )
         try:
-            return SourceLimitSchema(modelCode=source_config.get("code"),
-                                     maxLocal=source_config.get("max_doc"),
-                                     maxWeb=source_config.get("max_web"))
+            source_limits = SourceLimitSchema(modelCode=source_config.get("code"),
+                                              maxLocal=source_config.get("max_doc"),
+                                              maxWeb=source_config.get("max_web"))
         except ValidationError as error:
             logging.error(error)
             raise ModelConfigError(detail="Could not extract the sources configuration")
+        if self.source_limits_cache is not None:
+            self.source_limits_cache.set(("model_source_limits", model_code), source_limits)
+        return source_limits
+
+    async def _search_web_sources(self, headers: dict, question: QuestionInput, web_sources_count: int) -> dict:
+        with tracer.start_as_current_span(RETRIEVAL_SEARCH_SPAN, attributes={"retrieval.source": "web",
+                                                                             "retrieval.count": web_sources_count}):
+            web_sources = await make_request(
+                service_url=self.config["SOURCES_SERVICE_URL"],
+                uri="/sources/web",
+                method=RequestMethod.POST,
+                body=jsonable_encoder({"content": question.content}),
+                query_params=jsonable_encoder({"web_sources_count": web_sources_count}),
+                headers=dict(headers)
+            )
+        if isinstance(web_sources, NotOkServiceResponse):
+            raise HTTPException(status_code=500, detail="failed to get web sources")
+        return web_sources
+
+    async def _search_local_sources(self, headers: dict, question: QuestionInput, local_sources_count: int,
+                                    workspace_id: UUID) -> dict:
+        with tracer.start_as_current_span(RETRIEVAL_SEARCH_SPAN, attributes={"retrieval.source": "local",
+                                                                             "retrieval.count": local_sources_count}):
+            similar_docs_response = await make_request(
+                service_url=self.config["SOURCES_SERVICE_URL"],
+                uri="/sources/similar",
+                method=RequestMethod.POST,
+                body=jsonable_encoder({"content": question.content}),
+                query_params=jsonable_encoder({"local_sources_count": local_sources_count,
+                                               "workspace_id": workspace_id}),
+                headers=dict(headers)
+            )
+        if isinstance(similar_docs_response, NotOkServiceResponse):
+            raise HTTPException(status_code=500, detail="failed to get sources documents")
+        return similar_docs_response
 
     async def get_web_source(self, user_id: str, question: QuestionInput, model_code: str,
                              web_sources_count: int | None) -> SourceResponse:
@@ -142,16 +198,7 @@ class ChatService:
             "user-id": user_id,
         }
         # get web sources
-        web_sources = await make_request(
-            service_url=self.config["SOURCES_SERVICE_URL"],
-            uri="/sources/web",
-            method=RequestMethod.POST,
-            body=jsonable_encoder({"content": question.content}),
-            query_params=jsonable_encoder({"web_sources_count": web_sources_count}),
-            headers=headers
-        )
-        if isinstance(web_sources, NotOkServiceResponse):
-            raise HTTPException(status_code=500, detail="failed to get web sources")
+        web_sources = await self._search_web_sources(headers, question, web_sources_count)
         if web_sources_data := web_sources.get("data"):
             # save web sources in db if web_sources_data is not an empty list
             web_sources_response = await make_request(
@@ -186,16 +233,7 @@ class ChatService:
             "user-id": user_id,
         }
         # get sources documents
-        similar_docs_response = await make_request(
-            service_url=self.config["SOURCES_SERVICE_URL"],
-            uri="/sources/similar",
-            method=RequestMethod.POST,
-            body=jsonable_encoder({"content": question.content}),
-            query_params=jsonable_encoder({"local_sources_count": local_sources_count, "workspace_id": workspace_id}),
-            headers=headers
-        )
-        if isinstance(similar_docs_response, NotOkServiceResponse):
-            raise HTTPException(status_code=500, detail="failed to get sources documents")
+        similar_docs_response = await self._search_local_sources(headers, question, local_sources_count, workspace_id)
         if similar_docs_data := similar_docs_response.get("data"):
             # save sources documents in db if similar_docs_data is not an empty list
             sources_response = await make_request(
@@ -217,6 +255,78 @@ class ChatService:
                 raise SchemaError
         return similar_docs_response
 
+    @staticmethod
+    async def _search_within(search: Callable[[], Awaitable[dict]], sources_count: int, timeout: float,
+                             source_name: str) -> dict:
+        """
+        Result of a retrieval branch, its failure is returned as an empty result whose detail holds the reason so
+        the other branch is still returned
+        """
+        if not sources_count:
+            return {"data": [], "detail": "skipped"}
+        try:
+            return await asyncio.wait_for(search(), timeout=timeout)
+        except (asyncio.TimeoutError, HTTPException, CircuitBreakerError) as error:
+            timed_out = isinstance(error, asyncio.TimeoutError) or \
+                getattr(error, "status_code", None) == status.HTTP_504_GATEWAY_TIMEOUT
+            logger.error(f"Retrieval of the {source_name} failed: {error!r}")
+            return {"data": [], "detail": f"{source_name} retrieval timed out" if timed_out
+                    else f"failed to get {source_name}", "failed": True}
+
+    async def get_sources(self, user_id: str, question: QuestionInput, model_code: str,
+                          local_sources_count: int | None, web_sources_count: int | None,
+                          workspace_id: UUID) -> RetrievedSourcesResponse:
+        """
+        Fetch the source documents and the web sources concurrently, each within its own timeout, then save both in
+        one call to the conversation service before returning them. A failed retrieval is returned empty with its
+        reason, the request fails only if no retrieval succeeded.
+        """
+        if local_sources_count is None or web_sources_count is None:
+            sources_config = await self.get_model_config_per_model_code(model_code=model_code)
+            local_sources_count = sources_config.max_local if local_sources_count is None else local_sources_count
+            web_sources_count = sources_config.max_web if web_sources_count is None else web_sources_count
+
+        headers = {
+            "user-id": user_id,
+        }
+        local_sources, web_sources = await asyncio.gather(
+            self._search_within(
+                lambda: self._search_local_sources(headers, question, local_sources_count, workspace_id),
+                local_sources_count, self.config["LOCAL_RETRIEVAL_TIMEOUT"], "sources documents"),
+            self._search_within(lambda: self._search_web_sources(headers, question, web_sources_count),
+                                web_sources_count, self.config["WEB_RETRIEVAL_TIMEOUT"], "web sources"))
+        if local_sources.get("failed") and web_sources.get("failed"):
+            raise HTTPException(status_code=500, detail="failed to get sources")
+
+        similar_docs_data, web_sources_data = local_sources.get("data") or [], web_sources.get("data") or []
+        if similar_docs_data or web_sources_data:
+            # save both retrieved sources in db at once
+            saved_sources = await make_request(
+                service_url=self.config["CONVERSATION_SERVICE_URL"],
+                uri="/conversations/retrieved-sources",
+                method=RequestMethod.POST,
+                query_params=jsonable_encoder({"question_id": question.id}),
+                body={
+                    "similar_docs": similar_docs_data,
+                    "web_sources": web_sources_data
+                },
+                headers=headers
+            )
+            if isinstance(saved_sources, NotOkServiceResponse):
+                raise HTTPException(status_code=500, detail="failed to save the retrieved sources")
+            similar_docs_data, web_sources_data = saved_sources["similar_docs"], saved_sources["web_sources"]
+        try:
+            return RetrievedSourcesResponse(
+                local_sources=SourceResponse(data=[SourceSchema(**data) for data in similar_docs_data],
+                                             detail="success" if similar_docs_data
+                                             else local_sources.get("detail", "success")),
+                web_sources=SourceResponse(data=[WebSourceSchema(**data) for data in web_sources_data],
+                                           detail="success" if web_sources_data
+                                           else web_sources.get("detail", "success")))
+        except (ValidationError, KeyError) as error:
+            logger.error(error)
+            raise SchemaError
+
     async def create_rating_for_answer(self, user_id, request_body: AnswerRatingRequest) -> AnswerRatingResponse:
 
         """
@@ -296,10 +406,7 @@ class ChatService:
     # TODO remove this, as we will use the sources stored in conversation service
     async def _extract_config_per_model(self, model_code: str) -> SourceLimitSchema:
         """Extract the model config from the keycloak response"""
-        source_configs = await self.__keycloak_service.get_sources_configurations()
-
-        for source_config in source_configs:
-            source_config_schema = SourceLimitSchema(**source_config)
+        for source_config_schema in await self.__keycloak_service.extract_source_configurations():
             if source_config_schema.model_code == model_code:
                 return source_config_schema
 
@@ -334,25 +441,47 @@ class ChatService:
 
         query_params = {"queryDepth": query_depth.value} if workspace_type == WorkspaceTypesEnum.database else {}
 
-        async with httpx.AsyncClient() as client:
-            async with client.stream('GET', f'{self.config.get("CONVERSATION_SERVICE_URL")}{endpoint}',
-                                     headers=headers, params=query_params,
+        # the chunks relayed stand for the tokens, the answer is streamed about one token per chunk
+        generation_tracer = StreamedGenerationTracer(code=model_code)
+        conversation_service_url = self.config.get("CONVERSATION_SERVICE_URL")
+        client = upstream_sessions.get_stream_client(conversation_service_url)
+        started_at = next_disconnect_check = time.monotonic()
+        relayed_chunks = relayed_bytes = 0
+        status_code, error = None, None
+        try:
+            # the bytes are relayed as they come, identity keeps them from being compressed and decompressed on the way
+            async with client.stream('GET', f'{conversation_service_url}{endpoint}',
+                                     headers={**headers, "accept-encoding": "identity"}, params=query_params,
                                      timeout=300) as resp:
-                if resp.status_code == status.HTTP_200_OK:
-                    async for chunk in resp.aiter_bytes():
-                        logger.info(f"chunk {chunk}")
+                status_code = resp.status_code
+                if resp.status_code != status.HTTP_200_OK:
+                    error = f"Request failed with status code {resp.status_code}"
+                    yield str(ModelStreamingErrorResponse(detail=error))
+                    return
+                async for chunk in resp.aiter_bytes():
+                    # checking the connection on every token would cost more than relaying it
+                    if time.monotonic() >= next_disconnect_check:
                         if await request.is_disconnected():
-                            logger.info("Connection disconnected, end streaming!")
+                            error = "Connection disconnected"
                             break
-                        yield chunk
-                else:
-                    yield str(ModelStreamingErrorResponse(
-                        detail=f"Request failed with status code {resp.status_code}"))
-
+                        next_disconnect_check = time.monotonic() + app_config.STREAM_DISCONNECT_CHECK_INTERVAL
+                    generation_tracer.add_tokens()
+                    relayed_chunks += 1
+                    relayed_bytes += len(chunk)
+                    yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            # the client went away while a chunk was awaited or sent, leaving the stream closes the upstream connection
+            error = "Connection disconnected"
+            raise
+        finally:
+            generation_tracer.end(error=error)
+            logger.info(f"Relayed the answer of question {question_id}: status {status_code}, {relayed_chunks} chunks, "
+                        f"{relayed_bytes} bytes in {time.monotonic() - started_at:.3f} s"
+                        f"{f', {error}' if error else ''}")
 
     async def get_workspace_type_by_id(self, workspace_id: str) -> WorkspaceTypesEnum:
         """
-        Get the workspace type by its id
+        Get the workspace type by its id, from the workspace types cache when there is one
         Args:
             workspace_id (str): The workspace identifier
         Returns:
@@ -360,6 +489,12 @@ class ChatService:
         Raises:
             HTTPException: If the workspace type does not exist for that id
         """
+        if self.workspace_types_cache is not None:
+            return await self.workspace_types_cache.get_or_load(
+                str(workspace_id), lambda: self._get_workspace_type_by_id(workspace_id))
+        return await self._get_workspace_type_by_id(workspace_id)
+
+    async def _get_workspace_type_by_id(self, workspace_id: str) -> WorkspaceTypesEnum:
         workspace_type_dict = await make_request(service_url=self.config.get("CONVERSATION_SERVICE_URL"),
                                                  uri=f"/workspaces/{workspace_id}/type",
                                                  method=RequestMethod.GET)
@@ -2,6 +2,7 @@ from uuid import UUID
 
 from fastapi import HTTPException, status, UploadFile
 from fastapi.encoders import jsonable_encoder
+from loguru import logger
 
 from configuration.config import BFFSettings
 from source.exceptions.commons import NotOkServiceResponse
@@ -41,8 +42,25 @@ class IngestionService:
         if isinstance(store_documents_response, NotOkServiceResponse):
             return store_documents_response
 
+        await self.invalidate_answer_cache(workspace_id=workspace_id)
         return IngestedFileOutput(file_id=file_handler_response.get("file_id"))
 
+    async def invalidate_answer_cache(self, workspace_id: UUID) -> None:
+        """
+        Drop the answers the conversation service cached for the workspace, they were generated on its previous
+        documents. A failure is only logged: the document is ingested and the cache is keyed on the retrieved sources
+        """
+        try:
+            invalidation_response = await make_request(service_url=self.config['CONVERSATION_SERVICE_URL'],
+                                                       uri=f"/workspaces/{workspace_id}/answer-cache",
+                                                       method=RequestMethod.DELETE)
+        except HTTPException as error:
+            logger.error(f"Failed to invalidate the answer cache of workspace {workspace_id}: {error.detail}")
+            return
+        if isinstance(invalidation_response, NotOkServiceResponse):
+            logger.error(f"Failed to invalidate the answer cache of workspace {workspace_id}: "
+                         f"{invalidation_response.body.decode()}")
+
     async def delete_ingest_index(self) -> AcknowledgeResponse:
         """
 
@@ -5,20 +5,24 @@ import os
 from datetime import datetime, date
 from typing import Union
 
+import jwt
 from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from elgen_common.tracing import traced, AUTH_INTROSPECTION_SPAN
 from fastapi import HTTPException, Response
 from fastapi import status
 from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPAuthorizationCredentials
 from loguru import logger
+from opentelemetry import trace
 from pydantic import ValidationError
 
 from configuration.config import app_config
 from source.exceptions.api_exceptions import UserNotFoundApiException, KeycloakInternalApiException
 from source.exceptions.custom_exceptions import WrongCredentials, UserNotFound, UserAlreadyExistException, \
     KeycloakError, SessionNotFound, UserInformationFormatError, UserRolesNotDefined, AttributesError, \
-    MissingUserInformation, DataEncryptionError
+    MissingUserInformation, DataEncryptionError, RateLimitStoreError
+from source.helpers.cache_helpers import LRUCache
 from source.helpers.keycloack_helper import format_login_keycloak_response, format_user_info
 from source.models.enums import RequestMethod, LimitType
 from source.schemas.common import AcknowledgeResponse, AcknowledgeTypes
@@ -28,20 +32,38 @@ from source.schemas.keycloak_schemas import LoginData, LoginModel, RequestHeader
     RefreshTokenRequest, ClientRole, UserCreationBulkRequest, KeycloakPartialImportResponse, UserCreationBulkResponse, \
     UserInfoWorkspace
 from source.schemas.source_schemas import SourceLimitSchema
+from source.services.keycloak_session_service import KeycloakSessionService
+from source.services.rate_limit_service import RateLimitService
+from source.services.token_verification_service import TokenVerificationService
+from source.services.user_directory_service import UserDirectoryService
 from source.utils.utils import NotOkServiceResponse, make_request
 
+SOURCES_CONFIGURATION_CACHE_KEY = "keycloak_sources_configuration"
+
 
 class KeycloakService:
-    def __init__(self, keycloak_service_configuration: dict) -> None:
+    def __init__(self, keycloak_service_configuration: dict,
+                 token_verification_service: TokenVerificationService | None = None,
+                 keycloak_session_service: KeycloakSessionService | None = None,
+                 rate_limit_service: RateLimitService | None = None,
+                 source_limits_cache: LRUCache | None = None,
+                 user_directory_service: UserDirectoryService | None = None) -> None:
         self.keycloak_service_configuration = keycloak_service_configuration
+        self.token_verification_service = token_verification_service
+        self.keycloak_session_service = keycloak_session_service
+        self.rate_limit_service = rate_limit_service
+        self.source_limits_cache = source_limits_cache
+        self.user_directory_service = user_directory_service
         self.request_base_path = (f"{self.keycloak_service_configuration['SERVER_URL']}/admin/realms/"
                                   f"{self.keycloak_service_configuration['REALM']}")
 
     async def _get_keycloak_endpoints_configuration(self) -> dict:
         """
-        Returns Keycloak Open ID Connect configuration
+        Returns Keycloak Open ID Connect configuration, cached by the session service when there is one
         :returns: dict: Open ID Configuration
         """
+        if self.keycloak_session_service is not None:
+            return await self.keycloak_session_service.get_endpoints_configuration()
         return await make_request(
             service_url=self.keycloak_service_configuration['SERVER_URL'],
             uri=f"/realms/{self.keycloak_service_configuration['REALM']}/.well-known/openid-configuration",
@@ -70,9 +92,41 @@ class KeycloakService:
             logging.error("error getting all user infos from keycloak")
             raise KeycloakError(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="error getting user infos")
 
+    @traced(AUTH_INTROSPECTION_SPAN)
     async def get_token_infos(self, token: str) -> KeycloakTokenInfo:
         """
-        get token information's
+        get token information's, verified locally when the token is signed by a realm key, introspected on keycloak
+        otherwise with the recent introspections cached
+        :param token: access token
+        :return: KeycloakTokenInfo
+        """
+        if self.token_verification_service is None:
+            return await self._introspect_token(token)
+        current_span = trace.get_current_span()
+        try:
+            if (token_infos := await self.token_verification_service.verify(token)) is not None:
+                current_span.set_attribute("auth.verification", "local")
+                return token_infos
+        except (jwt.InvalidTokenError, ValidationError) as error:
+            logger.warning(f"Rejected access token: {error}")
+            raise KeycloakError(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token") from error
+
+        if (token_infos := self.token_verification_service.get_cached_introspection(token)) is not None:
+            current_span.set_attribute("auth.verification", "introspection_cache")
+            return token_infos
+        current_span.set_attribute("auth.verification", "introspection")
+        try:
+            token_infos = await self._introspect_token(token)
+        except KeycloakError as error:
+            if error.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY:
+                self.token_verification_service.cache_introspection(token, rejection=error)
+            raise
+        self.token_verification_service.cache_introspection(token, token_infos=token_infos)
+        return token_infos
+
+    async def _introspect_token(self, token: str) -> KeycloakTokenInfo:
+        """
+        get token information's from the keycloak introspection endpoint
         :param token: access token
         :return: KeycloakTokenInfo
         """
@@ -133,6 +187,8 @@ class KeycloakService:
         :returns: dict: Inplace method that updated the class attribute `_admin_token`
         PS:Is executed on startup and may be executed again if the token validation fails
         """
+        if self.keycloak_session_service is not None:
+            return await self.keycloak_session_service.get_admin_token(self._get_keycloak_endpoints_configuration)
         return await make_request(
             service_url=(await self._get_keycloak_endpoints_configuration()).get("token_endpoint"),
             uri="",
@@ -193,6 +249,8 @@ class KeycloakService:
             logger.error("skipping the creation of this user, they exist already")
             raise UserAlreadyExistException(status_code=status.HTTP_409_CONFLICT, detail="User Already exists!")
 
+        if self.user_directory_service is not None:
+            await self.user_directory_service.add_user(user_id, self._get_admin_token)
         return UserCreationBulkResponse(detail="User Created Successfully!", user_id=user_id)
 
     async def get_user(self, user_id: str = None,
@@ -253,10 +311,14 @@ class KeycloakService:
                 in response]
 
     async def get_workspace_users(self, users_ids: list) -> list[UserInfoWorkspace]:
+        if self.user_directory_service is not None:
+            return await self.user_directory_service.get_users_by_ids(users_ids, self._get_admin_token)
         users = await self.get_all_users()
         return [user for user in users if user is not None and getattr(user, 'id', None) in users_ids]
 
     async def get_workspace_non_included_users(self, users_ids: list) -> list[UserInfoWorkspace]:
+        if self.user_directory_service is not None:
+            return await self.user_directory_service.get_users_excluding(users_ids, self._get_admin_token)
         users = await self.get_all_users()
         return [user for user in users if user is not None and getattr(user, 'id', None) not in users_ids]
 
@@ -267,6 +329,11 @@ class KeycloakService:
         :param attribute_to_check: the user attribute to check which is either conversations/questions
         :return:
         """
+        if self.rate_limit_service is not None:
+            try:
+                return await self.rate_limit_service.get_remaining(user_id, attribute_to_check, self.get_user) > 0
+            except RateLimitStoreError as error:
+                raise KeycloakInternalApiException(detail=error.detail)
         user_profile = await self.get_user(user_id)
         try:
             conversation_info = ConversationInfo(**user_profile.user_actual_limits.dict()).dict(by_alias=True)
@@ -292,6 +359,13 @@ class KeycloakService:
         :param user_id:
         :return:
         """
+        if self.rate_limit_service is not None:
+            user_profile = await self.get_user(user_id=user_id, user_roles=user_roles)
+            try:
+                await self.rate_limit_service.cache_profile(user_id, user_profile)
+                return (await self.rate_limit_service.apply_counters(user_id, user_profile)).dict(by_alias=True)
+            except RateLimitStoreError as error:
+                raise KeycloakInternalApiException(detail=error.detail)
         admin_token = await self._get_admin_token()
         if isinstance(admin_token, NotOkServiceResponse):
             logger.error("User not found")
@@ -359,6 +433,24 @@ class KeycloakService:
             raise UserNotFoundApiException(detail="error in updating rate limit")
         return user_profile
 
+    async def reserve_rate_limit(self, user_id: str, attribute_to_reserve: KeycloakAttribute) -> UserInfo | None:
+        """
+        count a use of the attribute if the user did not reach its limit of the day, to be given back with
+        update_rate_limit(incrementation_condition=True) when the use fails
+        :param user_id:
+        :param attribute_to_reserve: the user attribute to count which is either conversations/questions
+        :return: the user profile with its remaining uses, None when the limit is reached
+        """
+        if self.rate_limit_service is not None:
+            try:
+                return await self.rate_limit_service.reserve(user_id, attribute_to_reserve, self.get_user)
+            except RateLimitStoreError as error:
+                raise KeycloakInternalApiException(detail=error.detail)
+        # the keycloak attributes are read then written, concurrent requests are not serialized
+        if not await self.check_user_limit(user_id=user_id, attribute_to_check=attribute_to_reserve):
+            return None
+        return await self.update_rate_limit(user_id, attribute_to_reserve)
+
     async def update_rate_limit(self, user_id: str, attribute_to_update: KeycloakAttribute,
                                 incrementation_condition: bool = False) -> UserInfo:
         """
@@ -368,6 +460,12 @@ class KeycloakService:
         :param incrementation_condition:
         :return:
         """
+        if self.rate_limit_service is not None:
+            try:
+                return await self.rate_limit_service.consume(user_id, attribute_to_update, self.get_user,
+                                                             amount=-1 if incrementation_condition else 1)
+            except RateLimitStoreError as error:
+                raise KeycloakInternalApiException(detail=error.detail)
         admin_token = await self._get_admin_token()
 
         if isinstance(admin_token, NotOkServiceResponse):
@@ -403,6 +501,35 @@ class KeycloakService:
         except (MissingUserInformation, ValidationError, ValueError, KeyError, IndexError):
             raise UserInformationFormatError
 
+    async def write_back_rate_limits(self) -> None:
+        """
+        Copies the counters of the users changed since the last write back to their keycloak attributes, the users
+        which could not be updated are kept for the next write back
+        """
+        changed_users = self.rate_limit_service.pop_changed_users()
+        if not changed_users:
+            return
+        admin_token = await self._get_admin_token()
+        if isinstance(admin_token, NotOkServiceResponse):
+            self.rate_limit_service.mark_changed(changed_users)
+            logger.error("Error getting the admin token to write the rate limits back")
+            return
+        failed_users = set()
+        for user_id in changed_users:
+            try:
+                user_profile = await self.rate_limit_service.apply_counters(user_id, await self.get_user(user_id))
+                response = await self._make_update_request(admin_token, user_id, user_profile)
+            except UserNotFound:
+                logger.warning(f"User {user_id} not found, its rate limits are not written back")
+                continue
+            except (HTTPException, UserInformationFormatError, MissingUserInformation, RateLimitStoreError):
+                response = None
+            if response is None or isinstance(response, NotOkServiceResponse):
+                failed_users.add(user_id)
+        if failed_users:
+            logger.error(f"Error writing the rate limits of {len(failed_users)} users back to keycloak")
+            self.rate_limit_service.mark_changed(failed_users)
+
     @staticmethod
     def _get_last_date(user_attributes: ConversationInfo, attribute_to_update: KeycloakAttribute) \
             -> date:
@@ -592,14 +719,24 @@ class KeycloakService:
         return json.loads(source_config_result)
 
     async def extract_source_configurations(self) -> list[SourceLimitSchema]:
-        """return the appropriate schema of source limits"""
+        """return the appropriate schema of source limits, cached when a source limits cache is given"""
+        if self.source_limits_cache is not None and \
+                (source_limits := self.source_limits_cache.get(SOURCES_CONFIGURATION_CACHE_KEY)) is not None:
+            return source_limits
         sources_config = await self.get_sources_configurations()
         try:
-            return [SourceLimitSchema(**data) for data in sources_config]
+            source_limits = [SourceLimitSchema(**data) for data in sources_config]
         except ValidationError as error:
             logger.error(error)
             raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                                 detail="An error occurred while creating the SourceLimitSchema schema")
+        if self.source_limits_cache is not None:
+            self.source_limits_cache.set(SOURCES_CONFIGURATION_CACHE_KEY, source_limits)
+        return source_limits
+
+    def invalidate_source_configurations(self) -> None:
+        if self.source_limits_cache is not None:
+            self.source_limits_cache.pop(SOURCES_CONFIGURATION_CACHE_KEY)
 
     async def update_sources_config(self, sources_config: SourceLimitSchema) -> (
             list[SourceLimitSchema] | NotOkServiceResponse):
@@ -622,6 +759,7 @@ class KeycloakService:
                                                     body={"attributes": {
                                                         "sourceConfig": json.dumps(existing_source_configs)}},
                                                     method=RequestMethod.PUT)
+                self.invalidate_source_configurations()
                 if isinstance(update_request, NotOkServiceResponse):
                     return update_request
                 break
@@ -644,6 +782,7 @@ class KeycloakService:
                                       body={"attributes": {
                                           "sourceConfig": json.dumps(parsed_sources_input)}},
                                       method=RequestMethod.PUT)
+        self.invalidate_source_configurations()
         if isinstance(response, NotOkServiceResponse):
             return response
         logger.warning("Sources configurations in keycloak have been set or overwritten")
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from fastapi.encoders import jsonable_encoder
+from loguru import logger
+
+from source.exceptions.commons import NotOkServiceResponse
+from source.models.enums import RequestMethod
+from source.schemas.keycloak_schemas import AdminTokenModel, RequestHeader
+from source.utils.utils import make_request
+
+
+class KeycloakSessionService:
+    """
+    Keeps the realm openid configuration and the admin token of the process, shared by the KeycloakService
+    instances through a Singleton provider. The openid configuration is fetched again every OIDC_DISCOVERY_CACHE_TTL
+    seconds, the admin token is renewed ADMIN_TOKEN_REFRESH_MARGIN seconds before its expiry. Concurrent callers
+    finding an expired value wait for a single fetch, the failed fetches are not kept.
+    """
+
+    def __init__(self, keycloak_service_configuration: dict) -> None:
+        self.keycloak_service_configuration = keycloak_service_configuration
+        self._endpoints_configuration: dict | None = None
+        self._endpoints_configuration_expiry = float("-inf")
+        self._admin_token: dict | None = None
+        self._admin_token_expiry = float("-inf")
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._locks_loop: asyncio.AbstractEventLoop | None = None
+
+    def get_lock(self, name: str) -> asyncio.Lock:
+        """Lock of the fetches of a value, one per event loop as the service outlives the loops of the tests"""
+        running_loop = asyncio.get_running_loop()
+        if self._locks_loop is not running_loop:
+            self._locks = {}
+            self._locks_loop = running_loop
+        return self._locks.setdefault(name, asyncio.Lock())
+
+    async def get_endpoints_configuration(self) -> dict | NotOkServiceResponse:
+        """
+        Returns the cached Keycloak Open ID Connect configuration of the realm
+        :returns: dict: Open ID Configuration, NotOkServiceResponse if keycloak refused the request
+        """
+        if time.monotonic() < self._endpoints_configuration_expiry:
+            return self._endpoints_configuration
+        async with self.get_lock("endpoints_configuration"):
+            if time.monotonic() < self._endpoints_configuration_expiry:
+                return self._endpoints_configuration
+            response = await make_request(
+                service_url=self.keycloak_service_configuration['SERVER_URL'],
+                uri=f"/realms/{self.keycloak_service_configuration['REALM']}/.well-known/openid-configuration",
+                headers={'Content-Type': RequestHeader.json}, method=RequestMethod.GET)
+            if isinstance(response, dict):
+                self._endpoints_configuration = response
+                self._endpoints_configuration_expiry = (time.monotonic() +
+                                                        self.keycloak_service_configuration['OIDC_DISCOVERY_CACHE_TTL'])
+            return response
+
+    async def get_admin_token(self,
+                              get_endpoints_configuration: Callable[[], Awaitable[dict]] | None = None
+                              ) -> dict | NotOkServiceResponse:
+        """
+        Returns the admin token of the process, exchanging the admin client credentials for a new one when it is
+        about to expire
+        :param get_endpoints_configuration: source of the openid configuration, the cached one by default
+        :returns: dict: the token response of keycloak, NotOkServiceResponse if keycloak refused the credentials
+        """
+        if time.monotonic() < self._admin_token_expiry:
+            return self._admin_token
+        async with self.get_lock("admin_token"):
+            if time.monotonic() < self._admin_token_expiry:
+                return self._admin_token
+            requested_at = time.monotonic()
+            configurations = await (get_endpoints_configuration or self.get_endpoints_configuration)()
+            response = await make_request(
+                service_url=configurations.get("token_endpoint"),
+                uri="",
+                headers={'Content-Type': RequestHeader.urlencoded},
+                keycloak_request_option=True,
+                body=jsonable_encoder(AdminTokenModel.from_configuration_dict(self.keycloak_service_configuration)),
+                method=RequestMethod.POST)
+            if isinstance(response, dict) and response.get("access_token"):
+                self._admin_token = response
+                # the expiry is counted from the request so the network time is not trusted as token lifetime
+                self._admin_token_expiry = (requested_at + float(response.get("expires_in", 0)) -
+                                            self.keycloak_service_configuration['ADMIN_TOKEN_REFRESH_MARGIN'])
+            elif isinstance(response, NotOkServiceResponse):
+                logger.error(f"Error getting the admin token: status {response.status_code}")
+            return response
@@ -0,0 +1,126 @@
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable
+
+from loguru import logger
+from pydantic import ValidationError
+
+from source.exceptions.custom_exceptions import UserInformationFormatError
+from source.helpers.cache_helpers import LRUCache
+from source.schemas.keycloak_schemas import ConversationInfo, KeycloakAttribute, UserInfo
+from source.services.rate_limit_store import RateLimitStore
+
+
+class RateLimitService:
+    """
+    Daily conversations and questions counters of the users kept in a RateLimitStore instead of the keycloak user
+    attributes. The daily quotas (`conversationsInit`, `questionsInit`) are still read from keycloak, the profiles are
+    cached RATE_LIMIT_PROFILE_CACHE_TTL seconds. The counters of the users changed since the last write back are
+    copied to their keycloak attributes every RATE_LIMIT_WRITE_BACK_INTERVAL seconds for the UI.
+    Shared by the KeycloakService instances through a Singleton provider.
+    """
+
+    def __init__(self, rate_limit_store: RateLimitStore, rate_limit_configuration: dict) -> None:
+        self.rate_limit_store = rate_limit_store
+        self.rate_limit_configuration = rate_limit_configuration
+        self.profiles = LRUCache(max_size=rate_limit_configuration['RATE_LIMIT_PROFILE_CACHE_SIZE'],
+                                 ttl=rate_limit_configuration['RATE_LIMIT_PROFILE_CACHE_TTL'])
+        self._changed_users: set[str] = set()
+
+    @staticmethod
+    def get_quota(user_profile: UserInfo, attribute: KeycloakAttribute) -> int:
+        try:
+            return int(user_profile.user_actual_limits.dict(by_alias=True)[f'{attribute.value}Init'][0])
+        except (AttributeError, KeyError, IndexError, TypeError, ValueError):
+            raise UserInformationFormatError
+
+    @classmethod
+    def get_keycloak_used_count(cls, user_profile: UserInfo, attribute: KeycloakAttribute, today: date) -> int:
+        """Uses of the day recorded in the keycloak attributes of the user, by a previous process or a write back"""
+        limits = user_profile.user_actual_limits.dict(by_alias=True)
+        try:
+            last_date = datetime.strptime(limits[f'{attribute.value}Date'][0], "%Y-%m-%d").date()
+            remaining = int(limits[f'{attribute.value}Limit'][0])
+        except (KeyError, IndexError, TypeError, ValueError):
+            return 0
+        return max(cls.get_quota(user_profile, attribute) - remaining, 0) if last_date == today else 0
+
+    async def cache_profile(self, user_id: str, user_profile: UserInfo) -> UserInfo:
+        """
+        Keeps the profile of the user, today's counters missing from the store start from the keycloak attributes
+        so the uses counted before a restart or by the previous keycloak counters are not given back
+        """
+        today = date.today()
+        for attribute in KeycloakAttribute:
+            await self.rate_limit_store.seed(user_id, attribute.value, today,
+                                             self.get_keycloak_used_count(user_profile, attribute, today))
+        self.profiles.set(user_id, user_profile)
+        return user_profile
+
+    async def get_profile(self, user_id: str, load_profile: Callable[[str], Awaitable[UserInfo]]) -> UserInfo:
+        if (user_profile := self.profiles.get(user_id)) is None:
+            user_profile = await self.cache_profile(user_id, await load_profile(user_id))
+        return user_profile
+
+    async def get_remaining(self, user_id: str, attribute: KeycloakAttribute,
+                            load_profile: Callable[[str], Awaitable[UserInfo]]) -> int:
+        user_profile = await self.get_profile(user_id, load_profile)
+        return (self.get_quota(user_profile, attribute) -
+                await self.rate_limit_store.get(user_id, attribute.value, date.today()))
+
+    async def consume(self, user_id: str, attribute: KeycloakAttribute,
+                      load_profile: Callable[[str], Awaitable[UserInfo]], amount: int = 1) -> UserInfo:
+        """
+        Counts amount uses of the day, a negative amount gives uses back
+        :return: the profile of the user with its remaining uses of the day
+        """
+        user_profile = await self.get_profile(user_id, load_profile)
+        await self.rate_limit_store.increment(user_id, attribute.value, date.today(), amount)
+        self._changed_users.add(user_id)
+        return await self.apply_counters(user_id, user_profile)
+
+    async def reserve(self, user_id: str, attribute: KeycloakAttribute,
+                      load_profile: Callable[[str], Awaitable[UserInfo]]) -> UserInfo | None:
+        """
+        Counts a use of the day if the quota of the user allows it. The use is counted first and given back when the
+        new count passes the quota, so concurrent requests can never go beyond it.
+        :return: the profile of the user with its remaining uses of the day, None when the quota is reached
+        """
+        user_profile = await self.get_profile(user_id, load_profile)
+        quota = self.get_quota(user_profile, attribute)
+        today = date.today()
+        if await self.rate_limit_store.increment(user_id, attribute.value, today) > quota:
+            await self.rate_limit_store.increment(user_id, attribute.value, today, amount=-1)
+            return None
+        self._changed_users.add(user_id)
+        return await self.apply_counters(user_id, user_profile)
+
+    async def apply_counters(self, user_id: str, user_profile: UserInfo) -> UserInfo:
+        """Copy of the profile whose limits attributes are the remaining uses of the day"""
+        today = date.today()
+        limits = user_profile.user_actual_limits.dict(by_alias=True)
+        for attribute in KeycloakAttribute:
+            used = await self.rate_limit_store.get(user_id, attribute.value, today)
+            limits[f'{attribute.value}Limit'] = [max(self.get_quota(user_profile, attribute) - used, 0)]
+            limits[f'{attribute.value}Date'] = [str(today)]
+        try:
+            return user_profile.copy(update={"user_actual_limits": ConversationInfo.parse_obj(limits)})
+        except ValidationError:
+            raise UserInformationFormatError
+
+    def pop_changed_users(self) -> set[str]:
+        changed_users, self._changed_users = self._changed_users, set()
+        return changed_users
+
+    def mark_changed(self, user_ids: set[str]) -> None:
+        self._changed_users |= user_ids
+
+    async def write_back_periodically(self, write_back: Callable[[], Awaitable[None]]) -> None:
+        """Runs the write back of the changed counters and drops the counters of the past days until cancelled"""
+        while True:
+            await asyncio.sleep(self.rate_limit_configuration['RATE_LIMIT_WRITE_BACK_INTERVAL'])
+            try:
+                await write_back()
+                await self.rate_limit_store.purge(before=date.today() - timedelta(days=1))
+            except Exception as error:
+                logger.error(f"Error writing the rate limit counters back to keycloak: {error}")
@@ -0,0 +1,205 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import date
+
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+from sqlalchemy import Column, Date, DateTime, Integer, MetaData, String, Table, create_engine, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from source.exceptions.custom_exceptions import RateLimitStoreError
+
+metadata = MetaData()
+
+rate_limit_counters = Table(
+    "user_rate_limit_counters", metadata,
+    Column("user_id", String, primary_key=True),
+    Column("attribute", String, primary_key=True),
+    Column("window_start", Date, primary_key=True),
+    Column("count", Integer, nullable=False, default=0),
+    Column("updated_at", DateTime, nullable=False, server_default=func.now()),
+)
+
+
+class RateLimitStore(ABC):
+    """
+    Counters of the uses of a limited resource (conversations, questions) by user and fixed window, the window being
+    the day the counted uses happened. Every change is a single atomic operation of the store, concurrent increments
+    are never lost.
+    """
+
+    @abstractmethod
+    async def increment(self, user_id: str, attribute: str, window_start: date, amount: int = 1) -> int:
+        """
+        Adds amount to the counter, a negative amount gives uses back
+        :return: the new value of the counter, never below 0
+        """
+
+    @abstractmethod
+    async def seed(self, user_id: str, attribute: str, window_start: date, count: int) -> int:
+        """
+        Starts the counter at count if it does not exist yet
+        :return: the value of the counter
+        """
+
+    @abstractmethod
+    async def get(self, user_id: str, attribute: str, window_start: date) -> int:
+        """Value of the counter, 0 if it does not exist"""
+
+    @abstractmethod
+    async def purge(self, before: date) -> None:
+        """Drops the counters of the windows started before the date"""
+
+    def init_database(self) -> None:
+        """Prepares the storage of the counters at startup, nothing to prepare by default"""
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """Counters of the process, for a single worker deployment"""
+
+    def __init__(self) -> None:
+        self._counters: dict[tuple[str, str, date], int] = {}
+        self._lock = threading.Lock()
+
+    async def increment(self, user_id: str, attribute: str, window_start: date, amount: int = 1) -> int:
+        key = (user_id, attribute, window_start)
+        with self._lock:
+            self._counters[key] = max(self._counters.get(key, 0) + amount, 0)
+            return self._counters[key]
+
+    async def seed(self, user_id: str, attribute: str, window_start: date, count: int) -> int:
+        with self._lock:
+            return self._counters.setdefault((user_id, attribute, window_start), max(count, 0))
+
+    async def get(self, user_id: str, attribute: str, window_start: date) -> int:
+        return self._counters.get((user_id, attribute, window_start), 0)
+
+    async def purge(self, before: date) -> None:
+        with self._lock:
+            self._counters = {key: count for key, count in self._counters.items() if key[2] >= before}
+
+
+class PostgresRateLimitStore(RateLimitStore):
+    """
+    Counters shared by the workers and instances of the BFF, each change is an upsert returning the new value
+    (`INSERT ... ON CONFLICT DO UPDATE ... RETURNING`) so the row lock of postgres serializes the concurrent changes
+    """
+
+    def __init__(self, db_url: str) -> None:
+        self.db_url = db_url
+        self._engine = None
+
+    @property
+    def engine(self):
+        """Engine created on first use, so that building the store needs neither the driver nor the database"""
+        if self._engine is None:
+            try:
+                self._engine = create_engine(self.db_url, pool_recycle=600, pool_pre_ping=True)
+            except (ImportError, SQLAlchemyError) as error:
+                logger.error(f"Failed to create the rate limit database engine: {error}")
+                raise RateLimitStoreError from error
+        return self._engine
+
+    def init_database(self) -> None:
+        """Creates the counters table when missing"""
+        try:
+            metadata.create_all(self.engine, checkfirst=True)
+        except SQLAlchemyError as error:
+            logger.error(f"Failed to create the rate limit counters table: {error}")
+            raise RateLimitStoreError from error
+
+    def _execute_upsert(self, user_id: str, attribute: str, window_start: date, count: int, update_value) -> int:
+        statement = insert(rate_limit_counters).values(user_id=user_id, attribute=attribute,
+                                                       window_start=window_start, count=count)
+        statement = statement.on_conflict_do_update(
+            index_elements=[rate_limit_counters.c.user_id, rate_limit_counters.c.attribute,
+                            rate_limit_counters.c.window_start],
+            set_={"count": update_value, "updated_at": func.now()},
+        ).returning(rate_limit_counters.c.count)
+        try:
+            with self.engine.begin() as connection:
+                return connection.execute(statement).scalar_one()
+        except SQLAlchemyError as error:
+            logger.error(f"Error updating the rate limit counter {attribute} of the user {user_id}: {error}")
+            raise RateLimitStoreError from error
+
+    async def increment(self, user_id: str, attribute: str, window_start: date, amount: int = 1) -> int:
+        return await run_in_threadpool(self._execute_upsert, user_id, attribute, window_start, max(amount, 0),
+                                       func.greatest(rate_limit_counters.c.count + amount, 0))
+
+    async def seed(self, user_id: str, attribute: str, window_start: date, count: int) -> int:
+        # the conflicting row is left as it is, the update only makes postgres return its current count
+        return await run_in_threadpool(self._execute_upsert, user_id, attribute, window_start, max(count, 0),
+                                       rate_limit_counters.c.count)
+
+    def _get(self, user_id: str, attribute: str, window_start: date) -> int:
+        statement = select(rate_limit_counters.c.count).where(rate_limit_counters.c.user_id == user_id,
+                                                              rate_limit_counters.c.attribute == attribute,
+                                                              rate_limit_counters.c.window_start == window_start)
+        try:
+            with self.engine.connect() as connection:
+                return connection.execute(statement).scalar_one_or_none() or 0
+        except SQLAlchemyError as error:
+            logger.error(f"Error reading the rate limit counter {attribute} of the user {user_id}: {error}")
+            raise RateLimitStoreError from error
+
+    async def get(self, user_id: str, attribute: str, window_start: date) -> int:
+        return await run_in_threadpool(self._get, user_id, attribute, window_start)
+
+    def _purge(self, before: date) -> None:
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(delete(rate_limit_counters).where(rate_limit_counters.c.window_start < before))
+        except SQLAlchemyError as error:
+            logger.error(f"Error purging the rate limit counters: {error}")
+            raise RateLimitStoreError from error
+
+    async def purge(self, before: date) -> None:
+        await run_in_threadpool(self._purge, before)
+
+
+class FailoverRateLimitStore(RateLimitStore):
+    """
+    Store used while the primary store is reachable, the counters of the process are used instead for
+    retry_interval seconds after the primary store fails: the users are then limited per process rather than rejected
+    """
+
+    def __init__(self, primary: RateLimitStore, fallback: RateLimitStore, retry_interval: float) -> None:
+        self.primary = primary
+        self.fallback = fallback
+        self.retry_interval = retry_interval
+        self._retry_at = float("-inf")
+
+    def _fail_over(self, error: RateLimitStoreError) -> None:
+        if time.monotonic() >= self._retry_at:
+            logger.warning(f"The rate limit store is unreachable, counting in the process for {self.retry_interval} "
+                           f"seconds: {error.detail}")
+        self._retry_at = time.monotonic() + self.retry_interval
+
+    async def _call(self, operation: str, *args, **kwargs):
+        if time.monotonic() >= self._retry_at:
+            try:
+                return await getattr(self.primary, operation)(*args, **kwargs)
+            except RateLimitStoreError as error:
+                self._fail_over(error)
+        return await getattr(self.fallback, operation)(*args, **kwargs)
+
+    async def increment(self, user_id: str, attribute: str, window_start: date, amount: int = 1) -> int:
+        return await self._call("increment", user_id, attribute, window_start, amount)
+
+    async def seed(self, user_id: str, attribute: str, window_start: date, count: int) -> int:
+        return await self._call("seed", user_id, attribute, window_start, count)
+
+    async def get(self, user_id: str, attribute: str, window_start: date) -> int:
+        return await self._call("get", user_id, attribute, window_start)
+
+    async def purge(self, before: date) -> None:
+        await self._call("purge", before)
+
+    def init_database(self) -> None:
+        try:
+            self.primary.init_database()
+        except RateLimitStoreError as error:
+            self._fail_over(error)
@@ -4,7 +4,7 @@ from uuid import UUID
 
 from fastapi import HTTPException, status
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import FileResponse, JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import ValidationError
 
 from source.enums.file_enums import FileType
@@ -16,7 +16,8 @@ from source.schemas.ingestion_schemas import IngestedFilesCountOutput
 from source.schemas.source_schemas import SourceLimitSchema, SourceTypeOutputSchema
 from source.schemas.source_schemas import SourceVerificationInput, SourceOutput, SourceDataOutput, \
     SourceVerificationOutput
-from source.utils.utils import make_request, parse_metadata_id_object, guess_and_extract_content_type
+from source.utils.utils import make_request, parse_metadata_id_object, guess_and_extract_content_type, \
+    stream_request
 
 
 class SourceService:
@@ -24,7 +25,7 @@ class SourceService:
         self.config = config
 
     async def preview_document(self, user_id: str, file_input: FileInputSchema,
-                               file_id: str) -> FileResponse | Response | JSONResponse:
+                               file_id: str) -> StreamingResponse | Response | JSONResponse:
         """highlight a file based on content inside of the file and its file_id if it is a pdf file otherwise send the entire document
         for FrontEnd to handle it"""
 
@@ -54,21 +55,15 @@ class SourceService:
 
         # Non PDF files will be handled in FE, just return the file
         if extracted_file_type != FileType.PDF:
-            file_response: FileResponse = await make_request(
+            return await stream_request(
                 service_url=self.config["FILE_HANDLER_URL"],
                 query_params={"user_id": self.config["FILE_HANDLER_USER"], "file_id": str(file_id)},
                 uri="/get_file",
-                method=RequestMethod.GET,
-                headers={"access_api_key": self.config['FILE_HANDLER_API_KEY']}
+                headers={"access_api_key": self.config['FILE_HANDLER_API_KEY']},
+                media_type=mime_type,
+                response_headers={"Content-Disposition": f"attachment; filename={file_name}"}
             )
 
-            # In case fetching the file raises an error
-            if isinstance(file_response, NotOkServiceResponse):
-                return file_type_response
-
-            return FileResponse(file_response.path, media_type=mime_type,
-                                headers={"Content-Disposition": f"attachment; filename={file_name}"})
-
         response = await make_request(
             service_url=self.config["SOURCES_SERVICE_URL"],
             uri="/sources/preview",
@@ -80,15 +75,18 @@ class SourceService:
 
         return response
 
-    async def download_document(self, file_id: UUID) -> FileResponse:
+    async def download_document(self, file_id: UUID,
+                                range_header: str | None = None) -> StreamingResponse | NotOkServiceResponse:
+        """stream the file from the file handler, a range header is forwarded to download a part of it"""
         query_params = {"user_id": self.config["FILE_HANDLER_USER"], "file_id": str(file_id)}
         headers = {"access_api_key": self.config['FILE_HANDLER_API_KEY']}
+        if range_header:
+            headers["Range"] = range_header
 
-        return await make_request(
+        return await stream_request(
             service_url=self.config["FILE_HANDLER_URL"],
             query_params=query_params,
             uri="/get_file",
-            method=RequestMethod.GET,
             headers=headers
         )
 
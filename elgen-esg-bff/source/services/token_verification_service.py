@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, NamedTuple
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import HTTPException
+from jwt.algorithms import RSAAlgorithm
+from jwt.utils import base64url_decode
+from loguru import logger
+
+from source.exceptions.commons import NotOkServiceResponse
+from source.exceptions.custom_exceptions import KeycloakError
+from source.helpers.cache_helpers import LRUCache
+from source.models.enums import RequestMethod
+from source.schemas.keycloak_schemas import KeycloakTokenInfo, RequestHeader
+from source.utils.utils import make_request
+
+JWK_KEY_TYPES = ("RSA", "EC")
+# signature algorithm of the keys published without `alg`, by key type and for EC keys by curve
+DEFAULT_RSA_ALGORITHM = "RS256"
+EC_CURVES = {"P-256": (ec.SECP256R1, "ES256"), "P-384": (ec.SECP384R1, "ES384"), "P-521": (ec.SECP521R1, "ES512")}
+ACCESS_TOKEN_TYPE = "Bearer"
+
+
+class SigningKey(NamedTuple):
+    public_key: Any
+    algorithm: str
+
+
+class TokenVerificationService:
+    """
+    Verifies the access tokens signed by the realm keys locally, the keys are fetched from the realm JWKS and kept
+    JWKS_CACHE_TTL seconds, a token signed with an unknown key triggers a new fetch to follow the key rotations.
+    The tokens which cannot be verified locally (opaque tokens, keys missing from the JWKS) are introspected on
+    keycloak by the caller, the results are cached a few seconds through `get_cached_introspection`.
+    Shared by the KeycloakService instances through a Singleton provider.
+    """
+
+    def __init__(self, keycloak_service_configuration: dict) -> None:
+        self.keycloak_service_configuration = keycloak_service_configuration
+        self.jwks_uri = f"/realms/{keycloak_service_configuration['REALM']}/protocol/openid-connect/certs"
+        self._signing_keys: dict[str, SigningKey] = {}
+        self._signing_keys_fetch_time = float("-inf")
+        self._signing_keys_lock: asyncio.Lock | None = None
+        self._signing_keys_lock_loop: asyncio.AbstractEventLoop | None = None
+        self.introspection_cache = LRUCache(max_size=keycloak_service_configuration['INTROSPECTION_CACHE_SIZE'],
+                                            ttl=keycloak_service_configuration['INTROSPECTION_CACHE_TTL'])
+        self.rejection_cache = LRUCache(max_size=keycloak_service_configuration['INTROSPECTION_CACHE_SIZE'],
+                                        ttl=keycloak_service_configuration['INTROSPECTION_NEGATIVE_CACHE_TTL'])
+
+    @property
+    def enabled(self) -> bool:
+        return self.keycloak_service_configuration['LOCAL_TOKEN_VERIFICATION']
+
+    def get_signing_keys_lock(self) -> asyncio.Lock:
+        """Lock of the JWKS fetches, one per event loop as the service outlives the loops of the tests"""
+        running_loop = asyncio.get_running_loop()
+        if self._signing_keys_lock is None or self._signing_keys_lock_loop is not running_loop:
+            self._signing_keys_lock = asyncio.Lock()
+            self._signing_keys_lock_loop = running_loop
+        return self._signing_keys_lock
+
+    @staticmethod
+    def get_jwk_algorithm(jwk: dict) -> str | None:
+        """Algorithm of the key, derived from its type and curve when the JWKS does not give it"""
+        if jwk.get("alg"):
+            return jwk["alg"]
+        if jwk["kty"] == "RSA":
+            return DEFAULT_RSA_ALGORITHM
+        return EC_CURVES[jwk["crv"]][1] if jwk.get("crv") in EC_CURVES else None
+
+    @staticmethod
+    def load_jwk_public_key(jwk: dict) -> Any:
+        """Public key of a RSA or EC JWK, PyJWT 1.x only reads the RSA ones"""
+        if jwk["kty"] == "RSA":
+            return RSAAlgorithm.from_jwk(json.dumps(jwk))
+        curve, _ = EC_CURVES[jwk["crv"]]
+        return ec.EllipticCurvePublicNumbers(x=int.from_bytes(base64url_decode(jwk["x"]), "big"),
+                                             y=int.from_bytes(base64url_decode(jwk["y"]), "big"),
+                                             curve=curve()).public_key()
+
+    @staticmethod
+    def parse_jwks(jwks: dict) -> dict[str, SigningKey]:
+        """Signature keys of the JWKS by key id, the encryption keys and the key types not supported are skipped"""
+        signing_keys = {}
+        for jwk in jwks.get("keys", []):
+            if jwk.get("use", "sig") != "sig" or jwk.get("kty") not in JWK_KEY_TYPES or not jwk.get("kid"):
+                continue
+            if (algorithm := TokenVerificationService.get_jwk_algorithm(jwk)) is None:
+                logger.warning(f"Skipping the key {jwk.get('kid')} of the realm JWKS on the unsupported curve "
+                               f"{jwk.get('crv')}")
+                continue
+            try:
+                public_key = TokenVerificationService.load_jwk_public_key(jwk)
+            except (ValueError, KeyError, TypeError, jwt.InvalidKeyError) as error:
+                logger.warning(f"Skipping the unreadable key {jwk.get('kid')} of the realm JWKS: {error}")
+                continue
+            signing_keys[jwk["kid"]] = SigningKey(public_key=public_key, algorithm=algorithm)
+        return signing_keys
+
+    async def refresh_signing_keys(self, min_age: float) -> None:
+        """
+        Fetches the realm JWKS unless it was fetched less than min_age seconds ago, concurrent callers wait for the
+        same fetch. The known keys are kept when keycloak cannot be reached.
+        """
+        async with self.get_signing_keys_lock():
+            if time.monotonic() - self._signing_keys_fetch_time < min_age:
+                return
+            self._signing_keys_fetch_time = time.monotonic()
+            try:
+                jwks = await make_request(service_url=self.keycloak_service_configuration['SERVER_URL'],
+                                          uri=self.jwks_uri, method=RequestMethod.GET,
+                                          headers={'Content-Type': RequestHeader.json})
+            except HTTPException as error:
+                logger.error(f"Error fetching the realm JWKS: {error.detail}")
+                return
+            if isinstance(jwks, NotOkServiceResponse) or not isinstance(jwks, dict):
+                logger.error("Error fetching the realm JWKS")
+                return
+            self._signing_keys = self.parse_jwks(jwks)
+
+    async def get_signing_key(self, key_id: str | None) -> SigningKey | None:
+        if time.monotonic() - self._signing_keys_fetch_time >= self.keycloak_service_configuration['JWKS_CACHE_TTL']:
+            await self.refresh_signing_keys(min_age=self.keycloak_service_configuration['JWKS_CACHE_TTL'])
+        if key_id not in self._signing_keys:
+            await self.refresh_signing_keys(min_age=self.keycloak_service_configuration['JWKS_MIN_REFRESH_INTERVAL'])
+        return self._signing_keys.get(key_id)
+
+    async def verify(self, token: str) -> KeycloakTokenInfo | None:
+        """
+        Token information of an access token signed by a key of the realm, None when the token cannot be verified
+        locally and has to be introspected
+        :raises jwt.InvalidTokenError: if the token is signed by a realm key but is invalid, expired or is not an
+        access token
+        """
+        if not self.enabled:
+            return None
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.DecodeError:
+            return None
+        if (signing_key := await self.get_signing_key(header.get("kid"))) is None:
+            return None
+        if header.get("alg") != signing_key.algorithm:
+            raise jwt.InvalidAlgorithmError(f"The token is not signed with {signing_key.algorithm}")
+        audience = self.keycloak_service_configuration['TOKEN_AUDIENCE']
+        claims = jwt.decode(token, signing_key.public_key, algorithms=[signing_key.algorithm], audience=audience,
+                            issuer=self.keycloak_service_configuration['TOKEN_ISSUER'],
+                            leeway=self.keycloak_service_configuration['TOKEN_LEEWAY'],
+                            options={"verify_aud": audience is not None,
+                                     "verify_iss": self.keycloak_service_configuration['TOKEN_ISSUER'] is not None,
+                                     "require_exp": True})
+        if claims.get("typ") != ACCESS_TOKEN_TYPE:
+            raise jwt.InvalidTokenError(f"{claims.get('typ')} tokens are not access tokens")
+        # the claims the introspection endpoint adds to the ones of the token
+        return KeycloakTokenInfo(**{"username": claims.get("preferred_username"), "active": True, **claims})
+
+    @staticmethod
+    def get_token_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get_cached_introspection(self, token: str) -> KeycloakTokenInfo | None:
+        """
+        Token information of a recent introspection of the token
+        :raises KeycloakError: if the token was recently rejected by keycloak
+        """
+        token_key = self.get_token_key(token)
+        if (rejection := self.rejection_cache.get(token_key)) is not None:
+            raise KeycloakError(status_code=rejection.status_code, detail=rejection.detail)
+        token_infos = self.introspection_cache.get(token_key)
+        if token_infos is not None and token_infos.exp is not None and token_infos.exp <= time.time():
+            self.introspection_cache.pop(token_key)
+            return None
+        return token_infos
+
+    def cache_introspection(self, token: str, token_infos: KeycloakTokenInfo | None = None,
+                            rejection: KeycloakError | None = None) -> None:
+        if rejection is not None:
+            self.rejection_cache.set(self.get_token_key(token), rejection)
+        elif token_infos is not None and token_infos.is_active:
+            self.introspection_cache.set(self.get_token_key(token), token_infos)
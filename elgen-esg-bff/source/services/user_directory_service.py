@@ -0,0 +1,219 @@
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable
+
+from fastapi import status
+from loguru import logger
+
+from source.exceptions.commons import NotOkServiceResponse
+from source.exceptions.custom_exceptions import UserNotFound
+from source.helpers.keycloack_helper import format_user_info
+from source.models.enums import RequestMethod
+from source.schemas.keycloak_schemas import ClientRole, RequestHeader, UserInfoWorkspace
+from source.utils.utils import make_request
+
+
+class UserDirectoryService:
+    """
+    Realm users formatted for the workspaces, indexed by ID and shared by the KeycloakService instances through a
+    Singleton provider. The first reader waits for all the users, read page by page (`first`/`max`). The directory is
+    then refreshed incrementally in the background: every USER_DIRECTORY_TTL seconds the next
+    USER_DIRECTORY_REFRESH_PAGES pages are read again and merged into it, and once the last page is reached the users
+    not seen since the first page are looked up by ID and dropped if keycloak no longer has them. The users missing
+    from the directory and the users created by this process are looked up by ID, the users without attributes are
+    left out as they were by `get_all_users`.
+    """
+
+    def __init__(self, keycloak_service_configuration: dict) -> None:
+        self.keycloak_service_configuration = keycloak_service_configuration
+        self.request_base_path = (f"{keycloak_service_configuration['SERVER_URL']}/admin/realms/"
+                                  f"{keycloak_service_configuration['REALM']}")
+        self._users: dict[str, UserInfoWorkspace] = {}
+        self._unknown_users_ids: set[str] = set()
+        # position of the incremental refresh in the pages of the realm users, and the users seen since its first page
+        self._refresh_first = 0
+        self._refresh_seen_ids: set[str] = set()
+        self._loaded = False
+        self._expiry = float("-inf")
+        self._refresh_task: asyncio.Task | None = None
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+
+    def get_lock(self) -> asyncio.Lock:
+        """Lock of the directory reads, one per event loop as the service outlives the loops of the tests"""
+        running_loop = asyncio.get_running_loop()
+        if self._lock_loop is not running_loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = running_loop
+        return self._lock
+
+    @staticmethod
+    def _raise_if_not_ok(response) -> None:
+        if isinstance(response, NotOkServiceResponse):
+            logger.error("User not found")
+            raise UserNotFound(response.status_code, json.loads(response.body))
+
+    async def _get_headers(self, get_admin_token: Callable[[], Awaitable[dict]]) -> dict:
+        admin_token = await get_admin_token()
+        self._raise_if_not_ok(admin_token)
+        return {"Content-Type": RequestHeader.json, "Authorization": f"Bearer {admin_token.get('access_token')}"}
+
+    @staticmethod
+    def _format_user(keycloak_user: dict) -> UserInfoWorkspace | None:
+        if not keycloak_user.get('attributes'):
+            return None
+        return format_user_info(keycloak_response=keycloak_user, workspace=True, user_roles=[ClientRole.USER])
+
+    async def _get_page(self, first: int, headers: dict) -> list[dict]:
+        page = await make_request(service_url=self.request_base_path, uri="users", keycloak_request_option=True,
+                                  headers=dict(headers), method=RequestMethod.GET,
+                                  query_params={"first": first,
+                                                "max": self.keycloak_service_configuration['USER_DIRECTORY_PAGE_SIZE'],
+                                                "briefRepresentation": "false"})
+        self._raise_if_not_ok(page)
+        return page
+
+    async def _load(self, get_admin_token: Callable[[], Awaitable[dict]]) -> None:
+        """Reads all the users of the realm page by page, the first copy of the directory"""
+        page_size = self.keycloak_service_configuration['USER_DIRECTORY_PAGE_SIZE']
+        headers = await self._get_headers(get_admin_token)
+        users = {}
+        first = 0
+        while True:
+            page = await self._get_page(first, headers)
+            for keycloak_user in page:
+                if (user := self._format_user(keycloak_user)) is not None:
+                    users[keycloak_user['id']] = user
+            if len(page) < page_size:
+                break
+            first += page_size
+        self._users, self._unknown_users_ids = users, set()
+        self._refresh_first, self._refresh_seen_ids = 0, set()
+        self._loaded = True
+        self._expiry = time.monotonic() + self.keycloak_service_configuration['USER_DIRECTORY_TTL']
+        logger.info(f"Read {len(users)} users of the realm in pages of {page_size}")
+
+    async def _refresh_pages(self, get_admin_token: Callable[[], Awaitable[dict]]) -> None:
+        """
+        Reads the next pages of the incremental refresh and merges them into the directory, the users not seen by
+        a whole pass over the pages are dropped once keycloak confirms they no longer exist
+        """
+        page_size = self.keycloak_service_configuration['USER_DIRECTORY_PAGE_SIZE']
+        headers = await self._get_headers(get_admin_token)
+        for _ in range(self.keycloak_service_configuration['USER_DIRECTORY_REFRESH_PAGES']):
+            page = await self._get_page(self._refresh_first, headers)
+            for keycloak_user in page:
+                self._refresh_seen_ids.add(keycloak_user['id'])
+                if (user := self._format_user(keycloak_user)) is None:
+                    self._users.pop(keycloak_user['id'], None)
+                else:
+                    self._users[keycloak_user['id']] = user
+            if len(page) < page_size:
+                await self._drop_removed_users(headers)
+                break
+            self._refresh_first += page_size
+        self._expiry = time.monotonic() + self.keycloak_service_configuration['USER_DIRECTORY_TTL']
+
+    async def _drop_removed_users(self, headers: dict) -> None:
+        """
+        End of a pass of the incremental refresh: the users not seen may have moved between pages while they were
+        read, they are only dropped when their lookup by ID does not find them
+        """
+        not_seen_users_ids = [user_id for user_id in self._users if user_id not in self._refresh_seen_ids]
+        self._refresh_first, self._refresh_seen_ids, self._unknown_users_ids = 0, set(), set()
+        semaphore = asyncio.Semaphore(self.keycloak_service_configuration['USER_DIRECTORY_LOOKUP_CONCURRENCY'])
+        found_users = await asyncio.gather(*(self._get_user_by_id(user_id, headers, semaphore)
+                                             for user_id in not_seen_users_ids))
+        for user_id, user in zip(not_seen_users_ids, found_users):
+            if user is None:
+                self._users.pop(user_id, None)
+            else:
+                self._users[user_id] = user
+
+    async def _refresh(self, get_admin_token: Callable[[], Awaitable[dict]]) -> None:
+        async with self.get_lock():
+            if not self._loaded:
+                await self._load(get_admin_token)
+            elif time.monotonic() >= self._expiry:
+                await self._refresh_pages(get_admin_token)
+
+    def _refresh_in_background(self, get_admin_token: Callable[[], Awaitable[dict]]) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+
+        def log_refresh_error(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(f"Error reading the users of the realm: {task.exception()}")
+
+        self._refresh_task = asyncio.create_task(self._refresh(get_admin_token))
+        self._refresh_task.add_done_callback(log_refresh_error)
+
+    async def get_users(self, get_admin_token: Callable[[], Awaitable[dict]]) -> dict[str, UserInfoWorkspace]:
+        """
+        Users of the realm by ID, the first call waits for the directory, the next pages are refreshed in the
+        background once it expires
+        """
+        if not self._loaded:
+            await self._refresh(get_admin_token)
+        elif time.monotonic() >= self._expiry:
+            self._refresh_in_background(get_admin_token)
+        return self._users
+
+    async def _get_user_by_id(self, user_id: str, headers: dict,
+                              semaphore: asyncio.Semaphore) -> UserInfoWorkspace | None:
+        async with semaphore:
+            response = await make_request(service_url=self.request_base_path, uri=f"users/{user_id}",
+                                          keycloak_request_option=True, headers=dict(headers),
+                                          method=RequestMethod.GET)
+        if isinstance(response, NotOkServiceResponse) and response.status_code == status.HTTP_404_NOT_FOUND:
+            return None
+        self._raise_if_not_ok(response)
+        return self._format_user(response)
+
+    async def add_user(self, user_id: str, get_admin_token: Callable[[], Awaitable[dict]]) -> None:
+        """
+        Adds a user created by this process to the directory once read, looked up by ID. On failure the user is left
+        to the lookups of the readers and to the incremental refresh.
+        """
+        if not self._loaded:
+            return
+        try:
+            headers = await self._get_headers(get_admin_token)
+            user = await self._get_user_by_id(user_id, headers, asyncio.Semaphore(1))
+        except Exception as error:
+            logger.warning(f"Error adding the created user {user_id} to the directory: {error}")
+            return
+        if user is not None:
+            self._users[user_id] = user
+            self._unknown_users_ids.discard(user_id)
+
+    async def get_users_by_ids(self, users_ids: list,
+                               get_admin_token: Callable[[], Awaitable[dict]]) -> list[UserInfoWorkspace]:
+        """
+        Users of the list found in the realm, in the order of the list. The users created since the directory was
+        read are looked up by ID and added to it, the IDs unknown to keycloak are not looked up again before the
+        next read of the directory.
+        """
+        users = await self.get_users(get_admin_token)
+        missing_users_ids = list(dict.fromkeys(str(user_id) for user_id in users_ids
+                                               if str(user_id) not in users
+                                               and str(user_id) not in self._unknown_users_ids))
+        if missing_users_ids:
+            headers = await self._get_headers(get_admin_token)
+            semaphore = asyncio.Semaphore(self.keycloak_service_configuration['USER_DIRECTORY_LOOKUP_CONCURRENCY'])
+            found_users = await asyncio.gather(*(self._get_user_by_id(user_id, headers, semaphore)
+                                                 for user_id in missing_users_ids))
+            for user_id, user in zip(missing_users_ids, found_users):
+                if user is None:
+                    self._unknown_users_ids.add(user_id)
+                else:
+                    users[user_id] = user
+        return [users[str(user_id)] for user_id in users_ids if str(user_id) in users]
+
+    async def get_users_excluding(self, users_ids: list,
+                                  get_admin_token: Callable[[], Awaitable[dict]]) -> list[UserInfoWorkspace]:
+        """Users of the realm not in the list"""
+        excluded_users_ids = {str(user_id) for user_id in users_ids}
+        users = await self.get_users(get_admin_token)
+        return [user for user_id, user in users.items() if user_id not in excluded_users_ids]
@@ -2,6 +2,7 @@ from uuid import UUID
 
 from fastapi.encoders import jsonable_encoder
 
+from source.helpers.cache_helpers import LRUCache
 from source.models.enums import RequestMethod
 from source.schemas.api_schemas import WorkspaceModelsSchema
 from source.schemas.common import UpdateStatusDataModel
@@ -11,8 +12,14 @@ from source.utils.utils import make_request
 
 
 class WorkspaceService:
-    def __init__(self, config: dict) -> None:
+    def __init__(self, config: dict, workspace_types_cache: LRUCache | None = None) -> None:
         self.config = config
+        self.workspace_types_cache = workspace_types_cache
+
+    def invalidate_workspace_type(self, workspace_id: UUID) -> None:
+        """The type of the workspace is read again by the next chat request of this process"""
+        if self.workspace_types_cache is not None:
+            self.workspace_types_cache.pop(str(workspace_id))
 
     async def get_workspaces_by_user_id(self, user_id: str) -> GenericWorkspacesResponseModel:
         """
@@ -94,12 +101,14 @@ class WorkspaceService:
         Raises:
             Exception: Any exceptions raised during the request to the conversation service.
         """
-        return await make_request(
+        response = await make_request(
             service_url=self.config["CONVERSATION_SERVICE_URL"],
             uri=f"/workspaces/{workspace_id}",
             method=RequestMethod.PATCH,
             body=jsonable_encoder(workspace_data.dict())
         )
+        self.invalidate_workspace_type(workspace_id)
+        return response
 
     async def delete_workspace(self, workspace_id: UUID) -> UpdateStatusDataModel:
         """
@@ -114,10 +123,12 @@ class WorkspaceService:
         Raises:
             Exception: Any exceptions raised during the request to the conversation service.
         """
-        return await make_request(
+        response = await make_request(
             service_url=self.config["CONVERSATION_SERVICE_URL"],
             uri=f"/workspaces/{workspace_id}",
             method=RequestMethod.DELETE)
+        self.invalidate_workspace_type(workspace_id)
+        return response
 
     async def get_workspace_by_id(self, workspace_id: UUID) -> dict:
         """
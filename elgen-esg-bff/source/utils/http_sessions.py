@@ -0,0 +1,82 @@
+import asyncio
+from urllib.parse import urlsplit
+
+import httpx
+from aiohttp import ClientSession, DummyCookieJar, TCPConnector
+from loguru import logger
+
+from configuration.config import BFFSettings, app_config
+
+
+class UpstreamSessions:
+    """
+    One aiohttp ClientSession per upstream (scheme, host and port) of the process, the calls to a service reuse the
+    open connections of its pool instead of paying a DNS resolution and a TCP (and TLS) handshake each.
+    The sessions do not keep the cookies set by the upstreams, they are shared by the requests of all the users.
+    The streamed answers are relayed with an httpx AsyncClient per upstream, pooled the same way.
+    """
+
+    def __init__(self, settings: BFFSettings) -> None:
+        self.settings = settings
+        self._sessions: dict[str, ClientSession] = {}
+        self._stream_clients: dict[str, httpx.AsyncClient] = {}
+        self._sessions_loop: asyncio.AbstractEventLoop | None = None
+
+    @staticmethod
+    def get_upstream(url: str) -> str:
+        split_url = urlsplit(url)
+        return f"{split_url.scheme}://{split_url.netloc}"
+
+    def _create_session(self) -> ClientSession:
+        connector = TCPConnector(limit=self.settings.UPSTREAM_POOL_SIZE,
+                                 keepalive_timeout=self.settings.UPSTREAM_KEEPALIVE_TIMEOUT,
+                                 ttl_dns_cache=self.settings.UPSTREAM_DNS_CACHE_TTL)
+        return ClientSession(connector=connector, cookie_jar=DummyCookieJar())
+
+    def _create_stream_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=self.settings.UPSTREAM_POOL_SIZE,
+                              max_keepalive_connections=self.settings.UPSTREAM_POOL_SIZE,
+                              keepalive_expiry=self.settings.UPSTREAM_KEEPALIVE_TIMEOUT)
+        return httpx.AsyncClient(limits=limits)
+
+    def _check_loop(self) -> None:
+        running_loop = asyncio.get_running_loop()
+        if self._sessions_loop is not running_loop:
+            # the sessions are bound to the loop they were created in, the tests run one loop each
+            self._sessions, self._stream_clients = {}, {}
+            self._sessions_loop = running_loop
+
+    def get_session(self, url: str) -> ClientSession:
+        """Session of the upstream of the url, created on its first call or after the event loop changed"""
+        self._check_loop()
+        upstream = self.get_upstream(url)
+        session = self._sessions.get(upstream)
+        if session is None or session.closed:
+            session = self._sessions[upstream] = self._create_session()
+        return session
+
+    def get_stream_client(self, url: str) -> httpx.AsyncClient:
+        """Streaming client of the upstream of the url, created on its first call or after the event loop changed"""
+        self._check_loop()
+        upstream = self.get_upstream(url)
+        client = self._stream_clients.get(upstream)
+        if client is None or client.is_closed:
+            client = self._stream_clients[upstream] = self._create_stream_client()
+        return client
+
+    async def open(self, urls: list[str]) -> None:
+        """Creates the sessions of the known upstreams at startup"""
+        for url in urls:
+            self.get_session(url)
+        logger.info(f"Opened the sessions of the upstreams {sorted(self._sessions)}")
+
+    async def close(self) -> None:
+        sessions, self._sessions = list(self._sessions.values()), {}
+        stream_clients, self._stream_clients = list(self._stream_clients.values()), {}
+        for session in sessions:
+            await session.close()
+        for stream_client in stream_clients:
+            await stream_client.aclose()
+
+
+upstream_sessions = UpstreamSessions(app_config)
@@ -1,15 +1,14 @@
 import logging
-import tempfile
 from asyncio import TimeoutError, CancelledError
 from functools import partial
 from io import BytesIO
-from typing import Dict, Any, Union
+from typing import AsyncIterator, Dict, Any, Union
 
 import async_timeout
 from aiohttp import ClientResponse, FormData, ClientSession, ClientConnectorError, ContentTypeError
 from circuitbreaker import circuit
 from fastapi import HTTPException, status, UploadFile, Request
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import Response, StreamingResponse
 from inflection import camelize
 from pydantic import BaseModel
 
@@ -18,6 +17,11 @@ from source.exceptions.commons import NotOkServiceResponse
 from source.exceptions.custom_exceptions import MetadataObjParseError, FileTypeExtractionError
 from source.models.enums import RequestMethod
 from source.schemas.streaming_answer_schema import ModelStreamingErrorResponse
+from source.utils.http_sessions import upstream_sessions
+
+# the headers of a downloaded file relayed to the client, the length and range ones let it resume a download
+STREAMED_RESPONSE_HEADERS = ("Content-Length", "Content-Range", "Accept-Ranges", "Content-Disposition", "ETag",
+                             "Last-Modified")
 
 
 class CamelModel(BaseModel):
@@ -42,21 +46,20 @@ class CamelModel(BaseModel):
         use_enum_values = True
 
 
+async def iter_upload_file(upload_file: UploadFile) -> AsyncIterator[bytes]:
+    """Chunks of an uploaded file from its current position, read off the event loop once it rolled over to disk"""
+    while chunk := await upload_file.read(app_config.FILE_STREAM_CHUNK_SIZE):
+        yield chunk
+
+
 async def file_to_data(payload_obj, data: FormData, files_field_name) -> FormData:
     """
     Args:
         payload_obj: convert file to aio http form data so it can be send in the request
-    Returns: aiohttp FormData that could be used on async methods
+    Returns: aiohttp FormData that could be used on async methods, the file is streamed in chunks as the request is
+    sent instead of being copied and loaded in memory
     """
-    temp = tempfile.NamedTemporaryFile(mode="w+b", delete=False)
-    temp.name = payload_obj.filename
-    try:
-        temp.writelines(payload_obj.file)
-        temp.seek(0)
-        data.add_field(files_field_name, temp.read(), filename=payload_obj.filename)
-        temp.close()
-    except Exception as exception:
-        logger.exception(exception)
+    data.add_field(files_field_name, iter_upload_file(payload_obj), filename=payload_obj.filename)
     return data
 
 
@@ -85,24 +88,23 @@ async def handle_file_upload(
 
     with async_timeout.timeout(delay=None):
         try:
-            async with ClientSession() as session:
-                request = getattr(session, method)
-                async with request(
-                        url=f"{service_url.rstrip('/') + '/' + uri.lstrip('/')}",
-                        headers=headers,
-                        data=data,
-                        params=query_params,
-                        cookies=cookies
-                ) as response:
-                    if response.ok:
-                        return await handle_data_by_response_content_type(response)
-                    else:
-                        try:
-                            json_response = await response.json()
-                            return NotOkServiceResponse(status_code=response.status, content=json_response)
-                        except Exception:
-                            detail = await response.text()
-                            raise HTTPException(status_code=response.status, detail=detail)
+            request = getattr(upstream_sessions.get_session(service_url), method)
+            async with request(
+                    url=f"{service_url.rstrip('/') + '/' + uri.lstrip('/')}",
+                    headers=headers,
+                    data=data,
+                    params=query_params,
+                    cookies=cookies
+            ) as response:
+                if response.ok:
+                    return await handle_data_by_response_content_type(response)
+                else:
+                    try:
+                        json_response = await response.json()
+                        return NotOkServiceResponse(status_code=response.status, content=json_response)
+                    except Exception:
+                        detail = await response.text()
+                        raise HTTPException(status_code=response.status, detail=detail)
         except ClientConnectorError:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -160,25 +162,24 @@ async def make_request(service_url: str,
     with async_timeout.timeout(180):
         try:
             service_name = service_url.replace("http://", "").split(".")[0]
-            async with ClientSession() as session:
-                request = getattr(session, method)
-                async with request(
-                        url=f"{service_url.rstrip('/') + '/' + uri.strip('/')}",
-                        headers=headers,
-                        json=(None if keycloak_request_option else body),
-                        data=(body if keycloak_request_option else None),
-                        params=query_params,
-                        cookies=cookies
-                ) as response:
-                    if response.ok:
-                        return await handle_data_by_response_content_type(response)
-                    else:
-                        try:
-                            json_response = await response.json()
-                            return NotOkServiceResponse(status_code=response.status, content=json_response)
-                        except Exception:
-                            detail = await response.text()
-                            raise HTTPException(status_code=response.status, detail=detail)
+            request = getattr(upstream_sessions.get_session(service_url), method)
+            async with request(
+                    url=f"{service_url.rstrip('/') + '/' + uri.strip('/')}",
+                    headers=headers,
+                    json=(None if keycloak_request_option else body),
+                    data=(body if keycloak_request_option else None),
+                    params=query_params,
+                    cookies=cookies
+            ) as response:
+                if response.ok:
+                    return await handle_data_by_response_content_type(response)
+                else:
+                    try:
+                        json_response = await response.json()
+                        return NotOkServiceResponse(status_code=response.status, content=json_response)
+                    except Exception:
+                        detail = await response.text()
+                        raise HTTPException(status_code=response.status, detail=detail)
         except ClientConnectorError:
             logger.exception(f'Service {service_name} is unavailable.')
             raise HTTPException(
@@ -202,7 +203,7 @@ async def make_request(service_url: str,
             )
 
 
-async def handle_data_by_response_content_type(response) -> Union[StreamingResponse, FileResponse]:
+async def handle_data_by_response_content_type(response) -> Union[StreamingResponse, Response]:
     """
     handler request response by response content type
     Args:
@@ -224,14 +225,74 @@ async def handle_data_by_response_content_type(response) -> Union[StreamingRespo
         response_stream.headers["Content-Disposition"] = "attachment; filename=zipped.zip"
         return response_stream
     else:
-        data = await response.read()
-        with tempfile.NamedTemporaryFile(mode="w+b", delete=False) as file:
-            file.write(data)
-        data = FileResponse(file.name, media_type=response.content_type)
+        # the files are streamed with stream_request, the other payloads are small enough to be held in memory
+        data = Response(content=await response.read(), media_type=response.content_type)
         data.headers['Content-Security-Policy'] = r'default-src \'self\''
         return data
 
 
+async def stream_request(service_url: str,
+                         uri: str,
+                         query_params: Dict = None,
+                         headers: dict = None,
+                         media_type: str = None,
+                         response_headers: dict = None
+                         ) -> StreamingResponse | NotOkServiceResponse:
+    """
+    GET a file from a service and stream it back as it is received, without holding it in memory or on disk.
+    The content type, length, range and validators of the upstream response are kept so a Range header forwarded in
+    headers gets its partial content back, and an If-None-Match header its 304. The body is asked for in identity
+    encoding, a compressed body is decompressed by aiohttp and relayed without the upstream length.
+
+    :param service_url: the url of the service to call
+    :param uri: the endpoint to call
+    :param query_params: a dict of query params, if any
+    :param headers: the request headers
+    :param media_type: the content type to answer with instead of the upstream one
+    :param response_headers: headers added to the response
+    :return: the streamed response, or the error of the service
+    :raises: a HTTP exception
+    """
+    url = f"{service_url.rstrip('/') + '/' + uri.strip('/')}"
+    try:
+        # only the wait for the response headers is bounded, the body takes as long as the file needs
+        async with async_timeout.timeout(180):
+            response = await upstream_sessions.get_session(service_url).get(
+                url, params=query_params or {}, headers={**(headers or {}), "Accept-Encoding": "identity"})
+    except ClientConnectorError:
+        logger.exception(f'Service {service_url} is unavailable.')
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail='Service is unavailable.')
+    except (CancelledError, TimeoutError):
+        logger.exception(f"The file request to {service_url} has timed out and has been cancelled")
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                            detail='This request has timed out and has been cancelled, please retry.')
+
+    if not response.ok:
+        try:
+            return NotOkServiceResponse(status_code=response.status, content=await response.json())
+        except Exception:
+            raise HTTPException(status_code=response.status, detail=await response.text())
+        finally:
+            response.release()
+
+    async def iter_response():
+        # closing the generator, when the download ends or the client goes away, gives the connection back
+        try:
+            async for chunk in response.content.iter_chunked(app_config.FILE_STREAM_CHUNK_SIZE):
+                yield chunk
+        finally:
+            response.release()
+
+    passed_headers = {name: response.headers[name] for name in STREAMED_RESPONSE_HEADERS if name in response.headers}
+    if "Content-Encoding" in response.headers:
+        # the length is the one of the compressed body, not of the decompressed chunks relayed
+        passed_headers.pop("Content-Length", None)
+    return StreamingResponse(iter_response(), status_code=response.status,
+                             media_type=media_type or response.content_type,
+                             headers={**passed_headers, 'Content-Security-Policy': r'default-src \'self\'',
+                                      **(response_headers or {})})
+
+
 def parse_metadata_id_object(metadata_object: list[dict]) -> str:
     """Parse the metadata object from  /medata_id in File handler, the metadata object is a list containing 1 element"""
     try:
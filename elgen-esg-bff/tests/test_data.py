@@ -2,6 +2,7 @@ from datetime import date, timedelta, datetime
 from uuid import uuid4
 
 import jwt
+from fastapi import Response, status
 from fastapi.security import HTTPAuthorizationCredentials
 
 from configuration.config import KeyCloakServiceConfiguration
@@ -503,12 +504,12 @@ success_ack = AcknowledgeResponse(acknowledge=AcknowledgeTypes.SUCCESS)
 dummy_question = {"question": "this is a question"}
 
 
-async def mock_check_user_limit_false(self, user_id, attribute_to_check):
-    return False
+async def mock_reserve_rate_limit_reached(self, user_id, attribute_to_reserve):
+    return None
 
 
-async def mock_check_user_limit_true(self, user_id, attribute_to_check):
-    return True
+async def mock_reserve_rate_limit(self, user_id, attribute_to_reserve):
+    return user_info
 
 
 question_id = "dba202cd-9268-43ca-86db-7d4525f22625"
@@ -854,6 +855,7 @@ chat_suggestion = ChatSuggestion(**{
     "available": True
 })
 chat_suggestions_list = WorkspaceChatSuggestions(suggestions=[chat_suggestion])
+chat_suggestions_etag = '"c0ffee"'
 
 
 async def mock_create_chat_suggestion(*args, **kwargs):
@@ -864,6 +866,13 @@ async def mock_get_chat_suggestions(*args, **kwargs):
     return chat_suggestions_list
 
 
+async def mock_relay_chat_suggestions(self, workspace_id, if_none_match=None):
+    headers = {"ETag": chat_suggestions_etag, "Cache-Control": "no-cache"}
+    if if_none_match == chat_suggestions_etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=chat_suggestions_list.json(), media_type="application/json", headers=headers)
+
+
 async def mock_delete_suggestion_by_id(*args, **kwargs):
     return mock_suggestion_deleted
 
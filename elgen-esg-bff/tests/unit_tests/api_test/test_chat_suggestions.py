@@ -9,7 +9,8 @@ from tests.conftest import test_client
 from tests.test_data import (mock_token_not_dict, mock_check_role_user_success, mock_create_chat_suggestion,
                              workspace_id, mock_chat_suggestion_input_data, chat_suggestion, mock_get_chat_suggestions,
                              mock_delete_suggestion_by_id, suggestion_id, mock_suggestion_deleted,
-                             mock_update_suggestion_by_id, mock_suggestion_updated)
+                             mock_update_suggestion_by_id, mock_suggestion_updated, chat_suggestions_list,
+                             mock_relay_chat_suggestions, chat_suggestions_etag)
 
 
 @pytest.mark.asyncio
@@ -46,6 +47,38 @@ async def test_get_suggestions_per_workspace(test_client, monkeypatch):
     assert isinstance(data.get("suggestions"), list)
 
 
+@pytest.mark.asyncio
+async def test_get_suggestions_per_workspace_not_modified(test_client, monkeypatch):
+    """test the If-None-Match ETag is forwarded and the 304 without body of the conversation service relayed"""
+    monkeypatch.setattr(KeycloakService, "check_auth", mock_token_not_dict)
+    monkeypatch.setattr(KeycloakService, "check_user_role", mock_check_role_user_success)
+
+    monkeypatch.setattr(ChatSuggestionsService, "get_suggestions_per_workspace", mock_relay_chat_suggestions)
+
+    response = test_client.get(url=f"/workspaces/suggestion?workspaceId={workspace_id}",
+                               headers={"Authorization": "Bearer dummy_token", "If-None-Match": chat_suggestions_etag})
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == chat_suggestions_etag
+    assert response.content == b""
+
+
+@pytest.mark.asyncio
+async def test_get_suggestions_per_workspace_modified(test_client, monkeypatch):
+    """test changed suggestions are sent again with their new ETag"""
+    monkeypatch.setattr(KeycloakService, "check_auth", mock_token_not_dict)
+    monkeypatch.setattr(KeycloakService, "check_user_role", mock_check_role_user_success)
+
+    monkeypatch.setattr(ChatSuggestionsService, "get_suggestions_per_workspace", mock_relay_chat_suggestions)
+
+    response = test_client.get(url=f"/workspaces/suggestion?workspaceId={workspace_id}",
+                               headers={"Authorization": "Bearer dummy_token", "If-None-Match": '"outdated"'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] == chat_suggestions_etag
+    assert response.json() == json.loads(chat_suggestions_list.json())
+
+
 @pytest.mark.asyncio
 async def test_delete_suggestion_by_id(test_client, monkeypatch):
     """ Test Deleting of suggestion by id"""
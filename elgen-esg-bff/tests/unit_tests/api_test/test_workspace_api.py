@@ -69,6 +69,28 @@ async def test_get_users_in_workspace(test_client, monkeypatch):
     assert UserInfoWorkspaceAPIResponse(**result.json()) == UserInfoWorkspaceAPIResponse(users=[user_info_workspace])
 
 
+@pytest.mark.asyncio
+async def test_get_users_in_workspace_page(test_client, monkeypatch):
+    """test getting a page of the users in a workspace"""
+
+    async def mock_get_workspace_users_list(*args, **kwargs):
+        return [{**user_info_workspace, "id": str(index)} for index in range(5)]
+
+    monkeypatch.setattr(KeycloakService, "check_auth", mock_token_not_dict)
+    monkeypatch.setattr(KeycloakService, "check_user_role", mock_check_role_user_success)
+    monkeypatch.setattr(WorkspaceService, "get_users_in_workspace", mock_get_users_by_workspace_id)
+    monkeypatch.setattr(KeycloakService, "get_workspace_users", mock_get_workspace_users_list)
+
+    result = test_client.get(url=f"/workspaces/{workspace_id}/users",
+                             params={"offset": 3, "limit": 10},
+                             headers={"Authorization": "Bearer dummy_token"},
+                             )
+
+    assert result.status_code == status.HTTP_200_OK
+    assert [user["id"] for user in result.json()["users"]] == ["3", "4"]
+    assert result.json()["total"] == 5
+
+
 @pytest.mark.asyncio
 async def test_get_users_in_workspace_fail_user_role_not_defined(test_client, monkeypatch):
     """test getting the users in a workspace"""
@@ -9,13 +9,16 @@ from pydantic import ValidationError
 
 from source.exceptions.commons import NotOkServiceResponse
 from source.exceptions.custom_exceptions import ModelConfigError
+from source.helpers.cache_helpers import LRUCache
+from source.models.enums import RequestMethod
 from source.schemas.answer_schemas import AnswerUpdatingRequest, VersionedAnswerResponse
-from source.schemas.api_schemas import QuestionLimitOutputSchema
+from source.schemas.api_schemas import QuestionLimitOutputSchema, ModelSourcesUpdateSchema
 from source.schemas.common import QueryDepth
 from source.schemas.conversation_schemas import AnswerSchema, QuestionInputSchema
 from source.schemas.source_schemas import SourceLimitSchema
 from source.schemas.streaming_answer_schema import ModelStreamingErrorResponse
 from source.services import chats_service
+from source.services.chats_service import ChatService
 from source.services.keycloak_service import KeycloakService
 from tests.conftest import test_chat_service, MockRequest
 from tests.test_data import sources_limit_dict_list, user_id, mock_add_question_return_object
@@ -129,6 +132,34 @@ async def test_get_model_config_per_model_code(test_chat_service, monkeypatch):
     assert result == SourceLimitSchema(modelCode="M1", maxWeb=2, maxLocal=1)
 
 
+@pytest.mark.asyncio
+async def test_model_source_limits_cached_until_patched(monkeypatch):
+    """test get_model_config_per_model_code reads the model once and again after the model is patched"""
+    stored_model = {"code": "M1", "max_doc": 1, "max_web": 2}
+    get_model_calls = []
+
+    async def mock_models_endpoint(*args, method, body=None, **kwargs):
+        if method == RequestMethod.GET:
+            get_model_calls.append(kwargs)
+        else:
+            stored_model.update(max_doc=body["max_doc"], max_web=body["max_web"])
+        return stored_model
+
+    chat_service = ChatService(config={}, keycloak_service=None, source_limits_cache=LRUCache(max_size=10, ttl=60))
+    monkeypatch.setattr(chats_service, "make_request", mock_models_endpoint)
+
+    for _ in range(5):
+        assert await chat_service.get_model_config_per_model_code(model_code="M1") == \
+               SourceLimitSchema(modelCode="M1", maxWeb=2, maxLocal=1)
+    assert len(get_model_calls) == 1
+
+    await chat_service.patch_model(ModelSourcesUpdateSchema(code="M1", max_web=5, maxLocal=4))
+
+    assert await chat_service.get_model_config_per_model_code(model_code="M1") == \
+           SourceLimitSchema(modelCode="M1", maxWeb=5, maxLocal=4)
+    assert len(get_model_calls) == 2
+
+
 @pytest.mark.asyncio
 async def test_get_model_config_per_model_code_validation_error(test_chat_service, monkeypatch):
     """test if get_model_config_per_model_code handles validation errors"""
@@ -0,0 +1,51 @@
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from source.services.chat_suggestions_service import ChatSuggestionsService
+from source.utils.http_sessions import upstream_sessions
+from tests.test_data import chat_suggestions_list, chat_suggestions_etag
+
+
+async def get_suggestions(request: web.Request) -> web.Response:
+    """Conversation service answering 304 to the clients having the current ETag"""
+    headers = {"ETag": chat_suggestions_etag, "Cache-Control": "no-cache"}
+    if request.query.get("workspace_id") is None:
+        return web.json_response({"detail": "workspace_id is required"}, status=422)
+    if request.headers.get("If-None-Match") == chat_suggestions_etag:
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=chat_suggestions_list.json(), content_type="application/json", headers=headers)
+
+
+@pytest_asyncio.fixture
+async def chat_suggestions_service():
+    stub_app = web.Application()
+    stub_app.router.add_get("/workspaces/suggestion", get_suggestions)
+    server = TestServer(stub_app)
+    await server.start_server()
+    yield ChatSuggestionsService(config={"CONVERSATION_SERVICE_URL": str(server.make_url(""))})
+    await upstream_sessions.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_suggestions_are_relayed_with_their_etag(chat_suggestions_service):
+    response = await chat_suggestions_service.get_suggestions_per_workspace(uuid4())
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == chat_suggestions_etag
+    assert response.headers["cache-control"] == "no-cache"
+    assert b"".join([chunk async for chunk in response.body_iterator]) == chat_suggestions_list.json().encode()
+
+
+@pytest.mark.asyncio
+async def test_not_modified_suggestions_are_relayed_without_body(chat_suggestions_service):
+    response = await chat_suggestions_service.get_suggestions_per_workspace(uuid4(),
+                                                                            if_none_match=chat_suggestions_etag)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == chat_suggestions_etag
+    assert b"".join([chunk async for chunk in response.body_iterator]) == b""
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from collections import Counter
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from fastapi import HTTPException
+
+from configuration.config import BFFSettings
+from source.schemas.api_schemas import QuestionInput
+from source.services.chats_service import ChatService
+from source.utils.http_sessions import upstream_sessions
+from tests.test_data import dummy_source_data
+
+SEARCH_LATENCY = 0.2
+dummy_web_source = {"url": "https://example.com", "description": "string", "title": "string"}
+
+
+def get_stub_services(latencies: dict, calls: Counter, saved_sources: list) -> web.Application:
+    """Sources and conversation services whose searches answer after latencies[path] seconds, or fail if it is None"""
+
+    def get_search(path: str, search_response: dict):
+        async def search(request: web.Request) -> web.Response:
+            calls[path] += 1
+            if latencies[path] is None:
+                return web.json_response({"detail": "search failed"}, status=500)
+            await asyncio.sleep(latencies[path])
+            return web.json_response(search_response)
+        return search
+
+    async def save_retrieved_sources(request: web.Request) -> web.Response:
+        calls["/conversations/retrieved-sources"] += 1
+        saved_sources.append(await request.json())
+        return web.json_response(saved_sources[-1])
+
+    stub_app = web.Application()
+    stub_app.router.add_post("/sources/similar", get_search("/sources/similar", dummy_source_data))
+    stub_app.router.add_post("/sources/web", get_search("/sources/web", {"data": [dummy_web_source],
+                                                                        "detail": "success"}))
+    stub_app.router.add_post("/conversations/retrieved-sources", save_retrieved_sources)
+    return stub_app
+
+
+@pytest.fixture
+def latencies():
+    return {"/sources/similar": SEARCH_LATENCY, "/sources/web": SEARCH_LATENCY}
+
+
+@pytest.fixture
+def calls():
+    return Counter()
+
+
+@pytest.fixture
+def saved_sources():
+    return []
+
+
+@pytest_asyncio.fixture
+async def chat_service(latencies, calls, saved_sources):
+    server = TestServer(get_stub_services(latencies, calls, saved_sources))
+    await server.start_server()
+    stub_url = str(server.make_url(""))
+    yield ChatService(config={**BFFSettings().dict(), "SOURCES_SERVICE_URL": stub_url,
+                              "CONVERSATION_SERVICE_URL": stub_url, "WEB_RETRIEVAL_TIMEOUT": 3 * SEARCH_LATENCY},
+                      keycloak_service=None)
+    await upstream_sessions.close()
+    await server.close()
+
+
+async def get_sources(chat_service: ChatService, local_sources_count: int = 2, web_sources_count: int = 2):
+    return await chat_service.get_sources(user_id=str(uuid4()), question=QuestionInput(id=uuid4(), content="question"),
+                                          model_code="M1", local_sources_count=local_sources_count,
+                                          web_sources_count=web_sources_count, workspace_id=uuid4())
+
+
+@pytest.mark.asyncio
+async def test_retrievals_run_concurrently_and_are_saved_at_once(chat_service, calls, saved_sources):
+    started_at = time.monotonic()
+    sources = await get_sources(chat_service)
+
+    assert time.monotonic() - started_at < 2 * SEARCH_LATENCY
+    assert len(sources.local_sources.data) == len(sources.web_sources.data) == 1
+    assert sources.local_sources.detail == sources.web_sources.detail == "success"
+    assert calls == {"/sources/similar": 1, "/sources/web": 1, "/conversations/retrieved-sources": 1}
+    assert saved_sources == [{"similar_docs": dummy_source_data["data"], "web_sources": [dummy_web_source]}]
+
+
+@pytest.mark.asyncio
+async def test_timed_out_retrieval_returns_the_other_one(chat_service, latencies, saved_sources):
+    latencies["/sources/web"] = 10 * SEARCH_LATENCY
+
+    started_at = time.monotonic()
+    sources = await get_sources(chat_service)
+
+    assert time.monotonic() - started_at < 5 * SEARCH_LATENCY
+    assert len(sources.local_sources.data) == 1
+    assert sources.web_sources.data == []
+    assert sources.web_sources.detail == "web sources retrieval timed out"
+    assert saved_sources == [{"similar_docs": dummy_source_data["data"], "web_sources": []}]
+
+
+@pytest.mark.asyncio
+async def test_failed_retrieval_returns_the_other_one(chat_service, latencies):
+    latencies["/sources/similar"] = None
+
+    sources = await get_sources(chat_service)
+
+    assert sources.local_sources.data == []
+    assert sources.local_sources.detail == "failed to get sources documents"
+    assert len(sources.web_sources.data) == 1
+
+
+@pytest.mark.asyncio
+async def test_all_retrievals_failed(chat_service, latencies, calls):
+    latencies["/sources/similar"] = latencies["/sources/web"] = None
+
+    with pytest.raises(HTTPException):
+        await get_sources(chat_service)
+    assert calls["/conversations/retrieved-sources"] == 0
+
+
+@pytest.mark.asyncio
+async def test_skipped_retrieval_is_not_requested(chat_service, calls):
+    sources = await get_sources(chat_service, web_sources_count=0)
+
+    assert sources.web_sources.detail == "skipped"
+    assert calls == {"/sources/similar": 1, "/conversations/retrieved-sources": 1}
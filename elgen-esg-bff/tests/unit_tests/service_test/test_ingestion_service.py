@@ -0,0 +1,47 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException, status
+
+from configuration.config import BFFSettings
+from source.exceptions.commons import NotOkServiceResponse
+from source.models.enums import RequestMethod
+from source.services import ingestion_services
+from source.services.ingestion_services import IngestionService
+
+
+@pytest.mark.asyncio
+async def test_invalidate_answer_cache(monkeypatch):
+    """Test the cached answers of the workspace are dropped in the conversation service"""
+    workspace_id = uuid4()
+    requests = []
+
+    async def mock_make_request(**kwargs):
+        requests.append(kwargs)
+        return {"workspace_id": str(workspace_id), "deleted_entries": 2}
+
+    monkeypatch.setattr(ingestion_services, "make_request", mock_make_request)
+
+    await IngestionService(config=BFFSettings().dict()).invalidate_answer_cache(workspace_id=workspace_id)
+
+    assert requests == [{"service_url": BFFSettings().CONVERSATION_SERVICE_URL,
+                         "uri": f"/workspaces/{workspace_id}/answer-cache",
+                         "method": RequestMethod.DELETE}]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("failure", [
+    NotOkServiceResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"detail": "database error"}),
+    HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Service is unavailable.")
+])
+async def test_invalidate_answer_cache_failure_does_not_raise(monkeypatch, failure):
+    """Test a failing invalidation does not fail the ingestion that triggered it"""
+
+    async def mock_make_request(**kwargs):
+        if isinstance(failure, Exception):
+            raise failure
+        return failure
+
+    monkeypatch.setattr(ingestion_services, "make_request", mock_make_request)
+
+    assert await IngestionService(config=BFFSettings().dict()).invalidate_answer_cache(workspace_id=uuid4()) is None
@@ -1,3 +1,4 @@
+import json
 from datetime import date, datetime, timedelta
 from unittest.mock import patch
 from uuid import uuid4
@@ -7,14 +8,17 @@ from fastapi import HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import ValidationError
 
+from configuration.config import KeyCloakServiceConfiguration
 from source.exceptions.api_exceptions import UserNotFoundApiException, KeycloakInternalApiException
 from source.exceptions.commons import NotOkServiceResponse
 from source.exceptions.custom_exceptions import UserRolesNotDefined, KeycloakError, UserAlreadyExistException, \
     UserNotFound, UserInformationFormatError, WrongCredentials, SessionNotFound, DataEncryptionError
+from source.helpers.cache_helpers import LRUCache
 from source.helpers.keycloack_helper import format_user_info
 from source.schemas.keycloak_schemas import UserInfo, KeycloakAttribute, ClientRole, KeycloakTokenInfo, \
     UserInfoRegistration, UserCreationBulkResponse, ConversationInfo, LoginModel
 from source.schemas.source_schemas import SourceLimitSchema
+from source.services import keycloak_service as keycloak_service_module
 from source.services.keycloak_service import KeycloakService
 from tests.conftest import test_keycloak_service
 from tests.test_data import user_email, first_name, last_name, valid_date_and_limit_attributes, user_id, \
@@ -689,6 +693,40 @@ async def test_update_sources_config(test_keycloak_service, monkeypatch):
         assert result == sources_limit_dict_list
 
 
+@pytest.mark.asyncio
+async def test_source_configurations_cached_until_written(monkeypatch):
+    """Test if the parsed source configs are read once from keycloak and read again after a write"""
+    stored_source_configs = [dict(source_config) for source_config in sources_limit_dict_list]
+    get_sources_configurations_calls = []
+
+    async def mock_get_sources_configurations(*args, **kwargs):
+        get_sources_configurations_calls.append(args)
+        return stored_source_configs
+
+    async def get_admin_token_mock(*args, **kwargs):
+        return {"access_token": "abc"}
+
+    async def mock_make_request(*args, body, **kwargs):
+        stored_source_configs[:] = json.loads(body["attributes"]["sourceConfig"])
+        return None
+
+    keycloak_service = KeycloakService(keycloak_service_configuration=KeyCloakServiceConfiguration().dict(),
+                                       source_limits_cache=LRUCache(max_size=10, ttl=60))
+    monkeypatch.setattr(KeycloakService, "get_sources_configurations", mock_get_sources_configurations)
+    monkeypatch.setattr(KeycloakService, "_get_admin_token", get_admin_token_mock)
+    monkeypatch.setattr(keycloak_service_module, "make_request", mock_make_request)
+
+    for _ in range(5):
+        assert await keycloak_service.extract_source_configurations() == sources_limit_list
+    assert len(get_sources_configurations_calls) == 1
+
+    updated_source_limits = sources_limit_list[0].copy(update={"max_web": 3})
+    await keycloak_service.add_complete_sources_configuration(complete_sources_config=[updated_source_limits])
+
+    assert await keycloak_service.extract_source_configurations() == [updated_source_limits]
+    assert len(get_sources_configurations_calls) == 2
+
+
 @pytest.mark.asyncio
 async def test_decrypt_user_creation_data_success(test_keycloak_service, monkeypatch):
     """ Test the decryption of data"""
@@ -0,0 +1,96 @@
+import asyncio
+from collections import Counter
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from configuration.config import KeyCloakServiceConfiguration
+from source.services.keycloak_service import KeycloakService
+from source.services.keycloak_session_service import KeycloakSessionService
+from source.utils.http_sessions import upstream_sessions
+from tests.test_data import dummy_user_info
+
+ADMIN_TOKEN_LIFESPAN = 60
+
+
+def get_stub_keycloak(calls: Counter) -> web.Application:
+    async def get_openid_configuration(request: web.Request) -> web.Response:
+        calls["discovery"] += 1
+        realm_url = f"{request.scheme}://{request.host}/realms/{request.match_info['realm']}"
+        return web.json_response({"token_endpoint": f"{realm_url}/protocol/openid-connect/token"})
+
+    async def create_token(request: web.Request) -> web.Response:
+        calls["token"] += 1
+        if request.match_info["realm"] != KeyCloakServiceConfiguration().REALM:
+            return web.json_response({"error": "unauthorized_client"}, status=401)
+        # lets the concurrent callers pile up behind the first refresh
+        await asyncio.sleep(0.05)
+        return web.json_response({"access_token": f"admin-token-{calls['token']}", "token_type": "Bearer",
+                                  "expires_in": ADMIN_TOKEN_LIFESPAN})
+
+    async def get_user(request: web.Request) -> web.Response:
+        calls[request.headers["Authorization"]] += 1
+        return web.json_response(dummy_user_info)
+
+    stub_app = web.Application()
+    stub_app.router.add_get("/realms/{realm}/.well-known/openid-configuration", get_openid_configuration)
+    stub_app.router.add_post("/realms/{realm}/protocol/openid-connect/token/", create_token)
+    stub_app.router.add_get("/admin/realms/{realm}/users/{user_id}", get_user)
+    return stub_app
+
+
+@pytest.fixture
+def calls():
+    return Counter()
+
+
+@pytest_asyncio.fixture
+async def keycloak_configuration(calls):
+    server = TestServer(get_stub_keycloak(calls))
+    await server.start_server()
+    yield {**KeyCloakServiceConfiguration().dict(), "SERVER_URL": str(server.make_url("")).rstrip("/")}
+    await upstream_sessions.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_admin_operations_share_one_admin_token(calls, keycloak_configuration):
+    keycloak_session_service = KeycloakSessionService(keycloak_configuration)
+
+    async def get_user():
+        # a KeycloakService is created per request by the container
+        keycloak_service = KeycloakService(keycloak_service_configuration=keycloak_configuration,
+                                           keycloak_session_service=keycloak_session_service)
+        return await keycloak_service.get_user(dummy_user_info["id"], update_attributes_option=False)
+
+    users = await asyncio.gather(*(get_user() for _ in range(100)))
+
+    assert all(user["id"] == dummy_user_info["id"] for user in users)
+    assert calls == {"discovery": 1, "token": 1, "Bearer admin-token-1": 100}
+
+
+@pytest.mark.asyncio
+async def test_admin_token_is_renewed_before_its_expiry(calls, keycloak_configuration):
+    keycloak_session_service = KeycloakSessionService(
+        {**keycloak_configuration, "ADMIN_TOKEN_REFRESH_MARGIN": ADMIN_TOKEN_LIFESPAN - 0.2})
+
+    first_token = await keycloak_session_service.get_admin_token()
+    assert await keycloak_session_service.get_admin_token() == first_token
+    await asyncio.sleep(0.3)
+    renewed_token = await keycloak_session_service.get_admin_token()
+
+    assert renewed_token["access_token"] == "admin-token-2"
+    assert calls == {"discovery": 1, "token": 2}
+
+
+@pytest.mark.asyncio
+async def test_refused_admin_token_is_not_kept(calls, keycloak_configuration):
+    keycloak_session_service = KeycloakSessionService({**keycloak_configuration, "REALM": "unknown"})
+
+    for _ in range(2):
+        response = await keycloak_session_service.get_admin_token()
+        assert response.status_code == 401
+
+    assert calls == {"discovery": 1, "token": 2}
@@ -0,0 +1,175 @@
+import asyncio
+import os
+from datetime import date
+
+import pytest
+
+from configuration.config import KeyCloakServiceConfiguration, RateLimitConfiguration
+from source.exceptions.custom_exceptions import RateLimitStoreError
+from source.schemas.keycloak_schemas import KeycloakAttribute, UserInfo
+from source.services.keycloak_service import KeycloakService
+from source.services.rate_limit_service import RateLimitService
+from source.services.rate_limit_store import FailoverRateLimitStore, InMemoryRateLimitStore, PostgresRateLimitStore
+from tests.test_data import dummy_user_info, user_id
+
+QUESTIONS_QUOTA = 100
+
+
+def get_user_profile(questions_used_today: int = 0) -> UserInfo:
+    user_profile = UserInfo.parse_obj(dummy_user_info)
+    user_profile.user_actual_limits.questions_date = [str(date.today())]
+    user_profile.user_actual_limits.questions_limit = [QUESTIONS_QUOTA - questions_used_today]
+    return user_profile
+
+
+def get_keycloak_service(monkeypatch, rate_limit_service: RateLimitService,
+                         user_profile: UserInfo | None = None) -> tuple[KeycloakService, list]:
+    """KeycloakService counting its reads of the user profile on keycloak"""
+    get_user_calls = []
+
+    async def mock_get_user(*args, **kwargs):
+        get_user_calls.append(args)
+        return user_profile or get_user_profile()
+
+    keycloak_service = KeycloakService(keycloak_service_configuration=KeyCloakServiceConfiguration().dict(),
+                                       rate_limit_service=rate_limit_service)
+    monkeypatch.setattr(keycloak_service, "get_user", mock_get_user)
+    return keycloak_service, get_user_calls
+
+
+@pytest.fixture
+def rate_limit_service():
+    return RateLimitService(rate_limit_store=InMemoryRateLimitStore(),
+                            rate_limit_configuration=RateLimitConfiguration().dict())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_questions_are_all_counted(monkeypatch, rate_limit_service):
+    keycloak_service, get_user_calls = get_keycloak_service(monkeypatch, rate_limit_service)
+
+    await asyncio.gather(*(keycloak_service.update_rate_limit(user_id, KeycloakAttribute.QUESTIONS)
+                           for _ in range(60)))
+    user_profile = await keycloak_service.update_rate_limit(user_id, KeycloakAttribute.QUESTIONS)
+
+    assert await rate_limit_service.rate_limit_store.get(user_id, "questions", date.today()) == 61
+    assert user_profile.user_actual_limits.questions_limit == [QUESTIONS_QUOTA - 61]
+    assert user_profile.user_actual_limits.conversations_limit == [100]
+    assert len(get_user_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reservations_never_pass_the_quota(monkeypatch, rate_limit_service):
+    keycloak_service, _ = get_keycloak_service(monkeypatch, rate_limit_service,
+                                               user_profile=get_user_profile(questions_used_today=QUESTIONS_QUOTA - 5))
+
+    reservations = await asyncio.gather(*(keycloak_service.reserve_rate_limit(user_id, KeycloakAttribute.QUESTIONS)
+                                          for _ in range(20)))
+
+    assert sum(reservation is not None for reservation in reservations) == 5
+    assert await rate_limit_service.rate_limit_store.get(user_id, "questions", date.today()) == QUESTIONS_QUOTA
+    assert not await keycloak_service.check_user_limit(user_id, KeycloakAttribute.QUESTIONS)
+
+
+@pytest.mark.asyncio
+async def test_counters_start_from_the_keycloak_attributes_of_the_day(monkeypatch, rate_limit_service):
+    keycloak_service, _ = get_keycloak_service(monkeypatch, rate_limit_service,
+                                               user_profile=get_user_profile(questions_used_today=QUESTIONS_QUOTA - 1))
+
+    assert await keycloak_service.check_user_limit(user_id, KeycloakAttribute.QUESTIONS)
+    await keycloak_service.update_rate_limit(user_id, KeycloakAttribute.QUESTIONS)
+    assert not await keycloak_service.check_user_limit(user_id, KeycloakAttribute.QUESTIONS)
+
+    user_profile = await keycloak_service.update_rate_limit(user_id, KeycloakAttribute.QUESTIONS,
+                                                            incrementation_condition=True)
+    assert user_profile.user_actual_limits.questions_limit == [1]
+    assert await keycloak_service.check_user_limit(user_id, KeycloakAttribute.QUESTIONS)
+
+
+@pytest.mark.asyncio
+async def test_changed_counters_are_written_back(monkeypatch, rate_limit_service):
+    keycloak_service, _ = get_keycloak_service(monkeypatch, rate_limit_service)
+    updates = []
+
+    async def mock_get_admin_token(*args, **kwargs):
+        return {"access_token": "admin-token"}
+
+    async def mock_make_update_request(admin_token, updated_user_id, user_profile):
+        updates.append((updated_user_id, user_profile.user_actual_limits.dict(by_alias=True)))
+        return {}
+
+    monkeypatch.setattr(keycloak_service, "_get_admin_token", mock_get_admin_token)
+    monkeypatch.setattr(keycloak_service, "_make_update_request", mock_make_update_request)
+    for _ in range(3):
+        await keycloak_service.update_rate_limit(user_id, KeycloakAttribute.QUESTIONS)
+    await keycloak_service.update_rate_limit(user_id, KeycloakAttribute.CONVERSATIONS)
+
+    await keycloak_service.write_back_rate_limits()
+    await keycloak_service.write_back_rate_limits()
+
+    assert len(updates) == 1
+    updated_user_id, attributes = updates[0]
+    assert updated_user_id == user_id
+    assert attributes["questionsLimit"] == [QUESTIONS_QUOTA - 3]
+    assert attributes["conversationsLimit"] == [99]
+    assert attributes["questionsDate"] == attributes["conversationsDate"] == [str(date.today())]
+
+
+class UnreachableRateLimitStore(InMemoryRateLimitStore):
+    """Store failing like a postgres store whose database is down, until it is brought back"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.reachable = False
+
+    async def increment(self, *args, **kwargs) -> int:
+        if not self.reachable:
+            raise RateLimitStoreError("connection refused")
+        return await super().increment(*args, **kwargs)
+
+
+def test_counters_are_kept_in_the_process_by_default(monkeypatch):
+    monkeypatch.delenv("RATE_LIMIT_STORE", raising=False)
+
+    assert RateLimitConfiguration().RATE_LIMIT_STORE == "memory"
+
+
+def test_postgres_store_connects_on_first_use():
+    rate_limit_store = PostgresRateLimitStore("postgresql://localhost:1/unreachable")
+
+    assert rate_limit_store._engine is None
+
+
+@pytest.mark.asyncio
+async def test_counters_fall_back_to_the_process_while_the_store_is_unreachable(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("source.services.rate_limit_store.time.monotonic", lambda: clock[0])
+    primary = UnreachableRateLimitStore()
+    rate_limit_store = FailoverRateLimitStore(primary=primary, fallback=InMemoryRateLimitStore(), retry_interval=30)
+
+    counts = [await rate_limit_store.increment(user_id, "questions", date.today()) for _ in range(2)]
+    primary.reachable = True
+    clock[0] += 10
+    counts.append(await rate_limit_store.increment(user_id, "questions", date.today()))
+    clock[0] += 30
+    counts.append(await rate_limit_store.increment(user_id, "questions", date.today()))
+
+    assert counts == [1, 2, 3, 1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.getenv("RATE_LIMIT_TEST_DB_URL"), reason="needs a postgres database")
+async def test_postgres_store_concurrent_increments():
+    rate_limit_store = PostgresRateLimitStore(os.environ["RATE_LIMIT_TEST_DB_URL"])
+    rate_limit_store.init_database()
+    window_start = date(2000, 1, 1)
+    await rate_limit_store.purge(before=date(2000, 1, 2))
+
+    assert await rate_limit_store.seed(user_id, "questions", window_start, 10) == 10
+    counts = await asyncio.gather(*(rate_limit_store.increment(user_id, "questions", window_start)
+                                    for _ in range(200)))
+    assert await rate_limit_store.seed(user_id, "questions", window_start, 0) == 210
+    await rate_limit_store.increment(user_id, "questions", window_start, amount=-500)
+
+    assert sorted(counts) == list(range(11, 211))
+    assert await rate_limit_store.get(user_id, "questions", window_start) == 0
+    await rate_limit_store.purge(before=date(2000, 1, 2))
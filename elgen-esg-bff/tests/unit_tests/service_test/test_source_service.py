@@ -1,10 +1,9 @@
 import mimetypes
-import tempfile
 from http import HTTPStatus
 from uuid import uuid4
 
 import pytest
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse
 
 from source.schemas.api_schemas import FileInputSchema
 from source.services import sources_service
@@ -27,21 +26,20 @@ async def test_preview_document(test_source_service, monkeypatch):
                                    'file name': 'test_document.docx',
                                    'original_file_name': file_name}, '_folder': 'some_folder'}]
 
-    with tempfile.SpooledTemporaryFile() as file:
-        mime_type, _ = mimetypes.guess_type("test_document.docx")
-        ingested_file_from_fh = FileResponse(file.name, media_type=mime_type,
-                                             headers={"Content-Disposition": f"attachment; filename={file_name}"})
+    async def mock_make_request(*args, **kwargs):
+        return file_type_response
 
-    return_values = [file_type_response, ingested_file_from_fh]
+    async def mock_stream_request(*args, media_type, response_headers, **kwargs):
+        """the file handler answers with a generic content type, the one guessed from the file name is kept"""
+        assert media_type == mimetypes.guess_type(file_name)[0]
+        return StreamingResponse(iter([b"document"]), media_type=media_type, headers=response_headers)
 
-    async def mock_multiple_make_request(*args, **kwargs):
-        return return_values.pop(0)
-
-    monkeypatch.setattr(sources_service, 'make_request', mock_multiple_make_request)
+    monkeypatch.setattr(sources_service, 'make_request', mock_make_request)
+    monkeypatch.setattr(sources_service, 'stream_request', mock_stream_request)
 
     result = await test_source_service.preview_document(user_id=user_id, file_id=file_id, file_input=file_input)
 
-    assert isinstance(result, FileResponse)
+    assert isinstance(result, StreamingResponse)
     assert result.status_code == HTTPStatus.OK
     assert result.media_type == docx_mime_type
     assert result.raw_headers == [(b'content-disposition', b'attachment; filename=test_document.docx'), (
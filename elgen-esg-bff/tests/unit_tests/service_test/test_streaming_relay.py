@@ -0,0 +1,106 @@
+import asyncio
+import json
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from source.schemas.common import QueryDepth
+from source.schemas.workspace_schemas import WorkspaceTypesEnum
+from source.services.chats_service import ChatService
+from source.utils.http_sessions import upstream_sessions
+from tests.conftest import MockRequest
+
+streamed_tokens = [json.dumps({"status": "IN_PROGRESS", "data": token}).encode() for token in ["é", "answer", "\n"]]
+
+
+class StubConversationService:
+    """Streams the answer tokens, or tokens until the relay goes away, and records the connections it served"""
+
+    def __init__(self) -> None:
+        self.client_addresses = []
+        self.generation_stopped = asyncio.Event()
+
+    async def stream_answer(self, request: web.Request) -> web.StreamResponse:
+        self.client_addresses.append(request.transport.get_extra_info("peername"))
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for token in streamed_tokens:
+            await response.write(token)
+        await response.write_eof()
+        return response
+
+    async def stream_endless_answer(self, request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse()
+        await response.prepare(request)
+        try:
+            while True:
+                await response.write(streamed_tokens[0])
+                await asyncio.sleep(0.01)
+        except (ConnectionResetError, asyncio.CancelledError):
+            self.generation_stopped.set()
+            raise
+
+    def get_app(self) -> web.Application:
+        stub_app = web.Application()
+        stub_app.router.add_get("/chat/answer/{question_id}/stream", self.stream_answer)
+        stub_app.router.add_get("/chat/answer/{question_id}/sql/stream", self.stream_endless_answer)
+        return stub_app
+
+
+class DisconnectingRequest(MockRequest):
+    async def is_disconnected(self, *args, **kwargs):
+        return True
+
+
+@pytest_asyncio.fixture
+async def conversation_service():
+    stub_conversation_service = StubConversationService()
+    server = TestServer(stub_conversation_service.get_app())
+    await server.start_server()
+    yield stub_conversation_service, ChatService(config={"CONVERSATION_SERVICE_URL": str(server.make_url(""))},
+                                                 keycloak_service=None)
+    await upstream_sessions.close()
+    await server.close()
+
+
+def stream_answer(chat_service: ChatService, workspace_type: WorkspaceTypesEnum, request=None):
+    return chat_service.generate_answer_by_streaming(user_id=str(uuid4()), model_code="M1", question_id=str(uuid4()),
+                                                     request=request or MockRequest(), workspace_type=workspace_type,
+                                                     workspace_id=str(uuid4()), query_depth=QueryDepth.EXPLANATION)
+
+
+@pytest.mark.asyncio
+async def test_answers_are_relayed_as_is_over_one_connection(conversation_service):
+    stub_conversation_service, chat_service = conversation_service
+
+    for _ in range(3):
+        relayed_answer = b"".join([chunk async for chunk in stream_answer(chat_service, WorkspaceTypesEnum.chat)])
+        assert relayed_answer == b"".join(streamed_tokens)
+
+    assert len(stub_conversation_service.client_addresses) == 3
+    assert len(set(stub_conversation_service.client_addresses)) == 1
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_stops_the_generation(conversation_service):
+    stub_conversation_service, chat_service = conversation_service
+    answer_stream = stream_answer(chat_service, WorkspaceTypesEnum.database)
+
+    assert await answer_stream.__anext__() == streamed_tokens[0]
+    await answer_stream.aclose()
+
+    await asyncio.wait_for(stub_conversation_service.generation_stopped.wait(), timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_disconnected_request_ends_the_relay(conversation_service):
+    stub_conversation_service, chat_service = conversation_service
+
+    relayed_chunks = [chunk async for chunk in stream_answer(chat_service, WorkspaceTypesEnum.database,
+                                                             request=DisconnectingRequest())]
+
+    assert relayed_chunks == []
+    await asyncio.wait_for(stub_conversation_service.generation_stopped.wait(), timeout=5)
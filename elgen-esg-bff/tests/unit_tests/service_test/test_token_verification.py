@@ -0,0 +1,207 @@
+import json
+import time
+from collections import Counter
+
+import jwt
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jwt.algorithms import RSAAlgorithm
+from jwt.utils import base64url_encode
+
+from configuration.config import KeyCloakServiceConfiguration
+from source.schemas.keycloak_schemas import KeycloakTokenInfo
+from source.services.keycloak_service import KeycloakService
+from source.services.token_verification_service import TokenVerificationService
+from source.utils.http_sessions import upstream_sessions
+from tests.test_data import dummy_token
+
+
+class StubRealm:
+    """Signing keys of a realm, served as a JWKS by the keycloak stub with the introspection endpoint"""
+
+    def __init__(self):
+        self.keys = {}
+        self.calls = Counter()
+        self.add_key("key-1")
+
+    def add_key(self, key_id: str) -> None:
+        self.keys[key_id] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def add_ec_key(self, key_id: str) -> None:
+        self.keys[key_id] = ec.generate_private_key(ec.SECP256R1())
+
+    @staticmethod
+    def get_jwk(private_key) -> dict:
+        # the RSA keys are published with their algorithm, the EC keys without it as some realms do
+        if isinstance(private_key, ec.EllipticCurvePrivateKey):
+            public_numbers = private_key.public_key().public_numbers()
+            return {"kty": "EC", "crv": "P-256", **{coordinate: base64url_encode(value.to_bytes(32, "big")).decode()
+                                                   for coordinate, value in (("x", public_numbers.x),
+                                                                             ("y", public_numbers.y))}}
+        return {**json.loads(RSAAlgorithm.to_jwk(private_key.public_key())), "alg": "RS256"}
+
+    def get_jwks(self) -> dict:
+        return {"keys": [{**self.get_jwk(private_key), "kid": key_id, "use": "sig"}
+                         for key_id, private_key in self.keys.items()]}
+
+    def sign(self, key_id: str = "key-1", private_key=None, **claims) -> str:
+        now = int(time.time())
+        payload = {**dummy_token, "iat": now, "exp": now + 300, **claims}
+        for claim in ("active", "username", "client_id"):
+            payload.pop(claim, None)
+        pem = (private_key or self.keys[key_id]).private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+        algorithm = "ES256" if isinstance(private_key or self.keys[key_id], ec.EllipticCurvePrivateKey) else "RS256"
+        token = jwt.encode(payload, pem, algorithm=algorithm, headers={"kid": key_id})
+        return token.decode() if isinstance(token, bytes) else token
+
+
+def get_stub_keycloak(realm: StubRealm) -> web.Application:
+    async def get_certs(request: web.Request) -> web.Response:
+        realm.calls["certs"] += 1
+        return web.json_response(realm.get_jwks())
+
+    async def introspect_token(request: web.Request) -> web.Response:
+        realm.calls["introspect"] += 1
+        form = await request.post()
+        if form["token"] != "opaque-token":
+            return web.json_response({"active": False})
+        return web.json_response({**dummy_token, "exp": int(time.time()) + 300})
+
+    stub_app = web.Application()
+    stub_app.router.add_get("/realms/{realm}/protocol/openid-connect/certs", get_certs)
+    stub_app.router.add_post("/realms/{realm}/protocol/openid-connect/token/introspect", introspect_token)
+    return stub_app
+
+
+@pytest.fixture
+def stub_realm():
+    return StubRealm()
+
+
+@pytest_asyncio.fixture
+async def keycloak_configuration(stub_realm):
+    server = TestServer(get_stub_keycloak(stub_realm))
+    await server.start_server()
+    yield {**KeyCloakServiceConfiguration().dict(), "SERVER_URL": str(server.make_url("")).rstrip("/")}
+    await upstream_sessions.close()
+    await server.close()
+
+
+def get_keycloak_service(keycloak_configuration: dict, **configuration) -> KeycloakService:
+    keycloak_configuration = {**keycloak_configuration, **configuration}
+    return KeycloakService(keycloak_service_configuration=keycloak_configuration,
+                           token_verification_service=TokenVerificationService(keycloak_configuration))
+
+
+async def check_auth(keycloak_service: KeycloakService, token: str):
+    return await keycloak_service.check_auth(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+
+
+@pytest.mark.asyncio
+async def test_signed_token_is_verified_locally(stub_realm, keycloak_configuration):
+    keycloak_service = get_keycloak_service(keycloak_configuration)
+    token = stub_realm.sign()
+
+    for _ in range(20):
+        token_infos = await check_auth(keycloak_service, token)
+
+    assert str(token_infos.sub) == dummy_token["sub"]
+    assert token_infos.is_active
+    assert token_infos.resource_access == KeycloakTokenInfo(**dummy_token).resource_access
+    assert stub_realm.calls == {"certs": 1}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("claims", [{"exp": int(time.time()) - 60}, {"typ": "Refresh"}, {"aud": "other-client"}])
+async def test_invalid_signed_token_is_rejected_without_introspection(stub_realm, keycloak_configuration, claims):
+    keycloak_service = get_keycloak_service(keycloak_configuration, TOKEN_AUDIENCE="account")
+
+    with pytest.raises(HTTPException) as error:
+        await check_auth(keycloak_service, stub_realm.sign(**claims))
+
+    assert error.value.status_code == 401
+    assert stub_realm.calls["introspect"] == 0
+
+
+@pytest.mark.asyncio
+async def test_token_signed_with_another_key_is_rejected(stub_realm, keycloak_configuration):
+    keycloak_service = get_keycloak_service(keycloak_configuration)
+    forged_token = stub_realm.sign(private_key=rsa.generate_private_key(public_exponent=65537, key_size=2048))
+
+    with pytest.raises(HTTPException) as error:
+        await check_auth(keycloak_service, forged_token)
+
+    assert error.value.status_code == 401
+    assert stub_realm.calls["introspect"] == 0
+
+
+@pytest.mark.asyncio
+async def test_token_signed_with_an_ec_key_without_algorithm_is_verified(stub_realm, keycloak_configuration):
+    keycloak_service = get_keycloak_service(keycloak_configuration)
+    stub_realm.add_ec_key("ec-key")
+
+    token_infos = await check_auth(keycloak_service, stub_realm.sign(key_id="ec-key"))
+
+    assert str(token_infos.sub) == dummy_token["sub"]
+    assert stub_realm.calls == {"certs": 1}
+
+
+def test_keys_without_algorithm_get_the_one_of_their_type():
+    assert TokenVerificationService.get_jwk_algorithm({"kty": "RSA"}) == "RS256"
+    assert TokenVerificationService.get_jwk_algorithm({"kty": "EC", "crv": "P-384"}) == "ES384"
+    assert TokenVerificationService.get_jwk_algorithm({"kty": "EC", "crv": "P-256", "alg": "ES256"}) == "ES256"
+    assert TokenVerificationService.get_jwk_algorithm({"kty": "EC", "crv": "secp256k1"}) is None
+
+
+@pytest.mark.asyncio
+async def test_rotated_key_is_fetched_once(stub_realm, keycloak_configuration):
+    keycloak_service = get_keycloak_service(keycloak_configuration, JWKS_MIN_REFRESH_INTERVAL=0)
+    await check_auth(keycloak_service, stub_realm.sign())
+    stub_realm.add_key("key-2")
+
+    for _ in range(5):
+        await check_auth(keycloak_service, stub_realm.sign(key_id="key-2"))
+
+    assert stub_realm.calls == {"certs": 2}
+
+
+@pytest.mark.asyncio
+async def test_unknown_key_falls_back_to_introspection(stub_realm, keycloak_configuration):
+    keycloak_service = get_keycloak_service(keycloak_configuration)
+    unknown_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    with pytest.raises(HTTPException):
+        await check_auth(keycloak_service, stub_realm.sign(key_id="unknown", private_key=unknown_key))
+
+    assert stub_realm.calls == {"certs": 1, "introspect": 1}
+
+
+@pytest.mark.asyncio
+async def test_opaque_and_revoked_tokens_introspections_are_cached(stub_realm, keycloak_configuration):
+    keycloak_service = get_keycloak_service(keycloak_configuration)
+
+    for _ in range(5):
+        token_infos = await check_auth(keycloak_service, "opaque-token")
+        with pytest.raises(HTTPException) as error:
+            await check_auth(keycloak_service, "revoked-token")
+
+    assert str(token_infos.sub) == dummy_token["sub"]
+    assert error.value.status_code == 401
+    assert stub_realm.calls == {"introspect": 2}
+
+
+@pytest.mark.asyncio
+async def test_local_verification_disabled(stub_realm, keycloak_configuration):
+    keycloak_service = get_keycloak_service(keycloak_configuration, LOCAL_TOKEN_VERIFICATION=False)
+
+    with pytest.raises(HTTPException):
+        await check_auth(keycloak_service, stub_realm.sign())
+
+    assert stub_realm.calls == {"introspect": 1}
@@ -0,0 +1,132 @@
+from collections import Counter
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from configuration.config import KeyCloakServiceConfiguration
+from source.services.keycloak_service import KeycloakService
+from source.services.user_directory_service import UserDirectoryService
+from source.utils.http_sessions import upstream_sessions
+from tests.test_data import dummy_user_info
+
+REALM_USERS_COUNT = 1234
+PAGE_SIZE = 500
+
+
+def get_realm_user() -> dict:
+    return {**dummy_user_info, "id": str(uuid4())}
+
+
+def get_stub_keycloak(realm_users: dict, calls: Counter) -> web.Application:
+    async def get_users(request: web.Request) -> web.Response:
+        calls["page"] += 1
+        first, max_results = int(request.query["first"]), int(request.query["max"])
+        return web.json_response(list(realm_users.values())[first:first + max_results])
+
+    async def get_user(request: web.Request) -> web.Response:
+        calls["lookup"] += 1
+        if (realm_user := realm_users.get(request.match_info["user_id"])) is None:
+            return web.json_response({"error": "User not found"}, status=404)
+        return web.json_response(realm_user)
+
+    stub_app = web.Application()
+    stub_app.router.add_get("/admin/realms/{realm}/users", get_users)
+    stub_app.router.add_get("/admin/realms/{realm}/users/{user_id}", get_user)
+    return stub_app
+
+
+@pytest.fixture
+def calls():
+    return Counter()
+
+
+@pytest.fixture
+def realm_users():
+    return {realm_user["id"]: realm_user for realm_user in (get_realm_user() for _ in range(REALM_USERS_COUNT))}
+
+
+@pytest_asyncio.fixture
+async def keycloak_service(realm_users, calls, monkeypatch):
+    server = TestServer(get_stub_keycloak(realm_users, calls))
+    await server.start_server()
+    keycloak_configuration = {**KeyCloakServiceConfiguration().dict(), "USER_DIRECTORY_PAGE_SIZE": PAGE_SIZE,
+                              "SERVER_URL": str(server.make_url("")).rstrip("/")}
+
+    async def mock_get_admin_token(*args, **kwargs):
+        return {"access_token": "admin-token"}
+
+    keycloak_service = KeycloakService(keycloak_service_configuration=keycloak_configuration,
+                                       user_directory_service=UserDirectoryService(keycloak_configuration))
+    monkeypatch.setattr(keycloak_service, "_get_admin_token", mock_get_admin_token)
+    yield keycloak_service
+    await upstream_sessions.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_directory_is_read_by_pages_once(keycloak_service, realm_users, calls):
+    workspace_users_ids = list(realm_users)[::100]
+
+    workspace_users = await keycloak_service.get_workspace_users(workspace_users_ids)
+    non_included_users = await keycloak_service.get_workspace_non_included_users(workspace_users_ids)
+    assert await keycloak_service.get_workspace_users(workspace_users_ids) == workspace_users
+
+    assert [str(user.id) for user in workspace_users] == workspace_users_ids
+    assert len(non_included_users) == REALM_USERS_COUNT - len(workspace_users_ids)
+    assert not {str(user.id) for user in non_included_users} & set(workspace_users_ids)
+    assert calls == {"page": 3}
+
+
+@pytest.mark.asyncio
+async def test_users_missing_from_the_directory_are_looked_up_by_id(keycloak_service, realm_users, calls):
+    await keycloak_service.get_workspace_non_included_users([])
+    new_user = get_realm_user()
+    realm_users[new_user["id"]] = new_user
+    unknown_user_id = str(uuid4())
+
+    for _ in range(3):
+        workspace_users = await keycloak_service.get_workspace_users([new_user["id"], unknown_user_id])
+
+    assert [str(user.id) for user in workspace_users] == [new_user["id"]]
+    assert calls == {"page": 3, "lookup": 2}
+
+
+@pytest.mark.asyncio
+async def test_created_user_is_added_by_id(keycloak_service, realm_users, calls):
+    await keycloak_service.get_workspace_non_included_users([])
+    new_user = get_realm_user()
+    realm_users[new_user["id"]] = new_user
+
+    await keycloak_service.user_directory_service.add_user(new_user["id"], keycloak_service._get_admin_token)
+    non_included_users = await keycloak_service.get_workspace_non_included_users([])
+
+    assert new_user["id"] in {str(user.id) for user in non_included_users}
+    assert calls == {"page": 3, "lookup": 1}
+
+
+@pytest.mark.asyncio
+async def test_directory_is_refreshed_by_pages_in_the_background(keycloak_service, realm_users, calls):
+    user_directory_service = keycloak_service.user_directory_service
+    await keycloak_service.get_workspace_non_included_users([])
+    realm_users_ids = list(realm_users)
+    renamed_user_id, removed_user_id, shifted_user_id = realm_users_ids[1], realm_users_ids[10], realm_users_ids[1001]
+
+    async def refresh_step():
+        user_directory_service._expiry = float("-inf")
+        await keycloak_service.get_workspace_non_included_users([])
+        await user_directory_service._refresh_task
+
+    realm_users[renamed_user_id] = {**realm_users[renamed_user_id], "firstName": "renamed"}
+    del realm_users[removed_user_id]
+    await refresh_step()
+    # shifts the next users one position back, the first one of the last page into the pages already refreshed
+    del realm_users[realm_users_ids[20]]
+    await refresh_step()
+
+    users = await user_directory_service.get_users(keycloak_service._get_admin_token)
+    assert users[renamed_user_id].first_name == "renamed"
+    assert removed_user_id not in users and shifted_user_id in users
+    assert calls == {"page": 3 + 2 + 1, "lookup": 2}
@@ -0,0 +1,88 @@
+import asyncio
+from collections import Counter
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from fastapi import HTTPException
+
+from source.helpers.cache_helpers import CoalescingCache
+from source.schemas.workspace_schemas import WorkspaceInput, WorkspaceTypesEnum
+from source.services.chats_service import ChatService
+from source.services.workspace_service import WorkspaceService
+from source.utils.http_sessions import upstream_sessions
+
+WORKSPACE_ID = str(uuid4())
+
+
+def get_stub_conversation_service(workspace_types: dict, calls: Counter) -> web.Application:
+    async def get_workspace_type(request: web.Request) -> web.Response:
+        calls[request.match_info["workspace_id"]] += 1
+        # lets the concurrent callers pile up behind the first one
+        await asyncio.sleep(0.05)
+        if (workspace_type := workspace_types.get(request.match_info["workspace_id"])) is None:
+            return web.json_response({"detail": "workspace not found"}, status=404)
+        return web.json_response({"id": "1", "name": workspace_type, "description": "", "available": True})
+
+    async def update_workspace(request: web.Request) -> web.Response:
+        workspace_types[request.match_info["workspace_id"]] = WorkspaceTypesEnum.database
+        return web.json_response({"status": "updated"})
+
+    stub_app = web.Application()
+    stub_app.router.add_get("/workspaces/{workspace_id}/type", get_workspace_type)
+    stub_app.router.add_patch("/workspaces/{workspace_id}", update_workspace)
+    return stub_app
+
+
+@pytest.fixture
+def calls():
+    return Counter()
+
+
+@pytest_asyncio.fixture
+async def services(calls):
+    server = TestServer(get_stub_conversation_service({WORKSPACE_ID: WorkspaceTypesEnum.chat}, calls))
+    await server.start_server()
+    config = {"CONVERSATION_SERVICE_URL": str(server.make_url(""))}
+    workspace_types_cache = CoalescingCache(max_size=10, ttl=60)
+    yield (ChatService(config=config, keycloak_service=None, workspace_types_cache=workspace_types_cache),
+           WorkspaceService(config=config, workspace_types_cache=workspace_types_cache))
+    await upstream_sessions.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_burst_of_misses_makes_one_call(services, calls):
+    chat_service, _ = services
+
+    workspace_types = await asyncio.gather(*(chat_service.get_workspace_type_by_id(WORKSPACE_ID) for _ in range(50)))
+    workspace_types += await asyncio.gather(*(chat_service.get_workspace_type_by_id(WORKSPACE_ID) for _ in range(50)))
+
+    assert set(workspace_types) == {WorkspaceTypesEnum.chat}
+    assert calls == {WORKSPACE_ID: 1}
+
+
+@pytest.mark.asyncio
+async def test_workspace_update_invalidates_its_type(services, calls):
+    chat_service, workspace_service = services
+
+    assert await chat_service.get_workspace_type_by_id(WORKSPACE_ID) == WorkspaceTypesEnum.chat
+    await workspace_service.update_workspace(workspace_id=WORKSPACE_ID,
+                                             workspace_data=WorkspaceInput(name="workspace", typeId=uuid4()))
+
+    assert await chat_service.get_workspace_type_by_id(WORKSPACE_ID) == WorkspaceTypesEnum.database
+    assert calls == {WORKSPACE_ID: 2}
+
+
+@pytest.mark.asyncio
+async def test_unknown_workspace_is_not_cached(services, calls):
+    chat_service, _ = services
+    unknown_workspace_id = str(uuid4())
+
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            await chat_service.get_workspace_type_by_id(unknown_workspace_id)
+
+    assert calls == {unknown_workspace_id: 2}
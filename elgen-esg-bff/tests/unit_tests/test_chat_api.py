@@ -8,21 +8,22 @@ from pydantic import ValidationError
 
 from source.exceptions.custom_exceptions import UserInformationFormatError
 from source.schemas.api_schemas import QuestionLimitOutputSchema
+from source.schemas.keycloak_schemas import KeycloakAttribute
 from source.services.chats_service import ChatService
 from source.services.keycloak_service import KeycloakService
 from tests.conftest import test_client, MockRequest
-from tests.test_data import dummy_question, mock_token_not_dict, mock_check_user_limit_false, mock_get_answer, \
+from tests.test_data import dummy_question, mock_token_not_dict, mock_reserve_rate_limit_reached, mock_get_answer, \
     question_id, \
     answer_output_dict, mock_get_models, model_data_1, model_data_2, mock_model, model_info, model_post_dict, \
     mock_check_user_role_valid, model_update_dict, updated_model, dummy_question_input, mock_get_source_docs, \
-    mock_get_source_docs_fail, dummy_source_data, mock_get_models_by_workspace_id, mock_check_user_limit_true, \
+    mock_get_source_docs_fail, dummy_source_data, mock_get_models_by_workspace_id, mock_reserve_rate_limit, \
     mock_update_rate_limit, mock_add_question
 
 
 @pytest.mark.asyncio
 async def test_add_question_rate_limit_fail(test_client, monkeypatch):
     monkeypatch.setattr(KeycloakService, "check_auth", mock_token_not_dict)
-    monkeypatch.setattr(KeycloakService, "check_user_limit", mock_check_user_limit_false)
+    monkeypatch.setattr(KeycloakService, "reserve_rate_limit", mock_reserve_rate_limit_reached)
     result = test_client.post(url="/chat/question?skipDoc=true&skipWeb=false", json=dict(dummy_question),
                               headers={"Authorization": "Bearer dummy_token",
                                        "conversation-id": "dba202cd-9268-43ca-86db-7d4525f22625",
@@ -36,7 +37,7 @@ async def test_add_question_rate_limit_fail(test_client, monkeypatch):
 @pytest.mark.asyncio
 async def test_add_question_success(test_client, monkeypatch):
     monkeypatch.setattr(KeycloakService, "check_auth", mock_token_not_dict)
-    monkeypatch.setattr(KeycloakService, "check_user_limit", mock_check_user_limit_true)
+    monkeypatch.setattr(KeycloakService, "reserve_rate_limit", mock_reserve_rate_limit)
     monkeypatch.setattr(ChatService, "add_question", mock_add_question)
     monkeypatch.setattr(KeycloakService, "update_rate_limit", mock_update_rate_limit)
     result = test_client.post(url="/chat/question?skipDoc=true&skipWeb=false", json=dict(dummy_question),
@@ -56,7 +57,7 @@ async def test_add_question_success(test_client, monkeypatch):
 @pytest.mark.asyncio
 async def test_add_question_fail_user_information_error(test_client, monkeypatch):
     monkeypatch.setattr(KeycloakService, "check_auth", mock_token_not_dict)
-    monkeypatch.setattr(KeycloakService, "check_user_limit", mock_check_user_limit_true)
+    monkeypatch.setattr(KeycloakService, "reserve_rate_limit", mock_reserve_rate_limit)
     monkeypatch.setattr(KeycloakService, "update_rate_limit", mock_update_rate_limit)
 
     async def mock_check_user_information_error(*args, **kwargs):
@@ -74,7 +75,7 @@ async def test_add_question_fail_user_information_error(test_client, monkeypatch
 @pytest.mark.asyncio
 async def test_add_question_fail_IndexError(test_client, monkeypatch):
     monkeypatch.setattr(KeycloakService, "check_auth", mock_token_not_dict)
-    monkeypatch.setattr(KeycloakService, "check_user_limit", mock_check_user_limit_true)
+    monkeypatch.setattr(KeycloakService, "reserve_rate_limit", mock_reserve_rate_limit)
     monkeypatch.setattr(KeycloakService, "update_rate_limit", mock_update_rate_limit)
 
     async def mock_check_IndexError(*args, **kwargs):
@@ -94,7 +95,7 @@ async def test_add_question_fail_IndexError(test_client, monkeypatch):
 @pytest.mark.asyncio
 async def test_add_question_fail_ValidationError(test_client, monkeypatch):
     monkeypatch.setattr(KeycloakService, "check_auth", mock_token_not_dict)
-    monkeypatch.setattr(KeycloakService, "check_user_limit", mock_check_user_limit_true)
+    monkeypatch.setattr(KeycloakService, "reserve_rate_limit", mock_reserve_rate_limit)
     monkeypatch.setattr(KeycloakService, "update_rate_limit", mock_update_rate_limit)
 
     async def mock_check_validation_error(*args, **kwargs):
@@ -110,6 +111,32 @@ async def test_add_question_fail_ValidationError(test_client, monkeypatch):
     assert result.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
 
 
+@pytest.mark.asyncio
+async def test_add_question_failure_gives_the_question_back(test_client, monkeypatch):
+    monkeypatch.setattr(KeycloakService, "check_auth", mock_token_not_dict)
+    monkeypatch.setattr(KeycloakService, "reserve_rate_limit", mock_reserve_rate_limit)
+    refunds = []
+
+    async def mock_refund_rate_limit(self, user_id, attribute_to_update, incrementation_condition=False):
+        refunds.append((attribute_to_update, incrementation_condition))
+        return await mock_update_rate_limit()
+
+    async def mock_add_question_error(*args, **kwargs):
+        raise UserInformationFormatError()
+
+    monkeypatch.setattr(KeycloakService, "update_rate_limit", mock_refund_rate_limit)
+    monkeypatch.setattr(ChatService, "add_question", mock_add_question_error)
+
+    result = test_client.post(url="/chat/question?skipDoc=true&skipWeb=false", json=dict(dummy_question),
+                              headers={"Authorization": "Bearer dummy_token",
+                                       "conversation-id": "dba202cd-9268-43ca-86db-7d4525f22625",
+                                       "workspace-id": str(uuid4())},
+                              )
+
+    assert result.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert refunds == [(KeycloakAttribute.QUESTIONS, True)]
+
+
 @pytest.mark.asyncio
 async def test_get_answer(test_client, monkeypatch):
     monkeypatch.setattr(KeycloakService, "check_auth", mock_token_not_dict)
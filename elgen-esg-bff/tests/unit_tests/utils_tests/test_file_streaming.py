@@ -0,0 +1,139 @@
+import gzip
+import io
+import os
+import resource
+import tempfile
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from fastapi import UploadFile
+
+from source.models.enums import RequestMethod
+from source.utils.http_sessions import upstream_sessions
+from source.utils.utils import handle_file_upload, stream_request
+
+FILE_SIZE = 2 * 1024 ** 3
+CHUNK_SIZE = 1024 ** 2
+MAX_RSS_GROWTH = 256 * 1024 ** 2
+
+
+class GeneratedFile(io.RawIOBase):
+    """A file of FILE_SIZE bytes produced as it is read, so that only the copies made by the code under test count"""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        size = self.size - self.position if size < 0 else min(size, self.size - self.position)
+        self.position += size
+        return b"x" * size
+
+
+def get_max_rss() -> int:
+    # the peak resident size of the process, in kilobytes on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def get_stub_file_handler(file_size: int) -> web.Application:
+    async def save_file(request: web.Request) -> web.Response:
+        received_bytes = 0
+        multipart_reader = await request.multipart()
+        file_part = await multipart_reader.next()
+        while chunk := await file_part.read_chunk(CHUNK_SIZE):
+            received_bytes += len(chunk)
+        return web.json_response({"file_id": "1", "file_name": file_part.filename, "size": received_bytes})
+
+    async def get_file(request: web.Request) -> web.StreamResponse:
+        first_byte = 0
+        response = web.StreamResponse(headers={"Content-Type": "application/pdf", "Accept-Ranges": "bytes"})
+        if request.http_range.start is not None:
+            first_byte = request.http_range.start
+            response.set_status(206)
+            response.headers["Content-Range"] = f"bytes {first_byte}-{file_size - 1}/{file_size}"
+        response.content_length = file_size - first_byte
+        await response.prepare(request)
+        for position in range(first_byte, file_size, CHUNK_SIZE):
+            await response.write(b"x" * min(CHUNK_SIZE, file_size - position))
+        await response.write_eof()
+        return response
+
+    stub_app = web.Application()
+    stub_app.router.add_post("/save_file", save_file)
+    stub_app.router.add_get("/get_file", get_file)
+    return stub_app
+
+
+@pytest_asyncio.fixture
+async def file_handler_url():
+    server = TestServer(get_stub_file_handler(FILE_SIZE))
+    await server.start_server()
+    yield str(server.make_url(""))
+    await upstream_sessions.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_large_file_is_streamed_through(file_handler_url):
+    temp_files = set(os.listdir(tempfile.gettempdir()))
+    max_rss = get_max_rss()
+
+    upload_response = await handle_file_upload(file=UploadFile(file=GeneratedFile(FILE_SIZE), filename="large.pdf"),
+                                               service_url=file_handler_url, uri="/save_file",
+                                               method=RequestMethod.POST)
+    download_response = await stream_request(service_url=file_handler_url, uri="/get_file")
+    downloaded_bytes = 0
+    async for chunk in download_response.body_iterator:
+        downloaded_bytes += len(chunk)
+
+    assert upload_response == {"file_id": "1", "file_name": "large.pdf", "size": FILE_SIZE}
+    assert download_response.headers["content-length"] == str(FILE_SIZE)
+    assert download_response.media_type == "application/pdf"
+    assert downloaded_bytes == FILE_SIZE
+    assert get_max_rss() - max_rss < MAX_RSS_GROWTH
+    assert set(os.listdir(tempfile.gettempdir())) == temp_files
+
+
+@pytest.mark.asyncio
+async def test_range_of_a_file_is_downloaded(file_handler_url):
+    first_byte = FILE_SIZE - 10
+
+    download_response = await stream_request(service_url=file_handler_url, uri="/get_file",
+                                             headers={"Range": f"bytes={first_byte}-"})
+
+    assert download_response.status_code == 206
+    assert download_response.headers["content-range"] == f"bytes {first_byte}-{FILE_SIZE - 1}/{FILE_SIZE}"
+    assert download_response.headers["accept-ranges"] == "bytes"
+    assert b"".join([chunk async for chunk in download_response.body_iterator]) == b"x" * 10
+
+
+@pytest.mark.asyncio
+async def test_compressed_file_is_relayed_without_its_compressed_length():
+    accept_encodings = []
+
+    async def get_compressed_file(request: web.Request) -> web.Response:
+        # compressed whatever the client accepts, as some proxies do
+        accept_encodings.append(request.headers.get("Accept-Encoding"))
+        return web.Response(body=gzip.compress(b"x" * CHUNK_SIZE), content_type="text/csv",
+                            headers={"Content-Encoding": "gzip"})
+
+    stub_app = web.Application()
+    stub_app.router.add_get("/get_file", get_compressed_file)
+    server = TestServer(stub_app)
+    await server.start_server()
+    try:
+        download_response = await stream_request(service_url=str(server.make_url("")), uri="/get_file")
+        body = b"".join([chunk async for chunk in download_response.body_iterator])
+    finally:
+        await upstream_sessions.close()
+        await server.close()
+
+    assert accept_encodings == ["identity"]
+    assert body == b"x" * CHUNK_SIZE
+    assert "content-length" not in download_response.headers
+    assert "content-encoding" not in download_response.headers
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from source.models.enums import RequestMethod
+from source.utils.http_sessions import upstream_sessions
+from source.utils.utils import make_request
+
+
+def get_stub_upstream(client_addresses: list) -> web.Application:
+    async def get_item(request: web.Request) -> web.Response:
+        # the address of the client differs for each connection opened to the upstream
+        client_addresses.append(request.transport.get_extra_info("peername"))
+        return web.json_response({"id": request.match_info["item_id"]}, headers={"Set-Cookie": "session=user-1"})
+
+    async def get_cookies(request: web.Request) -> web.Response:
+        return web.json_response(dict(request.cookies))
+
+    stub_app = web.Application()
+    stub_app.router.add_get("/items/{item_id}", get_item)
+    stub_app.router.add_get("/cookies", get_cookies)
+    return stub_app
+
+
+@pytest_asyncio.fixture
+async def upstream():
+    client_addresses = []
+    server = TestServer(get_stub_upstream(client_addresses))
+    await server.start_server()
+    yield str(server.make_url("")), client_addresses
+    await upstream_sessions.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_calls_to_an_upstream_reuse_its_connections(upstream):
+    upstream_url, client_addresses = upstream
+
+    for item_id in range(20):
+        assert await make_request(service_url=upstream_url, uri=f"/items/{item_id}",
+                                  method=RequestMethod.GET) == {"id": str(item_id)}
+    await asyncio.gather(*(make_request(service_url=upstream_url, uri=f"/items/{item_id}", method=RequestMethod.GET)
+                           for item_id in range(20)))
+
+    assert len(client_addresses) == 40
+    assert len(set(client_addresses[:20])) == 1
+    assert len(set(client_addresses)) <= 20
+
+
+@pytest.mark.asyncio
+async def test_cookies_of_an_upstream_are_not_shared(upstream):
+    upstream_url, _ = upstream
+
+    await make_request(service_url=upstream_url, uri="/items/1", method=RequestMethod.GET)
+
+    assert await make_request(service_url=upstream_url, uri="/cookies", method=RequestMethod.GET) == {}
@@ -0,0 +1,141 @@
+import json
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from dependency_injector.providers import Factory
+from elgen_common.tracing import provider, AUTH_INTROSPECTION_SPAN, RETRIEVAL_SEARCH_SPAN, MODEL_TTFT_SPAN, \
+    MODEL_TOKENS_PER_S_SPAN
+from httpx import AsyncClient
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from app import app
+from configuration.config import KeyCloakServiceConfiguration
+from source.apis.chats_router import get_workspace_type
+from source.services.chats_service import ChatService
+from source.services.keycloak_service import KeycloakService
+from source.utils.http_sessions import upstream_sessions
+from tests.test_data import dummy_token, dummy_source_data
+
+question_id = "dba202cd-9268-43ca-86db-7d4525f22625"
+streamed_tokens = ["this ", "is ", "the ", "answer"]
+
+
+def get_stub_services(received_headers: dict) -> web.Application:
+    """Local stand-ins of keycloak, the sources and the conversation services for a chat flow"""
+
+    async def introspect_token(request: web.Request) -> web.Response:
+        return web.json_response(dummy_token)
+
+    async def get_workspace_type(request: web.Request) -> web.Response:
+        return web.json_response({"id": str(uuid4()), "name": "chat", "description": "chat", "available": True})
+
+    async def get_similar_documents(request: web.Request) -> web.Response:
+        received_headers["similar_documents"] = dict(request.headers)
+        return web.json_response(dummy_source_data)
+
+    async def save_sources(request: web.Request) -> web.Response:
+        return web.json_response(dummy_source_data["data"])
+
+    async def stream_answer(request: web.Request) -> web.StreamResponse:
+        received_headers["stream_answer"] = dict(request.headers)
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for token in streamed_tokens:
+            await response.write(json.dumps({"status": "IN_PROGRESS", "data": token}).encode())
+        await response.write_eof()
+        return response
+
+    stub_app = web.Application()
+    stub_app.router.add_post("/realms/{realm}/protocol/openid-connect/token/introspect", introspect_token)
+    stub_app.router.add_get("/workspaces/{workspace_id}/type", get_workspace_type)
+    stub_app.router.add_post("/sources/similar", get_similar_documents)
+    stub_app.router.add_post("/conversations/sources", save_sources)
+    stub_app.router.add_get("/chat/answer/{question_id}/stream", stream_answer)
+    return stub_app
+
+
+@pytest.fixture
+def span_exporter():
+    exporter = InMemorySpanExporter()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    yield exporter
+    # the processor stays registered on the global provider but a shut down exporter drops the spans
+    exporter.shutdown()
+
+
+@pytest_asyncio.fixture
+async def stub_services(monkeypatch):
+    received_headers = {}
+    # the workspace type is fetched from the stub as well
+    monkeypatch.delitem(app.dependency_overrides, get_workspace_type, raising=False)
+    server = TestServer(get_stub_services(received_headers))
+    await server.start_server()
+    stub_url = str(server.make_url("")).rstrip("/")
+    keycloak_service = Factory(KeycloakService, keycloak_service_configuration={
+        **KeyCloakServiceConfiguration().dict(), "SERVER_URL": stub_url})
+    chat_service = Factory(ChatService, keycloak_service=keycloak_service, config={
+        "CONVERSATION_SERVICE_URL": stub_url, "SOURCES_SERVICE_URL": stub_url})
+    with app.injection_container.keycloak_service.override(keycloak_service), \
+            app.injection_container.chat_service.override(chat_service):
+        yield received_headers
+    await upstream_sessions.close()
+    await server.close()
+
+
+def get_span_tree(spans, root_name: str) -> tuple:
+    """The root span and the names of the children of every span under it"""
+    root = next(span for span in spans if span.name == root_name)
+    children = {}
+    for span in spans:
+        if span.parent and span.context.trace_id == root.context.trace_id:
+            children.setdefault(span.parent.span_id, []).append(span)
+    return root, children
+
+
+def get_children_names(children: dict, span) -> list[str]:
+    return sorted(child.name for child in children.get(span.context.span_id, []))
+
+
+@pytest.mark.asyncio
+async def test_source_documents_span_tree(span_exporter, stub_services):
+    async with AsyncClient(app=app, base_url="http://bff") as client:
+        response = await client.post("/chat/source-doc", params={"localSourcesCount": 1, "workspaceId": str(uuid4())},
+                                     json={"id": question_id, "content": "question"},
+                                     headers={"Authorization": "Bearer token", "model-code": "model"})
+    assert response.status_code == 200
+
+    root, children = get_span_tree(span_exporter.get_finished_spans(), "server_request")
+    assert get_children_names(children, root) == sorted([AUTH_INTROSPECTION_SPAN, RETRIEVAL_SEARCH_SPAN, "HTTP POST"])
+    auth_span, retrieval_span = (next(span for span in children[root.context.span_id] if span.name == name)
+                                 for name in (AUTH_INTROSPECTION_SPAN, RETRIEVAL_SEARCH_SPAN))
+    assert get_children_names(children, auth_span) == ["HTTP POST"]
+    assert get_children_names(children, retrieval_span) == ["HTTP POST"]
+    assert retrieval_span.attributes["retrieval.source"] == "local"
+    # the called service continues the trace of the request
+    assert f"{root.context.trace_id:032x}" in stub_services["similar_documents"]["traceparent"]
+
+
+@pytest.mark.asyncio
+async def test_streamed_answer_span_tree(span_exporter, stub_services):
+    async with AsyncClient(app=app, base_url="http://bff") as client:
+        response = await client.get(f"/chat/answer/{question_id}/stream",
+                                    headers={"Authorization": "Bearer token", "model-code": "model",
+                                             "workspace-id": str(uuid4())})
+    assert response.status_code == 200
+    assert "answer" in response.text
+
+    root, children = get_span_tree(span_exporter.get_finished_spans(), "server_request")
+    assert get_children_names(children, root) == sorted([AUTH_INTROSPECTION_SPAN, "HTTP GET", "HTTP GET",
+                                                         MODEL_TTFT_SPAN, MODEL_TOKENS_PER_S_SPAN])
+    ttft_span, generation_span = (next(span for span in children[root.context.span_id] if span.name == name)
+                                  for name in (MODEL_TTFT_SPAN, MODEL_TOKENS_PER_S_SPAN))
+    assert ttft_span.attributes["model.code"] == "model"
+    assert ttft_span.end_time == generation_span.start_time
+    assert generation_span.attributes["model.tokens"] >= 1
+    assert generation_span.attributes["model.tokens_per_s"] > 0
+    assert f"{root.context.trace_id:032x}" in stub_services["stream_answer"]["traceparent"]
+
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+Event loop lag of a service streaming answers while logging every chunk, with the logs written synchronously to
+stdout or through the queued sink of elgen_common.logging_conf. Every mode runs in a child process whose stdout is a
+pipe drained by a slow reader, as a busy log collector would:
+    python -m benchmarks.event_loop_lag
+    python -m benchmarks.event_loop_lag --streams 4 --chunks-per-s 250 --duration 4 --reader-bytes-per-s 65536
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+MODES = {
+    "sync stdout": {},
+    "queued": {"LOG_RATE_LIMIT": "0"},
+    "queued, rate limited": {"LOG_RATE_LIMIT": "50", "LOG_RATE_LIMIT_BURST": "100",
+                             "LOG_RATE_LIMITED_LOGGERS": "benchmark.streaming"},
+}
+LAG_PROBE_INTERVAL = 0.001
+
+
+def setup_logging(mode: str) -> None:
+    if mode == "sync stdout":
+        from pythonjsonlogger import jsonlogger
+
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(jsonlogger.JsonFormatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        logging.basicConfig(level=logging.INFO, handlers=[handler])
+    else:
+        from elgen_common.logging_conf import setup_logging as setup_queued_logging
+
+        setup_queued_logging()
+
+
+async def stream_answer(chunks_per_s: float, duration: float) -> int:
+    """Yields a chunk at a steady rate, logging each one as the streaming endpoints do, returns the chunks count"""
+    streaming_logger = logging.getLogger("benchmark.streaming")
+    start_time = time.perf_counter()
+    chunk_index = 0
+    while (elapsed := time.perf_counter() - start_time) < duration:
+        streaming_logger.info("streamed chunk %s of the answer", chunk_index)
+        chunk_index += 1
+        await asyncio.sleep(max(0.0, chunk_index / chunks_per_s - elapsed))
+    return chunk_index
+
+
+async def measure_lag(stop: asyncio.Event, lags: list) -> None:
+    """Delay of the wake ups of a task sleeping LAG_PROBE_INTERVAL, the time the loop was kept busy"""
+    while not stop.is_set():
+        before = time.perf_counter()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - before - LAG_PROBE_INTERVAL))
+
+
+async def run_streams(streams: int, chunks_per_s: float, duration: float) -> dict:
+    lags = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(stop, lags))
+    start_time = time.perf_counter()
+    chunks = await asyncio.gather(*(stream_answer(chunks_per_s, duration) for _ in range(streams)))
+    streaming_time = time.perf_counter() - start_time
+    stop.set()
+    await lag_task
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    return {"chunks": sum(chunks), "streaming_s": round(streaming_time, 2),
+            "lag_p50_ms": round(statistics.median(lags_ms), 2),
+            "lag_p99_ms": round(lags_ms[int(len(lags_ms) * 0.99)], 2), "lag_max_ms": round(lags_ms[-1], 2)}
+
+
+def drain_slowly(pipe, bytes_per_s: int, received: list) -> None:
+    """Read the child output at most bytes_per_s, counting its lines"""
+    read_size = max(1, bytes_per_s // 100)
+    while data := os.read(pipe.fileno(), read_size):
+        received.append(data.count(b"\n"))
+        time.sleep(0.01)
+
+
+def run_mode(mode: str, arguments: argparse.Namespace) -> dict:
+    child = subprocess.Popen([sys.executable, "-m", "benchmarks.event_loop_lag", "--child", mode,
+                              "--streams", str(arguments.streams), "--chunks-per-s", str(arguments.chunks_per_s),
+                              "--duration", str(arguments.duration)],
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, env={**os.environ, **MODES[mode]})
+    received = []
+    reader = threading.Thread(target=drain_slowly, args=(child.stdout, arguments.reader_bytes_per_s, received))
+    reader.start()
+    stderr = child.stderr.read()
+    child.wait()
+    reader.join()
+    if child.returncode:
+        raise RuntimeError(f"{mode} run failed:\n{stderr.decode()[-4000:]}")
+    result = json.loads(stderr.decode().strip().splitlines()[-1])
+    result["written_lines"] = sum(received)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=4, help="concurrent streamed answers")
+    parser.add_argument("--chunks-per-s", type=float, default=250, help="chunks per second of each stream")
+    parser.add_argument("--duration", type=float, default=4, help="seconds each stream lasts")
+    parser.add_argument("--reader-bytes-per-s", type=int, default=64 * 1024,
+                        help="throughput of the reader of the service stdout")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.child:
+        setup_logging(arguments.child)
+        result = asyncio.run(run_streams(arguments.streams, arguments.chunks_per_s, arguments.duration))
+        print(json.dumps(result), file=sys.stderr)
+        return
+
+    print(f"{arguments.streams} streams x {arguments.chunks_per_s:g} chunks/s for {arguments.duration:g} s, "
+          f"each chunk logged, stdout read at {arguments.reader_bytes_per_s / 1024:g} KB/s")
+    for mode in MODES:
+        result = run_mode(mode, arguments)
+        print(f"{mode:<22} stream {result['streaming_s']:.2f} s, loop lag p50 {result['lag_p50_ms']:.2f} ms, "
+              f"p99 {result['lag_p99_ms']:.2f} ms, max {result['lag_max_ms']:.2f} ms, "
+              f"{result['chunks']} chunks streamed, {result['written_lines']} lines written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Cost of RouterLoggingMiddleware on the requests of an ASGI app called in process, next to the app alone and to the
+BaseHTTPMiddleware pass-through the services used before: the time per request of a small JSON answer, and the time
+to the first chunk of a streamed answer whose chunks are generated every --chunk-interval-ms. The request lines are
+formatted as JSON and written to /dev/null, the spans are dropped unless TRACE_EXPORTER is set:
+    python -m benchmarks.logging_middleware
+    python -m benchmarks.logging_middleware --requests 5000 --chunks 20 --chunk-interval-ms 5
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+
+os.environ.setdefault("TRACE_EXPORTER", "none")
+
+from pythonjsonlogger import jsonlogger  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from elgen_common.logging_conf import logging_middleware_config  # noqa: E402
+from elgen_common.logging_middleware import RouterLoggingMiddleware  # noqa: E402
+
+JSON_ANSWER = b'{"id": "dba202cd-9268-43ca-86db-7d4525f22625", "answer": "a short answer"}'
+REQUEST_BODY = b'{"content": "What are the ESG criteria of the report?"}' * 4
+
+
+def get_logger() -> logging.Logger:
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    handler.setFormatter(jsonlogger.JsonFormatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    logger = logging.getLogger("benchmark.requests")
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def get_app(chunks: int, chunk_interval: float):
+    async def app(scope, receive, send) -> None:
+        await receive()
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        if scope["path"] == "/json":
+            await send({"type": "http.response.body", "body": JSON_ANSWER})
+            return
+        for index in range(chunks):
+            await asyncio.sleep(chunk_interval)
+            await send({"type": "http.response.body", "body": JSON_ANSWER, "more_body": index < chunks - 1})
+
+    return app
+
+
+class PassThroughMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+async def call(app, path: str) -> tuple[float, float]:
+    """Seconds to the first chunk and to the end of the response"""
+    start_time = time.perf_counter()
+    first_chunk_time = None
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+             "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+             "headers": [(b"content-type", b"application/json")], "client": ("127.0.0.1", 5000),
+             "server": ("127.0.0.1", 8000)}
+    request_sent = False
+    disconnected = asyncio.Event()
+
+    async def receive() -> dict:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": REQUEST_BODY, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        nonlocal first_chunk_time
+        if message["type"] == "http.response.body" and first_chunk_time is None:
+            first_chunk_time = time.perf_counter() - start_time
+
+    await app(scope, receive, send)
+    disconnected.set()
+    return first_chunk_time, time.perf_counter() - start_time
+
+
+async def measure(app, requests: int, streams: int) -> dict:
+    for _ in range(min(100, requests)):
+        await call(app, "/json")
+    start_time = time.perf_counter()
+    for _ in range(requests):
+        await call(app, "/json")
+    request_time = (time.perf_counter() - start_time) / requests
+    first_chunk_times = [(await call(app, "/stream"))[0] for _ in range(streams)]
+    return {"request_us": request_time * 1e6, "first_chunk_ms": statistics.median(first_chunk_times) * 1000}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="JSON requests timed per mode")
+    parser.add_argument("--streams", type=int, default=5, help="streamed requests timed per mode")
+    parser.add_argument("--chunks", type=int, default=20, help="chunks of a streamed answer")
+    parser.add_argument("--chunk-interval-ms", type=float, default=5, help="generation time of a chunk")
+    arguments = parser.parse_args()
+
+    app = get_app(arguments.chunks, arguments.chunk_interval_ms / 1000)
+    logger = get_logger()
+    modes = {
+        "app alone": (app, 0.0),
+        "BaseHTTPMiddleware": (PassThroughMiddleware(app), 0.0),
+        "RouterLoggingMiddleware": (RouterLoggingMiddleware(app, logger=logger), 0.0),
+        "bodies sampled": (RouterLoggingMiddleware(app, logger=logger), 1.0),
+    }
+    print(f"{arguments.requests} JSON requests, {arguments.streams} streams of {arguments.chunks} chunks "
+          f"every {arguments.chunk_interval_ms:g} ms")
+    for mode, (mode_app, sample_rate) in modes.items():
+        logging_middleware_config.LOG_BODY_SAMPLE_RATE = sample_rate
+        result = asyncio.run(measure(mode_app, arguments.requests, arguments.streams))
+        print(f"{mode:<24} {result['request_us']:8.1f} us per request, "
+              f"first chunk after {result['first_chunk_ms']:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
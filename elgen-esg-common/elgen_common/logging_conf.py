@@ -0,0 +1,162 @@
+import atexit
+import logging
+import logging.config
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterable, Optional, Tuple
+
+from loguru import logger as loguru_logger
+from opentelemetry.instrumentation.logging import LoggingInstrumentor
+from pydantic import BaseSettings, Field
+from pythonjsonlogger import jsonlogger
+
+
+class LoggingConfig(BaseSettings):
+    LOG_LEVEL: str = Field(env="LOG_LEVEL", default="INFO")
+    LOG_RATE_LIMIT: float = Field(env="LOG_RATE_LIMIT", default=0,
+                                  description="Records per second a rate limited logger can emit below WARNING once "
+                                              "its burst is spent, the extra records are dropped and counted, 0 to "
+                                              "disable")
+    LOG_RATE_LIMIT_BURST: int = Field(env="LOG_RATE_LIMIT_BURST", default=200,
+                                      description="Records a logger can emit at once before being rate limited")
+    LOG_RATE_LIMITED_LOGGERS: str = Field(env="LOG_RATE_LIMITED_LOGGERS", default="",
+                                          description="Comma separated names of the loggers of the hot loops to rate "
+                                                      "limit, with their children, the other loggers such as the "
+                                                      "request logs are never limited")
+
+
+logging_settings = LoggingConfig()
+
+
+class LogRateLimitFilter(logging.Filter):
+    """
+    Token bucket per logger name, keeps the hot loops from flooding the log queue. Only the records of the given
+    loggers and of their children are limited, warnings and errors always pass, the first record let through after
+    drops carries the number of dropped records.
+    """
+
+    def __init__(self, rate: float, burst: int, logger_names: Iterable[str]) -> None:
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.logger_names = tuple(logger_names)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._dropped_records: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def is_limited(self, logger_name: str) -> bool:
+        return any(logger_name == name or logger_name.startswith(f"{name}.") for name in self.logger_names)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.is_limited(record.name):
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, last_update = self._buckets.get(record.name, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last_update) * self.rate)
+            if tokens < 1:
+                self._buckets[record.name] = (tokens, now)
+                self._dropped_records[record.name] = self._dropped_records.get(record.name, 0) + 1
+                return False
+            self._buckets[record.name] = (tokens - 1, now)
+            dropped_records = self._dropped_records.pop(record.name, 0)
+        if dropped_records:
+            record.dropped_records = dropped_records
+        return True
+
+
+_log_queue = queue.SimpleQueue()
+_queue_handler: Optional[QueueHandler] = None
+_queue_listener: Optional[QueueListener] = None
+_loguru_sink_id: Optional[int] = None
+
+
+def get_queue_handler() -> QueueHandler:
+    """
+    Handler of all the records of the service: logging only puts them on a queue, a background thread writes them as
+    JSON lines on stdout. The first call starts the thread, the next ones return the same handler.
+    """
+    global _queue_handler, _queue_listener
+    if _queue_handler is None:
+        output_handler = logging.StreamHandler(sys.stdout)
+        output_handler.setFormatter(jsonlogger.JsonFormatter(
+            "%(asctime)s %(levelname)s %(name)s %(message)s %(otelTraceID)s %(otelSpanID)s"))
+        _queue_listener = QueueListener(_log_queue, output_handler)
+        _queue_listener.start()
+        atexit.register(stop_logging)
+        _queue_handler = QueueHandler(_log_queue)
+        rate_limited_loggers = [name.strip() for name in logging_settings.LOG_RATE_LIMITED_LOGGERS.split(",")
+                                if name.strip()]
+        if logging_settings.LOG_RATE_LIMIT > 0 and rate_limited_loggers:
+            _queue_handler.addFilter(LogRateLimitFilter(rate=logging_settings.LOG_RATE_LIMIT,
+                                                        burst=logging_settings.LOG_RATE_LIMIT_BURST,
+                                                        logger_names=rate_limited_loggers))
+    return _queue_handler
+
+
+def stop_logging() -> None:
+    """Write the records still queued and stop the background thread, registered to run at exit"""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+logging_config = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "queue": {
+            "()": get_queue_handler,
+        },
+    },
+    "root": {
+        "level": logging_settings.LOG_LEVEL,
+        "handlers": [
+            "queue"
+        ],
+    },
+    "loggers": {
+        "uvicorn": {"level": "INFO"},
+        "uvicorn.error": {"level": "INFO"},
+        "uvicorn.access": {"level": "INFO"},
+    },
+}
+LoggingInstrumentor().instrument(set_logging_format=True)
+
+
+def setup_logging() -> None:
+    """
+    Route the standard logging and loguru records through the log queue, to be called by the entry points before
+    serving: writing the logs then never blocks the event loop.
+    """
+    global _loguru_sink_id
+    logging.config.dictConfig(logging_config)
+    if _loguru_sink_id is not None:
+        return
+    try:
+        loguru_logger.remove(0)  # default synchronous stderr sink of loguru
+    except ValueError:
+        pass  # already removed by sinks the service set up itself
+    _loguru_sink_id = loguru_logger.add(get_queue_handler(), level=logging_settings.LOG_LEVEL, format="{message}")
+
+
+class OtlpConfig(BaseSettings):
+    OTLP_ENDPOINT: str = Field(env="OTLP_ENDPOINT", default="")
+
+
+otlp_config = OtlpConfig()
+
+
+class LoggingMiddlewareConfig(BaseSettings):
+    LOG_BODY_SAMPLE_RATE: float = Field(env="LOG_BODY_SAMPLE_RATE", default=0.0,
+                                        description="Share of the requests logged with their bodies, decided when "
+                                                    "they start")
+    LOG_BODY_MAX_BYTES: int = Field(env="LOG_BODY_MAX_BYTES", default=1024,
+                                    description="Bytes of the request and response bodies kept in a sampled log")
+
+
+logging_middleware_config = LoggingMiddlewareConfig()
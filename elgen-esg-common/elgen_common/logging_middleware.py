@@ -0,0 +1,131 @@
+import logging
+import random
+import time
+from uuid import uuid4
+
+from elgen_common.logging_conf import logging_middleware_config
+from elgen_common.tracing import tracer, app_name
+from opentelemetry.propagate import extract
+from opentelemetry.trace import SpanKind
+from starlette import status
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+status_code_500 = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+class RouterLoggingMiddleware:
+    """
+    Pure ASGI middleware opening the server span of each request and logging one line per request with its method,
+    path, status, latency and response size. The messages are passed through as they come so streamed responses are
+    neither buffered nor delayed. Bodies are only logged for the requests sampled when they start, truncated to
+    LOG_BODY_MAX_BYTES. An unhandled exception is logged and answered with a 500, or raised again once the response
+    has started, after the request line is logged.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            *,
+            logger: logging.Logger
+    ) -> None:
+        self.app = app
+        self._logger = logger
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = self._get_request_id(scope)
+        sample_body = random.random() < logging_middleware_config.LOG_BODY_SAMPLE_RATE
+        request_body = bytearray()
+        response_body = bytearray()
+        response = {"status_code": status_code_500, "bytes": 0, "started": False}
+        unhandled_error = None
+
+        async def receive_logging_body() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                self._append_capped(request_body, message.get("body", b""))
+            return message
+
+        async def send_logging_response(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status_code"] = message["status"]
+                response["started"] = True
+                # Kickback X-Request-ID
+                MutableHeaders(scope=message)["x-correlation-id"] = request_id
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                response["bytes"] += len(body)
+                if sample_body:
+                    self._append_capped(response_body, body)
+            await send(message)
+
+        start_time = time.perf_counter()
+        # continues the trace of the calling service when it propagated its context
+        with tracer.start_as_current_span("server_request", context=extract(Headers(scope=scope)),
+                                          kind=SpanKind.SERVER) as span:
+            try:
+                await self.app(scope, receive_logging_body if sample_body else receive, send_logging_response)
+            except Exception as general_error:
+                self._logger.exception({
+                    "path": self._get_path(scope),
+                    "method": scope["method"],
+                    "reason": general_error,
+                    "status": status_code_500,
+                    "overall_status": "failed",
+                    "correlation_id": request_id
+                })
+                if response["started"]:
+                    unhandled_error = general_error
+                else:
+                    # A response could not be built because of an unhandled exception
+                    await send_logging_response({"type": "http.response.start", "status": status_code_500,
+                                                 "headers": [(b"content-length", b"0")]})
+                    await send_logging_response({"type": "http.response.body", "body": b""})
+
+            execution_time = time.perf_counter() - start_time
+            logging_dict = {"correlation_id": request_id, "log_type": "request",
+                            "app_name": app_name,
+                            "http.method": scope["method"],
+                            "http.path": self._get_path(scope),
+                            "http.status_code": response["status_code"],
+                            "status": "successful" if response["status_code"] < 400 and not unhandled_error
+                            else "failed",
+                            "duration_ms": round(execution_time * 1000, 3),
+                            "http.response_bytes": response["bytes"],
+                            "otelSpanID": span.get_span_context().span_id,
+                            # added them manually because there weren't being injected properly
+                            "otelTraceID": span.get_span_context().trace_id}
+            if sample_body:
+                logging_dict["request_body"] = self._decode_body(request_body)
+                logging_dict["response_body"] = self._decode_body(response_body)
+            self._logger.info(logging_dict)
+            if unhandled_error:
+                raise unhandled_error
+
+    @staticmethod
+    def _get_request_id(scope: Scope) -> str:
+        for name, value in scope["headers"]:
+            if name == b"x-correlation-id":
+                return value.decode("latin-1")
+        return str(uuid4())
+
+    @staticmethod
+    def _get_path(scope: Scope) -> str:
+        path = scope["path"]
+        if scope.get("query_string"):
+            path += f"?{scope['query_string'].decode('latin-1')}"
+        return path
+
+    @staticmethod
+    def _append_capped(buffer: bytearray, body: bytes) -> None:
+        missing_bytes = logging_middleware_config.LOG_BODY_MAX_BYTES - len(buffer)
+        if missing_bytes > 0:
+            buffer.extend(body[:missing_bytes])
+
+    @staticmethod
+    def _decode_body(body: bytearray) -> str:
+        return body.decode("utf-8", errors="replace")
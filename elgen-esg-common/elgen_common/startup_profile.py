@@ -0,0 +1,152 @@
+"""
+Startup profile of the service: the import time of each top level package, from the `-X importtime` output of a
+fresh interpreter, then the time from launching uvicorn to the first answer of the health path.
+
+    python -m elgen_common.startup_profile --app main:app --health-path /healthz
+
+Run from the service directory, the profiled modules are imported from it. --offline refuses every outbound
+connection of the profiled interpreter to check the service boots without network access. The last line is a JSON
+summary to collect as a startup benchmark.
+"""
+import argparse
+import json
+import pathlib
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, NamedTuple, Optional
+
+service_directory = pathlib.Path.cwd()
+service_name = service_directory.name
+
+# `import time:  self [us] | cumulative | imported package`, the package is indented by its nesting level
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$")
+
+DISABLE_NETWORK = """
+import socket
+
+
+def refuse_connection(*args, **kwargs):
+    raise OSError("network disabled by the startup profile")
+
+
+socket.socket.connect = socket.socket.connect_ex = refuse_connection
+socket.create_connection = socket.getaddrinfo = refuse_connection
+"""
+
+
+class ImportTime(NamedTuple):
+    package: str
+    self_us: int
+    cumulative_us: int
+    level: int
+
+
+class StartupProfileError(Exception):
+    """Raised when the profiled service cannot be imported or started"""
+
+
+def get_python_code(statement: str, offline: bool) -> str:
+    return f"{DISABLE_NETWORK if offline else ''}\n{statement}"
+
+
+def parse_import_times(output: str) -> List[ImportTime]:
+    """Import times of the `-X importtime` stderr, the other lines are ignored"""
+    import_times = []
+    for line in output.splitlines():
+        if match := IMPORT_TIME_LINE.match(line):
+            self_us, cumulative_us, indentation, package = match.groups()
+            import_times.append(ImportTime(package=package, self_us=int(self_us), cumulative_us=int(cumulative_us),
+                                           level=len(indentation) // 2))
+    return import_times
+
+
+def profile_imports(module: str, offline: bool = False) -> List[ImportTime]:
+    """Import times of every module loaded by importing `module` in a fresh interpreter"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", get_python_code(f"import {module}", offline)],
+                            cwd=service_directory, capture_output=True, text=True)
+    if result.returncode:
+        raise StartupProfileError(f"Importing {module} failed:\n{result.stderr[-4000:]}")
+    return parse_import_times(result.stderr)
+
+
+def get_package_times(import_times: List[ImportTime]) -> Dict[str, int]:
+    """Self import time of every top level package in microseconds, slowest first"""
+    package_times = {}
+    for import_time in import_times:
+        package = import_time.package.split(".")[0]
+        package_times[package] = package_times.get(package, 0) + import_time.self_us
+    return dict(sorted(package_times.items(), key=lambda package_time: package_time[1], reverse=True))
+
+
+def get_free_port() -> int:
+    with socket.socket() as free_socket:
+        free_socket.bind(("127.0.0.1", 0))
+        return free_socket.getsockname()[1]
+
+
+def measure_time_to_health(app: str, health_path: str, offline: bool = False, timeout: float = 300) -> float:
+    """
+    Seconds from launching uvicorn with the app to the first answer of the health path below 500, a service without a
+    health route is up once it answers 404.
+    """
+    port = get_free_port()
+    statement = f"import uvicorn\nuvicorn.run({app!r}, host='127.0.0.1', port={port}, log_level='warning')"
+    start_time = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-c", get_python_code(statement, offline)], cwd=service_directory,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    try:
+        while time.perf_counter() - start_time < timeout:
+            if server.poll() is not None:
+                raise StartupProfileError(f"The service exited before answering:\n{server.stderr.read()[-4000:]}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}{health_path}", timeout=1):
+                    return time.perf_counter() - start_time
+            except urllib.error.HTTPError as http_error:
+                if http_error.code < 500:
+                    return time.perf_counter() - start_time
+            except OSError:
+                pass
+            time.sleep(0.05)
+        raise StartupProfileError(f"The service did not answer on {health_path} within {timeout} seconds")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def print_profile(package_times: Dict[str, int], top: int, time_to_health: Optional[float]) -> None:
+    total_us = sum(package_times.values())
+    print(f"{service_name} imports: {total_us / 1000:.1f} ms")
+    for package, self_us in list(package_times.items())[:top]:
+        print(f"  {package:<40} {self_us / 1000:>9.1f} ms {100 * self_us / total_us:>5.1f} %")
+    summary = {"service": service_name, "import_ms": round(total_us / 1000, 1),
+               "slowest_imports": {package: round(self_us / 1000, 1)
+                                   for package, self_us in list(package_times.items())[:top]}}
+    if time_to_health is not None:
+        print(f"{service_name} time to health: {time_to_health * 1000:.1f} ms")
+        summary["time_to_health_ms"] = round(time_to_health * 1000, 1)
+    print(json.dumps(summary))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="Module imported by the service entry point")
+    parser.add_argument("--app", default="main:app", help="ASGI application started by uvicorn")
+    parser.add_argument("--health-path", default="/healthz", help="Path polled until the service answers")
+    parser.add_argument("--top", type=int, default=15, help="Number of the slowest packages reported")
+    parser.add_argument("--offline", action="store_true", help="Refuse the outbound connections of the service")
+    parser.add_argument("--skip-health", action="store_true", help="Only profile the imports")
+    arguments = parser.parse_args()
+
+    package_times = get_package_times(profile_imports(arguments.module, offline=arguments.offline))
+    time_to_health = None if arguments.skip_health else measure_time_to_health(
+        arguments.app, arguments.health_path, offline=arguments.offline)
+    print_profile(package_times, arguments.top, time_to_health)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import functools
+import importlib
+import inspect
+import pathlib
+import threading
+import time
+from enum import Enum
+from typing import Callable, Optional, Sequence
+
+from elgen_common.logging_conf import otlp_config
+from google.protobuf.json_format import MessageToJson
+from opentelemetry import trace
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.resources import Resource, SERVICE_NAME
+from opentelemetry.sdk.trace import TracerProvider, ReadableSpan
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor, SpanExporter, \
+    SpanExportResult
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from pydantic import BaseSettings, Field
+
+PROMPT_BUILD_SPAN = "prompt.build"
+MODEL_TTFT_SPAN = "model.ttft"
+MODEL_TOKENS_PER_S_SPAN = "model.tokens_per_s"
+RETRIEVAL_SEARCH_SPAN = "retrieval.search"
+WEB_SUMMARIZATION_SPAN = "web.summarization"
+AUTH_INTROSPECTION_SPAN = "auth.introspection"
+
+# auto instrumented clients: the instrumentor of a client the service does not ship is skipped
+CLIENT_INSTRUMENTORS = (
+    ("opentelemetry.instrumentation.aiohttp_client", "AioHttpClientInstrumentor"),
+    ("opentelemetry.instrumentation.httpx", "HTTPXClientInstrumentor"),
+    ("opentelemetry.instrumentation.requests", "RequestsInstrumentor"),
+)
+
+
+class TraceExporter(str, Enum):
+    OTLP = "otlp"
+    OTLP_FILE = "otlp_file"
+    MEMORY = "memory"
+    NONE = "none"
+
+
+class TracingConfig(BaseSettings):
+    TRACE_EXPORTER: TraceExporter = Field(env="TRACE_EXPORTER", default=TraceExporter.OTLP,
+                                          description="Where the spans go: the OTLP collector, an OTLP JSON lines "
+                                                      "file, kept in memory or dropped, the last three work offline")
+    TRACE_FILE_PATH: str = Field(env="TRACE_FILE_PATH", default="traces.jsonl",
+                                 description="File the otlp_file exporter appends the spans to")
+    SERVICE_NAME: str = Field(env="OTEL_SERVICE_NAME", default_factory=lambda: pathlib.Path.cwd().name,
+                              description="Service name of the spans, the directory the service runs from by default")
+
+
+tracing_config = TracingConfig()
+app_name = tracing_config.SERVICE_NAME
+
+
+class OtlpJsonFileSpanExporter(SpanExporter):
+    """
+    Append every exported batch to a file as one line of OTLP JSON, the format of the collector's file exporter, so
+    traces recorded offline can be replayed into any OTLP backend or read with jq.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        line = MessageToJson(encode_spans(spans), indent=None)
+        with self._lock, open(self.file_path, "a", encoding="utf-8") as trace_file:
+            trace_file.write(line + "\n")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def get_span_processor() -> Optional[SimpleSpanProcessor | BatchSpanProcessor]:
+    """Span processor of the configured exporter, None when the spans are dropped"""
+    match tracing_config.TRACE_EXPORTER:
+        case TraceExporter.OTLP:
+            return BatchSpanProcessor(span_exporter=OTLPSpanExporter(endpoint=otlp_config.OTLP_ENDPOINT))
+        case TraceExporter.OTLP_FILE:
+            return BatchSpanProcessor(span_exporter=OtlpJsonFileSpanExporter(tracing_config.TRACE_FILE_PATH))
+        case TraceExporter.MEMORY:
+            # exported as soon as they end so the spans of a request can be read once it is answered
+            return SimpleSpanProcessor(span_exporter=memory_span_exporter)
+    return None
+
+
+memory_span_exporter = InMemorySpanExporter()
+
+provider = TracerProvider(resource=Resource.create({SERVICE_NAME: app_name}))
+if processor := get_span_processor():
+    provider.add_span_processor(span_processor=processor)
+trace.set_tracer_provider(tracer_provider=provider)
+tracer = trace.get_tracer(__name__)
+
+
+def instrument_clients() -> None:
+    """Open a client span, and propagate the trace context, for every call made by the HTTP clients of the service"""
+    for module_name, instrumentor_name in CLIENT_INSTRUMENTORS:
+        try:
+            instrumentor = getattr(importlib.import_module(module_name), instrumentor_name)()
+        except ImportError:
+            continue
+        if not instrumentor.is_instrumented_by_opentelemetry:
+            instrumentor.instrument(tracer_provider=provider)
+
+
+def instrument_engine(engine) -> None:
+    """Open a span for every query run by a SQLAlchemy engine, to be called once the engine is created"""
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
+    SQLAlchemyInstrumentor().instrument(engine=engine, tracer_provider=provider)
+
+
+def traced(span_name: str, attributes: Optional[dict] = None) -> Callable:
+    """
+    Run the decorated function, sync or async, in a child span of the current one. Exceptions are recorded on the
+    span and raised again.
+
+    >>> @traced(PROMPT_BUILD_SPAN)
+    >>> def generate_prompt(...):
+    """
+
+    def decorator(function: Callable) -> Callable:
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.start_as_current_span(span_name, attributes=attributes):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(span_name, attributes=attributes):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class StreamedGenerationTracer:
+    """
+    Spans of a streamed model answer, recorded once the stream ends since a generator cannot hold a current span
+    across its yields: model.ttft from the request to the first token, then model.tokens_per_s until the last token
+    with the generation rate.
+
+    >>> generation_tracer = StreamedGenerationTracer(code=model_code)
+    >>> for chunk in response:
+    >>>     generation_tracer.add_tokens()
+    >>> generation_tracer.end()
+    """
+
+    def __init__(self, **attributes) -> None:
+        self.attributes = {f"model.{name}": value for name, value in attributes.items() if value is not None}
+        self._parent_context = trace.set_span_in_context(trace.get_current_span())
+        self._start_time = time.time_ns()
+        self._first_token_time: Optional[int] = None
+        self._tokens = 0
+        self._ended = False
+
+    def add_tokens(self, tokens: int = 1) -> None:
+        if self._first_token_time is None:
+            self._first_token_time = time.time_ns()
+        self._tokens += tokens
+
+    def end(self, error: Optional[str] = None) -> None:
+        """Record the spans, only the first call counts, error is set when the stream did not complete"""
+        if self._ended:
+            return
+        self._ended = True
+        end_time = time.time_ns()
+        first_token_time = self._first_token_time or end_time
+        ttft_span = tracer.start_span(MODEL_TTFT_SPAN, context=self._parent_context, start_time=self._start_time,
+                                      attributes=self.attributes)
+        ttft_span.set_attribute("model.ttft_ms", (first_token_time - self._start_time) / 1e6)
+        if error and self._first_token_time is None:
+            ttft_span.set_status(trace.Status(trace.StatusCode.ERROR, error))
+        ttft_span.end(end_time=first_token_time)
+        if self._first_token_time is None:
+            return
+
+        generation_time = (end_time - first_token_time) / 1e9
+        generation_span = tracer.start_span(MODEL_TOKENS_PER_S_SPAN, context=self._parent_context,
+                                            start_time=first_token_time, attributes=self.attributes)
+        generation_span.set_attribute("model.tokens", self._tokens)
+        generation_span.set_attribute("model.tokens_per_s",
+                                      self._tokens / generation_time if generation_time else float(self._tokens))
+        if error:
+            generation_span.set_status(trace.Status(trace.StatusCode.ERROR, error))
+        generation_span.end(end_time=end_time)
+
+
+instrument_clients()
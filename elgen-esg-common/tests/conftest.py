@@ -0,0 +1,4 @@
+import os
+
+# the spans are kept in memory, set before elgen_common.tracing creates the provider
+os.environ.setdefault("TRACE_EXPORTER", "memory")
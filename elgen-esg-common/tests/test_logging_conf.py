@@ -0,0 +1,85 @@
+import json
+import logging
+import queue
+
+import pytest
+
+from elgen_common import logging_conf
+from elgen_common.logging_conf import LogRateLimitFilter, logging_settings
+
+
+def get_record(logger_name: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord(logger_name, level, __file__, 1, "message", None, None)
+
+
+@pytest.fixture
+def log_queue(monkeypatch):
+    """Fresh log queue, its listener is stopped after the test"""
+    monkeypatch.setattr(logging_conf, "_log_queue", queue.SimpleQueue())
+    monkeypatch.setattr(logging_conf, "_queue_handler", None)
+    monkeypatch.setattr(logging_conf, "_queue_listener", None)
+    yield
+    logging_conf.stop_logging()
+
+
+def test_rate_limit_is_off_by_default():
+    assert logging_settings.LOG_RATE_LIMIT == 0
+
+
+def test_only_the_listed_loggers_are_rate_limited():
+    rate_limit_filter = LogRateLimitFilter(rate=0, burst=2, logger_names=["source.utils"])
+
+    limited = [rate_limit_filter.filter(get_record("source.utils.utils")) for _ in range(3)]
+    access_logs = [rate_limit_filter.filter(get_record("uvicorn.access")) for _ in range(3)]
+
+    assert limited == [True, True, False]
+    assert access_logs == [True, True, True]
+    assert rate_limit_filter.filter(get_record("source.utils.utils", logging.WARNING))
+    assert rate_limit_filter.filter(get_record("source.utilities"))
+
+
+def test_dropped_records_are_counted_on_the_next_record(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(logging_conf.time, "monotonic", lambda: clock[0])
+    rate_limit_filter = LogRateLimitFilter(rate=1, burst=1, logger_names=["source"])
+    passed = [rate_limit_filter.filter(get_record("source")) for _ in range(3)]
+    clock[0] += 1
+
+    record = get_record("source")
+
+    assert passed == [True, False, False]
+    assert rate_limit_filter.filter(record)
+    assert record.dropped_records == 2
+
+
+def test_queued_records_are_written_as_json_once_logging_stops(log_queue, capsys):
+    queue_handler = logging_conf.get_queue_handler()
+    for index in range(1000):
+        queue_handler.handle(logging.LogRecord("source.streaming", logging.INFO, __file__, 1, "chunk %s", (index,),
+                                               None))
+
+    logging_conf.stop_logging()
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["message"] for line in lines] == [f"chunk {index}" for index in range(1000)]
+    assert lines[0]["name"] == "source.streaming" and lines[0]["levelname"] == "INFO"
+
+
+def test_queue_handler_is_created_once(log_queue):
+    assert logging_conf.get_queue_handler() is logging_conf.get_queue_handler()
+
+
+def test_listed_loggers_are_rate_limited_once_the_limit_is_set(log_queue, monkeypatch):
+    monkeypatch.setattr(logging_settings, "LOG_RATE_LIMIT", 10)
+    monkeypatch.setattr(logging_settings, "LOG_RATE_LIMITED_LOGGERS", " source.streaming, ,source.chunks")
+
+    rate_limit_filter, = logging_conf.get_queue_handler().filters
+
+    assert rate_limit_filter.logger_names == ("source.streaming", "source.chunks")
+    assert rate_limit_filter.burst == logging_settings.LOG_RATE_LIMIT_BURST
+
+
+def test_no_rate_limit_without_listed_loggers(log_queue, monkeypatch):
+    monkeypatch.setattr(logging_settings, "LOG_RATE_LIMIT", 10)
+
+    assert logging_conf.get_queue_handler().filters == []
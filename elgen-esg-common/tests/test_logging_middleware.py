@@ -0,0 +1,167 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from elgen_common.logging_conf import logging_middleware_config
+from elgen_common.logging_middleware import RouterLoggingMiddleware
+from elgen_common.tracing import memory_span_exporter
+
+TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+
+
+def get_scope(headers: list[tuple[bytes, bytes]] | None = None) -> dict:
+    return {"type": "http", "method": "POST", "path": "/chat", "query_string": b"stream=true",
+            "headers": headers or []}
+
+
+class StreamingApp:
+    """App streaming its chunks, when held each chunk after the first waits for the test to release it"""
+
+    def __init__(self, chunks: list[bytes], held: bool = False) -> None:
+        self.chunks = chunks
+        self.held = held
+        self.release = asyncio.Event()
+        self.received = []
+
+    async def __call__(self, scope, receive, send) -> None:
+        while (message := await receive())["more_body"]:
+            self.received.append(message["body"])
+        self.received.append(message["body"])
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        for index, chunk in enumerate(self.chunks):
+            if index and self.held:
+                await self.release.wait()
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(self.chunks) - 1})
+
+
+def failing_app(fail_after_start: bool):
+    async def app(scope, receive, send) -> None:
+        if fail_after_start:
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"partial", "more_body": True})
+        raise RuntimeError("unhandled")
+
+    return app
+
+
+def get_receive(*bodies: bytes):
+    messages = [{"type": "http.request", "body": body, "more_body": index < len(bodies) - 1}
+                for index, body in enumerate(bodies or (b"",))]
+
+    async def receive() -> dict:
+        return messages.pop(0)
+
+    return receive
+
+
+@pytest.fixture
+def logger():
+    return MagicMock()
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def send(sent):
+    async def send(message) -> None:
+        sent.append(message)
+
+    return send
+
+
+def get_request_line(logger) -> dict:
+    return logger.info.call_args.args[0]
+
+
+def get_headers(message: dict) -> dict:
+    return {name.decode(): value.decode() for name, value in message["headers"]}
+
+
+def test_streamed_chunks_are_sent_as_they_come(logger, sent, send):
+    app = StreamingApp([b"first ", b"second"], held=True)
+
+    async def stream() -> None:
+        request = asyncio.create_task(RouterLoggingMiddleware(app, logger=logger)(get_scope(), get_receive(), send))
+        await asyncio.sleep(0.01)
+        # the first chunk reached the client while the app holds the second one
+        assert [message.get("body") for message in sent] == [None, b"first "]
+        logger.info.assert_not_called()
+        app.release.set()
+        await request
+
+    asyncio.run(stream())
+
+    assert [message.get("body") for message in sent] == [None, b"first ", b"second"]
+    request_line = get_request_line(logger)
+    assert request_line["http.status_code"] == 200
+    assert request_line["http.response_bytes"] == len(b"first second")
+    assert request_line["http.path"] == "/chat?stream=true"
+    assert "response_body" not in request_line
+
+
+def test_sampled_bodies_are_capped(logger, send, monkeypatch):
+    monkeypatch.setattr(logging_middleware_config, "LOG_BODY_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(logging_middleware_config, "LOG_BODY_MAX_BYTES", 8)
+    app = StreamingApp([b"an answer ", b"of many chunks"])
+
+    asyncio.run(RouterLoggingMiddleware(app, logger=logger)(get_scope(), get_receive(b"a long ", b"question"), send))
+
+    request_line = get_request_line(logger)
+    assert app.received == [b"a long ", b"question"]
+    assert request_line["request_body"] == "a long q"
+    assert request_line["response_body"] == "an answe"
+    assert request_line["http.response_bytes"] == len(b"an answer of many chunks")
+
+
+def test_error_before_the_response_is_logged_and_answered_with_a_500(logger, sent, send):
+    asyncio.run(RouterLoggingMiddleware(failing_app(fail_after_start=False), logger=logger)(
+        get_scope(), get_receive(), send))
+
+    logger.exception.assert_called_once()
+    assert isinstance(logger.exception.call_args.args[0]["reason"], RuntimeError)
+    assert sent[0]["status"] == 500
+    request_line = get_request_line(logger)
+    assert get_headers(sent[0])["x-correlation-id"] == request_line["correlation_id"]
+    assert request_line["http.status_code"] == 500
+    assert request_line["status"] == "failed"
+
+
+def test_error_of_a_started_response_is_logged_and_raised_again(logger, sent, send):
+    with pytest.raises(RuntimeError, match="unhandled"):
+        asyncio.run(RouterLoggingMiddleware(failing_app(fail_after_start=True), logger=logger)(
+            get_scope(), get_receive(), send))
+
+    logger.exception.assert_called_once()
+    assert [message.get("body") for message in sent] == [None, b"partial"]
+    request_line = get_request_line(logger)
+    assert request_line["http.status_code"] == 200
+    assert request_line["status"] == "failed"
+
+
+def test_correlation_id_of_the_caller_is_kept(logger, sent, send):
+    app = StreamingApp([b"answer"])
+    scope = get_scope(headers=[(b"x-correlation-id", b"caller-id"),
+                               (b"traceparent", f"00-{TRACE_ID}-b7ad6b7169203331-01".encode())])
+    memory_span_exporter.clear()
+
+    asyncio.run(RouterLoggingMiddleware(app, logger=logger)(scope, get_receive(), send))
+
+    assert get_headers(sent[0])["x-correlation-id"] == "caller-id"
+    request_line = get_request_line(logger)
+    assert request_line["correlation_id"] == "caller-id"
+    # the server span continues the trace of the caller
+    assert f"{request_line['otelTraceID']:032x}" == TRACE_ID
+    server_span, = memory_span_exporter.get_finished_spans()
+    assert f"{server_span.context.trace_id:032x}" == TRACE_ID
+
+
+def test_correlation_id_is_generated_when_missing(logger, sent, send):
+    asyncio.run(RouterLoggingMiddleware(StreamingApp([b"answer"]), logger=logger)(get_scope(), get_receive(), send))
+
+    correlation_id = get_headers(sent[0])["x-correlation-id"]
+    assert correlation_id
+    assert get_request_line(logger)["correlation_id"] == correlation_id
@@ -0,0 +1,38 @@
+import pytest
+
+from elgen_common import startup_profile
+from elgen_common.startup_profile import get_package_times, parse_import_times, profile_imports, StartupProfileError
+
+import_time_output = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     nltk.data
+import time:       300 |        420 |   nltk
+import time:        50 |        470 | source.utils.text_preprocessing_utils
+"""
+
+
+@pytest.fixture
+def service_directory(tmp_path, monkeypatch):
+    """Service directory holding a lazy module, importing json on first use, and a module calling out on import"""
+    (tmp_path / "lazy_module.py").write_text("def load():\n    import json\n    return json\n")
+    (tmp_path / "calling_module.py").write_text("import socket\nsocket.create_connection(('example.com', 80))\n")
+    monkeypatch.setattr(startup_profile, "service_directory", tmp_path)
+    return tmp_path
+
+
+def test_parse_import_times():
+    """The import time lines are grouped by top level package"""
+    import_times = parse_import_times(import_time_output)
+    assert [import_time.level for import_time in import_times] == [2, 1, 0]
+    assert get_package_times(import_times) == {"nltk": 420, "source": 50}
+
+
+def test_modules_are_imported_from_the_service_directory(service_directory):
+    imported_packages = {import_time.package for import_time in profile_imports("lazy_module", offline=True)}
+
+    assert "lazy_module" in imported_packages
+    assert "json" not in imported_packages
+
+
+def test_offline_profile_refuses_the_connections(service_directory):
+    with pytest.raises(StartupProfileError, match="network disabled by the startup profile"):
+        profile_imports("calling_module", offline=True)
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+from elgen_common.tracing import memory_span_exporter, tracer, traced, OtlpJsonFileSpanExporter, \
+    StreamedGenerationTracer, MODEL_TTFT_SPAN, MODEL_TOKENS_PER_S_SPAN, PROMPT_BUILD_SPAN, RETRIEVAL_SEARCH_SPAN
+
+
+@pytest.fixture
+def spans():
+    memory_span_exporter.clear()
+    yield memory_span_exporter
+    memory_span_exporter.clear()
+
+
+def get_span(spans, name: str):
+    return next(span for span in spans.get_finished_spans() if span.name == name)
+
+
+def test_traced_function_runs_in_a_child_span(spans):
+    @traced(PROMPT_BUILD_SPAN, attributes={"prompt.kind": "rag"})
+    def build_prompt(question: str) -> str:
+        return f"prompt of {question}"
+
+    with tracer.start_as_current_span("request"):
+        assert build_prompt("question") == "prompt of question"
+
+    prompt_span, request_span = get_span(spans, PROMPT_BUILD_SPAN), get_span(spans, "request")
+    assert prompt_span.parent.span_id == request_span.context.span_id
+    assert prompt_span.attributes["prompt.kind"] == "rag"
+
+
+@traced(RETRIEVAL_SEARCH_SPAN)
+def search():
+    raise ValueError("search failed")
+
+
+@traced(RETRIEVAL_SEARCH_SPAN)
+async def search_async():
+    raise ValueError("search failed")
+
+
+@pytest.mark.parametrize("call_search", [search, lambda: asyncio.run(search_async())], ids=["sync", "async"])
+def test_traced_function_error_is_recorded_and_raised(spans, call_search):
+    with pytest.raises(ValueError):
+        call_search()
+
+    search_span = get_span(spans, RETRIEVAL_SEARCH_SPAN)
+    assert search_span.status.status_code == trace.StatusCode.ERROR
+    assert search_span.events[0].name == "exception"
+
+
+def test_streamed_generation_spans(spans):
+    with tracer.start_as_current_span("request"):
+        generation_tracer = StreamedGenerationTracer(code="model", stream=None)
+    for _ in range(3):
+        generation_tracer.add_tokens()
+    generation_tracer.end()
+    generation_tracer.end()
+
+    request_span = get_span(spans, "request")
+    ttft_span, generation_span = get_span(spans, MODEL_TTFT_SPAN), get_span(spans, MODEL_TOKENS_PER_S_SPAN)
+    assert len(spans.get_finished_spans()) == 3
+    assert ttft_span.parent.span_id == generation_span.parent.span_id == request_span.context.span_id
+    assert ttft_span.attributes["model.code"] == "model"
+    assert "model.stream" not in ttft_span.attributes
+    assert ttft_span.end_time == generation_span.start_time
+    assert generation_span.attributes["model.tokens"] == 3
+    assert generation_span.attributes["model.tokens_per_s"] > 0
+
+
+def test_stream_failing_before_its_first_token_records_the_ttft_only(spans):
+    generation_tracer = StreamedGenerationTracer(code="model")
+
+    generation_tracer.end(error="model unavailable")
+
+    ttft_span = get_span(spans, MODEL_TTFT_SPAN)
+    assert [span.name for span in spans.get_finished_spans()] == [MODEL_TTFT_SPAN]
+    assert ttft_span.status.status_code == trace.StatusCode.ERROR
+    assert ttft_span.status.description == "model unavailable"
+
+
+def test_otlp_json_file_exporter(tmp_path):
+    trace_file = tmp_path / "traces.jsonl"
+    file_provider = TracerProvider()
+    file_provider.add_span_processor(SimpleSpanProcessor(OtlpJsonFileSpanExporter(str(trace_file))))
+    with file_provider.get_tracer(__name__).start_as_current_span(RETRIEVAL_SEARCH_SPAN):
+        pass
+
+    exported_spans = json.loads(trace_file.read_text().splitlines()[0])
+    assert exported_spans["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] == RETRIEVAL_SEARCH_SPAN
@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+"""
+Maintain the monthly partitions of question, answer and answer_analytics, meant to run daily from a cron job once
+the changelog-partition-conversation-tables liquibase migration is applied:
+the upcoming months partitions are created, then the questions older than ARCHIVE_HORIZON_MONTHS are written with
+their answers and sources as csv.gz files under ARCHIVE_DIRECTORY and removed.
+    python archive_partitions.py
+    python archive_partitions.py --skip-archival
+"""
+import argparse
+
+from configuration.injection_container import DependencyContainer
+from configuration.logging_setup import logger
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skip-archival", action="store_true", help="only create the upcoming partitions")
+    arguments = parser.parse_args()
+
+    archival_service = DependencyContainer().archival_service()
+    partitions = archival_service.create_upcoming_partitions()
+    logger.info(f"Upcoming partitions ready: {', '.join(partitions)}")
+    if not arguments.skip_archival:
+        archive_files = archival_service.archive_old_partitions()
+        logger.info(f"{len(archive_files)} archive files written")
@@ -0,0 +1,36 @@
+from contextlib import contextmanager
+from typing import Generator
+from uuid import uuid4
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+from source.helpers.db_helpers import DBHelper
+
+
+@contextmanager
+def throwaway_schema(database_url: str) -> Generator[DBHelper, None, None]:
+    """Database helper on the tables of the models created in a new schema, dropped on exit"""
+    schema = f"benchmark_{uuid4().hex}"
+    admin_engine = create_engine(database_url, isolation_level="AUTOCOMMIT")
+    with admin_engine.connect() as connection:
+        connection.execute(text(f"CREATE SCHEMA {schema}"))
+    database_helper = DBHelper(make_url(database_url).update_query_dict({"options": f"-csearch_path={schema}"})
+                               .render_as_string(hide_password=False))
+    try:
+        database_helper.init_database()
+        yield database_helper
+    finally:
+        database_helper.engine.dispose()
+        with admin_engine.connect() as connection:
+            connection.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin_engine.dispose()
+
+
+def get_tables_size(database_helper: DBHelper, *table_names: str) -> int:
+    """Size in bytes of tables with their toast and indexes, once compacted"""
+    with database_helper.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for table_name in table_names:
+            connection.execute(text(f"VACUUM FULL ANALYZE {table_name}"))
+        return sum(connection.execute(text("SELECT pg_total_relation_size(:table_name)"),
+                                      {"table_name": table_name}).scalar() for table_name in table_names)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+Compress the large text values written before the CompressedText column type was introduced.
+Run it once the changelog-compress-large-text-columns liquibase migration is applied, it can be stopped and
+restarted at any time since every batch is committed on its own:
+    python compress_text_columns.py --batch-size 500
+"""
+import argparse
+
+from sqlalchemy import select, func, update
+from sqlalchemy.orm import InstrumentedAttribute
+
+from configuration.config import db_config
+from configuration.logging_setup import logger
+from source.helpers.db_helpers import DBHelper
+from source.models.common_models import CompressedText
+from source.models.conversations_models import AnswerAnalytics, SourceWeb
+
+COMPRESSED_COLUMNS = [AnswerAnalytics.prompt, SourceWeb.paragraphs]
+
+
+def compress_column(database_helper: DBHelper, column: InstrumentedAttribute, batch_size: int) -> int:
+    """
+    Rewrite, batch by batch, the values of a CompressedText column still stored in the plain format and large
+    enough to be compressed, the rewrite goes through the column type which compresses them
+    :return: the number of rewritten rows
+    """
+    model = column.class_
+    last_id = None
+    rewritten_rows = 0
+    while True:
+        query = select(model.id, column).where(func.get_byte(column, 0) == CompressedText.PLAIN_VERSION,
+                                               func.octet_length(column) > column.type.threshold)
+        if last_id:
+            query = query.where(model.id > last_id)
+        with database_helper.session() as session:
+            rows = session.execute(query.order_by(model.id).limit(batch_size)).all()
+            if not rows:
+                return rewritten_rows
+            session.execute(update(model), [{"id": row.id, column.key: row[1]} for row in rows])
+        last_id = rows[-1].id
+        rewritten_rows += len(rows)
+        logger.info(f"{model.__tablename__}.{column.key}: {rewritten_rows} rows rewritten")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="number of rows rewritten per transaction")
+    arguments = parser.parse_args()
+
+    db_helper = DBHelper(db_url=db_config.db_url)
+    for compressed_column in COMPRESSED_COLUMNS:
+        compress_column(db_helper, compressed_column, batch_size=arguments.batch_size)
@@ -59,6 +59,23 @@ class StreamingResponseConfig(BaseSettings):
                             description="streaming chunk size to be parsed at a time",
                             default=1024 * 4
                             )
+    CACHED_ANSWER_CHUNK_WORDS: int = Field(env="CACHED_ANSWER_CHUNK_WORDS", default=4,
+                                           description="words per in progress chunk when streaming a cached answer")
+
+
+class RequestDeadlineConfig(BaseSettings):
+    """Configuration of the time budget of a request, shared by all the outbound calls made to serve it"""
+    REQUEST_TIMEOUT_HEADER: str = Field(env="REQUEST_TIMEOUT_HEADER", default="X-Request-Timeout-Ms",
+                                        description="Header carrying the milliseconds a caller is willing to wait, "
+                                                    "also sent to the services called with what remains of it")
+    REQUEST_TIMEOUT_DEFAULT: float = Field(env="REQUEST_TIMEOUT_DEFAULT", default=180,
+                                           description="Seconds of budget of a request without the header and "
+                                                       "timeout of the outbound calls made outside of a request")
+    REQUEST_TIMEOUT_MAX: float = Field(env="REQUEST_TIMEOUT_MAX", default=600,
+                                       description="Seconds a caller can at most ask for through the header")
+    REQUEST_TIMEOUT_MIN_HOP: float = Field(env="REQUEST_TIMEOUT_MIN_HOP", default=0.05,
+                                           description="Seconds of budget under which an outbound call is not "
+                                                       "even started")
 
 
 class QuestionConfig(BaseSettings):
@@ -66,6 +83,76 @@ class QuestionConfig(BaseSettings):
     QUESTION_LENGTH_LIMIT: int = Field(env="LIMIT", default=500,
                                        description="A value indicating how many chars can be in a question")
 
+
+class QuestionClassificationConfig(BaseSettings):
+    """Configuration of the question classification done off the question creation path"""
+    CLASSIFICATION_WAIT_TIMEOUT: float = Field(env="CLASSIFICATION_WAIT_TIMEOUT", default=0.5,
+                                               description="Seconds a question creation waits for its classification "
+                                                           "before returning it unclassified")
+    CLASSIFICATION_CACHE_SIZE: int = Field(env="CLASSIFICATION_CACHE_SIZE", default=10000,
+                                           description="How many question classifications are kept in memory")
+    CLASSIFICATION_CACHE_TTL: int = Field(env="CLASSIFICATION_CACHE_TTL", default=86400,
+                                          description="Seconds a question classification is kept in memory")
+
+
+class ConversationHistoryConfig(BaseSettings):
+    """Configuration of the rolling summary of the conversations given to the model"""
+    HISTORY_WINDOW_TURNS: int = Field(env="HISTORY_WINDOW_TURNS", default=4,
+                                      description="Last turns of a conversation kept verbatim in the prompt")
+    HISTORY_SUMMARY_BATCH_TURNS: int = Field(env="HISTORY_SUMMARY_BATCH_TURNS", default=2,
+                                             description="Turns folded into the summary at once when the window "
+                                                         "overflows, one summarization call every that many turns")
+    HISTORY_SUMMARY_NUM_LINES: int = Field(env="HISTORY_SUMMARY_NUM_LINES", default=10,
+                                           description="Maximum number of lines of a conversation summary")
+    HISTORY_SUMMARY_MODEL_CODE: str | None = Field(env="HISTORY_SUMMARY_MODEL_CODE", default=None,
+                                                   description="Model summarizing the conversations, the model that "
+                                                               "answered the turn if not set")
+    HISTORY_SUMMARY_WORKERS: int = Field(env="HISTORY_SUMMARY_WORKERS", default=2,
+                                         description="Threads updating the conversation summaries in background")
+
+
+class ChatSuggestionsConfig(BaseSettings):
+    """Configuration of the chat suggestions materialized per workspace"""
+    CHAT_SUGGESTIONS_CACHE_SIZE: int = Field(env="CHAT_SUGGESTIONS_CACHE_SIZE", default=1000,
+                                             description="How many workspaces have their suggestions kept in memory")
+    CHAT_SUGGESTIONS_CACHE_TTL: int = Field(env="CHAT_SUGGESTIONS_CACHE_TTL", default=300,
+                                            description="Seconds the suggestions of a workspace are kept in memory "
+                                                        "without being refreshed, bounds how long a change made "
+                                                        "through another worker stays unseen")
+    CHAT_SUGGESTIONS_REFRESH_INTERVAL: int = Field(env="CHAT_SUGGESTIONS_REFRESH_INTERVAL", default=60,
+                                                   description="Seconds between two refreshes of the materialized "
+                                                               "suggestions that changed or are about to expire")
+
+
+class AnswerCacheConfig(BaseSettings):
+    """Configuration of the answer cache of the workspaces having it enabled"""
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = Field(env="ANSWER_CACHE_SIMILARITY_THRESHOLD", default=0.8,
+                                                     description="Estimated Jaccard similarity from which a question "
+                                                                 "is a near duplicate of a cached one")
+    ANSWER_CACHE_PERMUTATIONS: int = Field(env="ANSWER_CACHE_PERMUTATIONS", default=64,
+                                           description="Size of the MinHash signatures, changing it makes the "
+                                                       "existing entries unusable for near duplicates")
+
+
+class ConversationExportConfig(BaseSettings):
+    """Configuration for the conversations export"""
+    EXPORT_BATCH_SIZE: int = Field(env="EXPORT_BATCH_SIZE", default=1000,
+                                   description="How many rows are fetched at a time from the server side cursor")
+
+
+class ArchivalConfig(BaseSettings):
+    """Configuration of the monthly partitions maintenance of the conversation tables"""
+    ARCHIVE_HORIZON_MONTHS: int = Field(env="ARCHIVE_HORIZON_MONTHS", default=12,
+                                        description="Questions of the months ended this many months ago are archived")
+    ARCHIVE_DIRECTORY: str = Field(env="ARCHIVE_DIRECTORY", default="archives",
+                                   description="Directory where the archived partitions are written as csv.gz files")
+    PARTITIONS_CREATED_AHEAD: int = Field(env="PARTITIONS_CREATED_AHEAD", default=2,
+                                          description="How many months of partitions to create in advance")
+    ORPHANED_CHUNKS_GRACE_HOURS: int = Field(env="ORPHANED_CHUNKS_GRACE_HOURS", default=24,
+                                             description="Chunk texts no source document cites are removed once "
+                                                         "they were last cited this many hours ago")
+
+
 class SQLGenerationConfig(BaseSettings):
     """Configuration class for summarization"""
     DEFAULT_SQL_LLM_MODEL_CODE: str = Field(env="DEFAULT_SQL_LLM_MODEL_CODE", default="M2")
@@ -104,3 +191,4 @@ app_config = AppConfig()
 db_config = DataBaseConfig()
 
 question_config = QuestionConfig()
+request_deadline_config = RequestDeadlineConfig()
@@ -1,18 +1,28 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from dependency_injector import containers, providers
 
 from configuration.config import DataBaseConfig, AppConfig, SummarizationConfig, ModelsConfig, StreamingResponseConfig, \
-    SQLGenerationConfig
+    SQLGenerationConfig, ConversationExportConfig, ArchivalConfig, QuestionClassificationConfig, AnswerCacheConfig, \
+    ChatSuggestionsConfig, ConversationHistoryConfig
+from source.helpers.cache_helpers import LRUCache
 from source.helpers.db_helpers import DBHelper
 from source.helpers.streaming_helpers import LLMStreamer
 from source.models.conversations_models import Answer, VersionedAnswer
+from source.repositories.analytics_repository import AnalyticsRepository
+from source.repositories.answer_cache_repository import AnswerCacheRepository
 from source.repositories.answer_repository import AnswerRepository
 from source.repositories.chat_suggestions_repository import ChatSuggestionsRepository
 from source.repositories.conversation_repository import ConversationRepository
 from source.repositories.model_repository import ModelRepository
+from source.repositories.partition_repository import PartitionRepository
 from source.repositories.sources_repository import SourceRepository
 from source.repositories.sql_source_repository import SQLSourceRepository
 from source.repositories.workspace_repository import WorkspaceRepository
 from source.repositories.workspace_type_repository import WorkspaceTypeRepository
+from source.services.analytics_service import AnalyticsService
+from source.services.answer_cache_service import AnswerCacheService
+from source.services.archival_service import ArchivalService
 from source.services.chat_service import ChatService
 from source.services.chat_suggestions_service import ChatSuggestionsService
 from source.services.conversation_service import ConversationService
@@ -55,19 +65,56 @@ class DependencyContainer(containers.DeclarativeContainer):
 
     conversation_repository = providers.Factory(ConversationRepository, database_helper=db_helpers)
 
+    conversation_export_config = providers.Singleton(ConversationExportConfig)
+
+    question_classification_config = providers.Singleton(QuestionClassificationConfig)
+    question_classification_cache = providers.Singleton(
+        LRUCache,
+        max_size=question_classification_config.provided.CLASSIFICATION_CACHE_SIZE,
+        ttl=question_classification_config.provided.CLASSIFICATION_CACHE_TTL
+    )
+
+    conversation_history_config = providers.Singleton(ConversationHistoryConfig)
+    conversation_history_executor = providers.Singleton(
+        ThreadPoolExecutor,
+        max_workers=conversation_history_config.provided.HISTORY_SUMMARY_WORKERS,
+        thread_name_prefix="conversation-history"
+    )
+
     conversation_service = providers.Factory(ConversationService, conversation_repository=conversation_repository,
-                                             model_discovery_service=model_service)
+                                             model_discovery_service=model_service,
+                                             export_config=conversation_export_config,
+                                             classification_config=question_classification_config,
+                                             classification_cache=question_classification_cache,
+                                             history_config=conversation_history_config,
+                                             history_executor=conversation_history_executor)
+
+    archival_config = providers.Singleton(ArchivalConfig)
+    partition_repository = providers.Factory(PartitionRepository, database_helper=db_helpers)
+    archival_service = providers.Factory(ArchivalService,
+                                         partition_repository=partition_repository,
+                                         archival_config=archival_config)
+
+    analytics_repository = providers.Factory(AnalyticsRepository, database_helper=db_helpers)
+    analytics_service = providers.Factory(AnalyticsService, analytics_repository=analytics_repository)
     streamer_handler = providers.Factory(LLMStreamer,
                                          streaming_config=streaming_response_config,
                                          conversation_service=conversation_service)
 
+    answer_cache_config = providers.Singleton(AnswerCacheConfig)
+    answer_cache_repository = providers.Factory(AnswerCacheRepository, database_helper=db_helpers)
+    answer_cache_service = providers.Factory(AnswerCacheService,
+                                             answer_cache_repository=answer_cache_repository,
+                                             answer_cache_config=answer_cache_config)
+
     summarization_config = providers.Singleton(SummarizationConfig)
     answer_service = providers.Factory(ChatService,
                                        conversation_service=conversation_service,
                                        answer_repository=answer_repository,
                                        model_discovery_service=model_service,
                                        summarization_config=summarization_config,
-                                       streaming_handler=streamer_handler
+                                       streaming_handler=streamer_handler,
+                                       answer_cache_service=answer_cache_service
                                        )
     workspace_repository = providers.Factory(WorkspaceRepository, database_helper=db_helpers)
     workspace_type_repository = providers.Factory(WorkspaceTypeRepository, database_helper=db_helpers)
@@ -85,8 +132,15 @@ class DependencyContainer(containers.DeclarativeContainer):
     chat_suggestion_repository = providers.Factory(ChatSuggestionsRepository,
                                                    database_helper=db_helpers)
 
+    chat_suggestions_config = providers.Singleton(ChatSuggestionsConfig)
+    chat_suggestions_cache = providers.Singleton(
+        LRUCache,
+        max_size=chat_suggestions_config.provided.CHAT_SUGGESTIONS_CACHE_SIZE,
+        ttl=chat_suggestions_config.provided.CHAT_SUGGESTIONS_CACHE_TTL
+    )
     chat_suggestion_service = providers.Factory(ChatSuggestionsService,
-                                                chat_suggestions_repository=chat_suggestion_repository)
+                                                chat_suggestions_repository=chat_suggestion_repository,
+                                                suggestions_cache=chat_suggestions_cache)
 
     sql_llm_service = providers.Factory(SQLQueryChain, model_registry_service=model_service,
                                         conversation_repository=conversation_repository,
@@ -1,3 +1,7 @@
+import asyncio
+
+from elgen_common.logging_conf import logging_config, setup_logging
+from elgen_common.logging_middleware import RouterLoggingMiddleware
 from fastapi import FastAPI
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
@@ -5,9 +9,8 @@ from uvicorn import Server, Config
 
 from configuration.config import app_config
 from configuration.injection_container import DependencyContainer
-from configuration.logging_conf import logging_config
-from configuration.logging_middleware import RouterLoggingMiddleware
 from configuration.logging_setup import logger
+from source.apis.analytics_api import analytics_router
 from source.apis.chat_api import chat_router
 from source.apis.chat_suggestions_api import chat_suggestion_router
 from source.apis.conversation_api import conversation_router
@@ -16,10 +19,13 @@ from source.apis.model_api import model_router
 from source.apis.source_api import sources_router
 from source.apis.workspace_api import workspace_router
 from source.exceptions.api_exception_handler import ElgenAPIException
+from source.exceptions.service_exceptions import DeadlineExceededError
 from source.exceptions.validation_exceptions import QuestionLengthExceededError
 from source.middlewares.app_middlewares import middlewares
 from source.schemas.common import AppEnv
 
+setup_logging()
+
 
 def get_application() -> FastAPI:
     application = FastAPI(
@@ -51,9 +57,23 @@ app.include_router(model_router, tags=["model_api"])
 app.include_router(chat_suggestion_router, tags=["Chat Suggestions API"])
 app.include_router(workspace_router, tags=["Workspaces API"])
 app.include_router(sources_router, tags=["Sources Api"])
+app.include_router(analytics_router, tags=["Analytics API"])
 app.include_router(health_check_router, tags=["healthz_api"])
 
 
+@app.on_event("startup")
+async def start_chat_suggestions_refresh():
+    chat_suggestions_config = app.container.chat_suggestions_config()
+    app.state.chat_suggestions_refresh = asyncio.create_task(
+        app.container.chat_suggestion_service().refresh_materialized_suggestions_periodically(
+            interval=chat_suggestions_config.CHAT_SUGGESTIONS_REFRESH_INTERVAL))
+
+
+@app.on_event("shutdown")
+async def stop_chat_suggestions_refresh():
+    app.state.chat_suggestions_refresh.cancel()
+
+
 @app.exception_handler(ElgenAPIException)
 async def text_extraction_exception_handler(request: Request, exc: ElgenAPIException):
     return JSONResponse(
@@ -70,6 +90,14 @@ async def question_limit_exceeded_error(request: Request, exception: QuestionLen
     )
 
 
+@app.exception_handler(DeadlineExceededError)
+async def deadline_exceeded_error(request: Request, exception: DeadlineExceededError):
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": exception.message}
+    )
+
+
 if __name__ == '__main__':
     Server(Config(app=app,
                   host=app_config.APP_HOST,
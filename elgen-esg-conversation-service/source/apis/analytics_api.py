@@ -0,0 +1,40 @@
+from datetime import datetime
+from uuid import UUID
+
+from dependency_injector.wiring import Provide, inject
+from fastapi import APIRouter, Depends, Query
+from fastapi import status
+
+from configuration.injection_container import DependencyContainer
+from configuration.logging_setup import logger
+from source.exceptions.api_exception_handler import ElgenAPIException
+from source.exceptions.service_exceptions import AnalyticsFetchDataError
+from source.schemas.analytics_schema import LatencyAnalyticsSchema, TrendGranularity
+from source.services.analytics_service import AnalyticsService
+
+analytics_router = APIRouter(prefix="/analytics")
+
+
+@analytics_router.get(path="/latency", response_model=LatencyAnalyticsSchema, response_model_by_alias=True,
+                      description="Inference time percentiles and prompt throughput per model and workspace, "
+                                  "over a date range and per hour or day")
+@inject
+def get_latency_analytics(start_date: datetime | None = Query(None, alias='start-date',
+                                                              description="defaults to 7 days before end-date"),
+                          end_date: datetime | None = Query(None, alias='end-date', description="defaults to now"),
+                          model_code: str | None = Query(None, alias='model-code'),
+                          workspace_id: UUID | None = Query(None, alias='workspace-id'),
+                          granularity: TrendGranularity = Query(TrendGranularity.HOUR),
+                          analytics_service: AnalyticsService = Depends(
+                              Provide[DependencyContainer.analytics_service])):
+    if start_date and end_date and start_date > end_date:
+        raise ElgenAPIException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                                detail="start-date must be before end-date!")
+    try:
+        return analytics_service.get_latency_analytics(start_date=start_date, end_date=end_date,
+                                                       model_code=model_code, workspace_id=workspace_id,
+                                                       granularity=granularity)
+    except AnalyticsFetchDataError as error:
+        logger.error(error)
+        raise ElgenAPIException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Cannot connect to database to fetch the latency analytics!")
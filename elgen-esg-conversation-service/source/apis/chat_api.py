@@ -14,8 +14,9 @@ from source.exceptions.service_exceptions import (ChatServiceError, ChatAnswerCr
                                                   ChatIncompleteDataError, AnswerNotFoundError,
                                                   VersionedAnswerNotFoundException, ChatModelDiscoveryError,
                                                   SqlSourceResponseSavingException, SQLModelDiscoveryError,
-                                                  ConversationFetchDataError, SQLExecuteError
+                                                  ConversationFetchDataError, SQLExecuteError, DeadlineExceededError
                                                   )
+from source.helpers.deadline_helpers import get_deadline_headers, get_hop_timeout, is_deadline_exceeded
 from source.schemas.answer_schema import (AnswerRatingRequest, AnswerRatingResponse, AnswerUpdatingRequest,
                                           VersionedAnswerResponse)
 from source.schemas.chat_schema import PromptSchema
@@ -84,22 +85,32 @@ def create_answer_with_streaming_testing(request: Request,
     async def get_answer(text):
 
         service_url = chat_service.model_discovery_service.get_model_per_code(model_code)
-        response = requests.post(f"{service_url}/inference/stream", json={"prompt": text}, stream=True)
+        try:
+            timeout = get_hop_timeout()
+            response = requests.post(f"{service_url}/inference/stream", json={"prompt": text}, stream=True,
+                                     headers=get_deadline_headers(timeout), timeout=timeout)
+        except (DeadlineExceededError, requests.exceptions.Timeout):
+            yield str({"detail": "The request timed out", "status": "ERROR"})
+            return
 
         if response.status_code == 200:
             # Define the chunk size (the number of bytes to read at a time)
             chunk_size = 1024 * 4
 
             counter = 0
-            for chunk in response.iter_content(chunk_size=chunk_size):
-
-                counter += 1
-                is_disconnected = await request.is_disconnected()
-                logger.info(f"Is disconnected {is_disconnected} : {counter}")
-                if is_disconnected:
-                    logger.info("Connection disconnected, end streaming!")
-                    break
-                yield chunk
+            with response:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+
+                    counter += 1
+                    is_disconnected = await request.is_disconnected()
+                    logger.info(f"Is disconnected {is_disconnected} : {counter}")
+                    if is_disconnected:
+                        logger.info("Connection disconnected, end streaming!")
+                        break
+                    if is_deadline_exceeded():
+                        yield str({"detail": "The request timed out", "status": "ERROR"})
+                        break
+                    yield chunk
         else:
             yield str({"detail": f"Request failed with status code {response.status_code}", "status": "ERROR"})
 
@@ -1,7 +1,7 @@
 from uuid import UUID
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, Path, Body, Query
+from fastapi import APIRouter, Depends, Path, Body, Query, Header, Response
 from fastapi import status
 
 from configuration.injection_container import DependencyContainer
@@ -13,6 +13,7 @@ from source.schemas.chat_suggestions_schema import ChatSuggestion, WorkspaceChat
 from source.schemas.common import UpdateStatusDataModel
 from source.schemas.conversation_schema import QuestionInputSchema
 from source.services.chat_suggestions_service import ChatSuggestionsService
+from source.utils.utils import etag_matches
 
 chat_suggestion_router = APIRouter(prefix="/workspaces/suggestion")
 
@@ -36,14 +37,20 @@ async def create_chat_suggestion(
 @inject
 async def get_suggestions_per_workspace(
         workspace_id: UUID = Query(...),
+        if_none_match: str | None = Header(None, alias="If-None-Match"),
         chat_suggestion_service: ChatSuggestionsService = Depends(
             Provide[DependencyContainer.chat_suggestion_service])):
+    """Answer 304 without body when the If-None-Match header has the ETag of the current suggestions"""
     try:
-        return chat_suggestion_service.get_suggestions_per_workspace(workspace_id)
+        suggestions = chat_suggestion_service.get_materialized_suggestions(workspace_id)
     except (ChatSuggestionsDataBaseError, GenericValidationError) as error:
         logger.error(error)
         raise ElgenAPIException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail=error.message)
+    headers = {"ETag": suggestions.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, suggestions.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=suggestions.content, media_type="application/json", headers=headers)
 
 
 @chat_suggestion_router.delete(path="/{suggestion_id}", response_model=UpdateStatusDataModel)
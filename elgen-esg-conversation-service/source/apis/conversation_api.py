@@ -1,7 +1,9 @@
+from datetime import datetime
 from uuid import UUID
 
 from dependency_injector.wiring import Provide, inject
 from fastapi import APIRouter, Path, Depends, status, Body, Header, Query
+from fastapi.responses import StreamingResponse
 
 from configuration.injection_container import DependencyContainer
 from source.exceptions.api_exception_handler import ElgenAPIException
@@ -10,7 +12,7 @@ from source.exceptions.service_exceptions import ConversationValidationError, Co
     ModelServiceConnectionError, ChatModelDiscoveryError, ClassificationModelRetrievalError, ResourceOwnershipException
 from source.exceptions.validation_exceptions import GenericValidationError
 from source.schemas.conversation_schema import ConversationSchema, ConversationIdSchema, ConversationTitleSchema, \
-    ConversationOutputSchema, QuestionInputSchema, SourceDocumentsInput, SourceWebInput
+    ConversationOutputSchema, QuestionInputSchema, SourceDocumentsInput, SourceWebInput, RetrievedSourcesSchema
 from source.services.conversation_service import ConversationService
 
 conversation_router = APIRouter(prefix="/conversations")
@@ -28,6 +30,32 @@ def create_conversation(conversation_title_body: ConversationTitleSchema = Body(
                                                     user_id=user_id)
 
 
+@conversation_router.get(path="/export",
+                         description="Stream the conversations history of a workspace as NDJSON, "
+                                     "one line per question with its answer")
+@inject
+def export_conversations(workspace_id: UUID = Header(..., alias='workspace-id'),
+                         user_id: UUID | None = Query(None, alias='user-id',
+                                                      description="only export the conversations of this user"),
+                         start_date: datetime | None = Query(None, alias='start-date',
+                                                             description="only export questions asked after this date"),
+                         end_date: datetime | None = Query(None, alias='end-date',
+                                                           description="only export questions asked before this date"),
+                         conversation_service: ConversationService = Depends(
+                             Provide[DependencyContainer.conversation_service])):
+    if start_date and end_date and start_date > end_date:
+        raise ElgenAPIException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                                detail="start-date must be before end-date!")
+    return StreamingResponse(
+        conversation_service.export_conversations(workspace_id=workspace_id,
+                                                  user_id=user_id,
+                                                  start_date=start_date,
+                                                  end_date=end_date),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename=conversations-{workspace_id}.ndjson"}
+    )
+
+
 @conversation_router.get(path="/{conversation_id}",
                          description="Get entire conversation history including user queries, model answers and sources")
 @inject
@@ -108,12 +136,16 @@ async def create_question(question_input: QuestionInputSchema,
                           skip_doc: bool = Query(...),
                           skip_web: bool = Query(...),
                           use_classification: bool = Query(True, description="use question-classifer or not"),
+                          wait_for_classification: bool = Query(True, alias='wait-for-classification',
+                                                                description="wait briefly for the classification, "
+                                                                            "otherwise it is stored once done"),
                           conversation_service: ConversationService = Depends(
                               Provide[DependencyContainer.conversation_service])):
     """
 
     :param question_input: The question To be created
     :param use_classification: whether to classify the question or not
+    :param wait_for_classification: whether to wait for the classification before returning the question
     :param conversation_id: The conversation id to which the question is connected
     :param skip_doc: flag if we should skip the source docs
     :param skip_web: flag if we should skip the web sources
@@ -129,7 +161,8 @@ async def create_question(question_input: QuestionInputSchema,
                                                           skip_web=skip_web,
                                                           use_classification=use_classification,
                                                           workspace_id=workspace_id,
-                                                          user_id=user_id)
+                                                          user_id=user_id,
+                                                          wait_for_classification=wait_for_classification)
     except ResourceOwnershipException as error:
         raise ElgenAPIException(status_code=status.HTTP_403_FORBIDDEN, detail=error.message) from error
     except ModelServiceConnectionError as exc:
@@ -179,3 +212,20 @@ def create_web_sources(question_id: UUID, source_web_input: SourceWebInput = Bod
     except SourceDocumentsValidationError:
         raise ElgenAPIException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                                 detail="Failed to parse Source documents schema!")
+
+
+@conversation_router.post(path="/retrieved-sources", response_model=RetrievedSourcesSchema,
+                          description="Create the source documents and the web sources of a question in one "
+                                      "transaction")
+@inject
+def create_retrieved_sources(question_id: UUID, retrieved_sources: RetrievedSourcesSchema = Body(),
+                             conversation_service: ConversationService = Depends(
+                                 Provide[DependencyContainer.conversation_service])):
+    try:
+        return conversation_service.create_retrieved_sources(question_id, retrieved_sources)
+    except SourceDocumentsFetchDataError:
+        raise ElgenAPIException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail="Internal error when creating source docs!")
+    except SourceDocumentsValidationError:
+        raise ElgenAPIException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                                detail="Failed to parse Source documents schema!")
@@ -10,12 +10,14 @@ from configuration.logging_setup import logger
 from source.exceptions.api_exception_handler import ElgenAPIException
 from source.exceptions.service_exceptions import WorkspaceFetchDataError, WorkspaceCreationError, \
     WorkspaceTypeFetchDataError, WorkspaceTypeCreationError, SourceDataFetchError, SourceUpdatingError, \
-    WorkspaceNotFoundError
+    WorkspaceNotFoundError, AnswerCacheError
 from source.exceptions.validation_exceptions import GenericValidationError
+from source.schemas.answer_schema import AnswerCacheInvalidationOutput
 from source.schemas.common import UpdateStatusDataModel
 from source.schemas.workspace_schema import WorkspaceOutput, WorkspaceInput, \
     WorkspaceUsersApiModel, WorkspaceTypeInput, WorkspaceTypeOutputModel, WorkspaceTypeModel, \
     GenericWorkspaceInfoOutput
+from source.services.answer_cache_service import AnswerCacheService
 from source.services.source_service import SourceService
 from source.services.workspace_service import WorkspaceService
 
@@ -145,6 +147,21 @@ async def delete_workspace(workspace_id: UUID = Path(...),
                                 detail=error.message)
 
 
+@workspace_router.delete(path="/{workspace_id}/answer-cache", response_model=AnswerCacheInvalidationOutput)
+@inject
+def invalidate_answer_cache(workspace_id: UUID = Path(..., title="Workspace ID"),
+                            answer_cache_service: AnswerCacheService = Depends(
+                                Provide[DependencyContainer.answer_cache_service])):
+    try:
+        return AnswerCacheInvalidationOutput(
+            workspace_id=workspace_id,
+            deleted_entries=answer_cache_service.invalidate_workspace(workspace_id=workspace_id))
+    except AnswerCacheError as error:
+        logger.error(error)
+        raise ElgenAPIException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=error.message)
+
+
 @workspace_router.get(path="/{workspace_id}")
 @inject
 async def get_workspace_by_id(
@@ -367,3 +367,39 @@ class UnauthorizedSQLStatement(Exception):
         """
         self.message = message
         super().__init__(self.message)
+
+
+class PartitionArchivalError(Exception):
+    def __init__(self, message: str = "Unable to archive partition"):
+        """
+        raised when a partition could not be created, exported or dropped
+        """
+        self.message = message
+        super().__init__(self.message)
+
+
+class AnalyticsFetchDataError(Exception):
+    def __init__(self, message: str = "Unable to fetch the inference analytics"):
+        """
+        raised when the latency rollups could not be read
+        """
+        self.message = message
+        super().__init__(self.message)
+
+
+class AnswerCacheError(Exception):
+    def __init__(self, message: str = "Unable to access the answer cache"):
+        """
+        raised when the answer cache could not be read, written or invalidated
+        """
+        self.message = message
+        super().__init__(self.message)
+
+
+class DeadlineExceededError(Exception):
+    def __init__(self, message: str = "The request timed out, its outbound calls have been cancelled"):
+        """
+        raised when the time budget of a request runs out before or during one of its outbound calls
+        """
+        self.message = message
+        super().__init__(self.message)
@@ -0,0 +1,66 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable
+
+
+class LRUCache:
+    """
+    In process least recently used cache whose entries also expire ttl seconds after being set,
+    shared across requests through a Singleton provider, thread safe for the sync endpoints run in the threadpool
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expiry, value = entry
+            if expiry < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def keys(self) -> list[Hashable]:
+        """Keys of the entries not expired yet, least recently used first"""
+        now = time.monotonic()
+        with self._lock:
+            return [key for key, (expiry, _) in self._entries.items() if expiry >= now]
+
+    def expire(self, key: Hashable) -> None:
+        """Expire an entry now, it is not returned any more but still listed by expiring_keys until read or set"""
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = (time.monotonic() - 1, self._entries[key][1])
+
+    def expiring_keys(self, within: float) -> list[Hashable]:
+        """Keys of the entries expiring in the next `within` seconds or expired already, least recently used first"""
+        deadline = time.monotonic() + within
+        with self._lock:
+            return [key for key, (expiry, _) in self._entries.items() if expiry < deadline]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
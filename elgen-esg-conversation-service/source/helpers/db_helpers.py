@@ -2,6 +2,7 @@ from contextlib import contextmanager
 from typing import Generator
 
 from configuration.logging_setup import logger
+from elgen_common.tracing import instrument_engine
 from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import scoped_session, sessionmaker
@@ -22,6 +23,7 @@ class DBHelper:
                 pool_recycle=600,
                 pool_pre_ping=True,
             )
+            instrument_engine(self.engine)
         except Exception as engine_error:
             logger.error(engine_error)
 
@@ -0,0 +1,50 @@
+import time
+from contextvars import ContextVar, Token
+
+from configuration.config import request_deadline_config
+from source.exceptions.service_exceptions import DeadlineExceededError
+
+# monotonic time at which the request being served must be answered, unset outside of a request
+_request_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+def start_request_deadline(budget: float) -> Token:
+    """Give the current context a deadline in budget seconds, the token resets it once the request is served"""
+    return _request_deadline.set(time.monotonic() + budget)
+
+
+def reset_request_deadline(token: Token) -> None:
+    _request_deadline.reset(token)
+
+
+def get_remaining_time() -> float | None:
+    """Seconds left before the deadline of the current request, None outside of a request"""
+    deadline = _request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def is_deadline_exceeded() -> bool:
+    remaining_time = get_remaining_time()
+    return remaining_time is not None and remaining_time < request_deadline_config.REQUEST_TIMEOUT_MIN_HOP
+
+
+def get_hop_timeout() -> float:
+    """
+    Timeout of the next outbound call: what remains of the request budget, the default timeout outside of a request.
+
+    Raises:
+        DeadlineExceededError: If the budget is too short for the call to be worth starting.
+    """
+    remaining_time = get_remaining_time()
+    if remaining_time is None:
+        return request_deadline_config.REQUEST_TIMEOUT_DEFAULT
+    if remaining_time < request_deadline_config.REQUEST_TIMEOUT_MIN_HOP:
+        raise DeadlineExceededError
+    return remaining_time
+
+
+def get_deadline_headers(timeout: float) -> dict[str, str]:
+    """Headers handing the budget of an outbound call over to the called service"""
+    return {request_deadline_config.REQUEST_TIMEOUT_HEADER: str(int(timeout * 1000))}
@@ -0,0 +1,63 @@
+import math
+from typing import Iterable
+
+
+class LatencyHistogram:
+    """
+    Log scaled histogram of inference times: bucket 0 counts the latencies up to MIN_LATENCY, bucket i the ones in
+    ]MIN_LATENCY * GROWTH ** (i - 1), MIN_LATENCY * GROWTH ** i] and the last bucket everything above.
+    The bounds must stay in line with the backfill of changelog-add-inference-latency-rollup-table.
+    """
+    MIN_LATENCY = 0.01
+    GROWTH = 1.2
+    BUCKETS_COUNT = 64
+
+    @classmethod
+    def bucket_index(cls, latency: float) -> int:
+        if latency <= cls.MIN_LATENCY:
+            return 0
+        return min(cls.BUCKETS_COUNT - 1, math.ceil(math.log(latency / cls.MIN_LATENCY) / math.log(cls.GROWTH)))
+
+    @classmethod
+    def bucket_bounds(cls, index: int) -> tuple[float, float]:
+        if index == 0:
+            return 0.0, cls.MIN_LATENCY
+        return cls.MIN_LATENCY * cls.GROWTH ** (index - 1), cls.MIN_LATENCY * cls.GROWTH ** index
+
+    @classmethod
+    def single(cls, latency: float) -> list[int]:
+        """Histogram of one latency"""
+        histogram = [0] * cls.BUCKETS_COUNT
+        histogram[cls.bucket_index(latency)] = 1
+        return histogram
+
+    @classmethod
+    def merge(cls, histograms: Iterable[list[int]]) -> list[int]:
+        merged = [0] * cls.BUCKETS_COUNT
+        for histogram in histograms:
+            for index, count in enumerate(histogram):
+                merged[index] += count
+        return merged
+
+    @classmethod
+    def quantile(cls, histogram: list[int], quantile: float) -> float | None:
+        """
+        Estimate a quantile by interpolating geometrically inside the bucket holding it, the estimate is within
+        GROWTH - 1 of the exact value, latencies above the last bucket are reported as its lower bound
+        """
+        total = sum(histogram)
+        if not total:
+            return None
+        rank = quantile * total
+        cumulative_count = 0
+        for index, count in enumerate(histogram):
+            if count and cumulative_count + count >= rank:
+                lower_bound, upper_bound = cls.bucket_bounds(index)
+                position = (rank - cumulative_count) / count
+                if index == 0:
+                    return upper_bound * position
+                if index == cls.BUCKETS_COUNT - 1:
+                    return lower_bound
+                return lower_bound * (upper_bound / lower_bound) ** position
+            cumulative_count += count
+        return cls.bucket_bounds(cls.BUCKETS_COUNT - 1)[0]
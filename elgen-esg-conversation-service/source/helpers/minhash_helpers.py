@@ -0,0 +1,34 @@
+import random
+from hashlib import blake2b
+
+
+class MinHash:
+    """
+    MinHash signatures of texts over their character shingles, the share of equal values between two signatures
+    estimates the Jaccard similarity of the shingle sets. The permutations are seeded so that signatures stored in
+    the database stay comparable across processes and restarts.
+    """
+    MERSENNE_PRIME = (1 << 61) - 1
+
+    def __init__(self, permutations_count: int = 64, shingle_size: int = 4, seed: int = 1):
+        self.shingle_size = shingle_size
+        generator = random.Random(seed)
+        self._permutations = [(generator.randrange(1, self.MERSENNE_PRIME),
+                               generator.randrange(0, self.MERSENNE_PRIME))
+                              for _ in range(permutations_count)]
+
+    def shingles(self, text: str) -> set[str]:
+        if len(text) <= self.shingle_size:
+            return {text}
+        return {text[index:index + self.shingle_size] for index in range(len(text) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> list[int]:
+        hashes = [int.from_bytes(blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+                  for shingle in self.shingles(text)]
+        return [min((multiplier * shingle_hash + increment) % self.MERSENNE_PRIME for shingle_hash in hashes)
+                for multiplier, increment in self._permutations]
+
+    @staticmethod
+    def similarity(signature: list[int], other_signature: list[int]) -> float:
+        """Estimated Jaccard similarity of the texts behind two signatures"""
+        return sum(value == other_value for value, other_value in zip(signature, other_signature)) / len(signature)
@@ -1,14 +1,18 @@
 import json
+import re
 from json import JSONDecodeError
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Callable
 from uuid import UUID
 
+from elgen_common.tracing import StreamedGenerationTracer
 from fastapi.requests import Request
 from pydantic import ValidationError
-from requests import Response
+from requests import Response, RequestException
 
 from configuration.config import StreamingResponseConfig
 from configuration.logging_setup import logger
+from source.exceptions.service_exceptions import DeadlineExceededError, ConversationFetchDataError
+from source.helpers.deadline_helpers import is_deadline_exceeded
 from source.schemas.conversation_schema import AnswerOutputSchema
 from source.schemas.models_schema import ModelServiceAnswer
 from source.schemas.streaming_answer_schema import StreamingResponseStatus, ModelStreamingInProgressResponse, \
@@ -36,7 +40,9 @@ class LLMStreamer:
                                   question_id: UUID,
                                   model_code: str,
                                   final_response_metadata: dict | None = None,
-                                  full_prompt: str | None = None
+                                  full_prompt: str | None = None,
+                                  on_answer_created: Callable[[ModelServiceAnswer], None] | None = None,
+                                  generation_tracer: StreamedGenerationTracer | None = None
                                   ) -> AsyncGenerator:
         """
         Yield chunk by chunk a streaming REST response as an Async Generator
@@ -45,6 +51,9 @@ class LLMStreamer:
         :param question_id:
         :param model_code: code for model service
         :param final_response_metadata: optional metadata to be included in the Done Chunk
+        :param on_answer_created: optional callback given the model answer once it is saved
+        :param generation_tracer: traces the time to first token and the generation rate, started before the model
+        request was sent, the stream starts it otherwise
 
         There are three types of chunks: InProgress, Done and Error.
         Use this method inside another method:
@@ -52,9 +61,13 @@ class LLMStreamer:
         >>>     yield chunk
 
         You can use it directly with FastApi Streaming Response
+        The model response is closed as soon as the streaming ends, so that the model service stops generating for a
+        client that left or a request that ran out of time.
         """
+        generation_tracer = generation_tracer or StreamedGenerationTracer(code=model_code)
         if await request.is_disconnected():
             logger.info("Connection disconnected, end streaming!")
+            response.close()
             return
         try:
             generated_tokens = []
@@ -64,17 +77,26 @@ class LLMStreamer:
                     logger.info("Connection disconnected, end streaming!")
                     break
 
+                if is_deadline_exceeded():
+                    logger.info("Request deadline exceeded, end streaming!")
+                    yield str(ModelStreamingErrorResponse(detail=DeadlineExceededError().message))
+                    return
+
                 parsed_chunk = json.loads(chunk)
 
                 if parsed_chunk.get("status") == StreamingResponseStatus.IN_PROGRESS:
+                    generation_tracer.add_tokens()
                     generated_tokens.append(ModelStreamingInProgressResponse(**parsed_chunk).data)
                     yield chunk
 
                 elif parsed_chunk.get("status") == StreamingResponseStatus.DONE:
+                    generation_tracer.end()
                     model_answer_object = ModelServiceAnswer(**parsed_chunk.get('data'), model_code=model_code,
                                                              prompt=full_prompt)
                     final_chunk_response = ModelStreamingDoneResponse(data=model_answer_object)
                     answer_object = self.conversation_service.create_answer(question_id, final_chunk_response.data)
+                    if on_answer_created:
+                        on_answer_created(final_chunk_response.data)
                     yield str(
                         ConversationStreamingDoneResponse(data=AnswerOutputSchema(id=str(question_id),
                                                                                   answer=answer_object),
@@ -99,3 +121,52 @@ class LLMStreamer:
                 detail="An unexpected Error occured while parsing response!"
             ))
             return
+        except ConversationFetchDataError as error:
+            logger.error(error)
+            yield str(ModelStreamingErrorResponse(detail="An unexpected Error occured while saving the answer!"))
+            return
+        except RequestException as error:
+            logger.error(error)
+            yield str(ModelStreamingErrorResponse(
+                detail=DeadlineExceededError().message if is_deadline_exceeded()
+                else "The connection to the model service was lost while streaming!"
+            ))
+            return
+        finally:
+            # no-op once the answer is complete, the spans are marked as failed otherwise
+            generation_tracer.end(error="The stream ended before the answer was complete")
+            response.close()
+
+    async def stream_cached_answer(self,
+                                   answer: str,
+                                   request: Request,
+                                   question_id: UUID,
+                                   model_code: str,
+                                   model_name: str | None = None,
+                                   final_response_metadata: dict | None = None
+                                   ) -> AsyncGenerator:
+        """
+        Yield an already generated answer with the same chunks as stream_llm_response: InProgress chunks of a few
+        words then the Done chunk, the answer is saved for the question without accounting in the latency analytics
+        """
+        words = re.findall(r"\S+\s*|\s+", answer)
+        chunk_words = self.streaming_config.CACHED_ANSWER_CHUNK_WORDS
+        for start in range(0, len(words), chunk_words):
+            if await request.is_disconnected():
+                logger.info("Connection disconnected, end streaming!")
+                return
+            yield str(ModelStreamingInProgressResponse(data="".join(words[start:start + chunk_words])))
+
+        try:
+            answer_object = self.conversation_service.create_answer(
+                question_id,
+                ModelServiceAnswer(response=answer, inference_time=0, model_code=model_code,
+                                   model_name=model_name or model_code),
+                record_latency=False
+            )
+        except ConversationFetchDataError as error:
+            logger.error(error)
+            yield str(ModelStreamingErrorResponse(detail="An unexpected Error occured while saving the answer!"))
+            return
+        yield str(ConversationStreamingDoneResponse(data=AnswerOutputSchema(id=str(question_id), answer=answer_object),
+                                                    detail="Success!", metadata=final_response_metadata))
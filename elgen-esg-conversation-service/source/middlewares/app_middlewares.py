@@ -1,9 +1,12 @@
 from fastapi.middleware import Middleware
 from fastapi.middleware.cors import CORSMiddleware
 
+from source.middlewares.deadline_middleware import RequestDeadlineMiddleware
+
 middlewares = [Middleware(
         CORSMiddleware,
         allow_origins=["*"],
         allow_credentials=True,
         allow_methods=["*"],
-        allow_headers=["*"])]
+        allow_headers=["*"]),
+    Middleware(RequestDeadlineMiddleware)]
@@ -0,0 +1,42 @@
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from configuration.config import request_deadline_config
+from configuration.logging_setup import logger
+from source.helpers.deadline_helpers import start_request_deadline, reset_request_deadline
+
+
+class RequestDeadlineMiddleware:
+    """
+    Start the deadline of every HTTP request from the timeout header of the caller, or the default budget, before the
+    request reaches the routes so that all the outbound calls made to serve it share the same budget.
+    Plain ASGI middleware: the deadline is set in the context the endpoint and the streamed body run in.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = start_request_deadline(self.get_request_budget(Headers(scope=scope)))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_request_deadline(token)
+
+    @staticmethod
+    def get_request_budget(headers: Headers) -> float:
+        """Seconds the caller is willing to wait, capped by the configured maximum"""
+        timeout_header = headers.get(request_deadline_config.REQUEST_TIMEOUT_HEADER)
+        if timeout_header is None:
+            return request_deadline_config.REQUEST_TIMEOUT_DEFAULT
+        try:
+            budget = int(timeout_header) / 1000
+        except ValueError:
+            logger.warning(f"Ignoring invalid {request_deadline_config.REQUEST_TIMEOUT_HEADER} header: "
+                           f"{timeout_header}")
+            return request_deadline_config.REQUEST_TIMEOUT_DEFAULT
+        return min(max(budget, 0.0), request_deadline_config.REQUEST_TIMEOUT_MAX)
@@ -1,7 +1,8 @@
+import zlib
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Column, DateTime, Boolean, TypeDecorator, String
+from sqlalchemy import Column, DateTime, Boolean, TypeDecorator, String, LargeBinary
 from sqlalchemy.dialects.postgresql import UUID as PostgreSQLUUID
 from sqlalchemy.ext.declarative import AbstractConcreteBase
 from sqlalchemy.orm import declarative_base
@@ -31,6 +32,44 @@ class UUIDString(TypeDecorator):
         return value
 
 
+class CompressedText(TypeDecorator):
+    """
+    Text stored as bytes behind a one byte format version, values of at least `threshold` bytes are zlib compressed.
+    The version byte lets rows written in an older format stay readable.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    PLAIN_VERSION = 0
+    ZLIB_VERSION = 1
+
+    def __init__(self, threshold: int = 1024, compression_level: int = 6, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threshold = threshold
+        self.compression_level = compression_level
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        data = value.encode("utf-8")
+        if len(data) >= self.threshold:
+            compressed = zlib.compress(data, self.compression_level)
+            if len(compressed) < len(data):
+                return bytes([self.ZLIB_VERSION]) + compressed
+        return bytes([self.PLAIN_VERSION]) + data
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        value = bytes(value)
+        version, payload = value[0], value[1:]
+        if version == self.ZLIB_VERSION:
+            return zlib.decompress(payload).decode("utf-8")
+        if version == self.PLAIN_VERSION:
+            return payload.decode("utf-8")
+        raise ValueError(f"Unknown compressed text format version {version}")
+
+
 class Table(AbstractConcreteBase, Base):
     """Abstract Table Model"""
     id = Column(UUIDString, primary_key=True, default=uuid4, unique=True)
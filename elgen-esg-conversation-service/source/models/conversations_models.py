@@ -1,8 +1,9 @@
 from datetime import datetime
 
-from sqlalchemy import Column, ForeignKey, String, DateTime, Boolean, Float, Integer
+from sqlalchemy import Column, ForeignKey, String, DateTime, Boolean, Float, Integer, BigInteger, Index
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 
-from source.models.common_models import Table, UUIDString
+from source.models.common_models import Table, UUIDString, Base, CompressedText
 from source.models.workspace_models import Workspace
 
 
@@ -14,6 +15,10 @@ class Conversation(Table):
     workspace_id = Column(UUIDString, ForeignKey(f"{Workspace.__tablename__}.id", ondelete='CASCADE'), nullable=True)
     title = Column(String, default="New Conversation", nullable=False)
     update_date = Column(DateTime(timezone=True), default=datetime.now, nullable=True)
+    history_summary = Column(String, nullable=True, comment="summary of the turns older than recent_turns")
+    recent_turns = Column(JSONB, nullable=False, default=list,
+                          comment="last answered turns as question_id, question, answer and question_date objects, "
+                                  "oldest first")
 
 
 class Question(Table):
@@ -56,7 +61,7 @@ class AnswerAnalytics(Table):
     inference_time = Column(Float, nullable=False)
     model_code = Column(String, nullable=True)
     prompt_length = Column(Integer, nullable=True)
-    prompt = Column(String, nullable=True)
+    prompt = Column(CompressedText, nullable=True)
     load_in_8bit = Column(Integer, nullable=True)
     load_in_4bit = Column(Integer, nullable=True)
     max_new_tokens = Column(Integer, nullable=True)
@@ -64,6 +69,19 @@ class AnswerAnalytics(Table):
     repetition_penalty = Column(Integer, nullable=True)
 
 
+class InferenceLatencyRollup(Base):
+    """Hourly aggregate of the answers inference time per model and workspace, maintained on answer creation"""
+    __tablename__ = "inference_latency_rollup"
+    model_code = Column(String, primary_key=True)
+    workspace_id = Column(UUIDString, primary_key=True,
+                          comment="nil uuid for the conversations not attached to a workspace")
+    hour = Column(DateTime(timezone=True), primary_key=True, index=True)
+    answer_count = Column(Integer, nullable=False)
+    inference_time_sum = Column(Float, nullable=False)
+    prompt_length_sum = Column(BigInteger, nullable=False)
+    histogram = Column(ARRAY(Integer), nullable=False, comment="answer counts per LatencyHistogram bucket")
+
+
 class VersionedAnswer(AnswerTable):
     """Conversation Table Model"""
     __tablename__ = "versioned_answer"
@@ -71,13 +89,24 @@ class VersionedAnswer(AnswerTable):
                        nullable=False)
 
 
+class ChunkContent(Base):
+    """Content addressed chunk text, shared by all the source documents citing the same chunk"""
+    __tablename__ = "chunk_content"
+    hash = Column(String(64), primary_key=True, comment="sha256 hex digest of the content")
+    content = Column(String, nullable=False)
+    # refreshed when the chunk is cited again, the orphaned chunks are collected by this date
+    creation_date = Column(DateTime(timezone=True), default=datetime.now, nullable=False)
+
+
 class SourceDocument(Table):
     """Conversation Table Model"""
     __tablename__ = "source_document"
     question_id = Column(UUIDString, ForeignKey(f"{Question.__tablename__}.id", ondelete='CASCADE'),
                          nullable=False)
     document_path = Column(String, nullable=False)
-    content = Column(String, nullable=False)
+    # only set for rows written before chunk_content existed and not yet backfilled
+    content = Column(String, nullable=True)
+    content_hash = Column(String(64), ForeignKey(f"{ChunkContent.__tablename__}.hash"), nullable=True, index=True)
     document_id = Column(UUIDString)
     document_type = Column(String, nullable=False)
 
@@ -90,7 +119,7 @@ class SourceWeb(Table):
     url = Column(String, nullable=False)
     description = Column(String, nullable=False)
     title = Column(String, nullable=False)
-    paragraphs = Column(String)
+    paragraphs = Column(CompressedText)
 
 
 class SqlSourceResponse(Table):
@@ -101,3 +130,18 @@ class SqlSourceResponse(Table):
     query = Column(String, nullable=False)
     result = Column(String, nullable=True)
 
+
+
+class AnswerCacheEntry(Table):
+    """Answer generated for a question, reused for the same or a near duplicate question on the same sources"""
+    __tablename__ = "answer_cache"
+    workspace_id = Column(UUIDString, ForeignKey(f"{Workspace.__tablename__}.id", ondelete='CASCADE'), nullable=False)
+    model_code = Column(String, nullable=False)
+    model_name = Column(String, nullable=True)
+    sources_hash = Column(String(64), nullable=False, comment="sha256 of the sorted source chunks and web urls")
+    question_hash = Column(String(64), nullable=False, comment="sha256 of the normalized question")
+    question_numbers = Column(String, nullable=False, comment="numbers of the question, near duplicates must match")
+    question_signature = Column(ARRAY(BigInteger), nullable=False, comment="MinHash of the normalized question")
+    answer = Column(String, nullable=False)
+
+    __table_args__ = (Index("ix_answer_cache_lookup", "workspace_id", "model_code", "sources_hash"),)
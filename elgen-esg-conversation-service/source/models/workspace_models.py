@@ -30,6 +30,7 @@ class Workspace(Table):
     classification_change_enabled = Column(Boolean, nullable=True, default=True)
     available_model_codes = Column(String, nullable=True)
     stop_answer_process = Column(Boolean, nullable=True, default=False)
+    answer_cache_enabled = Column(Boolean, nullable=False, default=False)
 
     type = relationship("WorkspaceType", back_populates="workspaces")
 
@@ -0,0 +1,37 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import Row, asc
+from sqlalchemy.exc import SQLAlchemyError
+
+from configuration.logging_setup import logger
+from source.exceptions.service_exceptions import DatabaseConnectionError
+from source.helpers.db_helpers import DBHelper
+from source.models.conversations_models import InferenceLatencyRollup
+
+
+class AnalyticsRepository:
+
+    def __init__(self, database_helper: DBHelper):
+        self.database_helper = database_helper
+
+    def get_latency_rollups(self, start_date: datetime, end_date: datetime,
+                            model_code: str | None = None,
+                            workspace_id: UUID | None = None) -> list[Row]:
+        """Return the hourly latency rollups between two dates, ordered by hour"""
+        filters = [InferenceLatencyRollup.hour >= start_date, InferenceLatencyRollup.hour < end_date]
+        if model_code:
+            filters.append(InferenceLatencyRollup.model_code == model_code)
+        if workspace_id:
+            filters.append(InferenceLatencyRollup.workspace_id == workspace_id)
+        try:
+            with self.database_helper.session() as session:
+                return session.query(InferenceLatencyRollup.hour,
+                                     InferenceLatencyRollup.answer_count,
+                                     InferenceLatencyRollup.inference_time_sum,
+                                     InferenceLatencyRollup.prompt_length_sum,
+                                     InferenceLatencyRollup.histogram) \
+                    .filter(*filters).order_by(asc(InferenceLatencyRollup.hour)).all()
+        except SQLAlchemyError as error:
+            logger.error(f'A data error happened on get latency rollups {error}')
+            raise DatabaseConnectionError(f"Database connection error: {error}")
@@ -0,0 +1,73 @@
+from uuid import UUID
+
+from sqlalchemy import Row, delete
+from sqlalchemy.exc import SQLAlchemyError
+
+from configuration.logging_setup import logger
+from source.exceptions.service_exceptions import DatabaseConnectionError
+from source.helpers.db_helpers import DBHelper
+from source.models.conversations_models import AnswerCacheEntry, Question, Conversation
+from source.models.workspace_models import Workspace
+
+
+class AnswerCacheRepository:
+
+    def __init__(self, database_helper: DBHelper):
+        self.database_helper = database_helper
+
+    def get_question_workspace(self, question_id: UUID) -> Row | None:
+        """Return the workspace id of a question and whether its answer cache is enabled"""
+        try:
+            with self.database_helper.session() as session:
+                return session.query(Workspace.id.label("workspace_id"), Workspace.answer_cache_enabled) \
+                    .join(Conversation, Conversation.workspace_id == Workspace.id) \
+                    .join(Question, Question.conversation_id == Conversation.id) \
+                    .filter(Question.id == question_id).one_or_none()
+        except SQLAlchemyError as error:
+            logger.error(f'A data error happened on get workspace of question {question_id} {error}')
+            raise DatabaseConnectionError(f"Database connection error: {error}")
+
+    def get_entries(self, workspace_id: UUID, model_code: str, sources_hash: str, question_numbers: str) -> list[Row]:
+        """Return the cached answers of a workspace and model generated on the same sources for the same numbers"""
+        try:
+            with self.database_helper.session() as session:
+                return session.query(AnswerCacheEntry.question_hash,
+                                     AnswerCacheEntry.question_signature,
+                                     AnswerCacheEntry.answer,
+                                     AnswerCacheEntry.model_name) \
+                    .filter(AnswerCacheEntry.workspace_id == workspace_id,
+                            AnswerCacheEntry.model_code == model_code,
+                            AnswerCacheEntry.sources_hash == sources_hash,
+                            AnswerCacheEntry.question_numbers == question_numbers).all()
+        except SQLAlchemyError as error:
+            logger.error(f'A data error happened on get answer cache entries {error}')
+            raise DatabaseConnectionError(f"Database connection error: {error}")
+
+    def add_entry(self, workspace_id: UUID, model_code: str, model_name: str | None, sources_hash: str,
+                  question_hash: str, question_numbers: str, question_signature: list[int], answer: str) -> None:
+        try:
+            with self.database_helper.session() as session:
+                session.add(AnswerCacheEntry(workspace_id=workspace_id,
+                                             model_code=model_code,
+                                             model_name=model_name,
+                                             sources_hash=sources_hash,
+                                             question_hash=question_hash,
+                                             question_numbers=question_numbers,
+                                             question_signature=question_signature,
+                                             answer=answer))
+                session.commit()
+        except SQLAlchemyError as error:
+            logger.error(f'An error happened on add answer cache entry {error}')
+            raise DatabaseConnectionError(f"Cannot add answer cache entry: {error}")
+
+    def delete_workspace_entries(self, workspace_id: UUID) -> int:
+        """Delete all the cached answers of a workspace and return how many there were"""
+        try:
+            with self.database_helper.session() as session:
+                deleted_entries = session.execute(
+                    delete(AnswerCacheEntry).where(AnswerCacheEntry.workspace_id == workspace_id)).rowcount
+                session.commit()
+                return deleted_entries
+        except SQLAlchemyError as error:
+            logger.error(f'An error happened on delete answer cache of workspace {workspace_id} {error}')
+            raise DatabaseConnectionError(f"Cannot delete answer cache entries: {error}")
@@ -1,8 +1,10 @@
-from datetime import datetime
-from typing import Tuple
+import hashlib
+from datetime import datetime, timedelta
+from typing import Tuple, Generator
 from uuid import UUID
 
-from sqlalchemy import desc, Row, asc
+from sqlalchemy import desc, Row, asc, func, select, literal_column, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import NoResultFound, DataError, SQLAlchemyError, IntegrityError
 from sqlalchemy.orm import scoped_session
 
@@ -10,14 +12,20 @@ from configuration.logging_setup import logger
 from source.exceptions.service_exceptions import DatabaseConnectionError, DatabaseIntegrityError, \
     ResourceOwnershipException
 from source.helpers.db_helpers import DBHelper
+from source.helpers.histogram_helpers import LatencyHistogram
 from source.models.conversations_models import Conversation, Answer, Question, SourceDocument, SourceWeb, \
-    AnswerAnalytics
+    AnswerAnalytics, ChunkContent, InferenceLatencyRollup
 from source.models.workspace_models import Workspace
-from source.schemas.conversation_schema import ConversationSchema
+from source.schemas.conversation_schema import ConversationSchema, SourceSchema, ConversationHistorySchema, \
+    WebSourceSchema
 from source.schemas.models_schema import ModelServiceAnswer
+from source.utils.constants import NO_WORKSPACE_ID
 
 
 class ConversationRepository:
+    CREATION_DATE_MARGIN = timedelta(days=1)
+    # must stay below ArchivalConfig.ORPHANED_CHUNKS_GRACE_HOURS
+    CHUNK_CITATION_REFRESH_INTERVAL = timedelta(hours=1)
 
     def __init__(self, database_helper: DBHelper):
         self.database_helper = database_helper
@@ -86,13 +94,16 @@ class ConversationRepository:
 
     def get_conversation_by_id(self, conversation_id: UUID) -> list[Row]:
         with self.database_helper.session() as session:
-            conversation_exists = session.query(Conversation.id).filter(
+            conversation_date = session.query(Conversation.creation_date).filter(
                 Conversation.id == conversation_id,
                 Conversation.deleted == False
-            ).exists()
+            ).scalar()
 
-            if not session.query(conversation_exists).scalar():
+            if conversation_date is None:
                 raise NoResultFound(f'No result found for conversation {conversation_id}')
+            # questions and answers are never older than their conversation, bounding their creation date lets
+            # postgres skip the monthly partitions before it, the margin covers clock skew between app instances
+            oldest_date = conversation_date - self.CREATION_DATE_MARGIN
             query = session.query(Conversation.id.label("conv_id"), Question.id.label("quest_id"),
                                   Question.content.label("quest_content"),
                                   Question.creation_date.label("quest_date"),
@@ -107,8 +118,10 @@ class ConversationRepository:
                                   Answer.update_date.label("update_date")
                                   ) \
                 .join(Question, Conversation.id == Question.conversation_id) \
-                .join(Answer, Question.id == Answer.question_id, isouter=True).filter(
+                .join(Answer, (Question.id == Answer.question_id) & (Answer.creation_date >= oldest_date),
+                      isouter=True).filter(
                 Conversation.id == conversation_id, Question.deleted == False,
+                Question.creation_date >= oldest_date,
                 Conversation.deleted == False).order_by(
                 asc(Question.creation_date))
             return query.all()
@@ -120,6 +133,52 @@ class ConversationRepository:
             raise NoResultFound(f'Result not found for conversation {conversation_id}')
         return conversation_id[0], self.get_conversation_by_id(conversation_id[0])
 
+    def stream_questions_for_export(self, workspace_id: UUID,
+                                    user_id: UUID | None = None,
+                                    start_date: datetime | None = None,
+                                    end_date: datetime | None = None,
+                                    batch_size: int = 1000) -> Generator[Row, None, None]:
+        """
+        Stream every question of a workspace along with its answer, the rows are fetched from a server side cursor
+        batch_size rows at a time so memory stays constant whatever the size of the workspace history
+        """
+        filters = [Conversation.workspace_id == workspace_id,
+                   Conversation.deleted == False,
+                   Question.deleted == False]
+        if user_id:
+            filters.append(Conversation.user_id == user_id)
+        if start_date:
+            filters.append(Question.creation_date >= start_date)
+        if end_date:
+            filters.append(Question.creation_date < end_date)
+
+        with self.database_helper.session() as session:
+            query = session.query(Conversation.id.label("conversation_id"),
+                                  Conversation.title.label("conversation_title"),
+                                  Conversation.user_id.label("user_id"),
+                                  Question.id.label("question_id"),
+                                  Question.content.label("question_content"),
+                                  Question.creation_date.label("question_date"),
+                                  Question.skip_doc.label("skip_doc"),
+                                  Question.skip_web.label("skip_web"),
+                                  Question.is_specific.label("is_specific"),
+                                  Answer.id.label("answer_id"),
+                                  Answer.content.label("answer_content"),
+                                  Answer.creation_date.label("answer_date"),
+                                  Answer.rating.label("rating"),
+                                  Answer.edited.label("edited")
+                                  ) \
+                .join(Question, Conversation.id == Question.conversation_id) \
+                .join(Answer, Question.id == Answer.question_id, isouter=True) \
+                .filter(*filters) \
+                .order_by(asc(Conversation.creation_date), asc(Conversation.id), asc(Question.creation_date)) \
+                .yield_per(batch_size)
+            try:
+                yield from query
+            except SQLAlchemyError as ex:
+                logger.error(f'An error happened on export of conversations for workspace {workspace_id} {ex}')
+                raise DatabaseConnectionError(f'Cannot export conversations {ex}') from ex
+
     def get_question_by_id(self, question_id: UUID) -> Row:
         """For a certain user id, return the list of all conversation ids"""
         try:
@@ -201,6 +260,126 @@ class ConversationRepository:
                 raise DatabaseConnectionError(f'Cannot create question {ex}') from ex
             return question_object
 
+    def update_question_classification(self, question_id: UUID, creation_date: datetime, is_specific: bool,
+                                       skip_doc: bool, skip_web: bool) -> None:
+        """Store the classification of a question, the creation date restricts the update to its partition"""
+        try:
+            with self.database_helper.session() as session:
+                session.execute(update(Question).where(Question.id == question_id,
+                                                       Question.creation_date == creation_date)
+                                .values(is_specific=is_specific, skip_doc=skip_doc, skip_web=skip_web))
+                session.commit()
+        except SQLAlchemyError as ex:
+            logger.error(f'An error happened on update classification for question_id {question_id} {ex}')
+            raise DatabaseConnectionError(f'Cannot update question {ex}') from ex
+
+    def get_conversation_history(self, question_id: UUID) -> Row | None:
+        """Return the summary and last turns of the conversation of a question, a single row whatever its length"""
+        try:
+            with self.database_helper.session() as session:
+                return session.query(Conversation.id.label("conversation_id"),
+                                     Conversation.history_summary.label("summary"),
+                                     Conversation.recent_turns) \
+                    .join(Question, Question.conversation_id == Conversation.id) \
+                    .filter(Question.id == question_id).one_or_none()
+        except SQLAlchemyError as ex:
+            logger.error(f'An error happened on get conversation history for question_id {question_id} {ex}')
+            raise DatabaseConnectionError(f'Database connection error: {ex}') from ex
+
+    @staticmethod
+    def _place_turn(turns: list[dict], question_id: UUID, turn: dict | None) -> list[dict]:
+        """
+        The turns with the one of a question replaced by turn, or removed if turn is None, ordered by question date
+        whatever the order the updates ran in. Turns written before they had a question date are the oldest.
+        """
+        turns = [other_turn for other_turn in turns if other_turn["question_id"] != str(question_id)]
+        if turn:
+            turns.append(turn)
+        return sorted(turns, key=lambda other_turn: other_turn.get("question_date", ""))
+
+    def append_conversation_turn(self, question_id: UUID, answer: str) -> ConversationHistorySchema | None:
+        """
+        Append an answered question to the last turns of its conversation, or replace its turn if it was answered
+        again. The conversation row is locked so that concurrent updates and folds of the same conversation are
+        serialized, the turns stay ordered by question date whichever update commits first.
+
+        Returns:
+            ConversationHistorySchema: the history after the append, None if the question does not exist
+        """
+        try:
+            with self.database_helper.session() as session:
+                question = session.query(Question.conversation_id, Question.content, Question.creation_date) \
+                    .filter(Question.id == question_id).one_or_none()
+                if not question:
+                    return None
+                conversation = session.query(Conversation).filter(Conversation.id == question.conversation_id) \
+                    .with_for_update().one()
+                conversation.recent_turns = self._place_turn(
+                    conversation.recent_turns, question_id,
+                    {"question_id": str(question_id), "question": question.content, "answer": answer,
+                     "question_date": question.creation_date.isoformat()})
+                session.commit()
+                return ConversationHistorySchema(conversation_id=conversation.id,
+                                                 summary=conversation.history_summary,
+                                                 recent_turns=conversation.recent_turns)
+        except SQLAlchemyError as ex:
+            logger.error(f'An error happened on append conversation turn for question_id {question_id} {ex}')
+            raise DatabaseConnectionError(f'Cannot update conversation history {ex}') from ex
+
+    def refresh_conversation_turn(self, question_id: UUID) -> bool:
+        """
+        Replace the turn of a question in the last turns of its conversation by its current answer, or drop it once
+        the question is deleted or has no answer. A turn already folded stays in the summary as it was.
+
+        Returns:
+            bool: whether the turn of the question was in the last turns
+        """
+        try:
+            with self.database_helper.session() as session:
+                question = session.query(Question.conversation_id, Question.content, Question.creation_date,
+                                         Question.deleted).filter(Question.id == question_id).one_or_none()
+                if not question:
+                    return False
+                conversation = session.query(Conversation).filter(Conversation.id == question.conversation_id) \
+                    .with_for_update().one()
+                if str(question_id) not in [turn["question_id"] for turn in conversation.recent_turns]:
+                    session.rollback()
+                    return False
+                answer = session.query(Answer.content).filter(Answer.question_id == question_id) \
+                    .order_by(desc(Answer.creation_date)).first()
+                turn = None if question.deleted or not answer else {
+                    "question_id": str(question_id), "question": question.content, "answer": answer.content,
+                    "question_date": question.creation_date.isoformat()}
+                conversation.recent_turns = self._place_turn(conversation.recent_turns, question_id, turn)
+                session.commit()
+                return True
+        except SQLAlchemyError as ex:
+            logger.error(f'An error happened on refresh conversation turn for question_id {question_id} {ex}')
+            raise DatabaseConnectionError(f'Cannot update conversation history {ex}') from ex
+
+    def fold_conversation_turns(self, conversation_id: UUID, folded_question_ids: list[str], summary: str) -> bool:
+        """
+        Replace the summary of a conversation by one covering its oldest turns and drop those turns
+
+        Returns:
+            bool: False when the oldest turns are no longer the folded ones, another update went first
+        """
+        try:
+            with self.database_helper.session() as session:
+                conversation = session.query(Conversation).filter(Conversation.id == conversation_id) \
+                    .with_for_update().one_or_none()
+                oldest_turns = conversation.recent_turns[:len(folded_question_ids)] if conversation else []
+                if [turn["question_id"] for turn in oldest_turns] != folded_question_ids:
+                    session.rollback()
+                    return False
+                conversation.history_summary = summary
+                conversation.recent_turns = conversation.recent_turns[len(folded_question_ids):]
+                session.commit()
+                return True
+        except SQLAlchemyError as ex:
+            logger.error(f'An error happened on fold conversation turns for conversation {conversation_id} {ex}')
+            raise DatabaseConnectionError(f'Cannot update conversation history {ex}') from ex
+
     def _create_answer_analytics_object(self, answer_response: ModelServiceAnswer, answer_id: UUID,
                                         model_code: str) -> AnswerAnalytics:
         """
@@ -224,8 +403,38 @@ class ConversationRepository:
         answer_analytics_object.repetition_penalty = metadata.get('repetition_penalty')
         return answer_analytics_object
 
-    def create_answer(self, answer: ModelServiceAnswer, question_id: UUID) -> Row:
-        """Create a conversation and return its id"""
+    @staticmethod
+    def _latency_rollup_upsert(answer_response: ModelServiceAnswer, question_id: UUID):
+        """Statement adding an answer inference time to the rollup of its model, workspace and hour"""
+        rollup_table = InferenceLatencyRollup.__table__
+        workspace_id = select(Conversation.workspace_id) \
+            .join(Question, Question.conversation_id == Conversation.id) \
+            .where(Question.id == question_id).scalar_subquery()
+        statement = insert(InferenceLatencyRollup).values(
+            model_code=answer_response.model_code,
+            workspace_id=func.coalesce(workspace_id, NO_WORKSPACE_ID),
+            hour=func.date_trunc("hour", func.now()),
+            answer_count=1,
+            inference_time_sum=answer_response.inference_time,
+            prompt_length_sum=answer_response.prompt_length or 0,
+            histogram=LatencyHistogram.single(answer_response.inference_time)
+        )
+        return statement.on_conflict_do_update(
+            index_elements=[rollup_table.c.model_code, rollup_table.c.workspace_id, rollup_table.c.hour],
+            set_={
+                "answer_count": rollup_table.c.answer_count + statement.excluded.answer_count,
+                "inference_time_sum": rollup_table.c.inference_time_sum + statement.excluded.inference_time_sum,
+                "prompt_length_sum": rollup_table.c.prompt_length_sum + statement.excluded.prompt_length_sum,
+                "histogram": literal_column(
+                    "ARRAY(SELECT existing + added "
+                    "FROM unnest(inference_latency_rollup.histogram, excluded.histogram) "
+                    "WITH ORDINALITY AS bucket(existing, added, position) ORDER BY position)"
+                )
+            }
+        )
+
+    def create_answer(self, answer: ModelServiceAnswer, question_id: UUID, record_latency: bool = True) -> Row:
+        """Create a conversation and return its id, record_latency=False keeps it out of the latency rollups"""
         with self.database_helper.session() as session:
             try:
                 answer_object = Answer()
@@ -243,6 +452,8 @@ class ConversationRepository:
                     model_code=answer.model_code
                 )
                 session.add(answer_analytics_object)
+                if record_latency:
+                    session.execute(self._latency_rollup_upsert(answer_response=answer, question_id=question_id))
                 session.commit()
                 return answer_object
 
@@ -252,27 +463,76 @@ class ConversationRepository:
                 logger.error(f'An error happened on create answer for question_id {question_id} {ex}')
                 raise DatabaseConnectionError(f'Cannot create answer {ex}')
 
+    @staticmethod
+    def _source_document_columns() -> tuple:
+        """Source document columns, the chunk text being read from chunk_content or from legacy rows"""
+        return (SourceDocument.id,
+                SourceDocument.question_id,
+                SourceDocument.document_path,
+                SourceDocument.document_id,
+                SourceDocument.document_type,
+                SourceDocument.creation_date,
+                func.coalesce(ChunkContent.content, SourceDocument.content).label("content"))
+
     def get_sources_by_question_id(self, question_id: UUID) -> list[Row]:
         try:
             with self.database_helper.session() as session:
-                return session.query(SourceDocument).filter(SourceDocument.question_id == question_id,
-                                                            SourceDocument.deleted == False).all()
+                return session.query(*self._source_document_columns()) \
+                    .join(ChunkContent, ChunkContent.hash == SourceDocument.content_hash, isouter=True) \
+                    .filter(SourceDocument.question_id == question_id,
+                            SourceDocument.deleted == False).all()
         except SQLAlchemyError as ex:
             logger.error(f'An error happened on get sources by question by id for question_id {question_id} {ex}')
 
             raise DatabaseConnectionError(f'Cannot create source documents {ex}')
 
-    def create_source_document(self, question_id: UUID, file_name: str, content: str, document_type: str,
-                               document_id: UUID) -> Row:
+    @staticmethod
+    def compute_content_hash(content: str) -> str:
+        """Key of a chunk in chunk_content, must stay in line with the backfill migration"""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _add_source_documents(self, session: scoped_session, question_id: UUID,
+                              source_documents: list[SourceSchema]) -> list[SourceDocument]:
+        """
+        Adds the source documents of a question to the session, the chunks text is upserted once in chunk_content
+        and every source document only references it by hash
+        """
+        chunks = {self.compute_content_hash(source_document.content): source_document.content
+                  for source_document in source_documents}
+        source_objects = [SourceDocument(question_id=str(question_id),
+                                         document_path=source_document.file_name,
+                                         content_hash=self.compute_content_hash(source_document.content),
+                                         document_id=source_document.document_id,
+                                         document_type=source_document.document_type or 'pdf')
+                          for source_document in source_documents]
+        if not source_objects:
+            return []
+        # sorted so that concurrent upserts of the same chunks always lock them in the same order. Existing chunks
+        # are locked until the source documents are saved, so that the orphaned chunks collection skips them, and
+        # their date is refreshed at most once per CHUNK_CITATION_REFRESH_INTERVAL to keep them out of its grace period
+        chunk_insert = insert(ChunkContent).values([
+            {"hash": content_hash, "content": chunks[content_hash], "creation_date": func.now()}
+            for content_hash in sorted(chunks)
+        ])
+        session.execute(chunk_insert.on_conflict_do_update(
+            index_elements=[ChunkContent.hash],
+            set_={"creation_date": chunk_insert.excluded.creation_date},
+            where=ChunkContent.creation_date < func.now() - self.CHUNK_CITATION_REFRESH_INTERVAL
+        ))
+        session.add_all(source_objects)
+        return source_objects
+
+    def create_source_documents(self, question_id: UUID, source_documents: list[SourceSchema]) -> list[SourceDocument]:
+        """
+        Create the source documents of a question, the chunks text is upserted once in chunk_content
+        and every source document only references it by hash
+        """
+        if not source_documents:
+            return []
+
         with self.database_helper.session() as session:
-            source_object = SourceDocument()
-            source_object.question_id = str(question_id)
-            source_object.document_path = file_name
-            source_object.content = content
-            source_object.document_id = document_id
-            source_object.document_type = document_type or 'pdf'
-            session.add(source_object)
             try:
+                source_objects = self._add_source_documents(session, question_id, source_documents)
                 session.commit()
             except DataError as ex:
                 session.rollback()
@@ -285,7 +545,33 @@ class ConversationRepository:
                     f'An error happened on create sources by question by id for question_id {question_id} {ex}')
 
                 raise DatabaseConnectionError(f'Cannot create source documents {ex}')
-            return source_object
+            return source_objects
+
+    def create_retrieved_sources(self, question_id: UUID, source_documents: list[SourceSchema],
+                                 web_sources: list[WebSourceSchema]) -> tuple[list[SourceDocument], list[SourceWeb]]:
+        """Create the source documents and the web sources retrieved for a question in a single transaction"""
+        web_objects = [SourceWeb(question_id=str(question_id), url=web_source.url,
+                                 description=web_source.description, title=web_source.title,
+                                 paragraphs=web_source.paragraphs)
+                       for web_source in web_sources]
+
+        with self.database_helper.session() as session:
+            try:
+                source_objects = self._add_source_documents(session, question_id, source_documents)
+                session.add_all(web_objects)
+                session.commit()
+            except DataError as ex:
+                session.rollback()
+                logger.error(
+                    f'An error happened on create retrieved sources for question_id {question_id} {ex}')
+
+                raise DatabaseConnectionError(f'Cannot create retrieved sources {ex}')
+            except SQLAlchemyError as ex:
+                logger.error(
+                    f'An error happened on create retrieved sources for question_id {question_id} {ex}')
+
+                raise DatabaseConnectionError(f'Cannot create retrieved sources {ex}')
+            return source_objects, web_objects
 
     def create_web_source(self, question_id: UUID, url: str, description: str, title: str, paragraphs: str) -> Row:
         with self.database_helper.session() as session:
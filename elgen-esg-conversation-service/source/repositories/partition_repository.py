@@ -0,0 +1,150 @@
+from datetime import date
+from typing import IO, Sequence
+
+from psycopg2 import Error as DriverError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from configuration.logging_setup import logger
+from source.exceptions.service_exceptions import DatabaseConnectionError
+from source.helpers.db_helpers import DBHelper
+
+
+class PartitionRepository:
+    """Maintenance of the monthly partitions of the conversation tables, partitions are named <table>_YYYY_MM"""
+
+    def __init__(self, database_helper: DBHelper):
+        self.database_helper = database_helper
+
+    def _quote(self, identifier: str) -> str:
+        return self.database_helper.engine.dialect.identifier_preparer.quote(identifier)
+
+    @staticmethod
+    def get_partition_name(table_name: str, month_start: date) -> str:
+        return f"{table_name}_{month_start:%Y_%m}"
+
+    def get_monthly_partitions(self, table_name: str, attached: bool = True) -> dict[date, str]:
+        """
+        Return the monthly partitions of a table by the first day of their month, attached=False returns instead
+        the partitions left detached by an interrupted archival
+        """
+        try:
+            with self.database_helper.session() as session:
+                partition_names = session.execute(text(
+                    "SELECT relname FROM pg_class "
+                    "WHERE relkind IN ('r', 'p') AND relispartition = :attached AND relname ~ :name_pattern"
+                ), {"attached": attached,
+                    "name_pattern": rf"^{table_name}_[0-9]{{4}}_[0-9]{{2}}$"}).scalars().all()
+        except SQLAlchemyError as error:
+            logger.error(f'A data error happened on get partitions of {table_name} {error}')
+            raise DatabaseConnectionError(f"Database connection error: {error}")
+        return {date(int(partition_name[-7:-3]), int(partition_name[-2:]), 1): partition_name
+                for partition_name in partition_names}
+
+    def create_monthly_partition(self, table_name: str, month_start: date, month_end: date) -> str:
+        """Create the partition of a month if it does not exist yet"""
+        partition_name = self.get_partition_name(table_name, month_start)
+        try:
+            with self.database_helper.session() as session:
+                session.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {self._quote(partition_name)} PARTITION OF {self._quote(table_name)} "
+                    f"FOR VALUES FROM ('{month_start.isoformat()}') TO ('{month_end.isoformat()}')"
+                ))
+        except SQLAlchemyError as error:
+            logger.error(f'An error happened on create partition {partition_name} {error}')
+            raise DatabaseConnectionError(f"Cannot create partition {partition_name}: {error}")
+        return partition_name
+
+    def detach_partition(self, table_name: str, partition_name: str) -> None:
+        """Detach a partition, its rows stay in a standalone table that no query on the parent table reaches"""
+        try:
+            with self.database_helper.session() as session:
+                session.execute(text(
+                    f"ALTER TABLE {self._quote(table_name)} DETACH PARTITION {self._quote(partition_name)}"
+                ))
+        except SQLAlchemyError as error:
+            logger.error(f'An error happened on detach partition {partition_name} {error}')
+            raise DatabaseConnectionError(f"Cannot detach partition {partition_name}: {error}")
+
+    def has_rows(self, table_name: str, created_before: date | None = None) -> bool:
+        """Whether a table, or its part created before a date, has any row"""
+        condition = f" WHERE creation_date < '{created_before.isoformat()}'" if created_before else ""
+        try:
+            with self.database_helper.session() as session:
+                return session.execute(text(
+                    f"SELECT EXISTS (SELECT 1 FROM {self._quote(table_name)}{condition})"
+                )).scalar()
+        except SQLAlchemyError as error:
+            logger.error(f'An error happened on count of the rows of {table_name} {error}')
+            raise DatabaseConnectionError(f"Cannot read {table_name}: {error}")
+
+    def drop_partition(self, table_name: str, partition_name: str, attached: bool = True) -> None:
+        """Drop an empty partition, detaching it first so that the parent table is only locked briefly"""
+        try:
+            with self.database_helper.session() as session:
+                if attached:
+                    session.execute(text(
+                        f"ALTER TABLE {self._quote(table_name)} DETACH PARTITION {self._quote(partition_name)}"
+                    ))
+                session.execute(text(f"DROP TABLE {self._quote(partition_name)}"))
+        except SQLAlchemyError as error:
+            logger.error(f'An error happened on drop partition {partition_name} {error}')
+            raise DatabaseConnectionError(f"Cannot drop partition {partition_name}: {error}")
+
+    def archive_questions(self, question_table: str, file: IO[str],
+                          referencing_rows: Sequence[tuple[str, str, str, IO[str]]],
+                          created_before: date | None = None, chunk_file: IO[str] | None = None) -> None:
+        """
+        Write the questions of question_table and the rows referencing them as csv, then remove them, in one
+        transaction. The questions are those created before created_before if set, and the whole table otherwise,
+        which is then dropped: it is meant for a detached partition. The selected rows of a partition of question
+        are deleted instead.
+        referencing_rows lists (table, column, referenced table, file) of the rows referencing through column the
+        questions or their answers, in the order they are written and deleted.
+        chunk_file receives the chunk_content rows cited by the source documents of the questions, these are shared
+        with other questions and left to delete_orphaned_chunks.
+        """
+        quoted_table = self._quote(question_table)
+        condition = f" WHERE creation_date < '{created_before.isoformat()}'" if created_before else ""
+        selections = {"question": f"SELECT id FROM {quoted_table}{condition}"}
+        selections["answer"] = f"SELECT id FROM answer WHERE question_id IN ({selections['question']})"
+        try:
+            with self.database_helper.session() as session:
+                cursor = session.connection().connection.cursor()
+                for referencing_table, column, referenced_table, referencing_file in referencing_rows:
+                    cursor.copy_expert(f"COPY (SELECT * FROM {self._quote(referencing_table)} "
+                                       f"WHERE {self._quote(column)} IN ({selections[referenced_table]})) "
+                                       f"TO STDOUT WITH (FORMAT csv, HEADER)", referencing_file)
+                if chunk_file:
+                    cursor.copy_expert(f"COPY (SELECT * FROM chunk_content WHERE hash IN (SELECT content_hash "
+                                       f"FROM source_document WHERE question_id IN ({selections['question']}))) "
+                                       f"TO STDOUT WITH (FORMAT csv, HEADER)", chunk_file)
+                cursor.copy_expert(f"COPY (SELECT * FROM {quoted_table}{condition}) "
+                                   f"TO STDOUT WITH (FORMAT csv, HEADER)", file)
+                # the answers are deleted once the rows referencing them are gone, which their selection reads
+                for referencing_table, column, referenced_table, _ in referencing_rows:
+                    cursor.execute(f"DELETE FROM {self._quote(referencing_table)} "
+                                   f"WHERE {self._quote(column)} IN ({selections[referenced_table]})")
+                cursor.execute(f"DELETE FROM {quoted_table}{condition}" if created_before
+                               else f"DROP TABLE {quoted_table}")
+        except (SQLAlchemyError, DriverError) as error:
+            logger.error(f'An error happened on archive of {question_table} {error}')
+            raise DatabaseConnectionError(f"Cannot archive {question_table}: {error}")
+
+    def delete_orphaned_chunks(self, grace_hours: int) -> int:
+        """
+        Delete the chunk_content rows no source document cites anymore and last cited more than grace_hours ago,
+        the chunks locked by a source documents save in progress are skipped. Returns the number of deleted chunks
+        """
+        try:
+            with self.database_helper.session() as session:
+                return session.execute(text(
+                    "DELETE FROM chunk_content WHERE hash IN ("
+                    "SELECT hash FROM chunk_content "
+                    "WHERE creation_date < now() - make_interval(hours => :grace_hours) "
+                    "AND NOT EXISTS (SELECT 1 FROM source_document WHERE content_hash = chunk_content.hash) "
+                    "FOR UPDATE SKIP LOCKED)"
+                ), {"grace_hours": grace_hours}).rowcount
+        except SQLAlchemyError as error:
+            logger.error(f'An error happened on delete of the orphaned chunks {error}')
+            raise DatabaseConnectionError(f"Cannot delete the orphaned chunks: {error}")
@@ -0,0 +1,37 @@
+from datetime import datetime
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class TrendGranularity(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+
+class LatencyStatisticsSchema(BaseModel):
+    answer_count: int = Field(..., alias="answerCount")
+    mean: float | None = Field(None, description="Mean inference time in seconds")
+    p50: float | None = Field(None, description="Median inference time in seconds, estimated from the histogram")
+    p95: float | None = Field(None, description="95th percentile of the inference time in seconds")
+    p99: float | None = Field(None, description="99th percentile of the inference time in seconds")
+    prompt_tokens_per_second: float | None = Field(None, alias="promptTokensPerSecond",
+                                                   description="Prompt tokens per second of inference, the generated "
+                                                               "tokens are not recorded")
+
+    class Config:
+        allow_population_by_field_name = True
+
+
+class LatencyTrendPointSchema(LatencyStatisticsSchema):
+    period: datetime = Field(..., description="Start of the hour or day")
+
+
+class LatencyAnalyticsSchema(BaseModel):
+    start_date: datetime = Field(..., alias="startDate")
+    end_date: datetime = Field(..., alias="endDate")
+    overall: LatencyStatisticsSchema
+    trend: list[LatencyTrendPointSchema] = Field([], description="Statistics per period, empty periods omitted")
+
+    class Config:
+        allow_population_by_field_name = True
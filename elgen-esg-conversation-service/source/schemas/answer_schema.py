@@ -40,3 +40,23 @@ class VersionedAnswerResponse(BaseModel):
     class Config:
         allow_population_by_field_name = True
         orm_mode = True
+
+
+class AnswerCacheKeySchema(BaseModel):
+    workspace_id: UUID = Field(..., description="The workspace the question was asked in")
+    model_code: str = Field(..., description="The model generating the answer")
+    sources_hash: str = Field(..., description="sha256 of the sorted source chunks and web urls")
+    question_hash: str = Field(..., description="sha256 of the normalized question")
+    question_numbers: str = Field(..., description="Numbers of the question, a near duplicate must have the same")
+    question_signature: list[int] = Field(..., description="MinHash signature of the normalized question")
+
+
+class CachedAnswerSchema(BaseModel):
+    answer: str = Field(..., description="The cached answer")
+    model_name: str | None = Field(None, description="The name of the model that generated the answer")
+    similarity: float = Field(..., description="Estimated similarity between the cached and the asked question")
+
+
+class AnswerCacheInvalidationOutput(BaseModel):
+    workspace_id: UUID = Field(..., description="The workspace whose cached answers were dropped")
+    deleted_entries: int = Field(..., description="Number of dropped cached answers")
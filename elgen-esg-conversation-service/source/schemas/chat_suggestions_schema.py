@@ -15,3 +15,8 @@ class ChatSuggestion(BaseModel):
 
 class WorkspaceChatSuggestions(BaseModel):
     suggestions: list[ChatSuggestion] = Field([], description="List of suggested questions for the workspace")
+
+
+class MaterializedChatSuggestions(BaseModel):
+    content: bytes = Field(..., description="WorkspaceChatSuggestions serialized as the API returns it")
+    etag: str = Field(..., description="Entity tag of the content")
@@ -97,6 +97,9 @@ class QuestionSchema(BaseModel):
     local_sources: Optional[list[SourceSchema]] = Field(alias="localSources", default=None)
     web_sources: Optional[list[WebSourceSchema]] = Field(alias="webSources", default=None)
     is_specific: Optional[bool] = True
+    classified: Optional[bool] = Field(True, description="False when the question is returned before its "
+                                                         "classification completed or after it failed, is_specific "
+                                                         "and the skip flags are then the ones requested")
 
     class Config:
         allow_population_by_field_name = True
@@ -111,11 +114,61 @@ class SourceWebInput(BaseModel):
     web_sources: List[WebSourceSchema]
 
 
+class RetrievedSourcesSchema(BaseModel):
+    """The source documents and the web sources retrieved for a question, persisted together"""
+    similar_docs: List[SourceSchema] = []
+    web_sources: List[WebSourceSchema] = []
+
+
 class ChatSchema(BaseModel):
     id: UUID
     questions: List[QuestionSchema]
 
 
+class ConversationTurnSchema(BaseModel):
+    question_id: UUID
+    question: str
+    answer: str
+
+
+class ConversationHistorySchema(BaseModel):
+    """Compact history of a conversation: the summary of its older turns and its last turns verbatim"""
+    conversation_id: UUID
+    summary: str | None = None
+    recent_turns: List[ConversationTurnSchema] = Field(default_factory=list)
+
+    class Config:
+        orm_mode = True
+
+
 class AnswerOutputSchema(BaseModel):
     question_id: UUID = Field(..., description='The question id for the answer output', alias='id')
     answer: AnswerSchema = Field(..., description='The answer')
+
+
+class ConversationExportRecordSchema(BaseModel):
+    """One line of the NDJSON conversations export: a question and its answer, if any"""
+    conversation_id: UUID = Field(..., alias="conversationId")
+    conversation_title: str = Field(..., alias="conversationTitle")
+    user_id: UUID = Field(..., alias="userId")
+    question_id: UUID = Field(..., alias="questionId")
+    question_content: str = Field(..., alias="question")
+    question_date: datetime = Field(..., alias="questionTime")
+    skip_doc: Optional[bool] = Field(False, alias="skipDoc")
+    skip_web: Optional[bool] = Field(False, alias="skipWeb")
+    is_specific: Optional[bool] = Field(True, alias="isSpecific")
+    answer_id: Optional[UUID] = Field(None, alias="answerId")
+    answer_content: Optional[str] = Field(None, alias="answer")
+    answer_date: Optional[datetime] = Field(None, alias="answerTime")
+    rating: Optional[AnswerRatingEnum] = None
+    edited: Optional[bool] = None
+
+    class Config:
+        allow_population_by_field_name = True
+        orm_mode = True
+
+
+class ConversationExportErrorSchema(BaseModel):
+    """Last line of a conversations export interrupted once streaming started, the lines before it are incomplete"""
+    error: str = Field(..., description="why the export stopped")
+    complete: bool = Field(False, description="always false, tells the error line apart from the records")
@@ -12,6 +12,7 @@ class WorkspaceInput(BaseModel):
     active: bool | None = Field(True, description="workspace active or not")
     classification_change_enabled: bool | None = Field(None, description="Enable/disable classification")
     stop_answer_process: bool | None = Field(None, description="Enable/disable classification")
+    answer_cache_enabled: bool | None = Field(None, description="Reuse the answers to repeated questions")
     available_model_codes: list[str] | None = Field(None, description="List of available models for a workspace")
     source_type_id: UUID | None = Field(None, description="Type of source")
     source_id: UUID | None = Field(None, description="Id of source")
@@ -61,6 +62,7 @@ class WorkspaceTypeOutputModel(BaseModel):
 class GenericWorkspaceInfo(WorkspaceOutput):
     classification_change_enabled: bool | None = Field(None, description="Enable/disable classification")
     stop_answer_process: bool | None = Field(None, description="Enable/disable classification")
+    answer_cache_enabled: bool | None = Field(None, description="Reuse the answers to repeated questions")
     available_model_codes: list[str] = Field(..., description="List of available models for a workspace")
     workspace_type: WorkspaceTypeModel | None = Field(None, description="workspace type data")
 
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from itertools import groupby
+from uuid import UUID
+
+from sqlalchemy import Row
+
+from configuration.logging_setup import logger
+from source.exceptions.service_exceptions import DatabaseConnectionError, AnalyticsFetchDataError
+from source.helpers.histogram_helpers import LatencyHistogram
+from source.repositories.analytics_repository import AnalyticsRepository
+from source.schemas.analytics_schema import LatencyAnalyticsSchema, LatencyStatisticsSchema, \
+    LatencyTrendPointSchema, TrendGranularity
+
+
+class AnalyticsService:
+    """
+    Service class computing the inference latency statistics out of the hourly rollups, the cost of a request
+    depends on the number of hours and buckets in the range, not on the number of answers
+    """
+    DEFAULT_RANGE = timedelta(days=7)
+
+    def __init__(self, analytics_repository: AnalyticsRepository):
+        """
+        Initialize the AnalyticsService.
+
+        Args:
+            analytics_repository (AnalyticsRepository): The analytics repository to use.
+        """
+        self._analytics_repository = analytics_repository
+
+    @staticmethod
+    def _compute_statistics(rollups: list[Row]) -> dict:
+        answer_count = sum(rollup.answer_count for rollup in rollups)
+        if not answer_count:
+            return {"answer_count": 0}
+        inference_time_sum = sum(rollup.inference_time_sum for rollup in rollups)
+        histogram = LatencyHistogram.merge(rollup.histogram for rollup in rollups)
+        return {
+            "answer_count": answer_count,
+            "mean": inference_time_sum / answer_count,
+            "p50": LatencyHistogram.quantile(histogram, 0.5),
+            "p95": LatencyHistogram.quantile(histogram, 0.95),
+            "p99": LatencyHistogram.quantile(histogram, 0.99),
+            "prompt_tokens_per_second": sum(rollup.prompt_length_sum for rollup in rollups) / inference_time_sum
+            if inference_time_sum else None
+        }
+
+    def get_latency_analytics(self, start_date: datetime | None = None,
+                              end_date: datetime | None = None,
+                              model_code: str | None = None,
+                              workspace_id: UUID | None = None,
+                              granularity: TrendGranularity = TrendGranularity.HOUR) -> LatencyAnalyticsSchema:
+        """
+        Compute the inference latency percentiles and prompt throughput over a date range and their trend per period.
+
+        Args:
+            start_date (datetime): Start of the range, DEFAULT_RANGE before the end if omitted.
+            end_date (datetime): End of the range, now if omitted.
+            model_code (str): Only account for the answers of this model.
+            workspace_id (UUID): Only account for the answers given in this workspace.
+            granularity (TrendGranularity): Period of the trend points.
+
+        Returns:
+            LatencyAnalyticsSchema: The statistics over the whole range and per period.
+
+        Raises:
+            AnalyticsFetchDataError: If the rollups could not be read.
+        """
+        end_date = end_date or datetime.now().astimezone()
+        start_date = start_date or end_date - self.DEFAULT_RANGE
+        try:
+            rollups = self._analytics_repository.get_latency_rollups(start_date=start_date, end_date=end_date,
+                                                                     model_code=model_code,
+                                                                     workspace_id=workspace_id)
+        except DatabaseConnectionError as error:
+            logger.error(error)
+            raise AnalyticsFetchDataError(message=error.message) from error
+
+        period_start = (lambda hour: hour.replace(hour=0)) if granularity == TrendGranularity.DAY \
+            else (lambda hour: hour)
+        return LatencyAnalyticsSchema(
+            start_date=start_date,
+            end_date=end_date,
+            overall=LatencyStatisticsSchema(**self._compute_statistics(rollups)),
+            trend=[LatencyTrendPointSchema(period=period, **self._compute_statistics(list(period_rollups)))
+                   for period, period_rollups in groupby(rollups, key=lambda rollup: period_start(rollup.hour))]
+        )
@@ -0,0 +1,120 @@
+import hashlib
+import re
+from uuid import UUID
+
+from configuration.config import AnswerCacheConfig
+from configuration.logging_setup import logger
+from source.exceptions.service_exceptions import DatabaseConnectionError, AnswerCacheError
+from source.helpers.minhash_helpers import MinHash
+from source.repositories.answer_cache_repository import AnswerCacheRepository
+from source.repositories.conversation_repository import ConversationRepository
+from source.schemas.answer_schema import AnswerCacheKeySchema, CachedAnswerSchema
+from source.schemas.conversation_schema import SourceSchema, WebSourceSchema
+from source.utils.utils import normalize_question
+
+
+class AnswerCacheService:
+    """
+    Service class reusing the answers generated in the workspaces that enabled it: an answer is reused for the same
+    model, the same sources and the same question or a near duplicate of it, found by comparing MinHash signatures.
+    Character shingles barely tell "2022" from "2023" so near duplicates must also contain the same numbers.
+    """
+    NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+
+    def __init__(self, answer_cache_repository: AnswerCacheRepository, answer_cache_config: AnswerCacheConfig):
+        """
+        Initialize the AnswerCacheService.
+
+        Args:
+            answer_cache_repository (AnswerCacheRepository): The answer cache repository to use.
+            answer_cache_config (AnswerCacheConfig): The similarity threshold and signature size.
+        """
+        self._answer_cache_repository = answer_cache_repository
+        self._answer_cache_config = answer_cache_config
+        self._minhash = MinHash(permutations_count=answer_cache_config.ANSWER_CACHE_PERMUTATIONS)
+
+    @staticmethod
+    def compute_sources_hash(source_documents: list[SourceSchema], web_sources: list[WebSourceSchema]) -> str:
+        """Hash of the chunks, identified by their content hash, and of the web pages an answer is generated on"""
+        source_ids = sorted([ConversationRepository.compute_content_hash(source.content) for source in source_documents]
+                            + [web_source.url for web_source in web_sources])
+        return hashlib.sha256("\n".join(source_ids).encode("utf-8")).hexdigest()
+
+    def get_cache_key(self, question_id: UUID, question: str, model_code: str,
+                      source_documents: list[SourceSchema],
+                      web_sources: list[WebSourceSchema]) -> AnswerCacheKeySchema | None:
+        """
+        Build the key of the answer to a question.
+
+        Returns:
+            AnswerCacheKeySchema: The key, None if the workspace of the question does not use the answer cache.
+
+        Raises:
+            AnswerCacheError: If the workspace of the question could not be read.
+        """
+        try:
+            workspace = self._answer_cache_repository.get_question_workspace(question_id)
+        except DatabaseConnectionError as error:
+            raise AnswerCacheError(message=error.message) from error
+        if not workspace or not workspace.answer_cache_enabled:
+            return None
+        normalized_question = normalize_question(question)
+        return AnswerCacheKeySchema(workspace_id=workspace.workspace_id,
+                                    model_code=model_code,
+                                    sources_hash=self.compute_sources_hash(source_documents, web_sources),
+                                    question_hash=hashlib.sha256(normalized_question.encode("utf-8")).hexdigest(),
+                                    question_numbers=" ".join(self.NUMBER_PATTERN.findall(normalized_question)),
+                                    question_signature=self._minhash.signature(normalized_question))
+
+    def get_cached_answer(self, cache_key: AnswerCacheKeySchema) -> CachedAnswerSchema | None:
+        """
+        Find the cached answer to the same question, or else to the most similar question above the threshold.
+
+        Raises:
+            AnswerCacheError: If the cached answers could not be read.
+        """
+        try:
+            entries = self._answer_cache_repository.get_entries(workspace_id=cache_key.workspace_id,
+                                                                model_code=cache_key.model_code,
+                                                                sources_hash=cache_key.sources_hash,
+                                                                question_numbers=cache_key.question_numbers)
+        except DatabaseConnectionError as error:
+            raise AnswerCacheError(message=error.message) from error
+
+        cached_answer = None
+        for entry in entries:
+            if entry.question_hash == cache_key.question_hash:
+                return CachedAnswerSchema(answer=entry.answer, model_name=entry.model_name, similarity=1.0)
+            similarity = MinHash.similarity(cache_key.question_signature, entry.question_signature)
+            if similarity >= self._answer_cache_config.ANSWER_CACHE_SIMILARITY_THRESHOLD and \
+                    (cached_answer is None or similarity > cached_answer.similarity):
+                cached_answer = CachedAnswerSchema(answer=entry.answer, model_name=entry.model_name,
+                                                   similarity=similarity)
+        return cached_answer
+
+    def store_answer(self, cache_key: AnswerCacheKeySchema, answer: str, model_name: str | None) -> None:
+        """
+        Raises:
+            AnswerCacheError: If the answer could not be stored.
+        """
+        try:
+            self._answer_cache_repository.add_entry(answer=answer, model_name=model_name, **cache_key.dict())
+        except DatabaseConnectionError as error:
+            raise AnswerCacheError(message=error.message) from error
+
+    def invalidate_workspace(self, workspace_id: UUID) -> int:
+        """
+        Drop the cached answers of a workspace, to be called once new documents are ingested in it.
+
+        Returns:
+            int: The number of dropped answers.
+
+        Raises:
+            AnswerCacheError: If the answers could not be deleted.
+        """
+        try:
+            deleted_entries = self._answer_cache_repository.delete_workspace_entries(workspace_id)
+        except DatabaseConnectionError as error:
+            raise AnswerCacheError(message=error.message) from error
+        logger.info(f"Dropped {deleted_entries} cached answers of workspace {workspace_id}")
+        return deleted_entries
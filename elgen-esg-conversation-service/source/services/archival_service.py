@@ -0,0 +1,149 @@
+import gzip
+from contextlib import ExitStack
+from datetime import date
+from pathlib import Path
+
+from configuration.config import ArchivalConfig
+from configuration.logging_setup import logger
+from source.exceptions.service_exceptions import DatabaseConnectionError, PartitionArchivalError
+from source.repositories.partition_repository import PartitionRepository
+
+
+def add_months(month_start: date, months: int) -> date:
+    """First day of the month `months` months after the month of month_start"""
+    month_index = month_start.year * 12 + month_start.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+class ArchivalService:
+    """
+    Service class maintaining the monthly partitions of the high volume conversation tables:
+    partitions are created ahead of time and the ones older than the horizon are moved to compressed csv files.
+    """
+
+    PARTITIONED_TABLES = ("question", "answer", "answer_analytics")
+    QUESTION_TABLE = "question"
+    # (table, column, referenced table) of the rows archived along their question, a question is archived
+    # with its answers whatever their own month, the rows referencing an answer come before it
+    QUESTION_REFERENCES = [
+        ("answer_analytics", "answer_id", "answer"),
+        ("versioned_answer", "answer_id", "answer"),
+        ("answer", "question_id", "question"),
+        ("source_document", "question_id", "question"),
+        ("source_web", "question_id", "question"),
+        ("sql_source_response", "question_id", "question"),
+    ]
+    # text of the chunks cited by the archived source documents
+    CHUNK_TABLE = "chunk_content"
+
+    def __init__(self, partition_repository: PartitionRepository, archival_config: ArchivalConfig):
+        """
+        Initialize the ArchivalService.
+
+        Args:
+            partition_repository (PartitionRepository): The partition repository to use.
+            archival_config (ArchivalConfig): The horizon, archive directory and partitions to create ahead.
+        """
+        self._partition_repository = partition_repository
+        self._archival_config = archival_config
+
+    def create_upcoming_partitions(self, today: date | None = None) -> list[str]:
+        """
+        Create the partitions of the current month and of the next PARTITIONS_CREATED_AHEAD months,
+        so that new rows never land in the default partition.
+
+        Returns:
+            list[str]: The names of the partitions, existing ones included.
+        """
+        current_month = (today or date.today()).replace(day=1)
+        try:
+            return [self._partition_repository.create_monthly_partition(table_name=table_name,
+                                                                        month_start=add_months(current_month, months),
+                                                                        month_end=add_months(current_month, months + 1))
+                    for table_name in self.PARTITIONED_TABLES
+                    for months in range(self._archival_config.PARTITIONS_CREATED_AHEAD + 1)]
+        except DatabaseConnectionError as error:
+            raise PartitionArchivalError(message=error.message) from error
+
+    def archive_old_partitions(self, today: date | None = None) -> list[Path]:
+        """
+        Archive the questions whose month ended more than ARCHIVE_HORIZON_MONTHS ago: their partitions are detached,
+        then written with the answers and rows referencing them as csv.gz files under ARCHIVE_DIRECTORY and dropped.
+        The old questions of the default partition are archived likewise, and question partitions left detached by
+        an interrupted run too. The old answer and answer_analytics partitions are dropped once emptied this way,
+        and the chunk texts only cited by the archived source documents are deleted, they are archived with them.
+
+        Returns:
+            list[Path]: The written archive files.
+        """
+        horizon = add_months((today or date.today()).replace(day=1), -self._archival_config.ARCHIVE_HORIZON_MONTHS)
+        archive_files = []
+        try:
+            detached_partitions = self._partition_repository.get_monthly_partitions(self.QUESTION_TABLE,
+                                                                                    attached=False)
+            for month_start, partition_name in self._get_old_partitions(self.QUESTION_TABLE, horizon).items():
+                self._partition_repository.detach_partition(self.QUESTION_TABLE, partition_name)
+                detached_partitions[month_start] = partition_name
+            for month_start, partition_name in sorted(detached_partitions.items()):
+                archive_files.extend(self._archive_questions(partition_name, partition_name))
+
+            default_partition = f"{self.QUESTION_TABLE}_default"
+            if self._partition_repository.has_rows(default_partition, created_before=horizon):
+                archive_files.extend(self._archive_questions(default_partition,
+                                                             f"{default_partition}_before_{horizon:%Y_%m}",
+                                                             created_before=horizon))
+
+            for table_name in self.PARTITIONED_TABLES:
+                if table_name != self.QUESTION_TABLE:
+                    self._drop_empty_partitions(table_name, horizon)
+
+            deleted_chunks = self._partition_repository.delete_orphaned_chunks(
+                grace_hours=self._archival_config.ORPHANED_CHUNKS_GRACE_HOURS)
+            logger.info(f"Deleted {deleted_chunks} chunk texts no source document cites anymore")
+        except DatabaseConnectionError as error:
+            raise PartitionArchivalError(message=error.message) from error
+        return archive_files
+
+    def _get_old_partitions(self, table_name: str, horizon: date) -> dict[date, str]:
+        return {month_start: partition_name
+                for month_start, partition_name in self._partition_repository.get_monthly_partitions(table_name).items()
+                if add_months(month_start, 1) <= horizon}
+
+    def _archive_questions(self, question_table: str, archive_name: str,
+                           created_before: date | None = None) -> list[Path]:
+        """Write questions and the rows referencing them to csv.gz files, then remove them"""
+        archive_directory = Path(self._archival_config.ARCHIVE_DIRECTORY)
+        archive_directory.mkdir(parents=True, exist_ok=True)
+        archive_file = archive_directory / f"{archive_name}.csv.gz"
+        referencing_files = [archive_directory / f"{archive_name}.{referencing_table}.csv.gz"
+                             for referencing_table, _, _ in self.QUESTION_REFERENCES]
+        chunk_file = archive_directory / f"{archive_name}.{self.CHUNK_TABLE}.csv.gz"
+        with ExitStack() as files:
+            self._partition_repository.archive_questions(
+                question_table=question_table,
+                file=files.enter_context(gzip.open(archive_file, "wt")),
+                referencing_rows=[(referencing_table, column, referenced_table,
+                                   files.enter_context(gzip.open(referencing_file, "wt")))
+                                  for (referencing_table, column, referenced_table), referencing_file
+                                  in zip(self.QUESTION_REFERENCES, referencing_files)],
+                created_before=created_before,
+                chunk_file=files.enter_context(gzip.open(chunk_file, "wt"))
+            )
+        logger.info(f"Archived the questions of {question_table} to {archive_file}")
+        return [archive_file, *referencing_files, chunk_file]
+
+    def _drop_empty_partitions(self, table_name: str, horizon: date) -> None:
+        """
+        Drop the old partitions of a table archived along the questions, one still holding rows, answers of a
+        question not archived yet, is kept
+        """
+        partitions = [(partition_name, True)
+                      for partition_name in self._get_old_partitions(table_name, horizon).values()]
+        partitions += [(partition_name, False) for partition_name in
+                       self._partition_repository.get_monthly_partitions(table_name, attached=False).values()]
+        for partition_name, attached in partitions:
+            if self._partition_repository.has_rows(partition_name):
+                logger.warning(f"Partition {partition_name} is kept, it holds rows of questions not archived yet")
+            else:
+                self._partition_repository.drop_partition(table_name, partition_name, attached=attached)
+                logger.info(f"Dropped the archived partition {partition_name}")
@@ -1,6 +1,9 @@
+from functools import partial
 from typing import List, Optional, AsyncGenerator
 from uuid import UUID
 
+from elgen_common.tracing import traced, tracer, PROMPT_BUILD_SPAN, WEB_SUMMARIZATION_SPAN, \
+    StreamedGenerationTracer
 from fastapi import HTTPException, status
 from fastapi.requests import Request
 from pydantic import ValidationError
@@ -10,14 +13,18 @@ from configuration.logging_setup import logger
 from source.exceptions.service_exceptions import ModelServiceConnectionError, DataLayerError, ChatServiceError, \
     ConversationFetchDataError, \
     ConversationNotFoundError, SourceDocumentsFetchDataError, ChatIncompleteDataError, ChatAnswerCreationError, \
-    AnswerNotFoundException, AnswerNotFoundError, VersionedAnswerNotFoundException, ModelServiceParsingError
+    AnswerNotFoundException, AnswerNotFoundError, VersionedAnswerNotFoundException, ModelServiceParsingError, \
+    AnswerCacheError, DeadlineExceededError
 from source.helpers.streaming_helpers import LLMStreamer
 from source.repositories.answer_repository import AnswerRepository
-from source.schemas.answer_schema import AnswerRatingResponse, VersionedAnswerResponse
+from source.schemas.answer_schema import AnswerRatingResponse, VersionedAnswerResponse, AnswerCacheKeySchema, \
+    CachedAnswerSchema
 from source.schemas.chat_schema import PromptSchema, QuestionLanguageEnum
-from source.schemas.conversation_schema import ChatSchema, SourceSchema, AnswerOutputSchema, WebSourceSchema, \
-    AnswerSchema
+from source.schemas.conversation_schema import SourceSchema, AnswerOutputSchema, WebSourceSchema, AnswerSchema, \
+    ConversationHistorySchema
+from source.schemas.models_schema import ModelServiceAnswer
 from source.schemas.streaming_answer_schema import ModelStreamingErrorResponse
+from source.services.answer_cache_service import AnswerCacheService
 from source.services.conversation_service import ConversationService
 from source.services.model_service import ModelService
 from source.utils.utils import detect_language
@@ -33,7 +40,8 @@ class ChatService:
                  answer_repository: AnswerRepository,
                  model_discovery_service: ModelService,
                  summarization_config: SummarizationConfig,
-                 streaming_handler: LLMStreamer
+                 streaming_handler: LLMStreamer,
+                 answer_cache_service: AnswerCacheService
                  ):
         """
         Initialize the ChatService.
@@ -50,12 +58,13 @@ class ChatService:
         self.model_discovery_service = model_discovery_service
         self.summarization_config = summarization_config
         self.streaming_handler = streaming_handler
+        self.answer_cache_service = answer_cache_service
 
     def prepare_prompt_arguments(self, question_id: UUID, model_code: str,
                                  use_web_sources_flag: bool = True) -> \
-            tuple[str, ChatSchema, List[SourceSchema], list[WebSourceSchema], list[str] | None]:
+            tuple[str, ConversationHistorySchema, List[SourceSchema], list[WebSourceSchema], list[str] | None]:
         """Using the question id, we fetch the chat_history, source_documents and question, we then set the web sources
-        and return all of them
+        and return all of them. The chat history is the rolling summary and last turns of the conversation.
 
         Args:
             question_id (UUID): The ID of the question.
@@ -63,10 +72,11 @@ class ChatService:
             use_web_sources_flag: A flag indicating if we want to use online sources or not
 
         Returns:
-            data to pass to prompt:tuple[str, ChatSchema, List[SourceSchema], list[WebSourceSchema], list[str] | None]"""
+            data to pass to prompt:
+                tuple[str, ConversationHistorySchema, List[SourceSchema], list[WebSourceSchema], list[str] | None]"""
         try:
             question = self.conversation_service.get_question_by_id(question_id).content
-            chat_history = self.conversation_service.get_conversation_by_question_id(question_id)
+            chat_history = self.conversation_service.get_conversation_history(question_id)
         except ConversationFetchDataError:
             raise ChatIncompleteDataError('Incomplete chat history data')
         except ConversationNotFoundError:
@@ -82,12 +92,12 @@ class ChatService:
                 web_sources = self.conversation_service.get_web_sources_by_question_id(question_id)
             except SourceDocumentsFetchDataError:
                 raise ChatIncompleteDataError('Internal error when fetching web source docs')
-            summarized_paragraphs = '\n'.join(
-                [self.model_discovery_service.request_model_service_per_code(model_code=model_code,
-                                                                             text=self._generate_summarization_prompt(
-                                                                                 text_to_summarize=web_source.paragraphs)
-                                                                             ).response for
-                 web_source in web_sources])
+            with tracer.start_as_current_span(WEB_SUMMARIZATION_SPAN, attributes={"web.sources": len(web_sources)}):
+                summarized_paragraphs = '\n'.join(
+                    [self.model_discovery_service.request_model_service_per_code(
+                        model_code=model_code,
+                        text=self._generate_summarization_prompt(text_to_summarize=web_source.paragraphs)
+                    ).response for web_source in web_sources])
         else:
             web_sources = []
             summarized_paragraphs = None
@@ -132,13 +142,14 @@ class ChatService:
             ) from error
 
     @staticmethod
-    def _generate_prompt(chat_history: ChatSchema, source_documents: List[SourceSchema],
+    @traced(PROMPT_BUILD_SPAN)
+    def _generate_prompt(chat_history: ConversationHistorySchema, source_documents: List[SourceSchema],
                          web_source_summarized_paragraph: Optional[str], question: str) -> str:
         """
         Generate the prompt text for the model based on chat history, source documents, and the question.
 
         Args:
-            chat_history (ChatSchema): The chat history.
+            chat_history (ConversationHistorySchema): The summary and last turns of the conversation.
             source_documents (List[SourceSchema]): The source documents.
             web_source_summarized_paragraph (Optional[str]): the summarized paragraphs from the source documents
             question (str): The question.
@@ -157,8 +168,13 @@ class ChatService:
         Use the following pieces of context to answer the question at the end.\
         If you don't know the answer, just say that you don't know, don't try to make up an answer.\
         Act as specified, as ELGEN. If you are greeted, simply answer by a polite greeting. If the question is in French, answer in French."
+        history_lines = [f"Conversation summary: {chat_history.summary}"] if chat_history.summary else []
+        history_lines += [f"User: {turn.question}\nAssistant: {turn.answer}" for turn in chat_history.recent_turns]
+        history_string = "\n".join(history_lines)
         prompt_template = f"""{prompt_en if lang == QuestionLanguageEnum.EN else prompt_fr}
 
+                {history_string}
+
                 {source_documents_string}
 
                 {web_source_summarized_paragraph if web_source_summarized_paragraph else ''}
@@ -219,7 +235,7 @@ class ChatService:
         """
         try:
             result = self._answer_repository.update_answer_with_versioning(answer_id=answer_id, content=content)
-
+            self.conversation_service.schedule_conversation_turn_refresh(question_id=result.question_id)
             return AnswerSchema.from_orm(result)
         except AnswerNotFoundException as exception:
             logger.error(exception)
@@ -241,10 +257,45 @@ class ChatService:
         except DataLayerError as error:
             raise ChatServiceError(message=error.message) from error
 
+    def _get_cached_answer(self, question_id: UUID, model_code: str, use_web_sources_flag: bool) -> \
+            tuple[AnswerCacheKeySchema | None, CachedAnswerSchema | None]:
+        """
+        Look up the answer cache of the question's workspace before any model call, the key only needs the question
+        and the ids of its sources so the web sources are not summarized on a hit.
+        A failing cache never fails the answer: it is logged and the answer is generated as if it was disabled.
+
+        Returns:
+            tuple: The cache key, None if the workspace does not use the cache, and the cached answer if any.
+        """
+        try:
+            question = self.conversation_service.get_question_by_id(question_id).content
+            source_documents = self.conversation_service.get_source_documents(question_id)
+            web_sources = self.conversation_service.get_web_sources_by_question_id(question_id) \
+                if use_web_sources_flag else []
+            cache_key = self.answer_cache_service.get_cache_key(question_id=question_id, question=question,
+                                                                model_code=model_code,
+                                                                source_documents=source_documents,
+                                                                web_sources=web_sources)
+            if cache_key is None:
+                return None, None
+            return cache_key, self.answer_cache_service.get_cached_answer(cache_key)
+        except (AnswerCacheError, ConversationFetchDataError, ConversationNotFoundError,
+                SourceDocumentsFetchDataError) as error:
+            logger.error(f"Answer cache lookup failed for question {question_id}: {error}")
+            return None, None
+
+    def _store_answer_in_cache(self, cache_key: AnswerCacheKeySchema, answer: ModelServiceAnswer) -> None:
+        try:
+            self.answer_cache_service.store_answer(cache_key=cache_key, answer=answer.response,
+                                                   model_name=answer.model_name)
+        except AnswerCacheError as error:
+            logger.error(f"Failed to cache the answer: {error}")
+
     async def generate_answer_by_streaming(self, request: Request, question_id: UUID, model_code: str,
                                            use_web_sources_flag: bool = True) -> AsyncGenerator:
         """
-        Generate an answer for a question using chat history and source documents asynchronously
+        Generate an answer for a question using chat history and source documents asynchronously, or stream back the
+        cached answer to the same or a near duplicate question when the workspace enabled the answer cache
 
         Args:
             question_id (UUID): The ID of the question.
@@ -254,6 +305,20 @@ class ChatService:
         Returns:
             str: The generated answer.
         """
+        cache_key, cached_answer = self._get_cached_answer(question_id=question_id, model_code=model_code,
+                                                           use_web_sources_flag=use_web_sources_flag)
+        if cached_answer:
+            logger.info(f"Answer of question {question_id} from the cache, similarity {cached_answer.similarity}")
+            async for chunk in self.streaming_handler.stream_cached_answer(
+                    answer=cached_answer.answer,
+                    request=request,
+                    question_id=question_id,
+                    model_code=model_code,
+                    model_name=cached_answer.model_name,
+                    final_response_metadata={"cached": True, "similarity": cached_answer.similarity}):
+                yield chunk
+            return
+
         try:
 
             question, chat_history, source_documents, web_sources, summarized_paragraphs = self.prepare_prompt_arguments(
@@ -263,10 +328,12 @@ class ChatService:
                                                 question=question,
                                                 web_source_summarized_paragraph=summarized_paragraphs)
 
+            generation_tracer = StreamedGenerationTracer(code=model_code)
             response = self.model_discovery_service.request_model_service_per_code_by_streaming(model_code=model_code,
                                                                                                 text=prompt_text)
 
-        except (ModelServiceConnectionError, ConversationFetchDataError, ModelServiceParsingError) as error:
+        except (ModelServiceConnectionError, ConversationFetchDataError, ModelServiceParsingError,
+                DeadlineExceededError) as error:
             logger.error(error)
             yield str(ModelStreamingErrorResponse(
                 detail="Unable to stream response!",
@@ -278,10 +345,13 @@ class ChatService:
             logger.info("Connection disconnected, end streaming!")
             return
 
+        on_answer_created = partial(self._store_answer_in_cache, cache_key) if cache_key else None
         async for chunk in self.streaming_handler.stream_llm_response(response=response,
                                                                       request=request,
                                                                       question_id=question_id,
                                                                       model_code=model_code,
-                                                                      full_prompt=prompt_text
+                                                                      full_prompt=prompt_text,
+                                                                      on_answer_created=on_answer_created,
+                                                                      generation_tracer=generation_tracer
                                                                       ):
             yield chunk
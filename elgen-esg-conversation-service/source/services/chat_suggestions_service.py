@@ -1,33 +1,43 @@
+import asyncio
 from uuid import UUID
 
 from pydantic import ValidationError
 from sqlalchemy.exc import NoResultFound
 
 from configuration.logging_setup import logger
+from source.helpers.cache_helpers import LRUCache
 from source.exceptions.service_exceptions import DatabaseIntegrityError, DatabaseConnectionError, \
     ChatSuggestionsDataBaseError, ChatSuggestionNotFoundError
 from source.exceptions.validation_exceptions import GenericValidationError
 from source.repositories.chat_suggestions_repository import ChatSuggestionsRepository
-from source.schemas.chat_suggestions_schema import ChatSuggestion, WorkspaceChatSuggestions
+from source.schemas.chat_suggestions_schema import ChatSuggestion, WorkspaceChatSuggestions, \
+    MaterializedChatSuggestions
 from source.schemas.common import UpdateStatusDataModel
 from source.schemas.conversation_schema import QuestionInputSchema
+from source.utils.utils import compute_etag
 
 
 class ChatSuggestionsService:
     """
-    Service class for handling chat suggestions
+    Service class for handling chat suggestions, they are read each time the chat opens so the suggestions of a
+    workspace are materialized in memory, already serialized with their ETag. The writes going through this process
+    expire the materialized suggestions they change, the periodic refresh materializes again the expired ones and
+    the ones about to expire, so the writes made through other workers are seen within CHAT_SUGGESTIONS_CACHE_TTL.
     """
 
     def __init__(self,
-                 chat_suggestions_repository: ChatSuggestionsRepository
+                 chat_suggestions_repository: ChatSuggestionsRepository,
+                 suggestions_cache: LRUCache
                  ):
         """
         Initialize the ChatSuggestionsService.
 
         Args:
             chat_suggestions_repository (ChatSuggestionsRepository): The chat workspace repository to use.
+            suggestions_cache (LRUCache): The materialized suggestions, shared across requests.
         """
         self._chat_suggestions_repository = chat_suggestions_repository
+        self._suggestions_cache = suggestions_cache
 
     def create_chat_suggestion(self, workspace_id: UUID, suggestion: QuestionInputSchema) -> ChatSuggestion:
         """
@@ -40,8 +50,10 @@ class ChatSuggestionsService:
             ChatSuggestion: the newly created suggestion.
         """
         try:
-            return ChatSuggestion.from_orm(
+            created_suggestion = ChatSuggestion.from_orm(
                 self._chat_suggestions_repository.create_chat_suggestion(workspace_id, suggestion))
+            self._suggestions_cache.expire(workspace_id)
+            return created_suggestion
         except (DatabaseIntegrityError, DatabaseConnectionError) as error:
             logger.error(f"Unable to create new chat suggestion: {error}")
             raise ChatSuggestionsDataBaseError(message="Unable to create new chat suggestion")
@@ -69,6 +81,51 @@ class ChatSuggestionsService:
             logger.error(f"error validating result: {error}")
             raise GenericValidationError("Invalid result")
 
+    def refresh_workspace_suggestions(self, workspace_id: UUID) -> MaterializedChatSuggestions:
+        """
+        Read the suggestions of a workspace and materialize them
+
+        Raises:
+            ChatSuggestionsDataBaseError: If the suggestions could not be read.
+        """
+        content = self.get_suggestions_per_workspace(workspace_id).json().encode("utf-8")
+        materialized_suggestions = MaterializedChatSuggestions(content=content, etag=compute_etag(content))
+        self._suggestions_cache.set(workspace_id, materialized_suggestions)
+        return materialized_suggestions
+
+    def get_materialized_suggestions(self, workspace_id: UUID) -> MaterializedChatSuggestions:
+        """
+        Get the serialized suggestions of a workspace and their ETag, only read from the database when the workspace
+        is not materialized yet
+
+        Raises:
+            ChatSuggestionsDataBaseError: If the suggestions could not be read.
+        """
+        return self._suggestions_cache.get(workspace_id) or self.refresh_workspace_suggestions(workspace_id)
+
+    def expire_materialized_suggestions(self) -> None:
+        """Expire the suggestions of every workspace, for the writes whose workspace is not known"""
+        for workspace_id in self._suggestions_cache.keys():
+            self._suggestions_cache.expire(workspace_id)
+
+    def refresh_materialized_suggestions(self, within: float) -> None:
+        """
+        Refresh the materialized workspaces that expired or expire in the next `within` seconds, a failing
+        workspace is read again on its next request
+        """
+        for workspace_id in self._suggestions_cache.expiring_keys(within):
+            try:
+                self.refresh_workspace_suggestions(workspace_id)
+            except (ChatSuggestionsDataBaseError, GenericValidationError) as error:
+                logger.error(f"Unable to refresh chat suggestions of workspace {workspace_id}: {error}")
+
+    async def refresh_materialized_suggestions_periodically(self, interval: float) -> None:
+        """Every interval seconds until cancelled, refresh the materialized suggestions expiring before the next run"""
+        while True:
+            await asyncio.sleep(interval)
+            # twice the interval so that a late run still finds the entries before they expire
+            await asyncio.to_thread(self.refresh_materialized_suggestions, within=2 * interval)
+
     def delete_suggestion_by_id(self, suggestion_id: UUID) -> UpdateStatusDataModel:
         """
         Delete suggestion by id
@@ -81,6 +138,8 @@ class ChatSuggestionsService:
         try:
             updated_status = True if not self._chat_suggestions_repository.delete_suggestion_by_id(
                 suggestion_id) else False
+            # the workspace of the suggestion is not known here, writes are rare enough to expire every workspace
+            self.expire_materialized_suggestions()
             return UpdateStatusDataModel(id=suggestion_id, updated=updated_status)
         except DatabaseConnectionError as error:
             logger.error(f"Unable to delete chat suggestion for id {suggestion_id}: {error}")
@@ -93,6 +152,7 @@ class ChatSuggestionsService:
         try:
             updated_status = True if not self._chat_suggestions_repository.update_suggestion_by_id(suggestion_id,
                                                                                                    suggestion) else False
+            self.expire_materialized_suggestions()
             return UpdateStatusDataModel(id=suggestion_id, updated=updated_status)
         except DatabaseConnectionError as error:
             logger.error(f"Unable to update chat suggestion {suggestion_id}: {error}")
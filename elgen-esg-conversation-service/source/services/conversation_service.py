@@ -1,19 +1,28 @@
+import asyncio
 import re
-from typing import List
+from concurrent.futures import Executor, Future
+from datetime import datetime
+from typing import Callable, List, Generator
 from uuid import UUID
 
 from pydantic import ValidationError
 from sqlalchemy.exc import NoResultFound
 
+from configuration.config import ConversationExportConfig, QuestionClassificationConfig, ConversationHistoryConfig
 from configuration.logging_setup import logger
 from source.exceptions.service_exceptions import DatabaseConnectionError, \
     ConversationFetchDataError, ConversationValidationError, ConversationNotFoundError, SourceDocumentsFetchDataError, \
-    SourceDocumentsValidationError, DatabaseIntegrityError
+    SourceDocumentsValidationError, DatabaseIntegrityError, ModelServiceConnectionError, \
+    ClassificationModelRetrievalError, ChatModelDiscoveryError, DeadlineExceededError
+from source.exceptions.validation_exceptions import GenericValidationError
+from source.helpers.cache_helpers import LRUCache
 from source.repositories.conversation_repository import ConversationRepository
 from source.schemas.conversation_schema import ConversationSchema, AnswerSchema, QuestionSchema, ChatSchema, \
-    ConversationIdSchema, SourceSchema, WebSourceSchema
+    ConversationIdSchema, SourceSchema, WebSourceSchema, ConversationExportRecordSchema, ConversationExportErrorSchema, \
+    ConversationHistorySchema, ConversationTurnSchema, RetrievedSourcesSchema
 from source.schemas.models_schema import ModelServiceAnswer
 from source.services.model_service import ModelService
+from source.utils.utils import normalize_question
 
 
 class ConversationService:
@@ -21,15 +30,31 @@ class ConversationService:
     Service class for managing conversations.
     """
 
-    def __init__(self, conversation_repository: ConversationRepository, model_discovery_service: ModelService):
+    # keeps a reference to the classifications running in the background until they complete
+    _pending_classifications: set[asyncio.Task] = set()
+
+    def __init__(self, conversation_repository: ConversationRepository, model_discovery_service: ModelService,
+                 export_config: ConversationExportConfig, classification_config: QuestionClassificationConfig,
+                 classification_cache: LRUCache, history_config: ConversationHistoryConfig,
+                 history_executor: Executor):
         """
         Initialize the ConversationService.
 
         Args:
             conversation_repository (ConversationRepository): The conversation repository to use.
+            export_config (ConversationExportConfig): The configuration of the conversations export.
+            classification_config (QuestionClassificationConfig): How long question creation waits for classification.
+            classification_cache (LRUCache): Classifications by workspace and normalized question, shared by requests.
+            history_config (ConversationHistoryConfig): The size of the conversation windows and of their summaries.
+            history_executor (Executor): Runs the conversation history updates off the request path.
         """
         self.conversation_repository = conversation_repository
         self.model_discovery_service = model_discovery_service
+        self.export_config = export_config
+        self.classification_config = classification_config
+        self.classification_cache = classification_cache
+        self.history_config = history_config
+        self.history_executor = history_executor
 
     def get_conversations_per_user(self, user_id: UUID, workspace_id: UUID) -> list[ConversationSchema]:
         """
@@ -118,6 +143,42 @@ class ConversationService:
 
             raise ConversationValidationError("Invalid chat schema !")
 
+    def export_conversations(self, workspace_id: UUID, user_id: UUID | None = None,
+                             start_date: datetime | None = None,
+                             end_date: datetime | None = None) -> Generator[str, None, None]:
+        """
+        Export the conversations history of a workspace as NDJSON, one line per question.
+
+        Args:
+            workspace_id (UUID): The ID of the workspace.
+            user_id (UUID | None): Only export the conversations of this user.
+            start_date (datetime | None): Only export questions asked at or after this date.
+            end_date (datetime | None): Only export questions asked before this date.
+
+        Returns:
+            Generator[str, None, None]: The NDJSON lines, rows are streamed from the database so the whole
+            history is never held in memory. The response status is sent before the first line, so an error
+            met on the way ends the export with a ConversationExportErrorSchema line instead of cutting it short.
+        """
+        rows = self.conversation_repository.stream_questions_for_export(workspace_id=workspace_id,
+                                                                         user_id=user_id,
+                                                                         start_date=start_date,
+                                                                         end_date=end_date,
+                                                                         batch_size=self.export_config.EXPORT_BATCH_SIZE)
+        try:
+            for row in rows:
+                yield ConversationExportRecordSchema.from_orm(row).json(by_alias=True) + "\n"
+        except DatabaseConnectionError as exc:
+            logger.error(f'Export of conversations interrupted for workspace {workspace_id} {exc}')
+            yield ConversationExportErrorSchema(
+                error=f'Unable to export conversations for workspace {workspace_id}').json() + "\n"
+        except ValidationError as exc:
+            logger.error(f'Failed to parse exported data for workspace {workspace_id} {exc}')
+            yield ConversationExportErrorSchema(error='Invalid conversation export schema !').json() + "\n"
+        except Exception as exc:
+            logger.exception(f'Export of conversations failed for workspace {workspace_id} {exc}')
+            yield ConversationExportErrorSchema(error='Unexpected error during the export').json() + "\n"
+
     def get_web_sources_by_question_id(self, question_id: UUID) -> list[WebSourceSchema]:
         try:
             return [WebSourceSchema.from_orm(data) for data in
@@ -242,9 +303,11 @@ class ConversationService:
 
     async def create_question(self, question: str, conversation_id: UUID, skip_doc: bool,
                               skip_web: bool, use_classification: bool, workspace_id: UUID,
-                              user_id: UUID) -> QuestionSchema:
+                              user_id: UUID, wait_for_classification: bool = True) -> QuestionSchema:
         """
         Create a new question in a conversation.
+        The question is persisted first, its classification is taken from the cache or requested in the background
+        and stored on the question once done, a question classified as not specific skips the document and web sources.
 
         Args:
             question (str): The content of the question.
@@ -254,26 +317,27 @@ class ConversationService:
             use_classification: classify the question or not
             workspace_id: the workspace used
             user_id: the user_id
+            wait_for_classification: wait up to CLASSIFICATION_WAIT_TIMEOUT for the classification to return it
 
         Returns:
-            QuestionSchema: The created question schema.
+            QuestionSchema: The created question schema, with classified False if the classification is not done
+            yet or failed: the question then keeps the requested skip flags, and the label is stored later if any.
         """
-        is_specific = True
-        if use_classification:
-            is_specific = self.model_discovery_service.request_question_classification_model(
-                question=question).is_specific
-            if not is_specific:
-                skip_doc, skip_web = True, True
+        cache_key = (workspace_id, normalize_question(question))
+        is_specific = self.classification_cache.get(cache_key) if use_classification else True
+        classification_pending = is_specific is None
+        if is_specific is False:
+            skip_doc, skip_web = True, True
 
         try:
-            return QuestionSchema.from_orm(
+            question_schema = QuestionSchema.from_orm(
                 self.conversation_repository.create_question(question=question,
                                                              conversation_id=conversation_id,
                                                              workspace_id=workspace_id,
                                                              user_id=user_id,
                                                              skip_doc=skip_doc,
                                                              skip_web=skip_web,
-                                                             is_specific=is_specific
+                                                             is_specific=True if classification_pending else is_specific
                                                              )
             )
         except (DatabaseIntegrityError, DatabaseConnectionError) as e:
@@ -283,7 +347,44 @@ class ConversationService:
         except ValidationError:
             raise ConversationValidationError('Failed to map data into Question Schema')
 
-    def create_answer(self, question_id: UUID, answer: ModelServiceAnswer) -> AnswerSchema:
+        if not classification_pending:
+            return question_schema
+        classification = asyncio.create_task(self._classify_question(question_schema, cache_key))
+        self._pending_classifications.add(classification)
+        classification.add_done_callback(self._pending_classifications.discard)
+        if not wait_for_classification:
+            return question_schema.copy(update={"classified": False})
+        try:
+            return await asyncio.wait_for(asyncio.shield(classification),
+                                          timeout=self.classification_config.CLASSIFICATION_WAIT_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"Question {question_schema.id} returned before its classification completed")
+            return question_schema.copy(update={"classified": False})
+
+    async def _classify_question(self, question: QuestionSchema, cache_key: tuple[UUID, str]) -> QuestionSchema:
+        """Classify a persisted question, cache the result and store it on the question"""
+        try:
+            classification = await asyncio.to_thread(self.model_discovery_service.request_question_classification_model,
+                                                     question=question.content)
+        except (ModelServiceConnectionError, ClassificationModelRetrievalError, GenericValidationError,
+                DeadlineExceededError) as error:
+            logger.error(f"Question {question.id} left unclassified: {error}")
+            return question.copy(update={"classified": False})
+        self.classification_cache.set(cache_key, classification.is_specific)
+        if classification.is_specific:
+            return question
+        try:
+            self.conversation_repository.update_question_classification(question_id=question.id,
+                                                                        creation_date=question.creation_date,
+                                                                        is_specific=False,
+                                                                        skip_doc=True,
+                                                                        skip_web=True)
+        except DatabaseConnectionError as error:
+            logger.error(f"Failed to store the classification of question {question.id}: {error}")
+            return question.copy(update={"classified": False})
+        return question.copy(update={"is_specific": False, "skip_doc": True, "skip_web": True})
+
+    def create_answer(self, question_id: UUID, answer: ModelServiceAnswer, record_latency: bool = True) -> AnswerSchema:
         """
         Create an answer for a question.
 
@@ -291,15 +392,96 @@ class ConversationService:
             question_id (UUID): The ID of the question.
             answer (str): The content of the answer.
             model_code (str): the code of the model to be saved in the analytics object
+            record_latency (bool): whether the inference time accounts in the latency analytics
 
         Returns:
             AnswerSchema: The created answer schema.
         """
         try:
             # answer.response = self.post_process_model_answer(answer.response)
-            return AnswerSchema.from_orm(self.conversation_repository.create_answer(answer, question_id))
+            answer_schema = AnswerSchema.from_orm(self.conversation_repository.create_answer(
+                answer, question_id, record_latency=record_latency))
         except DatabaseConnectionError:
             raise ConversationFetchDataError(f'Failed to create answer for question_id: {question_id}')
+        self._submit_history_update(self.update_conversation_history, question_id=question_id,
+                                    answer=answer.response, model_code=answer.model_code)
+        return answer_schema
+
+    def _submit_history_update(self, history_update: Callable[..., None], **kwargs) -> None:
+        """Run a history update in the history executor, what it does not handle itself is logged once it ends"""
+        self.history_executor.submit(history_update, **kwargs).add_done_callback(self._log_history_update_error)
+
+    @staticmethod
+    def _log_history_update_error(history_update: Future) -> None:
+        if not history_update.cancelled() and history_update.exception():
+            logger.opt(exception=history_update.exception()).error("Unexpected error on a conversation history update")
+
+    def schedule_conversation_turn_refresh(self, question_id: UUID) -> None:
+        """Bring the turn of a question in the conversation history in line with its answer once it changed"""
+        self._submit_history_update(self.refresh_conversation_turn, question_id=question_id)
+
+    def refresh_conversation_turn(self, question_id: UUID) -> None:
+        """
+        Replace the turn of a question in the last turns of its conversation by its current answer, or drop it once
+        the question is deleted. Meant to run in the history executor, a failure is only logged.
+        """
+        try:
+            self.conversation_repository.refresh_conversation_turn(question_id=question_id)
+        except DatabaseConnectionError as error:
+            logger.error(f"Unable to refresh the turn of question {question_id} in its conversation history: {error}")
+
+    def get_conversation_history(self, question_id: UUID) -> ConversationHistorySchema:
+        """
+        Get the summary and the last turns of the conversation of a question, what the prompt needs of the history
+        is read from the conversation row so the cost does not grow with the conversation
+
+        Raises:
+            ConversationNotFoundError: If the question does not exist.
+            ConversationFetchDataError: If the history could not be read.
+        """
+        try:
+            history = self.conversation_repository.get_conversation_history(question_id)
+        except DatabaseConnectionError:
+            raise ConversationFetchDataError(f'Unable to fetch conversation history for question_id: {question_id}')
+        if not history:
+            raise ConversationNotFoundError(f"Cannot find a conversation for question {question_id}")
+        return ConversationHistorySchema.from_orm(history)
+
+    def update_conversation_history(self, question_id: UUID, answer: str, model_code: str) -> None:
+        """
+        Append an answered question to the last turns of its conversation, once HISTORY_SUMMARY_BATCH_TURNS turns
+        overflow the window they are folded into the conversation summary by the model. Meant to run in the
+        history executor: a failure is only logged, the turns stay in the window and are folded with the next ones.
+        """
+        try:
+            history = self.conversation_repository.append_conversation_turn(question_id=question_id, answer=answer)
+            if not history:
+                return
+            overflow = len(history.recent_turns) - self.history_config.HISTORY_WINDOW_TURNS
+            if overflow < self.history_config.HISTORY_SUMMARY_BATCH_TURNS:
+                return
+            folded_turns = history.recent_turns[:overflow]
+            summary = self.model_discovery_service.request_model_service_per_code(
+                model_code=self.history_config.HISTORY_SUMMARY_MODEL_CODE or model_code,
+                text=self._generate_history_summary_prompt(summary=history.summary, turns=folded_turns)
+            ).response
+            if not self.conversation_repository.fold_conversation_turns(
+                    conversation_id=history.conversation_id,
+                    folded_question_ids=[str(turn.question_id) for turn in folded_turns],
+                    summary=summary):
+                logger.info(f"History of conversation {history.conversation_id} was folded by another update")
+        except (DatabaseConnectionError, ModelServiceConnectionError, ChatModelDiscoveryError,
+                DeadlineExceededError) as error:
+            logger.error(f"Unable to update the history of the conversation of question {question_id}: {error}")
+
+    def _generate_history_summary_prompt(self, summary: str | None, turns: List[ConversationTurnSchema]) -> str:
+        """Generate the prompt updating a conversation summary with the turns leaving the window"""
+        exchanges = "\n".join(f"User: {turn.question}\nAssistant: {turn.answer}" for turn in turns)
+        return (f"Update the summary of a conversation between a user and an assistant with its new exchanges. "
+                f"Keep the facts needed to answer follow-up questions, write at most "
+                f"{self.history_config.HISTORY_SUMMARY_NUM_LINES} lines in the language of the conversation.\n"
+                f"Summary: {summary or ''}\n"
+                f"New exchanges:\n{exchanges}")
 
     def get_source_documents(self, question_id: UUID) -> List[SourceSchema]:
         """
@@ -330,12 +512,15 @@ class ConversationService:
         """
 
         try:
-            return [SourceSchema.from_orm(
-                self.conversation_repository.create_source_document(question_id, source_document.file_name,
-                                                                    source_document.content,
-                                                                    source_document.document_type,
-                                                                    source_document.document_id))
-                for source_document in source_documents]
+            source_objects = self.conversation_repository.create_source_documents(question_id, source_documents)
+            # the text is not read back from chunk_content, the input already holds it
+            return [SourceSchema(id=source_object.id,
+                                 content=source_document.content,
+                                 document_path=source_object.document_path,
+                                 creation_date=source_object.creation_date,
+                                 document_type=source_object.document_type,
+                                 document_id=source_object.document_id)
+                    for source_object, source_document in zip(source_objects, source_documents)]
         except DatabaseConnectionError:
             raise SourceDocumentsFetchDataError('Failed to create new source documents because of db connection error')
         except ValidationError:
@@ -364,6 +549,36 @@ class ConversationService:
         except ValidationError:
             raise SourceDocumentsValidationError('Failed to validate source documents schema')
 
+    def create_retrieved_sources(self, question_id: UUID,
+                                 retrieved_sources: RetrievedSourcesSchema) -> RetrievedSourcesSchema:
+        """
+        Create the source documents and the web sources of a question in one transaction.
+
+        Args:
+            question_id (UUID): The ID of the question.
+            retrieved_sources (RetrievedSourcesSchema): The source documents and the web sources to create.
+
+        Returns:
+            RetrievedSourcesSchema: The created source documents and web sources.
+        """
+        try:
+            source_objects, web_objects = self.conversation_repository.create_retrieved_sources(
+                question_id, retrieved_sources.similar_docs, retrieved_sources.web_sources)
+            return RetrievedSourcesSchema(
+                similar_docs=[SourceSchema(id=source_object.id,
+                                           content=source_document.content,
+                                           document_path=source_object.document_path,
+                                           creation_date=source_object.creation_date,
+                                           document_type=source_object.document_type,
+                                           document_id=source_object.document_id)
+                              for source_object, source_document in zip(source_objects,
+                                                                        retrieved_sources.similar_docs)],
+                web_sources=[WebSourceSchema.from_orm(web_object) for web_object in web_objects])
+        except DatabaseConnectionError:
+            raise SourceDocumentsFetchDataError('Failed to create new retrieved sources because of db connection error')
+        except ValidationError:
+            raise SourceDocumentsValidationError('Failed to validate retrieved sources schema')
+
     @staticmethod
     def post_process_model_answer(answer: str) -> str:
         """
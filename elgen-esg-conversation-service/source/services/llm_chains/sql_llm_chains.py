@@ -2,6 +2,7 @@ import traceback
 from typing import AsyncGenerator
 from uuid import UUID
 
+from elgen_common.tracing import StreamedGenerationTracer
 from pydantic import ValidationError
 from sqlalchemy.exc import NoResultFound
 from starlette.requests import Request
@@ -12,7 +13,7 @@ from source.exceptions.service_exceptions import (DatabaseConnectionError, Conve
                                                   ModelRetrievalError, SqlSourceResponseSavingException,
                                                   SQLModelDiscoveryError, ModelServiceConnectionError,
                                                   ChatModelDiscoveryError, SQLExecuteError, QueryExecutionFail,
-                                                  UnauthorizedSQLStatement)
+                                                  UnauthorizedSQLStatement, DeadlineExceededError)
 from source.exceptions.validation_exceptions import GenericValidationError
 from source.helpers.streaming_helpers import LLMStreamer
 from source.models.conversations_models import SqlSourceResponse
@@ -237,6 +238,7 @@ class FullSQLChain(LLMChain):
 
             prompt = self.construct_prompt(sql_source_response)
 
+            generation_tracer = StreamedGenerationTracer(code=chat_model_code)
             response = self.model_discovery_service.request_model_service_per_code_by_streaming(
                 model_code=chat_model_code,
                 text=prompt)
@@ -244,7 +246,8 @@ class FullSQLChain(LLMChain):
                 ModelServiceConnectionError,
                 SQLModelDiscoveryError,
                 DatabaseConnectionError,
-                SQLExecuteError) as error:
+                SQLExecuteError,
+                DeadlineExceededError) as error:
 
             logger.error(error)
             yield str(ModelStreamingErrorResponse(
@@ -262,6 +265,7 @@ class FullSQLChain(LLMChain):
                                                                      request=request,
                                                                      model_code=chat_model_code,
                                                                      question_id=question_id,
-                                                                     final_response_metadata=sql_source_response.dict()
+                                                                     final_response_metadata=sql_source_response.dict(),
+                                                                     generation_tracer=generation_tracer
                                                                      ):
             yield chunk
@@ -2,15 +2,16 @@ from uuid import UUID
 import requests
 from fastapi import status
 from pydantic import ValidationError
-from requests import RequestException, Response
+from requests import RequestException, Response, Timeout
 from sqlalchemy.exc import SQLAlchemyError, NoResultFound
 
 from configuration.config import ModelsConfig
 from configuration.logging_setup import logger
 from source.exceptions.service_exceptions import ChatModelDiscoveryError, ModelServiceConnectionError, \
     DatabaseIntegrityError, DatabaseConnectionError, ModelCreationError, ModelUpdateError, ModelRetrievalError, \
-    ClassificationModelRetrievalError
+    ClassificationModelRetrievalError, DeadlineExceededError
 from source.exceptions.validation_exceptions import GenericValidationError
+from source.helpers.deadline_helpers import get_hop_timeout, get_deadline_headers
 from source.repositories.model_repository import ModelRepository
 from source.schemas.chat_schema import QuestionPurposeResponse
 from source.schemas.models_schema import ModelSchema, ModelServiceAnswer, PromptInputSchema, \
@@ -92,17 +93,23 @@ class ModelService:
         return model_route_to_use
 
     def request_model_service_per_code(self, text: str, model_code: str) -> ModelServiceAnswer:
+        discovered_model_route = self.__get_model_per_code(model_code=model_code)
+        timeout = get_hop_timeout()
         headers = {
             'accept': self.__request_application_header,
-            'Content-Type': self.__request_application_header
+            'Content-Type': self.__request_application_header,
+            **get_deadline_headers(timeout)
         }
-        discovered_model_route = self.__get_model_per_code(model_code=model_code)
         try:
             response = requests.post(
                 url=f"{discovered_model_route}{self._models_config.GENERATIVE_MODEL_INFERENCE_ENDPOINT}",
                 headers=headers,
-                json=PromptInputSchema(prompt=text).dict())
+                json=PromptInputSchema(prompt=text).dict(),
+                timeout=timeout)
 
+        except Timeout as error:
+            logger.error(f"Model service with code {model_code} did not answer within {timeout:.2f}s")
+            raise DeadlineExceededError from error
         except requests.exceptions.RequestException as error:
             logger.error(f"Connection error with model code {model_code}: {error}")
             raise ModelServiceConnectionError(
@@ -118,21 +125,27 @@ class ModelService:
         return ModelServiceAnswer(**response.json(), model_code=model_code)
 
     def request_question_classification_model(self, question: str) -> QuestionPurposeResponse:
-        headers = {
-            'accept': self.__request_application_header,
-            'Content-Type': self.__request_application_header
-        }
         try:
             discovered_classification_model_route = self._model_repository.get_classification_model().route
         except (SQLAlchemyError, NoResultFound):
             raise ClassificationModelRetrievalError
 
+        timeout = get_hop_timeout()
+        headers = {
+            'accept': self.__request_application_header,
+            'Content-Type': self.__request_application_header,
+            **get_deadline_headers(timeout)
+        }
         try:
             response = requests.post(
                 url=f"{discovered_classification_model_route}{self._models_config.TOPIC_CLASSIFICATION_ENDPOINT}",
                 headers=headers,
-                json=QuestionClassificationSchema(content=question).dict())
+                json=QuestionClassificationSchema(content=question).dict(),
+                timeout=timeout)
 
+        except Timeout as error:
+            logger.error(f"Classification model did not answer within {timeout:.2f}s")
+            raise DeadlineExceededError from error
         except requests.exceptions.RequestException as error:
             logger.error(f"Connection error with classification model: {error}")
             raise ModelServiceConnectionError(
@@ -175,17 +188,21 @@ class ModelService:
 
     def request_model_service_per_code_by_streaming(self, text: str,
                                                     model_code: str) -> Response | None:
+        discovered_model_route = self.__get_model_per_code(model_code=model_code)
+        timeout = get_hop_timeout()
         headers = {
             'accept': self.__request_application_header,
-            'Content-Type': self.__request_application_header
+            'Content-Type': self.__request_application_header,
+            **get_deadline_headers(timeout)
         }
-        discovered_model_route = self.__get_model_per_code(model_code=model_code)
         try:
+            # the timeout bounds the connection and each read, the streamer stops reading once the deadline is past
             response = requests.post(
                 url=f"{discovered_model_route}{self._models_config.STREAMING_GENERATIVE_MODEL_INFERENCE_ENDPOINT}",
                 headers=headers,
                 json=PromptInputSchema(prompt=text).dict(),
-                stream=True
+                stream=True,
+                timeout=timeout
             )
 
             if response.status_code != status.HTTP_200_OK:
@@ -194,6 +211,9 @@ class ModelService:
 
             return response
 
+        except Timeout as error:
+            logger.error(f"Model service with code {model_code} did not start streaming within {timeout:.2f}s")
+            raise DeadlineExceededError from error
         except RequestException as error:
             logger.error(f"Connection error with model code {model_code}: {error}")
             raise ModelServiceConnectionError(
@@ -115,6 +115,7 @@ class WorkspaceService:
         """
         try:
             workspace_data.available_model_codes = ",".join(workspace_data.available_model_codes)
+            workspace_data.answer_cache_enabled = bool(workspace_data.answer_cache_enabled)
             workspace = Workspace(**workspace_data.dict(exclude={"source_id"}))
             return self._workspace_repository.create_workspace(workspace)
         except DatabaseConnectionError:
@@ -1 +1,6 @@
+from uuid import UUID
+
 SQL_EXECUTE_ERROR_RESPONSE_FOR_STREAMING_MESSAGE = "I couldn't generate an answer given the provided context, please try again!\n\n"
+
+# workspace id of the latency rollups of the conversations not attached to any workspace
+NO_WORKSPACE_ID = UUID(int=0)
@@ -1,3 +1,4 @@
+import hashlib
 import tempfile
 from asyncio import TimeoutError, CancelledError
 from io import BytesIO
@@ -13,6 +14,8 @@ from langdetect import detect, LangDetectException
 
 from configuration.logging_setup import logger
 from source.exceptions.api_exception_handler import NotOkServiceResponse
+from source.exceptions.service_exceptions import DeadlineExceededError
+from source.helpers.deadline_helpers import get_hop_timeout, get_deadline_headers
 from source.schemas.chat_schema import QuestionLanguageEnum
 from source.schemas.common import RequestMethod
 
@@ -38,7 +41,7 @@ async def make_request(service_url: str,
     :param cookies: the request cookies
     :param keycloak_request_option: optional value to pass the body as 'data' in the request
     :return: a json response
-    :raises: a HTTP exception
+    :raises: a HTTP exception, DeadlineExceededError when the budget of the request runs out
     """
     if headers is None:
         headers = {}
@@ -46,7 +49,9 @@ async def make_request(service_url: str,
         query_params = {}
     uri = uri.lstrip('/')
     headers.pop("content-length", None)  # causes an infinite loop if sent to service
-    with async_timeout.timeout(180):
+    timeout = get_hop_timeout()
+    headers.update(get_deadline_headers(timeout))
+    async with async_timeout.timeout(timeout):
         try:
             service_name = service_url.replace("http://", "").split(".")[0]
             async with ClientSession() as session:
@@ -85,10 +90,9 @@ async def make_request(service_url: str,
                 "This request has timed out and has been cancelled, "
                 f"the target service {service_name} took too long to respond or is unavailable"
             )
-            raise HTTPException(
-                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-                detail='This request has timed out and has been cancelled, please retry.'
-            )
+            raise DeadlineExceededError(
+                message='This request has timed out and has been cancelled, please retry.'
+            ) from timeout_exception
 
 
 async def handle_data_by_response_content_type(response):
@@ -142,3 +146,22 @@ def is_select_query(sql_query):
     parsed_query = sqlparse.parse(sql_query)
     first_token = next(token for token in parsed_query[0].tokens if not token.is_whitespace)
     return first_token.normalized.upper() == 'SELECT' and len(parsed_query) == 1
+
+
+def normalize_question(question: str) -> str:
+    """Normalized text of a question for the caches keyed by question: case and spacing insensitive"""
+    return " ".join(question.casefold().split()).strip(" ?!.")
+
+
+def compute_etag(content: bytes) -> str:
+    """Strong entity tag of a response body"""
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header lists the entity tag, weak comparison as RFC 9110 requires for it"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag.removeprefix("W/") in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
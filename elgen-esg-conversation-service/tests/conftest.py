@@ -0,0 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from configuration.config import ConversationExportConfig, QuestionClassificationConfig, ConversationHistoryConfig
+from source.helpers.cache_helpers import LRUCache
+from source.services.conversation_service import ConversationService
+
+
+@pytest.fixture
+def conversation_repository():
+    return MagicMock()
+
+
+@pytest.fixture
+def model_service():
+    return MagicMock()
+
+
+@pytest.fixture
+def conversation_service(conversation_repository, model_service):
+    history_executor = ThreadPoolExecutor(max_workers=2)
+    yield ConversationService(conversation_repository=conversation_repository, model_discovery_service=model_service,
+                              export_config=ConversationExportConfig(EXPORT_BATCH_SIZE=10),
+                              classification_config=QuestionClassificationConfig(),
+                              classification_cache=LRUCache(max_size=100, ttl=60),
+                              history_config=ConversationHistoryConfig(),
+                              history_executor=history_executor)
+    history_executor.shutdown(wait=True)
@@ -0,0 +1,59 @@
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+import requests
+
+from configuration.config import request_deadline_config
+from source.apis import chat_api
+from source.helpers.deadline_helpers import reset_request_deadline, start_request_deadline
+
+
+class StubRequest:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+@pytest.fixture
+def chat_service():
+    chat_service = MagicMock()
+    chat_service.model_discovery_service.get_model_per_code.return_value = "http://model"
+    return chat_service
+
+
+async def read_test_stream(chat_service, budget: float) -> list:
+    token = start_request_deadline(budget)
+    try:
+        response = chat_api.create_answer_with_streaming_testing(request=StubRequest(), text="Hello",
+                                                                 model_code="M1", question_id=uuid4(),
+                                                                 chat_service=chat_service)
+        return [chunk async for chunk in response.body_iterator]
+    finally:
+        reset_request_deadline(token)
+
+
+@pytest.mark.asyncio
+async def test_test_stream_is_bounded_by_the_request_deadline(chat_service, monkeypatch):
+    calls = []
+    response = MagicMock(status_code=200)
+    response.__enter__.return_value = response
+    response.iter_content.return_value = iter([b"chunk"])
+    monkeypatch.setattr(chat_api.requests, "post", lambda url, **kwargs: calls.append(kwargs) or response)
+
+    chunks = await read_test_stream(chat_service, budget=2)
+
+    assert chunks == [b"chunk"]
+    assert 0 < calls[0]["timeout"] <= 2
+    assert 0 < int(calls[0]["headers"][request_deadline_config.REQUEST_TIMEOUT_HEADER]) <= 2000
+
+
+@pytest.mark.asyncio
+async def test_test_stream_reports_the_model_timeout(chat_service, monkeypatch):
+    def post(url, **kwargs):
+        raise requests.exceptions.Timeout
+
+    monkeypatch.setattr(chat_api.requests, "post", post)
+
+    chunks = await read_test_stream(chat_service, budget=2)
+
+    assert len(chunks) == 1 and "ERROR" in chunks[0]
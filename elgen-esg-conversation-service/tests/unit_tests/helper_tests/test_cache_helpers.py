@@ -0,0 +1,65 @@
+import pytest
+
+from source.helpers import cache_helpers
+from source.helpers.cache_helpers import LRUCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache_helpers.time, "monotonic", lambda: clock[0])
+    return clock
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.keys() == ["a", "c"]
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LRUCache(max_size=10, ttl=60)
+    cache.set("a", False)
+    cache.set("b", True)
+
+    clock[0] += 30
+    cache.set("b", True)
+    clock[0] += 31
+
+    assert cache.get("a", default="missing") == "missing"
+    assert cache.get("b") is True
+    assert cache.keys() == ["b"]
+
+
+def test_pop_and_clear(clock):
+    cache = LRUCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.pop("a") == 1
+    assert cache.pop("a", default=0) == 0
+    cache.clear()
+    assert cache.get("b") is None
+
+
+
+def test_expired_entries_are_listed_until_read(clock):
+    cache = LRUCache(max_size=10, ttl=60)
+    cache.set("expired", 1)
+    cache.set("expiring", 2)
+    clock[0] += 50
+    cache.set("fresh", 3)
+
+    cache.expire("expired")
+
+    assert cache.expiring_keys(within=20) == ["expired", "expiring"]
+    assert cache.get("expired") is None
+    assert cache.expiring_keys(within=20) == ["expiring"]
+    assert cache.keys() == ["expiring", "fresh"]
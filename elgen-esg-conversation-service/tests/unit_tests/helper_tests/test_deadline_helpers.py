@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from configuration.config import request_deadline_config
+from source.exceptions.service_exceptions import DeadlineExceededError
+from source.helpers import deadline_helpers
+from source.helpers.deadline_helpers import (get_hop_timeout, get_remaining_time, reset_request_deadline,
+                                             start_request_deadline)
+from source.schemas.common import RequestMethod
+from source.utils.utils import make_request
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(deadline_helpers.time, "monotonic", lambda: clock[0])
+    return clock
+
+
+@pytest.fixture
+def request_deadline():
+    """Deadline of a request of 1 second, reset after the test"""
+    token = start_request_deadline(1)
+    yield
+    reset_request_deadline(token)
+
+
+def test_outbound_calls_outside_of_a_request_use_the_default_timeout():
+    assert get_remaining_time() is None
+    assert get_hop_timeout() == request_deadline_config.REQUEST_TIMEOUT_DEFAULT
+
+
+def test_outbound_calls_get_what_remains_of_the_budget(clock, request_deadline):
+    clock[0] += 0.4
+
+    assert get_hop_timeout() == pytest.approx(0.6)
+
+
+def test_outbound_call_is_not_started_without_enough_budget(clock, request_deadline):
+    clock[0] += 1 - request_deadline_config.REQUEST_TIMEOUT_MIN_HOP / 2
+
+    with pytest.raises(DeadlineExceededError):
+        get_hop_timeout()
+
+
+def test_deadline_is_reset_once_the_request_is_served():
+    token = start_request_deadline(1)
+    reset_request_deadline(token)
+
+    assert get_remaining_time() is None
+
+
+@pytest_asyncio.fixture
+async def slow_service_url():
+    """Service answering after 2 seconds, recording the timeout headers it receives"""
+    received_timeouts = []
+
+    async def answer_slowly(request: web.Request) -> web.Response:
+        received_timeouts.append(request.headers.get(request_deadline_config.REQUEST_TIMEOUT_HEADER))
+        await asyncio.sleep(2)
+        return web.json_response({})
+
+    stub_app = web.Application()
+    stub_app.router.add_get("/slow", answer_slowly)
+    server = TestServer(stub_app)
+    await server.start_server()
+    yield str(server.make_url("")), received_timeouts
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_outbound_call_is_cancelled_when_the_budget_runs_out(slow_service_url):
+    service_url, received_timeouts = slow_service_url
+    token = start_request_deadline(0.3)
+    started_at = time.monotonic()
+    try:
+        with pytest.raises(DeadlineExceededError):
+            await make_request(service_url, "/slow", RequestMethod.GET)
+    finally:
+        reset_request_deadline(token)
+
+    assert time.monotonic() - started_at < 1
+    assert len(received_timeouts) == 1
+    assert 0 < int(received_timeouts[0]) <= 300
@@ -0,0 +1,39 @@
+import random
+import statistics
+
+import pytest
+
+from source.helpers.histogram_helpers import LatencyHistogram
+
+
+@pytest.fixture
+def latencies():
+    # inference times spread over three orders of magnitude, with a slow tail
+    generator = random.Random(30)
+    return [generator.lognormvariate(0, 1) for _ in range(20000)] + [generator.uniform(20, 60) for _ in range(200)]
+
+
+@pytest.mark.parametrize("quantile", [0.5, 0.95, 0.99])
+def test_merged_hourly_histograms_estimate_the_quantiles_of_the_samples(latencies, quantile):
+    hourly_histograms = [LatencyHistogram.merge(LatencyHistogram.single(latency) for latency in latencies[hour::24])
+                         for hour in range(24)]
+
+    estimate = LatencyHistogram.quantile(LatencyHistogram.merge(hourly_histograms), quantile)
+
+    exact = statistics.quantiles(latencies, n=100, method="inclusive")[round(quantile * 100) - 1]
+    assert abs(estimate - exact) / exact <= LatencyHistogram.GROWTH - 1
+
+
+def test_merge_keeps_the_sample_count(latencies):
+    histogram = LatencyHistogram.merge(LatencyHistogram.single(latency) for latency in latencies)
+
+    assert sum(histogram) == len(latencies)
+    assert len(histogram) == LatencyHistogram.BUCKETS_COUNT
+
+
+def test_quantile_bounds():
+    slowest_latency = LatencyHistogram.bucket_bounds(LatencyHistogram.BUCKETS_COUNT - 1)[0]
+
+    assert LatencyHistogram.quantile([0] * LatencyHistogram.BUCKETS_COUNT, 0.5) is None
+    assert LatencyHistogram.quantile(LatencyHistogram.single(10 * slowest_latency), 0.99) == slowest_latency
+    assert LatencyHistogram.quantile(LatencyHistogram.single(0.001), 0.5) <= LatencyHistogram.MIN_LATENCY
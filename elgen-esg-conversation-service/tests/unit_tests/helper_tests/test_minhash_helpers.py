@@ -0,0 +1,21 @@
+from source.helpers.minhash_helpers import MinHash
+
+QUESTION = "what was the total revenue of the company in the year 2023"
+
+
+def test_signatures_are_stable_across_instances():
+    assert MinHash(permutations_count=64).signature(QUESTION) == MinHash(permutations_count=64).signature(QUESTION)
+    assert len(MinHash(permutations_count=16).signature(QUESTION)) == 16
+
+
+def test_similarity_estimates_the_shingles_overlap():
+    minhash = MinHash(permutations_count=64)
+    signature = minhash.signature(QUESTION)
+
+    assert MinHash.similarity(signature, signature) == 1.0
+    assert MinHash.similarity(signature, minhash.signature(f"{QUESTION}, please")) >= 0.8
+    assert MinHash.similarity(signature, minhash.signature("who is the ceo of the company")) < 0.5
+
+
+def test_short_text_is_one_shingle():
+    assert MinHash(shingle_size=4).shingles("why") == {"why"}
@@ -0,0 +1,52 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from configuration.config import StreamingResponseConfig
+from source.exceptions.service_exceptions import ConversationFetchDataError
+from source.helpers.streaming_helpers import LLMStreamer
+from source.schemas.streaming_answer_schema import StreamingResponseStatus
+
+
+@pytest.fixture
+def llm_streamer():
+    return LLMStreamer(streaming_config=StreamingResponseConfig(CACHED_ANSWER_CHUNK_WORDS=2),
+                       conversation_service=MagicMock())
+
+
+@pytest.fixture
+def request_mock():
+    request = MagicMock()
+    request.is_disconnected = AsyncMock(return_value=False)
+    return request
+
+
+async def collect_cached_answer(llm_streamer, request) -> list[dict]:
+    return [json.loads(chunk) async for chunk in llm_streamer.stream_cached_answer(
+        answer="a cached answer of words", request=request, question_id=uuid4(), model_code="M1")]
+
+
+@pytest.mark.asyncio
+async def test_cached_answer_is_streamed_then_saved(llm_streamer, request_mock):
+    llm_streamer.conversation_service.create_answer.return_value = {
+        "id": str(uuid4()), "content": "a cached answer of words", "creationTime": "2024-01-01T00:00:00"}
+
+    chunks = await collect_cached_answer(llm_streamer, request_mock)
+
+    assert [chunk["status"] for chunk in chunks] == [StreamingResponseStatus.IN_PROGRESS] * 3 + \
+           [StreamingResponseStatus.DONE]
+    assert "".join(chunk["data"] for chunk in chunks[:-1]) == "a cached answer of words"
+    assert llm_streamer.conversation_service.create_answer.call_args.kwargs["record_latency"] is False
+
+
+@pytest.mark.asyncio
+async def test_cached_answer_failing_to_be_saved_ends_with_an_error(llm_streamer, request_mock):
+    llm_streamer.conversation_service.create_answer.side_effect = ConversationFetchDataError("database down")
+
+    chunks = await collect_cached_answer(llm_streamer, request_mock)
+
+    assert [chunk["status"] for chunk in chunks] == [StreamingResponseStatus.IN_PROGRESS] * 3 + \
+           [StreamingResponseStatus.ERROR]
+    assert chunks[-1]["detail"] == "An unexpected Error occured while saving the answer!"
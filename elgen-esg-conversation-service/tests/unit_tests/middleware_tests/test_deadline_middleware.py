@@ -0,0 +1,36 @@
+import pytest
+from starlette.datastructures import Headers
+
+from configuration.config import request_deadline_config
+from source.helpers.deadline_helpers import get_remaining_time
+from source.middlewares.deadline_middleware import RequestDeadlineMiddleware
+
+HEADER = request_deadline_config.REQUEST_TIMEOUT_HEADER
+
+
+@pytest.mark.parametrize("headers, budget", [
+    ({}, request_deadline_config.REQUEST_TIMEOUT_DEFAULT),
+    ({HEADER: "2500"}, 2.5),
+    ({HEADER: "not a number"}, request_deadline_config.REQUEST_TIMEOUT_DEFAULT),
+    ({HEADER: "-100"}, 0.0),
+    ({HEADER: str(int(request_deadline_config.REQUEST_TIMEOUT_MAX * 1000) + 1)},
+     request_deadline_config.REQUEST_TIMEOUT_MAX),
+])
+def test_request_budget_is_read_from_the_header_and_capped(headers, budget):
+    assert RequestDeadlineMiddleware.get_request_budget(Headers(headers)) == budget
+
+
+@pytest.mark.asyncio
+async def test_routes_are_served_within_the_request_deadline():
+    remaining_times = []
+
+    async def app(scope, receive, send):
+        remaining_times.append(get_remaining_time())
+
+    scope = {"type": "http", "headers": [(HEADER.lower().encode(), b"2000")]}
+    await RequestDeadlineMiddleware(app)(scope, None, None)
+    await RequestDeadlineMiddleware(app)({"type": "lifespan"}, None, None)
+
+    assert 1.9 < remaining_times[0] <= 2
+    assert remaining_times[1] is None
+    assert get_remaining_time() is None
@@ -0,0 +1,62 @@
+import zlib
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from source.models.common_models import CompressedText
+
+DIALECT = postgresql.dialect()
+COMPRESSIBLE_TEXT = "Context: the annual report of the group lists its emissions per scope. " * 40
+
+
+@pytest.fixture
+def compressed_text():
+    return CompressedText()
+
+
+@pytest.mark.parametrize("value", ["", "short prompt", "é" * 511, COMPRESSIBLE_TEXT, "€ " + COMPRESSIBLE_TEXT])
+def test_text_is_read_back_as_written(compressed_text, value):
+    stored = compressed_text.process_bind_param(value, DIALECT)
+
+    assert compressed_text.process_result_value(memoryview(stored), DIALECT) == value
+
+
+def test_text_below_the_threshold_is_stored_plain(compressed_text):
+    value = "a" * 1023
+
+    assert compressed_text.process_bind_param(value, DIALECT) == b"\x00" + value.encode("utf-8")
+
+
+def test_threshold_counts_encoded_bytes(compressed_text):
+    # 512 two bytes characters reach the 1024 bytes threshold
+    stored = compressed_text.process_bind_param("é" * 512, DIALECT)
+
+    assert stored[0] == CompressedText.ZLIB_VERSION
+    assert zlib.decompress(stored[1:]).decode("utf-8") == "é" * 512
+
+
+def test_text_compressed_larger_is_stored_plain():
+    # level 0 only adds the zlib framing to the text
+    compressed_text = CompressedText(compression_level=0)
+
+    stored = compressed_text.process_bind_param(COMPRESSIBLE_TEXT, DIALECT)
+
+    assert stored[0] == CompressedText.PLAIN_VERSION
+    assert compressed_text.process_result_value(stored, DIALECT) == COMPRESSIBLE_TEXT
+
+
+def test_legacy_text_converted_by_the_migration_is_readable(compressed_text):
+    # the changelog prefixes the existing UTF-8 text with the plain version byte
+    legacy_value = b"\x00" + COMPRESSIBLE_TEXT.encode("utf-8")
+
+    assert compressed_text.process_result_value(legacy_value, DIALECT) == COMPRESSIBLE_TEXT
+
+
+def test_null_is_kept(compressed_text):
+    assert compressed_text.process_bind_param(None, DIALECT) is None
+    assert compressed_text.process_result_value(None, DIALECT) is None
+
+
+def test_unknown_format_version_is_rejected(compressed_text):
+    with pytest.raises(ValueError, match="Unknown compressed text format version 2"):
+        compressed_text.process_result_value(b"\x02" + zlib.compress(b"text"), DIALECT)
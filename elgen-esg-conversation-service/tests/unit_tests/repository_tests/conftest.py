@@ -0,0 +1,25 @@
+import os
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+from source.helpers.db_helpers import DBHelper
+
+
+@pytest.fixture
+def schema_database_helper():
+    """Database helper on the tables of the models, created in a schema of its own of the TEST_DB_URL database"""
+    schema = f"repository_test_{uuid4().hex}"
+    admin_engine = create_engine(os.environ["TEST_DB_URL"], isolation_level="AUTOCOMMIT")
+    with admin_engine.connect() as connection:
+        connection.execute(text(f"CREATE SCHEMA {schema}"))
+    database_url = make_url(os.environ["TEST_DB_URL"]).update_query_dict({"options": f"-csearch_path={schema}"})
+    database_helper = DBHelper(database_url.render_as_string(hide_password=False))
+    database_helper.init_database()
+    yield database_helper
+    database_helper.engine.dispose()
+    with admin_engine.connect() as connection:
+        connection.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    admin_engine.dispose()
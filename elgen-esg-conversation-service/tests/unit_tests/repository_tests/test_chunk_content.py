@@ -0,0 +1,188 @@
+"""
+Tests of the content addressed chunk text of the source documents, the ones reading and writing postgres are skipped
+unless TEST_DB_URL is set, see test_partitioned_tables
+"""
+import os
+from pathlib import Path
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+import yaml
+from sqlalchemy import func, text
+from sqlalchemy.dialects import postgresql
+
+from source.models.conversations_models import ChunkContent, Conversation, Question, SourceDocument
+from source.repositories.conversation_repository import ConversationRepository
+from source.repositories.partition_repository import PartitionRepository
+from source.schemas.conversation_schema import SourceSchema
+
+requires_database = pytest.mark.skipif(not os.getenv("TEST_DB_URL"), reason="needs a postgres database")
+
+CHANGELOG = Path(__file__).parents[3] / "liquibase" / "changelogs" / "changelog-add-chunk-content-table.yml"
+
+
+def get_sources(*contents: str) -> list[SourceSchema]:
+    return [SourceSchema(content=content, file_name="file.pdf", document_id=uuid4()) for content in contents]
+
+
+def compile_statement(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.fixture
+def session():
+    return MagicMock()
+
+
+@pytest.fixture
+def conversation_repository(session):
+    database_helper = MagicMock()
+    database_helper.session.return_value.__enter__.return_value = session
+    return ConversationRepository(database_helper)
+
+
+def test_repeated_chunks_are_upserted_once(conversation_repository, session):
+    conversation_repository.create_source_documents(uuid4(), get_sources("chunk b", "chunk a", "chunk b"))
+
+    chunk_insert = session.execute.call_args.args[0]
+    statement = compile_statement(chunk_insert)
+    hashes = [chunk_insert.compile(dialect=postgresql.dialect()).params[f"hash_m{index}"] for index in range(2)]
+    assert hashes == sorted(ConversationRepository.compute_content_hash(content) for content in ("chunk a", "chunk b"))
+    assert "hash_m2" not in statement
+    assert "ON CONFLICT (hash) DO UPDATE SET creation_date = excluded.creation_date" in statement
+    assert "WHERE chunk_content.creation_date <" in statement
+    source_objects = session.add_all.call_args.args[0]
+    assert [source_object.content_hash for source_object in source_objects] == [
+        ConversationRepository.compute_content_hash(content) for content in ("chunk b", "chunk a", "chunk b")]
+    assert all(source_object.content is None for source_object in source_objects)
+
+
+def test_question_without_sources_writes_no_chunk(conversation_repository, session):
+    assert conversation_repository.create_source_documents(uuid4(), []) == []
+
+    session.execute.assert_not_called()
+
+
+def test_chunk_text_is_read_from_chunk_content_then_from_legacy_rows(conversation_repository, session):
+    conversation_repository.get_sources_by_question_id(uuid4())
+
+    content_column = session.query.call_args.args[-1]
+    assert content_column.name == "content"
+    assert compile_statement(content_column.element) == "coalesce(chunk_content.content, source_document.content)"
+    join_target, join_condition = session.query.return_value.join.call_args.args
+    assert join_target is ChunkContent
+    assert compile_statement(join_condition) == "chunk_content.hash = source_document.content_hash"
+    assert session.query.return_value.join.call_args.kwargs == {"isouter": True}
+
+
+def add_question(database_helper) -> str:
+    with database_helper.session() as session:
+        conversation = Conversation(user_id=str(uuid4()))
+        session.add(conversation)
+        session.flush()
+        question = Question(conversation_id=conversation.id, content="question")
+        session.add(question)
+        session.flush()
+        return question.id
+
+
+def get_chunks(database_helper) -> dict[str, str]:
+    with database_helper.session() as session:
+        return dict(session.query(ChunkContent.hash, ChunkContent.content).all())
+
+
+def age_chunks(database_helper, hours: int) -> None:
+    with database_helper.session() as session:
+        session.execute(text("UPDATE chunk_content SET creation_date = now() - make_interval(hours => :hours)"),
+                        {"hours": hours})
+
+
+@requires_database
+def test_chunks_shared_by_questions_are_stored_once(schema_database_helper):
+    conversation_repository = ConversationRepository(schema_database_helper)
+
+    conversation_repository.create_source_documents(add_question(schema_database_helper),
+                                                    get_sources("shared", "first only", "shared"))
+    conversation_repository.create_source_documents(add_question(schema_database_helper),
+                                                    get_sources("shared", "second only"))
+
+    assert sorted(get_chunks(schema_database_helper).values()) == ["first only", "second only", "shared"]
+    with schema_database_helper.session() as session:
+        assert session.query(func.count(SourceDocument.id)).scalar() == 5
+
+
+@requires_database
+def test_legacy_and_deduplicated_sources_are_read_alike(schema_database_helper):
+    question_id = add_question(schema_database_helper)
+    conversation_repository = ConversationRepository(schema_database_helper)
+    conversation_repository.create_source_documents(question_id, get_sources("deduplicated"))
+    with schema_database_helper.session() as session:
+        session.add(SourceDocument(question_id=question_id, document_path="file.pdf", content="legacy",
+                                   document_type="pdf"))
+
+    sources = conversation_repository.get_sources_by_question_id(question_id)
+
+    assert sorted(source.content for source in sources) == ["deduplicated", "legacy"]
+
+
+@requires_database
+def test_backfill_moves_the_legacy_text_to_chunk_content(schema_database_helper):
+    question_id = add_question(schema_database_helper)
+    with schema_database_helper.session() as session:
+        session.add_all([SourceDocument(question_id=question_id, document_path="file.pdf", content=content,
+                                        document_type="pdf") for content in ("légacy", "légacy", "other")])
+    backfill = next(change_set["changeSet"]["changes"][0]["sql"]["sql"]
+                    for change_set in yaml.safe_load(CHANGELOG.read_text())["databaseChangeLog"]
+                    if change_set["changeSet"]["id"] == "backfillChunkContent")
+
+    for _ in range(2):
+        with schema_database_helper.engine.begin() as connection:
+            connection.connection.cursor().execute(backfill)
+
+    assert get_chunks(schema_database_helper) == {ConversationRepository.compute_content_hash(content): content
+                                                  for content in ("légacy", "other")}
+    with schema_database_helper.session() as session:
+        assert session.query(SourceDocument.id).filter(SourceDocument.content.isnot(None)).count() == 0
+    sources = ConversationRepository(schema_database_helper).get_sources_by_question_id(question_id)
+    assert sorted(source.content for source in sources) == ["légacy", "légacy", "other"]
+
+
+@requires_database
+def test_orphaned_chunks_are_deleted_after_the_grace_period(schema_database_helper):
+    conversation_repository = ConversationRepository(schema_database_helper)
+    archived_question_id = add_question(schema_database_helper)
+    conversation_repository.create_source_documents(archived_question_id, get_sources("shared", "archived only"))
+    conversation_repository.create_source_documents(add_question(schema_database_helper), get_sources("shared"))
+    with schema_database_helper.session() as session:
+        session.query(SourceDocument).filter(SourceDocument.question_id == archived_question_id).delete()
+    partition_repository = PartitionRepository(schema_database_helper)
+
+    assert partition_repository.delete_orphaned_chunks(grace_hours=24) == 0
+    age_chunks(schema_database_helper, hours=48)
+    assert partition_repository.delete_orphaned_chunks(grace_hours=24) == 1
+
+    assert list(get_chunks(schema_database_helper).values()) == ["shared"]
+
+
+@requires_database
+def test_chunk_cited_again_is_kept(schema_database_helper):
+    conversation_repository = ConversationRepository(schema_database_helper)
+    question_id = add_question(schema_database_helper)
+    conversation_repository.create_source_documents(question_id, get_sources("cited again"))
+    with schema_database_helper.session() as session:
+        session.query(SourceDocument).delete()
+    age_chunks(schema_database_helper, hours=48)
+    partition_repository = PartitionRepository(schema_database_helper)
+
+    # the chunk is locked by the save in progress, then its citation date is refreshed
+    session = schema_database_helper.create_db_local_session()
+    conversation_repository._add_source_documents(session, question_id, get_sources("cited again"))
+    assert partition_repository.delete_orphaned_chunks(grace_hours=24) == 0
+    session.commit()
+    session.remove()
+    with schema_database_helper.session() as session:
+        session.query(SourceDocument).delete()
+
+    assert partition_repository.delete_orphaned_chunks(grace_hours=24) == 0
+    assert list(get_chunks(schema_database_helper).values()) == ["cited again"]
@@ -0,0 +1,105 @@
+"""
+Tests of the compression of the text values written before CompressedText, the ones on postgres are skipped unless
+TEST_DB_URL is set, see test_partitioned_tables
+"""
+import os
+from collections import namedtuple
+from pathlib import Path
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+import yaml
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+
+from compress_text_columns import compress_column
+from source.models.common_models import CompressedText
+from source.models.conversations_models import Conversation, Question, SourceWeb
+
+requires_database = pytest.mark.skipif(not os.getenv("TEST_DB_URL"), reason="needs a postgres database")
+
+CHANGELOG = Path(__file__).parents[3] / "liquibase" / "changelogs" / "changelog-compress-large-text-columns.yml"
+Row = namedtuple("Row", ["id", "paragraphs"])
+LARGE_PARAGRAPHS = "The group reduced its scope 1 emissions by 12% over the year. " * 40
+
+
+def test_rows_are_rewritten_batch_by_batch_after_the_last_id():
+    batches = [[Row("id 1", "first"), Row("id 2", "second")], [Row("id 3", "third")], []]
+    sessions = [MagicMock() for _ in batches]
+    for session, batch in zip(sessions, batches):
+        session.execute.return_value.all.return_value = batch
+    database_helper = MagicMock()
+    database_helper.session.return_value.__enter__.side_effect = sessions
+
+    assert compress_column(database_helper, SourceWeb.paragraphs, batch_size=2) == 3
+
+    assert sessions[0].execute.call_args.args[1] == [{"id": "id 1", "paragraphs": "first"},
+                                                     {"id": "id 2", "paragraphs": "second"}]
+    assert sessions[1].execute.call_args.args[1] == [{"id": "id 3", "paragraphs": "third"}]
+    query = sessions[1].execute.call_args_list[0].args[0].compile(dialect=postgresql.dialect())
+    assert "source_web.id > %(id_1)s" in str(query) and query.params["id_1"] == "id 2"
+    assert query.params["get_byte_2"] == CompressedText.PLAIN_VERSION
+    assert sessions[2].execute.call_count == 1
+
+
+@pytest.fixture
+def legacy_database_helper(schema_database_helper):
+    """Tables with text columns as before the changelog"""
+    with schema_database_helper.session() as session:
+        session.execute(text("ALTER TABLE answer_analytics ALTER COLUMN prompt TYPE TEXT USING NULL"))
+        session.execute(text("ALTER TABLE source_web ALTER COLUMN paragraphs TYPE TEXT USING NULL"))
+    return schema_database_helper
+
+
+def add_legacy_web_sources(database_helper, *paragraphs: str | None) -> None:
+    with database_helper.session() as session:
+        conversation = Conversation(user_id=str(uuid4()))
+        session.add(conversation)
+        session.flush()
+        question = Question(conversation_id=conversation.id, content="question")
+        session.add(question)
+        session.flush()
+        for value in paragraphs:
+            session.execute(text("INSERT INTO source_web (id, question_id, url, description, title, paragraphs, "
+                                 "creation_date, deleted) VALUES (:id, :question_id, 'url', 'description', 'title', "
+                                 ":paragraphs, now(), false)"),
+                            {"id": str(uuid4()), "question_id": question.id, "paragraphs": value})
+
+
+def migrate(database_helper) -> None:
+    with database_helper.engine.begin() as connection:
+        cursor = connection.connection.cursor()
+        for change_set in yaml.safe_load(CHANGELOG.read_text())["databaseChangeLog"]:
+            cursor.execute(change_set["changeSet"]["changes"][0]["sql"]["sql"])
+
+
+def get_paragraphs(database_helper) -> list[tuple[str | None, int | None]]:
+    """Paragraphs read through CompressedText with the version byte they are stored with"""
+    with database_helper.session() as session:
+        return sorted(session.execute(select(SourceWeb.paragraphs, func.get_byte(SourceWeb.paragraphs, 0))).all(),
+                      key=str)
+
+
+@requires_database
+def test_legacy_text_is_readable_once_migrated(legacy_database_helper):
+    add_legacy_web_sources(legacy_database_helper, "short", "", None, LARGE_PARAGRAPHS)
+
+    migrate(legacy_database_helper)
+
+    assert get_paragraphs(legacy_database_helper) == sorted([("short", 0), ("", 0), (None, None),
+                                                             (LARGE_PARAGRAPHS, 0)], key=str)
+
+
+@requires_database
+def test_compression_of_the_legacy_text_is_idempotent(legacy_database_helper):
+    add_legacy_web_sources(legacy_database_helper, "short", None, LARGE_PARAGRAPHS, "é" + LARGE_PARAGRAPHS)
+    migrate(legacy_database_helper)
+
+    assert compress_column(legacy_database_helper, SourceWeb.paragraphs, batch_size=1) == 2
+    compressed = get_paragraphs(legacy_database_helper)
+    assert compress_column(legacy_database_helper, SourceWeb.paragraphs, batch_size=1) == 0
+
+    assert get_paragraphs(legacy_database_helper) == compressed
+    assert compressed == sorted([("short", 0), (None, None), (LARGE_PARAGRAPHS, 1), ("é" + LARGE_PARAGRAPHS, 1)],
+                                key=str)
@@ -0,0 +1,70 @@
+from datetime import date
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+
+from source.exceptions.service_exceptions import DatabaseConnectionError
+from source.repositories.partition_repository import PartitionRepository
+
+
+@pytest.fixture
+def session():
+    return MagicMock()
+
+
+@pytest.fixture
+def partition_repository(session):
+    database_helper = MagicMock()
+    database_helper.engine.dialect = postgresql.dialect()
+    database_helper.session.return_value.__enter__.return_value = session
+    return PartitionRepository(database_helper)
+
+
+def get_statement(session) -> str:
+    return " ".join(str(call.args[0]) for call in session.execute.call_args_list)
+
+
+def test_partitions_are_named_by_their_month():
+    assert PartitionRepository.get_partition_name("answer_analytics", date(2024, 3, 1)) == "answer_analytics_2024_03"
+
+
+def test_partitions_are_read_by_the_first_day_of_their_month(partition_repository, session):
+    session.execute.return_value.scalars.return_value.all.return_value = ["answer_2023_12", "answer_2024_01"]
+
+    partitions = partition_repository.get_monthly_partitions("answer", attached=False)
+
+    assert partitions == {date(2023, 12, 1): "answer_2023_12", date(2024, 1, 1): "answer_2024_01"}
+    parameters = session.execute.call_args.args[1]
+    assert parameters["attached"] is False
+    # the default partition and the partitions of another table sharing the prefix are not monthly partitions
+    assert parameters["name_pattern"] == r"^answer_[0-9]{4}_[0-9]{2}$"
+
+
+def test_monthly_partition_covers_its_month(partition_repository, session):
+    partition_name = partition_repository.create_monthly_partition("question", date(2024, 12, 1), date(2025, 1, 1))
+
+    assert partition_name == "question_2024_12"
+    assert get_statement(session) == ("CREATE TABLE IF NOT EXISTS question_2024_12 PARTITION OF question "
+                                      "FOR VALUES FROM ('2024-12-01') TO ('2025-01-01')")
+
+
+def test_rows_before_a_month_are_looked_up_by_creation_date(partition_repository, session):
+    partition_repository.has_rows("question_default", created_before=date(2024, 3, 1))
+
+    assert get_statement(session) == ("SELECT EXISTS (SELECT 1 FROM question_default "
+                                      "WHERE creation_date < '2024-03-01')")
+
+
+def test_detached_partition_is_dropped_without_detach(partition_repository, session):
+    partition_repository.drop_partition("answer", "answer_2024_01", attached=False)
+
+    assert get_statement(session) == "DROP TABLE answer_2024_01"
+
+
+def test_database_error_is_raised_as_connection_error(partition_repository, session):
+    session.execute.side_effect = OperationalError("CREATE TABLE", {}, Exception("connection refused"))
+
+    with pytest.raises(DatabaseConnectionError):
+        partition_repository.create_monthly_partition("question", date(2024, 1, 1), date(2024, 2, 1))
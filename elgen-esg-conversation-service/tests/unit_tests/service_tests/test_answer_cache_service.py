@@ -0,0 +1,98 @@
+import hashlib
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from configuration.config import AnswerCacheConfig
+from source.exceptions.service_exceptions import AnswerCacheError, DatabaseConnectionError
+from source.schemas.conversation_schema import SourceSchema, WebSourceSchema
+from source.services.answer_cache_service import AnswerCacheService
+
+QUESTION = "What was the total revenue of the company in the year 2023?"
+SOURCE_DOCUMENTS = [SourceSchema(content="first chunk"), SourceSchema(content="second chunk")]
+WEB_SOURCES = [WebSourceSchema(url="https://example.com", description="page", title="page")]
+
+
+@pytest.fixture
+def answer_cache_repository():
+    answer_cache_repository = MagicMock()
+    answer_cache_repository.get_question_workspace.return_value = SimpleNamespace(workspace_id=uuid4(),
+                                                                                  answer_cache_enabled=True)
+    answer_cache_repository.get_entries.return_value = []
+    return answer_cache_repository
+
+
+@pytest.fixture
+def answer_cache_service(answer_cache_repository):
+    return AnswerCacheService(answer_cache_repository=answer_cache_repository,
+                              answer_cache_config=AnswerCacheConfig(ANSWER_CACHE_SIMILARITY_THRESHOLD=0.8))
+
+
+def get_cache_key(answer_cache_service: AnswerCacheService, question: str = QUESTION, source_documents=None):
+    return answer_cache_service.get_cache_key(question_id=uuid4(), question=question, model_code="M1",
+                                              source_documents=source_documents or SOURCE_DOCUMENTS,
+                                              web_sources=WEB_SOURCES)
+
+
+def get_entry(answer_cache_service: AnswerCacheService, question: str, answer: str) -> SimpleNamespace:
+    cache_key = get_cache_key(answer_cache_service, question)
+    return SimpleNamespace(question_hash=cache_key.question_hash, question_signature=cache_key.question_signature,
+                           answer=answer, model_name="model")
+
+
+def test_cache_key_ignores_the_question_form_and_the_sources_order(answer_cache_service):
+    cache_key = get_cache_key(answer_cache_service)
+    other_cache_key = get_cache_key(answer_cache_service, "  what was the total REVENUE of the company in the year 2023",
+                                    source_documents=SOURCE_DOCUMENTS[::-1])
+
+    assert cache_key == other_cache_key
+    assert cache_key.question_numbers == "2023"
+    assert cache_key.question_hash == hashlib.sha256(
+        b"what was the total revenue of the company in the year 2023").hexdigest()
+    other_sources_key = get_cache_key(answer_cache_service, source_documents=SOURCE_DOCUMENTS[:1])
+    assert cache_key.sources_hash != other_sources_key.sources_hash
+
+
+def test_no_cache_key_when_the_workspace_disabled_the_cache(answer_cache_service, answer_cache_repository):
+    answer_cache_repository.get_question_workspace.return_value.answer_cache_enabled = False
+
+    assert get_cache_key(answer_cache_service) is None
+
+
+def test_same_question_hits(answer_cache_service, answer_cache_repository):
+    answer_cache_repository.get_entries.return_value = [
+        get_entry(answer_cache_service, f"{QUESTION}, please", "near duplicate answer"),
+        get_entry(answer_cache_service, QUESTION, "answer")]
+
+    cached_answer = answer_cache_service.get_cached_answer(get_cache_key(answer_cache_service))
+
+    assert (cached_answer.answer, cached_answer.similarity) == ("answer", 1.0)
+    assert answer_cache_repository.get_entries.call_args.kwargs["question_numbers"] == "2023"
+
+
+def test_near_duplicate_hits_and_unrelated_question_misses(answer_cache_service, answer_cache_repository):
+    answer_cache_repository.get_entries.return_value = [
+        get_entry(answer_cache_service, "Who is the CEO of the company?", "unrelated answer"),
+        get_entry(answer_cache_service, f"{QUESTION}, please", "near duplicate answer")]
+
+    cached_answer = answer_cache_service.get_cached_answer(get_cache_key(answer_cache_service))
+    missed_answer = answer_cache_service.get_cached_answer(
+        get_cache_key(answer_cache_service, "How many employees does the company have in 2023?"))
+
+    assert cached_answer.answer == "near duplicate answer"
+    assert 0.8 <= cached_answer.similarity < 1.0
+    assert missed_answer is None
+
+
+def test_workspace_invalidation(answer_cache_service, answer_cache_repository):
+    workspace_id = uuid4()
+    answer_cache_repository.delete_workspace_entries.return_value = 3
+
+    assert answer_cache_service.invalidate_workspace(workspace_id) == 3
+    answer_cache_repository.delete_workspace_entries.assert_called_once_with(workspace_id)
+
+    answer_cache_repository.delete_workspace_entries.side_effect = DatabaseConnectionError()
+    with pytest.raises(AnswerCacheError):
+        answer_cache_service.invalidate_workspace(workspace_id)
@@ -0,0 +1,105 @@
+from datetime import date
+from unittest.mock import MagicMock
+
+import pytest
+
+from configuration.config import ArchivalConfig
+from source.exceptions.service_exceptions import DatabaseConnectionError, PartitionArchivalError
+from source.services.archival_service import ArchivalService, add_months
+
+TODAY = date(2024, 6, 15)
+
+
+@pytest.fixture
+def partition_repository():
+    partition_repository = MagicMock()
+    partitions = {
+        ("question", True): {date(2024, 1, 1): "question_2024_01", date(2024, 3, 1): "question_2024_03"},
+        ("question", False): {date(2023, 12, 1): "question_2023_12"},
+        ("answer", True): {date(2024, 1, 1): "answer_2024_01", date(2024, 2, 1): "answer_2024_02",
+                           date(2024, 3, 1): "answer_2024_03"},
+        ("answer", False): {},
+        ("answer_analytics", True): {date(2024, 1, 1): "answer_analytics_2024_01"},
+        ("answer_analytics", False): {},
+    }
+    partition_repository.get_monthly_partitions.side_effect = \
+        lambda table_name, attached=True: dict(partitions[table_name, attached])
+    # answer_2024_02 holds the answer of a question of march, not archived yet
+    partition_repository.has_rows.side_effect = \
+        lambda table_name, created_before=None: table_name in {"answer_2024_02", "question_default"}
+    return partition_repository
+
+
+@pytest.fixture
+def archival_service(partition_repository, tmp_path):
+    return ArchivalService(partition_repository=partition_repository,
+                           archival_config=ArchivalConfig(ARCHIVE_HORIZON_MONTHS=3, ARCHIVE_DIRECTORY=str(tmp_path)))
+
+
+def test_questions_are_archived_with_the_rows_referencing_them(archival_service, partition_repository, tmp_path):
+    archive_files = archival_service.archive_old_partitions(today=TODAY)
+
+    partition_repository.detach_partition.assert_called_once_with("question", "question_2024_01")
+    archived = [(call.kwargs["question_table"], call.kwargs["created_before"])
+                for call in partition_repository.archive_questions.call_args_list]
+    assert archived == [("question_2023_12", None), ("question_2024_01", None),
+                        ("question_default", date(2024, 3, 1))]
+    for call in partition_repository.archive_questions.call_args_list:
+        referenced = [(table, column, referenced_table) for table, column, referenced_table, _
+                      in call.kwargs["referencing_rows"]]
+        assert referenced == ArchivalService.QUESTION_REFERENCES
+    assert tmp_path / "question_2024_01.csv.gz" in archive_files
+    assert tmp_path / "question_2024_01.answer.csv.gz" in archive_files
+    assert tmp_path / "question_default_before_2024_03.sql_source_response.csv.gz" in archive_files
+    assert tmp_path / "question_2024_01.chunk_content.csv.gz" in archive_files
+    assert all(archive_file.exists() for archive_file in archive_files)
+
+
+def test_only_emptied_answer_partitions_are_dropped(archival_service, partition_repository):
+    archival_service.archive_old_partitions(today=TODAY)
+
+    dropped = [call.args[:2] for call in partition_repository.drop_partition.call_args_list]
+    assert dropped == [("answer", "answer_2024_01"), ("answer_analytics", "answer_analytics_2024_01")]
+
+
+def test_chunks_no_source_document_cites_are_deleted_after_the_archival(archival_service, partition_repository):
+    archival_service.archive_old_partitions(today=TODAY)
+
+    partition_repository.delete_orphaned_chunks.assert_called_once_with(grace_hours=24)
+    assert [call[0] for call in partition_repository.method_calls][-1] == "delete_orphaned_chunks"
+
+
+def test_database_error_is_raised_as_archival_error(archival_service, partition_repository):
+    partition_repository.archive_questions.side_effect = DatabaseConnectionError("Cannot archive question_2023_12")
+
+    with pytest.raises(PartitionArchivalError):
+        archival_service.archive_old_partitions(today=TODAY)
+
+
+@pytest.mark.parametrize("month_start, months, expected", [
+    (date(2024, 6, 1), 0, date(2024, 6, 1)),
+    (date(2024, 11, 1), 2, date(2025, 1, 1)),
+    (date(2024, 1, 1), -1, date(2023, 12, 1)),
+    (date(2024, 3, 1), -27, date(2021, 12, 1)),
+])
+def test_months_are_added_across_years(month_start, months, expected):
+    assert add_months(month_start, months) == expected
+
+
+def test_upcoming_partitions_cover_the_following_months(archival_service, partition_repository):
+    archival_service.create_upcoming_partitions(today=date(2024, 11, 30))
+
+    bounds = {(call.kwargs["month_start"], call.kwargs["month_end"])
+              for call in partition_repository.create_monthly_partition.call_args_list}
+    assert bounds == {(date(2024, 11, 1), date(2024, 12, 1)), (date(2024, 12, 1), date(2025, 1, 1)),
+                      (date(2025, 1, 1), date(2025, 2, 1))}
+    tables = {call.kwargs["table_name"] for call in partition_repository.create_monthly_partition.call_args_list}
+    assert tables == set(ArchivalService.PARTITIONED_TABLES)
+
+
+def test_partition_is_archived_once_its_month_ended_before_the_horizon(archival_service, partition_repository):
+    # the horizon of the 1st of july is the 1st of april: the partition of march has just ended before it
+    archival_service.archive_old_partitions(today=date(2024, 7, 1))
+
+    detached = [call.args[1] for call in partition_repository.detach_partition.call_args_list]
+    assert detached == ["question_2024_01", "question_2024_03"]
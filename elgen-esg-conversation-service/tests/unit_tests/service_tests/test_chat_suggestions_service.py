@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from source.exceptions.service_exceptions import DatabaseConnectionError
+from source.helpers import cache_helpers
+from source.helpers.cache_helpers import LRUCache
+from source.services.chat_suggestions_service import ChatSuggestionsService
+
+TTL = 300
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache_helpers.time, "monotonic", lambda: clock[0])
+    return clock
+
+
+@pytest.fixture
+def suggestions():
+    """Suggestions stored per workspace, read by the repository"""
+    return {}
+
+
+@pytest.fixture
+def chat_suggestions_repository(suggestions):
+    chat_suggestions_repository = MagicMock()
+    chat_suggestions_repository.get_suggestions_by_workspace.side_effect = \
+        lambda workspace_id: [SimpleNamespace(id=uuid4(), content=content, available=True)
+                              for content in suggestions.get(workspace_id, [])]
+    chat_suggestions_repository.create_chat_suggestion.side_effect = \
+        lambda workspace_id, suggestion: SimpleNamespace(id=uuid4(), content=suggestion.question, available=True)
+    chat_suggestions_repository.delete_suggestion_by_id.return_value = None
+    return chat_suggestions_repository
+
+
+@pytest.fixture
+def chat_suggestions_service(chat_suggestions_repository, clock):
+    return ChatSuggestionsService(chat_suggestions_repository=chat_suggestions_repository,
+                                  suggestions_cache=LRUCache(max_size=10, ttl=TTL))
+
+
+def read_count(chat_suggestions_repository) -> int:
+    return chat_suggestions_repository.get_suggestions_by_workspace.call_count
+
+
+def test_suggestions_are_read_once(chat_suggestions_service, chat_suggestions_repository, suggestions):
+    workspace_id = uuid4()
+    suggestions[workspace_id] = ["first question"]
+
+    materialized_suggestions = chat_suggestions_service.get_materialized_suggestions(workspace_id)
+
+    assert chat_suggestions_service.get_materialized_suggestions(workspace_id) == materialized_suggestions
+    assert b"first question" in materialized_suggestions.content
+    assert read_count(chat_suggestions_repository) == 1
+
+
+def test_created_suggestion_expires_its_workspace(chat_suggestions_service, chat_suggestions_repository,
+                                                  suggestions):
+    workspace_id, other_workspace_id = uuid4(), uuid4()
+    suggestions[workspace_id] = ["first question"]
+    etag = chat_suggestions_service.get_materialized_suggestions(workspace_id).etag
+    chat_suggestions_service.get_materialized_suggestions(other_workspace_id)
+
+    suggestions[workspace_id].append("second question")
+    chat_suggestions_service.create_chat_suggestion(workspace_id, SimpleNamespace(question="second question"))
+
+    assert chat_suggestions_service.get_materialized_suggestions(workspace_id).etag != etag
+    chat_suggestions_service.get_materialized_suggestions(other_workspace_id)
+    assert read_count(chat_suggestions_repository) == 3
+
+
+@pytest.mark.parametrize("write", ["delete", "update"])
+def test_write_of_an_unknown_workspace_expires_every_workspace(chat_suggestions_service, chat_suggestions_repository,
+                                                               write):
+    workspace_ids = [uuid4(), uuid4()]
+    for workspace_id in workspace_ids:
+        chat_suggestions_service.get_materialized_suggestions(workspace_id)
+
+    if write == "delete":
+        chat_suggestions_service.delete_suggestion_by_id(uuid4())
+    else:
+        chat_suggestions_service.update_suggestion_by_id(uuid4(), SimpleNamespace(question="question"))
+
+    chat_suggestions_service.refresh_materialized_suggestions(within=60)
+    for workspace_id in workspace_ids:
+        chat_suggestions_service.get_materialized_suggestions(workspace_id)
+    assert read_count(chat_suggestions_repository) == 4
+
+
+def test_refresh_reads_only_the_expired_and_expiring_workspaces(chat_suggestions_service,
+                                                                chat_suggestions_repository, clock):
+    expiring_workspace_id, expired_workspace_id, fresh_workspace_id = uuid4(), uuid4(), uuid4()
+    chat_suggestions_service.get_materialized_suggestions(expiring_workspace_id)
+    clock[0] += TTL - 100
+    chat_suggestions_service.get_materialized_suggestions(expired_workspace_id)
+    chat_suggestions_service.get_materialized_suggestions(fresh_workspace_id)
+    chat_suggestions_service.create_chat_suggestion(expired_workspace_id, SimpleNamespace(question="question"))
+    chat_suggestions_repository.get_suggestions_by_workspace.reset_mock()
+
+    chat_suggestions_service.refresh_materialized_suggestions(within=120)
+
+    refreshed = [call.args[0] for call in chat_suggestions_repository.get_suggestions_by_workspace.call_args_list]
+    assert refreshed == [expiring_workspace_id, expired_workspace_id]
+    clock[0] += 100
+    for workspace_id in (expiring_workspace_id, expired_workspace_id, fresh_workspace_id):
+        chat_suggestions_service.get_materialized_suggestions(workspace_id)
+    assert read_count(chat_suggestions_repository) == 2
+
+
+def test_failing_refresh_leaves_the_workspace_to_its_next_request(chat_suggestions_service,
+                                                                  chat_suggestions_repository, suggestions):
+    workspace_id = uuid4()
+    chat_suggestions_service.get_materialized_suggestions(workspace_id)
+    chat_suggestions_service.create_chat_suggestion(workspace_id, SimpleNamespace(question="question"))
+    chat_suggestions_repository.get_suggestions_by_workspace.side_effect = DatabaseConnectionError()
+
+    chat_suggestions_service.refresh_materialized_suggestions(within=60)
+
+    chat_suggestions_repository.get_suggestions_by_workspace.side_effect = None
+    chat_suggestions_repository.get_suggestions_by_workspace.return_value = []
+    assert chat_suggestions_service.get_materialized_suggestions(workspace_id).content == b'{"suggestions": []}'
@@ -0,0 +1,75 @@
+import json
+import tracemalloc
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+from source.exceptions.service_exceptions import DatabaseConnectionError
+from source.schemas.conversation_schema import ConversationExportRecordSchema
+
+EXPORTED_ROWS = 5000
+
+
+def get_export_row(with_answer: bool = True) -> SimpleNamespace:
+    return SimpleNamespace(conversation_id=uuid4(), conversation_title="title", user_id=uuid4(), question_id=uuid4(),
+                           question_content="question", question_date=datetime(2024, 1, 1), skip_doc=False,
+                           skip_web=True, is_specific=True, answer_id=uuid4() if with_answer else None,
+                           answer_content="answer" if with_answer else None,
+                           answer_date=datetime(2024, 1, 1, 0, 1) if with_answer else None, rating=None, edited=False)
+
+
+def export(conversation_service) -> list[dict]:
+    return [json.loads(line) for line in conversation_service.export_conversations(workspace_id=uuid4())]
+
+
+def test_export_record_is_one_camel_case_json_line():
+    row = get_export_row(with_answer=False)
+
+    line = ConversationExportRecordSchema.from_orm(row).json(by_alias=True)
+
+    assert "\n" not in line
+    assert json.loads(line) == {"conversationId": str(row.conversation_id), "conversationTitle": "title",
+                                "userId": str(row.user_id), "questionId": str(row.question_id),
+                                "question": "question", "questionTime": "2024-01-01T00:00:00", "skipDoc": False,
+                                "skipWeb": True, "isSpecific": True, "answerId": None, "answer": None,
+                                "answerTime": None, "rating": None, "edited": False}
+
+
+def test_export_streams_the_rows_one_line_each(conversation_service, conversation_repository):
+    conversation_repository.stream_questions_for_export.return_value = (get_export_row() for _ in range(3))
+
+    records = export(conversation_service)
+
+    assert len(records) == 3
+    assert all(record["answer"] == "answer" for record in records)
+    assert conversation_repository.stream_questions_for_export.call_args.kwargs["batch_size"] == 10
+
+
+def test_export_memory_does_not_grow_with_the_history(conversation_service, conversation_repository):
+    conversation_repository.stream_questions_for_export.return_value = (get_export_row() for _ in range(EXPORTED_ROWS))
+
+    tracemalloc.start()
+    try:
+        exported_lines = sum(1 for _ in conversation_service.export_conversations(workspace_id=uuid4()))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert exported_lines == EXPORTED_ROWS
+    # the whole export is about 2.5 MB, only a few lines are alive at once
+    assert peak < 512 * 1024
+
+
+def test_export_interrupted_ends_with_an_error_line(conversation_service, conversation_repository):
+    def get_rows():
+        yield get_export_row()
+        raise DatabaseConnectionError("connection lost")
+
+    conversation_repository.stream_questions_for_export.return_value = get_rows()
+
+    records = export(conversation_service)
+
+    assert len(records) == 2
+    assert "questionId" in records[0]
+    assert records[1]["complete"] is False
+    assert "Unable to export conversations" in records[1]["error"]
@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from source.exceptions.service_exceptions import ModelServiceConnectionError
+from source.repositories.conversation_repository import ConversationRepository
+from source.schemas.conversation_schema import ConversationHistorySchema
+from source.services import conversation_service as conversation_service_module
+
+
+class StubSummaryModel:
+    """Model service recording the summary prompts and answering a numbered summary, or failing"""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.error = error
+        self.prompts = []
+
+    def __call__(self, model_code: str, text: str) -> SimpleNamespace:
+        self.prompts.append(text)
+        if self.error:
+            raise self.error
+        return SimpleNamespace(response=f"summary {len(self.prompts)}")
+
+
+def get_history(turns_count: int, summary: str | None = None) -> ConversationHistorySchema:
+    return ConversationHistorySchema(conversation_id=uuid4(), summary=summary,
+                                     recent_turns=[{"question_id": uuid4(), "question": f"question {index}",
+                                                    "answer": f"answer {index}"} for index in range(turns_count)])
+
+
+@pytest.fixture
+def summary_model(model_service):
+    summary_model = StubSummaryModel()
+    model_service.request_model_service_per_code.side_effect = summary_model
+    return summary_model
+
+
+@pytest.fixture
+def logger(monkeypatch):
+    logger = MagicMock()
+    monkeypatch.setattr(conversation_service_module, "logger", logger)
+    return logger
+
+
+def test_overflowing_turns_are_folded_into_the_summary(conversation_service, conversation_repository, summary_model):
+    # 4 turns are kept verbatim, 2 are folded at once
+    history = get_history(turns_count=6, summary="previous summary")
+    conversation_repository.append_conversation_turn.return_value = history
+
+    conversation_service.update_conversation_history(question_id=uuid4(), answer="answer 5", model_code="M1")
+
+    assert len(summary_model.prompts) == 1
+    assert "Summary: previous summary" in summary_model.prompts[0]
+    assert "User: question 1\nAssistant: answer 1" in summary_model.prompts[0]
+    assert "question 2" not in summary_model.prompts[0]
+    conversation_repository.fold_conversation_turns.assert_called_once_with(
+        conversation_id=history.conversation_id, summary="summary 1",
+        folded_question_ids=[str(turn.question_id) for turn in history.recent_turns[:2]])
+
+
+def test_turns_within_the_window_are_not_summarized(conversation_service, conversation_repository, summary_model):
+    conversation_repository.append_conversation_turn.return_value = get_history(turns_count=5)
+
+    conversation_service.update_conversation_history(question_id=uuid4(), answer="answer", model_code="M1")
+
+    assert summary_model.prompts == []
+    conversation_repository.fold_conversation_turns.assert_not_called()
+
+
+def test_failing_summary_keeps_the_turns(conversation_service, conversation_repository, summary_model, logger):
+    conversation_repository.append_conversation_turn.return_value = get_history(turns_count=6)
+    summary_model.error = ModelServiceConnectionError("model unavailable")
+
+    conversation_service.update_conversation_history(question_id=uuid4(), answer="answer", model_code="M1")
+
+    conversation_repository.fold_conversation_turns.assert_not_called()
+    logger.error.assert_called_once()
+
+
+def test_unexpected_error_of_a_history_update_is_logged(conversation_service, conversation_repository, logger):
+    conversation_repository.create_answer.return_value = SimpleNamespace(id=uuid4(), content="answer",
+                                                                         creation_date="2024-01-01T00:00:00",
+                                                                         update_date=None, rating=None, edited=False)
+    conversation_repository.append_conversation_turn.side_effect = RuntimeError("unexpected")
+
+    conversation_service.create_answer(question_id=uuid4(), answer=SimpleNamespace(response="answer",
+                                                                                   model_code="M1"))
+    conversation_service.history_executor.shutdown(wait=True)
+
+    logger.opt.assert_called_once()
+    assert isinstance(logger.opt.call_args.kwargs["exception"], RuntimeError)
+
+
+def test_edited_answer_refreshes_its_turn(conversation_service, conversation_repository):
+    question_id = uuid4()
+
+    conversation_service.schedule_conversation_turn_refresh(question_id=question_id)
+    conversation_service.history_executor.shutdown(wait=True)
+
+    conversation_repository.refresh_conversation_turn.assert_called_once_with(question_id=question_id)
+
+
+def test_turns_are_ordered_by_question_date_whatever_the_update_order():
+    first_id, second_id, third_id = uuid4(), uuid4(), uuid4()
+    legacy_turn = {"question_id": str(uuid4()), "question": "legacy", "answer": "legacy"}
+    turns = [legacy_turn, {"question_id": str(third_id), "question_date": "2024-01-01T00:03:00"}]
+
+    turns = ConversationRepository._place_turn(turns, first_id, {"question_id": str(first_id),
+                                                                 "question_date": "2024-01-01T00:01:00"})
+    turns = ConversationRepository._place_turn(turns, second_id, {"question_id": str(second_id),
+                                                                  "question_date": "2024-01-01T00:02:00"})
+    turns = ConversationRepository._place_turn(turns, first_id, {"question_id": str(first_id), "answer": "edited",
+                                                                 "question_date": "2024-01-01T00:01:00"})
+
+    assert [turn["question_id"] for turn in turns] == [legacy_turn["question_id"], str(first_id), str(second_id),
+                                                       str(third_id)]
+    assert turns[1]["answer"] == "edited"
+    assert ConversationRepository._place_turn(turns, second_id, None) == [turns[0], turns[1], turns[3]]
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from configuration.config import QuestionClassificationConfig
+from source.exceptions.service_exceptions import ModelServiceConnectionError
+from source.services.conversation_service import ConversationService
+from source.utils.utils import normalize_question
+
+WAIT_TIMEOUT = 0.1
+
+
+class StubClassifier:
+    """Labels the questions containing 'hello' as not specific, after latency seconds, or fails"""
+
+    def __init__(self, latency: float = 0.0, error: Exception | None = None) -> None:
+        self.latency = latency
+        self.error = error
+        self.questions = []
+
+    def __call__(self, question: str) -> SimpleNamespace:
+        self.questions.append(question)
+        time.sleep(self.latency)
+        if self.error:
+            raise self.error
+        return SimpleNamespace(is_specific="hello" not in question.lower())
+
+
+@pytest.fixture
+def classified_conversation_service(conversation_service, conversation_repository):
+    conversation_service.classification_config = QuestionClassificationConfig(CLASSIFICATION_WAIT_TIMEOUT=WAIT_TIMEOUT)
+    conversation_repository.create_question.side_effect = lambda **question: SimpleNamespace(
+        id=uuid4(), content=question["question"], creation_date=datetime.now(), answer=None,
+        skip_doc=question["skip_doc"], skip_web=question["skip_web"], is_specific=question["is_specific"])
+    return conversation_service
+
+
+def use_classifier(conversation_service: ConversationService, classifier: StubClassifier) -> StubClassifier:
+    conversation_service.model_discovery_service.request_question_classification_model.side_effect = classifier
+    return classifier
+
+
+async def create_question(conversation_service: ConversationService, question: str, workspace_id=None,
+                          wait_for_classification: bool = True):
+    return await conversation_service.create_question(question=question, conversation_id=uuid4(), skip_doc=False,
+                                                      skip_web=False, use_classification=True,
+                                                      workspace_id=workspace_id or uuid4(), user_id=uuid4(),
+                                                      wait_for_classification=wait_for_classification)
+
+
+async def wait_for_pending_classifications():
+    await asyncio.gather(*ConversationService._pending_classifications)
+
+
+@pytest.mark.asyncio
+async def test_label_is_stored_and_cached(classified_conversation_service, conversation_repository):
+    classifier = use_classifier(classified_conversation_service, StubClassifier())
+    workspace_id = uuid4()
+
+    question = await create_question(classified_conversation_service, "Hello there", workspace_id)
+    cached_question = await create_question(classified_conversation_service, " hello THERE ?", workspace_id)
+
+    assert question.classified and not question.is_specific and question.skip_doc and question.skip_web
+    conversation_repository.update_question_classification.assert_called_once()
+    assert classifier.questions == ["Hello there"]
+    assert cached_question.classified and not cached_question.is_specific
+    assert conversation_repository.create_question.call_args.kwargs["skip_doc"] is True
+    cache_key = (workspace_id, normalize_question("hello there"))
+    assert classified_conversation_service.classification_cache.get(cache_key) is False
+
+
+@pytest.mark.asyncio
+async def test_late_label_is_stored_after_the_question_is_returned(classified_conversation_service,
+                                                                    conversation_repository):
+    use_classifier(classified_conversation_service, StubClassifier(latency=3 * WAIT_TIMEOUT))
+
+    started_at = time.monotonic()
+    question = await create_question(classified_conversation_service, "Hello there")
+
+    assert time.monotonic() - started_at < 2 * WAIT_TIMEOUT
+    assert not question.classified and question.is_specific and not question.skip_doc
+    conversation_repository.update_question_classification.assert_not_called()
+    await wait_for_pending_classifications()
+    assert conversation_repository.update_question_classification.call_args.kwargs["is_specific"] is False
+
+
+@pytest.mark.asyncio
+async def test_question_is_returned_without_waiting(classified_conversation_service):
+    use_classifier(classified_conversation_service, StubClassifier(latency=WAIT_TIMEOUT))
+
+    question = await create_question(classified_conversation_service, "Hello there", wait_for_classification=False)
+
+    assert not question.classified and question.is_specific
+    await wait_for_pending_classifications()
+
+
+@pytest.mark.asyncio
+async def test_classifier_failure_returns_the_question_unclassified(classified_conversation_service,
+                                                                    conversation_repository):
+    use_classifier(classified_conversation_service, StubClassifier(error=ModelServiceConnectionError()))
+    workspace_id = uuid4()
+
+    question = await create_question(classified_conversation_service, "Hello there", workspace_id)
+
+    assert not question.classified and question.is_specific and not question.skip_web
+    conversation_repository.update_question_classification.assert_not_called()
+    cache_key = (workspace_id, normalize_question("hello there"))
+    assert classified_conversation_service.classification_cache.get(cache_key) is None
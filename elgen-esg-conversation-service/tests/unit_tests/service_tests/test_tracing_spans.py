@@ -0,0 +1,130 @@
+"""
+Spans of the hot paths of an answer: the web sources summarization, the prompt build, the streamed generation and the
+database queries
+"""
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from elgen_common.tracing import provider, tracer, MODEL_TOKENS_PER_S_SPAN, MODEL_TTFT_SPAN, PROMPT_BUILD_SPAN, \
+    WEB_SUMMARIZATION_SPAN
+from opentelemetry import trace
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from sqlalchemy import text
+
+from configuration.config import StreamingResponseConfig
+from source.helpers.db_helpers import DBHelper
+from source.helpers.streaming_helpers import LLMStreamer
+from source.schemas.conversation_schema import ConversationHistorySchema, SourceSchema
+from source.services.chat_service import ChatService
+
+
+@pytest.fixture(scope="module")
+def span_exporter():
+    exporter = InMemorySpanExporter()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    yield exporter
+    # the processor stays registered on the global provider but a shut down exporter drops the spans
+    exporter.shutdown()
+
+
+@pytest.fixture
+def spans(span_exporter):
+    span_exporter.clear()
+    return span_exporter
+
+
+def get_span(spans, name: str):
+    return next(span for span in spans.get_finished_spans() if span.name == name)
+
+
+@pytest.fixture
+def chat_service():
+    return ChatService(conversation_service=MagicMock(), answer_repository=MagicMock(),
+                       model_discovery_service=MagicMock(), summarization_config=MagicMock(),
+                       streaming_handler=MagicMock(), answer_cache_service=MagicMock())
+
+
+def test_web_sources_are_summarized_in_their_span(chat_service, spans):
+    chat_service.conversation_service.get_web_sources_by_question_id.return_value = [
+        SimpleNamespace(paragraphs="first web page"), SimpleNamespace(paragraphs="second web page")]
+    summarizing_spans = []
+
+    def summarize(model_code: str, text: str) -> SimpleNamespace:
+        summarizing_spans.append(trace.get_current_span().name)
+        return SimpleNamespace(response="summary")
+
+    chat_service.model_discovery_service.request_model_service_per_code.side_effect = summarize
+
+    chat_service.prepare_prompt_arguments(question_id=uuid4(), model_code="M1")
+
+    assert summarizing_spans == [WEB_SUMMARIZATION_SPAN] * 2
+    assert get_span(spans, WEB_SUMMARIZATION_SPAN).attributes["web.sources"] == 2
+
+
+def test_prompt_is_built_in_a_child_span(spans):
+    chat_history = ConversationHistorySchema(conversation_id=uuid4(), summary=None, recent_turns=[])
+    with tracer.start_as_current_span("request"):
+        ChatService._generate_prompt(chat_history=chat_history, question="What is ESG?",
+                                     source_documents=[SourceSchema(content="chunk", file_name="file.pdf",
+                                                                    document_id=uuid4())],
+                                     web_source_summarized_paragraph=None)
+
+    assert get_span(spans, PROMPT_BUILD_SPAN).parent.span_id == get_span(spans, "request").context.span_id
+
+
+def get_model_response(*chunks: dict) -> MagicMock:
+    response = MagicMock()
+    response.iter_content.return_value = [json.dumps(chunk) for chunk in chunks]
+    return response
+
+
+async def stream_answer(response: MagicMock) -> list[dict]:
+    conversation_service = MagicMock()
+    conversation_service.create_answer.return_value = {"id": str(uuid4()), "content": "an answer",
+                                                       "creationTime": "2024-01-01T00:00:00"}
+    llm_streamer = LLMStreamer(streaming_config=StreamingResponseConfig(), conversation_service=conversation_service)
+    request = MagicMock()
+    request.is_disconnected = AsyncMock(return_value=False)
+    with tracer.start_as_current_span("request"):
+        return [json.loads(chunk) async for chunk in llm_streamer.stream_llm_response(
+            response=response, request=request, question_id=uuid4(), model_code="M1")]
+
+
+@pytest.mark.asyncio
+async def test_streamed_answer_records_the_generation_spans(spans):
+    await stream_answer(get_model_response({"status": "IN_PROGRESS", "data": "an "},
+                                           {"status": "IN_PROGRESS", "data": "answer"},
+                                           {"status": "DONE", "data": {"response": "an answer"}}))
+
+    request_span = get_span(spans, "request")
+    ttft_span, generation_span = get_span(spans, MODEL_TTFT_SPAN), get_span(spans, MODEL_TOKENS_PER_S_SPAN)
+    assert ttft_span.parent.span_id == generation_span.parent.span_id == request_span.context.span_id
+    assert ttft_span.attributes["model.code"] == "M1"
+    assert ttft_span.end_time == generation_span.start_time
+    assert generation_span.attributes["model.tokens"] == 2
+    assert generation_span.status.status_code == trace.StatusCode.UNSET
+
+
+@pytest.mark.asyncio
+async def test_incomplete_stream_marks_the_generation_spans_as_failed(spans):
+    await stream_answer(get_model_response({"status": "IN_PROGRESS", "data": "an "}))
+
+    generation_span = get_span(spans, MODEL_TOKENS_PER_S_SPAN)
+    assert generation_span.status.status_code == trace.StatusCode.ERROR
+    assert generation_span.attributes["model.tokens"] == 1
+    assert get_span(spans, MODEL_TTFT_SPAN).status.status_code == trace.StatusCode.UNSET
+
+
+def test_database_queries_are_traced(spans):
+    database_helper = DBHelper("sqlite://")
+
+    with tracer.start_as_current_span("request"), database_helper.session() as session:
+        session.execute(text("SELECT 1"))
+
+    query_span = next(span for span in spans.get_finished_spans() if span.attributes.get("db.statement"))
+    assert query_span.attributes["db.statement"] == "SELECT 1"
+    assert query_span.parent.span_id == get_span(spans, "request").context.span_id
@@ -0,0 +1,21 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from source.schemas.workspace_schema import WorkspaceInput
+from source.services.workspace_service import WorkspaceService
+
+
+@pytest.mark.asyncio
+async def test_update_keeps_the_omitted_answer_cache_flag():
+    workspace_repository = MagicMock(update_workspace=AsyncMock(return_value=True))
+    workspace_service = WorkspaceService(workspace_repository=workspace_repository,
+                                         workspace_type_repository=MagicMock(), source_service=MagicMock())
+
+    await workspace_service.update_workspace(WorkspaceInput(name="renamed"), workspace_id=uuid4())
+
+    updated_fields = workspace_repository.update_workspace.call_args.args[0].dict(exclude_unset=True,
+                                                                                  exclude_none=True)
+    assert "answer_cache_enabled" not in updated_fields
+    assert updated_fields["name"] == "renamed"
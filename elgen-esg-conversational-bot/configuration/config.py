@@ -78,9 +78,18 @@ class EmbedderSettings(BaseSettings):
     IGNORE_TOKEN_LENGTH:  int = Field(env="IGNORE_TOKEN_LENGTH", default=30)
 
 
+class NltkConfig(BaseSettings):
+    NLTK_DATA_PATH: str = Field(env="NLTK_DATA_PATH", default="nltk_data",
+                                description="Directory of the NLTK data bundled with the service, searched first")
+    NLTK_DOWNLOAD_MISSING_DATA: bool = Field(env="NLTK_DOWNLOAD_MISSING_DATA", default=True,
+                                             description="Download the punkt tokenizer to NLTK_DATA_PATH when it is "
+                                                         "not bundled, disabled the service never reaches the network")
+
+
 app_config = AppConfig()
 es_config = ElasticSearchConfig()
 embedder_settings = EmbedderSettings()
+nltk_config = NltkConfig()
 
 db_config = DataBaseConfig()
 
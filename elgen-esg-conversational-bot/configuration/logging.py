@@ -2,7 +2,8 @@ import sys
 
 from loguru import logger
 
-# Configure the logger
+# Configure the logger, both sinks are written by a background thread so that logging never blocks the event loop
 logger.remove()  # Remove the default configuration
-logger.add(sink="logs.log", level="DEBUG", rotation="10 MB", backtrace=True, diagnose=True, catch=True)  # Add a file sink
-logger.add(sink=sys.stdout, level="INFO")  # Add a console sink
\ No newline at end of file
+logger.add(sink="logs.log", level="DEBUG", rotation="10 MB", backtrace=True, diagnose=True, catch=True,
+           enqueue=True)  # Add a file sink
+logger.add(sink=sys.stdout, level="INFO", serialize=True, enqueue=True)  # Add a console sink
@@ -50,4 +50,13 @@ class NoDataFound(Exception):
 class FileNotFoundInDirectory(Exception):
     def __init__(self, message: str = "Current file not found"):
         self.message = message
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+
+class NltkPackageError(Exception):
+    """Raised when the punkt tokenizer is neither bundled nor downloadable"""
+
+    def __init__(self, message="The punkt tokenizer is missing, bundle it with the following command: "
+                               "python -m nltk.downloader -d $NLTK_DATA_PATH punkt"):
+        self.message = message
+        super().__init__(self.message)
@@ -1,13 +1,13 @@
 import os
+from functools import lru_cache
 from re import search as re_search
-from typing import List
-
-import nltk
-
-nltk.download('punkt')
+from typing import Callable, List
 
 from loguru import logger
 
+from configuration.config import nltk_config
+from source.exceptions.service_exceptions import NltkPackageError
+
 
 def extract_file_and_error(log_entry):
     pattern = r"Error at : `([^`]*)` : `([^`]*)`"
@@ -33,14 +33,34 @@ def delete_file(file_path: str):
         raise FileNotFoundError
 
 
+@lru_cache(maxsize=None)
+def get_word_tokenizer() -> Callable[[str], List[str]]:
+    """
+    nltk word tokenizer, nltk is imported by the first chunking rather than at startup. The punkt data is looked up
+    in NLTK_DATA_PATH first, where the image bundles it, and only downloaded there when missing and allowed.
+    """
+    import nltk
+
+    if nltk_config.NLTK_DATA_PATH not in nltk.data.path:
+        nltk.data.path.insert(0, nltk_config.NLTK_DATA_PATH)
+    try:
+        nltk.data.find("tokenizers/punkt")
+    except LookupError:
+        if not nltk_config.NLTK_DOWNLOAD_MISSING_DATA or not nltk.download(
+                "punkt", download_dir=nltk_config.NLTK_DATA_PATH, quiet=True, raise_on_error=False):
+            raise NltkPackageError
+    return nltk.word_tokenize
+
+
 def chunk_text(text: str, chunk_size: int = 250, overlap: int = 50, ignore_token_length: int = 30) -> List[str]:
     """Chunk text in to a list following this strategy:
     - split using double \n as it usually signifies a new paragraph
     - if the paragraph is less than the specified ignore_token_length parameter then we won't consider it
     - if the paragraph is more than the specified chunk_size then truncate it into sub-paragraphs with overlap"""
+    word_tokenize = get_word_tokenizer()
     chunks = []
     for paragraph in text.split("\n\n"):
-        paragraph_tokens = nltk.word_tokenize(paragraph)
+        paragraph_tokens = word_tokenize(paragraph)
         if len(paragraph_tokens) < ignore_token_length:
             pass
         elif len(paragraph_tokens) > chunk_size:
@@ -49,3 +49,11 @@ class VectorStoreApiConfig(BaseSettings):
     @property
     def VEC_STORE_URL(self):
         return f"{self.VEC_URL}/{self.STORE_ENDPOINT}"
+
+
+class NltkConfig(BaseSettings):
+    NLTK_DATA_PATH: str = Field(env="NLTK_DATA_PATH", default="nltk_data",
+                                description="Directory of the NLTK data bundled with the service, searched first")
+    NLTK_DOWNLOAD_MISSING_DATA: bool = Field(env="NLTK_DOWNLOAD_MISSING_DATA", default=True,
+                                             description="Download the punkt tokenizer to NLTK_DATA_PATH when it is "
+                                                         "not bundled, disabled the service never reaches the network")
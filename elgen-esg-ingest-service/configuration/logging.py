@@ -1,8 +1,6 @@
-import sys
-
 from loguru import logger
 
-# Configure the logger
+# Configure the logger, the console output goes through the log queue set up by elgen_common.logging_conf
 logger.remove()  # Remove the default configuration
-logger.add(sink="logs.log", level="DEBUG", rotation="10 MB", backtrace=True, diagnose=True, catch=True)  # Add a file sink
-logger.add(sink=sys.stdout, level="INFO")  # Add a console sink
\ No newline at end of file
+logger.add(sink="logs.log", level="DEBUG", rotation="10 MB", backtrace=True, diagnose=True, catch=True,
+           enqueue=True)  # Add a file sink written by a background thread
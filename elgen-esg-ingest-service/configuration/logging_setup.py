@@ -2,5 +2,3 @@ import logging
 
 
 logger = logging.getLogger(__name__)
-handler = logging.StreamHandler()
-logger.addHandler(handler)
\ No newline at end of file
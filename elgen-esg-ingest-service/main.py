@@ -1,21 +1,20 @@
 import logging
 
+from elgen_common.logging_conf import logging_config, setup_logging
+from elgen_common.logging_middleware import RouterLoggingMiddleware
 from fastapi import FastAPI
 from uvicorn import run
 
 from configuration.config import AppConfig
 from configuration.injection import DependencyContainer
-from configuration.logging_conf import logging_config
-from configuration.logging_middleware import RouterLoggingMiddleware
 from source import middlewares
 from source.api.ingest_api import ingest_router
 from source.middlewares.app_middlewares import middlewares
 from source.middlewares.interceptors import GenericExceptionInterceptor
 from source.middlewares.observers import ProcessTimeMiddleware
 
+setup_logging()
 logger = logging.getLogger(__name__)
-handler = logging.StreamHandler()
-logger.addHandler(handler)
 
 
 def get_application() -> FastAPI:
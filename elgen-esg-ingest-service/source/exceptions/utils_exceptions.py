@@ -10,5 +10,5 @@ class NltkPackageError(UtilsException):
     """An error raised when the punk package is missing"""
 
     def __init__(self, detail="You need to install NLTK package to chunk your text, for that use the following "
-                              "command: nltk.download('punkt')"):
+                              "command: python -m nltk.downloader -d $NLTK_DATA_PATH punkt"):
         super().__init__(detail)
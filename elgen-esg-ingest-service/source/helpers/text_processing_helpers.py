@@ -1,8 +1,6 @@
 from typing import List
 
-import nltk
-
-nltk.download('punkt')
+from source.utils.text_preprocessing_utils import get_word_tokenizer
 
 
 def chunk_text_nltk(text: str, chunk_size: int = 250, overlap: int = 50, ignore_token_length: int = 30) -> List[str]:
@@ -10,9 +8,10 @@ def chunk_text_nltk(text: str, chunk_size: int = 250, overlap: int = 50, ignore_
     - split using double \n as it usually signifies a new paragraph
     - if the paragraph is less than the specified ignore_token_length parameter then we won't consider it
     - if the paragraph is more than the specified chunk_size then truncate it into sub-paragraphs with overlap"""
+    word_tokenize = get_word_tokenizer()
     chunks = []
     for paragraph in text.split("\n\n"):
-        paragraph_tokens = nltk.word_tokenize(paragraph)
+        paragraph_tokens = word_tokenize(paragraph)
         if len(paragraph_tokens) < ignore_token_length:
             continue
         elif len(paragraph_tokens) > chunk_size:
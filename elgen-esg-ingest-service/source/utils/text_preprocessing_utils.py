@@ -1,10 +1,30 @@
-from typing import List
-
-import nltk
+from functools import lru_cache
+from typing import Callable, List
 
+from configuration.config import NltkConfig
 from source.exceptions.utils_exceptions import NltkPackageError
 
-nltk.download('punkt')
+PUNKT_RESOURCE = "tokenizers/punkt"
+
+
+@lru_cache(maxsize=None)
+def get_word_tokenizer() -> Callable[[str], List[str]]:
+    """
+    nltk word tokenizer, nltk is imported by the first chunking rather than at startup. The punkt data is looked up
+    in NLTK_DATA_PATH first, where the image bundles it, and only downloaded there when missing and allowed.
+    """
+    import nltk
+
+    nltk_config = NltkConfig()
+    if nltk_config.NLTK_DATA_PATH not in nltk.data.path:
+        nltk.data.path.insert(0, nltk_config.NLTK_DATA_PATH)
+    try:
+        nltk.data.find(PUNKT_RESOURCE)
+    except LookupError:
+        if not nltk_config.NLTK_DOWNLOAD_MISSING_DATA or not nltk.download(
+                "punkt", download_dir=nltk_config.NLTK_DATA_PATH, quiet=True, raise_on_error=False):
+            raise NltkPackageError
+    return nltk.word_tokenize
 
 
 def chunk_text_nltk(text: str, chunk_size: int = 250, overlap: int = 50, ignore_token_length: int = 30) -> List[str]:
@@ -12,11 +32,10 @@ def chunk_text_nltk(text: str, chunk_size: int = 250, overlap: int = 50, ignore_
     - split using double \n as it usually signifies a new paragraph
     - if the paragraph is less than the specified ignore_token_length parameter then we won't consider it
     - if the paragraph is more than the specified chunk_size then truncate it into sub-paragraphs with overlap"""
-    if not nltk.data.find('tokenizers/punkt'):
-        raise NltkPackageError
+    word_tokenize = get_word_tokenizer()
     chunks = []
     for paragraph in text.split("\n\n"):
-        paragraph_tokens = nltk.word_tokenize(paragraph)
+        paragraph_tokens = word_tokenize(paragraph)
         if len(paragraph_tokens) < ignore_token_length:
             continue
         elif len(paragraph_tokens) > chunk_size:
@@ -0,0 +1,59 @@
+import socket
+
+import nltk
+import pytest
+from elgen_common.startup_profile import profile_imports
+
+from source.exceptions.utils_exceptions import NltkPackageError
+from source.utils.text_preprocessing_utils import chunk_text_nltk, get_word_tokenizer, PUNKT_RESOURCE
+
+
+@pytest.fixture
+def network_disabled(monkeypatch):
+    """Every outbound connection of the test fails as it would without network access"""
+
+    def refuse_connection(*args, **kwargs):
+        raise OSError("network disabled")
+
+    for target, name in ((socket.socket, "connect"), (socket.socket, "connect_ex"),
+                         (socket, "create_connection"), (socket, "getaddrinfo")):
+        monkeypatch.setattr(target, name, refuse_connection)
+
+
+@pytest.fixture
+def nltk_data_path(monkeypatch, tmp_path):
+    """An empty NLTK data directory searched instead of the ones of the machine"""
+    monkeypatch.setenv("NLTK_DATA_PATH", str(tmp_path))
+    monkeypatch.setattr(nltk.data, "path", [])
+    get_word_tokenizer.cache_clear()
+    yield tmp_path
+    get_word_tokenizer.cache_clear()
+
+
+def test_text_preprocessing_import_is_offline_and_lazy():
+    """Importing the chunking utils needs neither the network nor nltk"""
+    import_times = profile_imports("source.utils.text_preprocessing_utils", offline=True)
+    imported_packages = {import_time.package for import_time in import_times}
+    assert "source.utils.text_preprocessing_utils" in imported_packages
+    assert "nltk" not in imported_packages
+
+
+def test_bundled_punkt_is_used_offline(network_disabled, nltk_data_path, monkeypatch):
+    """The bundled punkt data is found without trying to download it"""
+    (nltk_data_path / PUNKT_RESOURCE / "PY3").mkdir(parents=True)
+    monkeypatch.setattr(nltk, "download", lambda *args, **kwargs: pytest.fail("punkt was downloaded"))
+    assert get_word_tokenizer() is nltk.word_tokenize
+
+
+def test_chunk_text_offline_without_punkt(network_disabled, nltk_data_path):
+    """Without network a missing punkt data fails the chunking with NltkPackageError"""
+    with pytest.raises(NltkPackageError):
+        chunk_text_nltk("some text")
+
+
+def test_chunk_text_without_punkt_download_disabled(nltk_data_path, monkeypatch):
+    """Missing punkt data is not downloaded when NLTK_DOWNLOAD_MISSING_DATA is disabled"""
+    monkeypatch.setenv("NLTK_DOWNLOAD_MISSING_DATA", "false")
+    monkeypatch.setattr(nltk, "download", lambda *args, **kwargs: pytest.fail("punkt was downloaded"))
+    with pytest.raises(NltkPackageError):
+        chunk_text_nltk("some text")
@@ -0,0 +1,61 @@
+from pydantic import BaseSettings, Field
+
+
+class LoadTestConfig(BaseSettings):
+    CONCURRENCY: int = Field(env="CONCURRENCY", default=8, description="Virtual users running scenarios at once")
+    SCENARIOS_COUNT: int = Field(env="SCENARIOS_COUNT", default=64,
+                                 description="Scenarios run in total, shared between the virtual users")
+    WARM_UP_SCENARIOS_COUNT: int = Field(env="WARM_UP_SCENARIOS_COUNT", default=2,
+                                         description="Scenarios run before the measured ones, left out of the report")
+    LOCAL_SOURCES_COUNT: int = Field(env="LOCAL_SOURCES_COUNT", default=2,
+                                     description="Source documents retrieved for every question")
+    REQUEST_TIMEOUT: float = Field(env="REQUEST_TIMEOUT", default=300, description="Seconds allowed to a scenario")
+    MODEL_CODE: str = Field(env="LOAD_TEST_MODEL_CODE", default="LOAD",
+                            description="Prefix of the code of the stand-in model")
+
+
+class LlmStandInConfig(BaseSettings):
+    FIRST_TOKEN_LATENCY: float = Field(env="LLM_FIRST_TOKEN_LATENCY", default=0.3,
+                                       description="Seconds before the stand-in model streams its first token")
+    TOKENS_PER_SECOND: float = Field(env="LLM_TOKENS_PER_SECOND", default=40,
+                                     description="Rate of the tokens streamed after the first one")
+    ANSWER_TOKENS: int = Field(env="LLM_ANSWER_TOKENS", default=60, description="Tokens of every answer")
+
+
+class VectorStoreStandInConfig(BaseSettings):
+    DOCUMENTS_COUNT: int = Field(env="VECTOR_STORE_DOCUMENTS_COUNT", default=500,
+                                 description="Generated paragraphs ingested in the in-memory vector store")
+    EMBEDDING_DIMENSION: int = Field(env="VECTOR_STORE_EMBEDDING_DIMENSION", default=256,
+                                     description="Dimension of the hashed bag of words embeddings")
+
+
+class ServicesConfig(BaseSettings):
+    HOST: str = Field(env="LOAD_TEST_HOST", default="127.0.0.1", description="Interface of the services and stand-ins")
+    BFF_DIRECTORY: str = Field(env="BFF_DIRECTORY", default="../elgen-esg-bff")
+    BFF_PYTHON: str = Field(env="BFF_PYTHON", default="python",
+                            description="Interpreter of an environment with the BFF requirements")
+    CONVERSATION_SERVICE_DIRECTORY: str = Field(env="CONVERSATION_SERVICE_DIRECTORY",
+                                                default="../elgen-esg-conversation-service")
+    CONVERSATION_SERVICE_PYTHON: str = Field(env="CONVERSATION_SERVICE_PYTHON", default="python",
+                                             description="Interpreter of an environment with the conversation "
+                                                         "service requirements")
+    TRACE_EXPORTER: str = Field(env="SERVICES_TRACE_EXPORTER", default="none",
+                                description="Trace exporter of the services, none keeps them from calling a collector")
+    START_TIMEOUT: float = Field(env="SERVICE_START_TIMEOUT", default=120,
+                                 description="Seconds a service is given to answer once launched")
+
+
+class DataBaseConfig(BaseSettings):
+    """Local Postgres database of the conversation service, its tables are created when missing"""
+    DB_HOST: str = Field(env='DB_HOST', default='localhost')
+    DB_PORT: int = Field(env='DB_PORT', default=5432)
+    DB_NAME: str = Field(env='DB_NAME', default='elgen_load_test')
+    DB_USER: str = Field(env='DB_USER', default='postgres')
+    DB_PASSWORD: str = Field(env='DB_PASSWORD', default='postgres')
+
+
+load_test_config = LoadTestConfig()
+llm_stand_in_config = LlmStandInConfig()
+vector_store_stand_in_config = VectorStoreStandInConfig()
+services_config = ServicesConfig()
+db_config = DataBaseConfig()
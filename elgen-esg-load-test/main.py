@@ -0,0 +1,102 @@
+"""
+Offline end-to-end load test of the chat flow: the BFF and the conversation service run as subprocesses against local
+stand-ins of Keycloak, of the sources service with an in-memory vector store and of a streaming LLM, the conversation
+service stores its data in a local Postgres.
+
+    python main.py --concurrency 16 --scenarios 200 --report report.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+
+import aiohttp
+
+from configuration.config import (load_test_config, llm_stand_in_config, vector_store_stand_in_config,
+                                  services_config, db_config)
+from source.schemas.report_schemas import LoadTestReport
+from source.services.scenario_runner import run_load_test
+from source.services.seeder import seed_workspace
+from source.services.service_launcher import (start_stand_in, create_conversation_tables, get_conversation_service,
+                                              get_bff)
+from source.stand_ins.keycloak_stand_in import create_keycloak_stand_in
+from source.stand_ins.llm_stand_in import create_llm_stand_in
+from source.stand_ins.vector_store_stand_in import create_vector_store_stand_in
+
+logger = logging.getLogger("load_test")
+
+BFF_HEALTH_PATH = "/docs"
+CONVERSATION_SERVICE_HEALTH_PATH = "/healthz"
+
+
+async def run() -> LoadTestReport:
+    runners = []
+    services = []
+    try:
+        for stand_in in (create_keycloak_stand_in(), create_llm_stand_in(llm_stand_in_config),
+                         create_vector_store_stand_in(vector_store_stand_in_config)):
+            runners.append(await start_stand_in(stand_in, services_config.HOST))
+        (_, keycloak_url), (_, llm_url), (_, sources_url) = runners
+        logger.info(f"stand-ins: keycloak {keycloak_url}, llm {llm_url}, sources {sources_url}")
+
+        create_conversation_tables(services_config, db_config)
+        conversation_service = get_conversation_service(services_config, db_config, sources_url)
+        services.append(conversation_service)
+        conversation_service.start()
+        startup_time = await conversation_service.wait_until_up(CONVERSATION_SERVICE_HEALTH_PATH,
+                                                                services_config.START_TIMEOUT)
+        logger.info(f"conversation service up in {startup_time:.1f} s")
+
+        bff = get_bff(services_config, conversation_service.url, sources_url, keycloak_url)
+        services.append(bff)
+        bff.start()
+        startup_time = await bff.wait_until_up(BFF_HEALTH_PATH, services_config.START_TIMEOUT)
+        logger.info(f"bff up in {startup_time:.1f} s")
+
+        async with aiohttp.ClientSession() as session:
+            workspace = await seed_workspace(session, conversation_service.url, llm_url, load_test_config)
+        logger.info(f"running {load_test_config.SCENARIOS_COUNT} scenarios with {load_test_config.CONCURRENCY} "
+                    f"virtual users in workspace {workspace.workspace_id}")
+        return await run_load_test(bff.url, keycloak_url, workspace, load_test_config)
+    finally:
+        for service in reversed(services):
+            service.stop()
+        for runner, _ in runners:
+            with contextlib.suppress(Exception):
+                await runner.cleanup()
+
+
+def print_report(report: LoadTestReport) -> None:
+    print(f"{report.scenarios} scenarios, {report.concurrency} virtual users, {report.duration:.1f} s, "
+          f"{report.throughput:.2f} scenarios/s, {report.errors} errors")
+    for name, summary in (("TTFT", report.ttft), ("total latency", report.total_latency)):
+        if summary.p50 is not None:
+            print(f"  {name:<14} p50 {summary.p50 * 1000:>9.1f} ms  p99 {summary.p99 * 1000:>9.1f} ms  "
+                  f"max {summary.max * 1000:>9.1f} ms")
+    for error, count in report.error_samples.items():
+        print(f"  {count} x {error}")
+    print(report.json())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, help="Virtual users running scenarios at once")
+    parser.add_argument("--scenarios", type=int, help="Scenarios run in total")
+    parser.add_argument("--report", help="File the JSON report is written to")
+    arguments = parser.parse_args()
+    if arguments.concurrency is not None:
+        load_test_config.CONCURRENCY = arguments.concurrency
+    if arguments.scenarios is not None:
+        load_test_config.SCENARIOS_COUNT = arguments.scenarios
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    report = asyncio.run(run())
+    print_report(report)
+    if arguments.report:
+        with open(arguments.report, "w") as report_file:
+            json.dump(report.dict(), report_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
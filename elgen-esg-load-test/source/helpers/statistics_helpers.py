@@ -0,0 +1,33 @@
+import math
+from collections import Counter
+
+from source.schemas.report_schemas import LatencySummary, LoadTestReport, ScenarioResult
+
+
+def get_percentile(values: list[float], percentile: float) -> float | None:
+    """Nearest rank percentile: the smallest value with at least `percentile` % of the values below or equal to it"""
+    if not values:
+        return None
+    ordered_values = sorted(values)
+    rank = math.ceil(percentile / 100 * len(ordered_values))
+    return ordered_values[max(rank, 1) - 1]
+
+
+def get_latency_summary(values: list[float]) -> LatencySummary:
+    if not values:
+        return LatencySummary()
+    return LatencySummary(p50=get_percentile(values, 50), p99=get_percentile(values, 99),
+                          mean=sum(values) / len(values), max=max(values))
+
+
+def get_report(results: list[ScenarioResult], concurrency: int, duration: float) -> LoadTestReport:
+    successes = [result for result in results if result.error is None]
+    return LoadTestReport(
+        concurrency=concurrency,
+        scenarios=len(results),
+        errors=len(results) - len(successes),
+        error_samples=dict(Counter(result.error for result in results if result.error is not None)),
+        duration=duration,
+        throughput=len(successes) / duration if duration else 0,
+        ttft=get_latency_summary([result.ttft for result in successes]),
+        total_latency=get_latency_summary([result.total_latency for result in successes]))
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+
+
+class ScenarioResult(BaseModel):
+    """Timings of one question → sources → streamed answer scenario, measured from the question request"""
+    virtual_user: int = Field(..., description="Index of the virtual user that ran the scenario")
+    ttft: float | None = Field(None, description="Seconds until the first byte of the streamed answer")
+    total_latency: float | None = Field(None, description="Seconds until the end of the streamed answer")
+    error: str | None = Field(None, description="Step and reason of the failure of the scenario")
+
+
+class LatencySummary(BaseModel):
+    p50: float | None = Field(None, description="Median in seconds")
+    p99: float | None = Field(None, description="99th percentile in seconds")
+    mean: float | None = Field(None, description="Mean in seconds")
+    max: float | None = Field(None, description="Maximum in seconds")
+
+
+class LoadTestReport(BaseModel):
+    concurrency: int = Field(..., description="Virtual users running scenarios at once")
+    scenarios: int = Field(..., description="Measured scenarios")
+    errors: int = Field(..., description="Failed scenarios")
+    error_samples: dict[str, int] = Field(default_factory=dict, description="Failed scenarios per error")
+    duration: float = Field(..., description="Seconds taken by the measured scenarios")
+    throughput: float = Field(..., description="Successful scenarios per second")
+    ttft: LatencySummary
+    total_latency: LatencySummary
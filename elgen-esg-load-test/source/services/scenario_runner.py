@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from configuration.config import LoadTestConfig
+from source.helpers.statistics_helpers import get_report
+from source.schemas.report_schemas import LoadTestReport, ScenarioResult
+from source.services.seeder import SeededWorkspace
+from source.stand_ins.vector_store_stand_in import generate_question
+
+logger = logging.getLogger(__name__)
+
+KEYCLOAK_REALM = "elgen"
+
+
+class ScenarioError(Exception):
+    """Raised when a step of a scenario fails, the message names the step"""
+
+    def __init__(self, step: str, reason: str) -> None:
+        self.step = step
+        self.reason = reason
+        super().__init__(f"{step}: {reason}")
+
+
+class VirtualUser:
+    """A signed in user chatting in its own conversation of the load test workspace through the BFF"""
+
+    def __init__(self, index: int, session: aiohttp.ClientSession, bff_url: str, workspace: SeededWorkspace,
+                 config: LoadTestConfig) -> None:
+        self.index = index
+        self.session = session
+        self.bff_url = bff_url
+        self.workspace = workspace
+        self.config = config
+        self.headers: dict[str, str] = {}
+
+    async def request_json(self, step: str, method: str, uri: str, **kwargs) -> dict:
+        try:
+            async with self.session.request(method, f"{self.bff_url}{uri}", **kwargs) as response:
+                if response.status >= 400:
+                    raise ScenarioError(step, f"HTTP {response.status}")
+                return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            raise ScenarioError(step, type(error).__name__) from error
+
+    async def sign_in(self, keycloak_url: str) -> None:
+        """Gets a token of the Keycloak stand-in then opens the conversation of the user"""
+        async with self.session.post(f"{keycloak_url}/realms/{KEYCLOAK_REALM}/protocol/openid-connect/token", data={
+                "grant_type": "password", "username": f"load-test-user-{self.index}", "password": "load-test"}) \
+                as response:
+            token = (await response.json())["access_token"]
+        self.headers = {"Authorization": f"Bearer {token}", "workspace-id": self.workspace.workspace_id}
+        conversation = await self.request_json("conversation", "POST", "/conversations", headers=self.headers,
+                                               json={"title": f"load test {self.index}"})
+        self.headers["conversation-id"] = str(conversation["id"])
+
+    async def run_scenario(self, scenario_index: int) -> ScenarioResult:
+        """Asks a question, retrieves its sources then streams its answer, timings start with the question request"""
+        question = generate_question(scenario_index)
+        start_time = time.perf_counter()
+        try:
+            created_question = await self.request_json(
+                "question", "POST", "/chat/question", headers=self.headers, json={"question": question},
+                params={"skipDoc": "false", "skipWeb": "true", "useClassification": "false"})
+            await self.request_json(
+                "sources", "POST", "/chat/source-doc", json={"id": created_question["id"], "content": question},
+                headers={**self.headers, "model-code": self.workspace.model_code},
+                params={"localSourcesCount": self.config.LOCAL_SOURCES_COUNT,
+                        "workspaceId": self.workspace.workspace_id})
+            ttft = await self.stream_answer(created_question["id"], start_time)
+        except ScenarioError as error:
+            return ScenarioResult(virtual_user=self.index, error=str(error))
+        return ScenarioResult(virtual_user=self.index, ttft=ttft, total_latency=time.perf_counter() - start_time)
+
+    async def stream_answer(self, question_id: str, start_time: float) -> float:
+        """Reads the whole streamed answer, returns the seconds from start_time to its first byte"""
+        ttft = None
+        try:
+            async with self.session.get(f"{self.bff_url}/chat/answer/{question_id}/stream",
+                                        headers={**self.headers, "model-code": self.workspace.model_code}) as response:
+                if response.status >= 400:
+                    raise ScenarioError("answer", f"HTTP {response.status}")
+                async for chunk in response.content.iter_any():
+                    if ttft is None and chunk:
+                        ttft = time.perf_counter() - start_time
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            raise ScenarioError("answer", type(error).__name__) from error
+        if ttft is None:
+            raise ScenarioError("answer", "empty stream")
+        return ttft
+
+    async def run_scenarios(self, scenario_indexes: asyncio.Queue, results: list[ScenarioResult]) -> None:
+        while not scenario_indexes.empty():
+            results.append(await self.run_scenario(scenario_indexes.get_nowait()))
+
+
+async def run_load_test(bff_url: str, keycloak_url: str, workspace: SeededWorkspace,
+                        config: LoadTestConfig) -> LoadTestReport:
+    """
+    Signs CONCURRENCY virtual users in, runs WARM_UP_SCENARIOS_COUNT scenarios left out of the report, then shares
+    SCENARIOS_COUNT scenarios between the virtual users running at once.
+    """
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector,
+                                     timeout=aiohttp.ClientTimeout(total=config.REQUEST_TIMEOUT)) as session:
+        virtual_users = [VirtualUser(index, session, bff_url, workspace, config) for index in range(config.CONCURRENCY)]
+        await asyncio.gather(*(virtual_user.sign_in(keycloak_url) for virtual_user in virtual_users))
+
+        for scenario_index in range(config.WARM_UP_SCENARIOS_COUNT):
+            warm_up_result = await virtual_users[0].run_scenario(scenario_index)
+            logger.info(f"warm up scenario {scenario_index}: {warm_up_result.error or 'ok'}")
+
+        scenario_indexes = asyncio.Queue()
+        for scenario_index in range(config.SCENARIOS_COUNT):
+            scenario_indexes.put_nowait(config.WARM_UP_SCENARIOS_COUNT + scenario_index)
+        results: list[ScenarioResult] = []
+        start_time = time.perf_counter()
+        await asyncio.gather(*(virtual_user.run_scenarios(scenario_indexes, results)
+                               for virtual_user in virtual_users))
+        return get_report(results, concurrency=config.CONCURRENCY, duration=time.perf_counter() - start_time)
@@ -0,0 +1,54 @@
+from uuid import uuid4
+
+import aiohttp
+from pydantic import BaseModel
+
+from configuration.config import LoadTestConfig
+
+WORKSPACE_TYPE_NAME = "chat"
+
+
+class SeedingError(Exception):
+    """Raised when the conversation service refuses the load test data"""
+
+
+class SeededWorkspace(BaseModel):
+    workspace_id: str
+    model_code: str
+
+
+async def post(session: aiohttp.ClientSession, url: str, body: dict):
+    async with session.post(url, json=body) as response:
+        if response.status >= 400:
+            raise SeedingError(f"POST {url} answered {response.status}: {await response.text()}")
+        return await response.json()
+
+
+async def get_workspace_type_id(session: aiohttp.ClientSession, conversation_url: str) -> str:
+    """Id of the chat workspace type, created when the database does not have it yet"""
+    async with session.get(f"{conversation_url}/workspaces/types") as response:
+        workspace_types = (await response.json()).get("data", []) if response.status == 200 else []
+    for workspace_type in workspace_types:
+        if workspace_type["name"] == WORKSPACE_TYPE_NAME:
+            return workspace_type["id"]
+    return await post(session, f"{conversation_url}/workspaces/types", {
+        "name": WORKSPACE_TYPE_NAME, "description": "load test chat workspaces", "available": True})
+
+
+async def seed_workspace(session: aiohttp.ClientSession, conversation_url: str, llm_url: str,
+                         config: LoadTestConfig) -> SeededWorkspace:
+    """
+    Creates directly on the conversation service a chat workspace answered by the LLM stand-in, the answer cache of the
+    workspace is disabled so every scenario reaches the model. The stand-in listens on a new port every run, so every
+    run registers a model and a workspace of its own.
+    """
+    run_id = uuid4().hex[:8]
+    model_code = f"{config.MODEL_CODE}-{run_id}"
+    workspace_type_id = await get_workspace_type_id(session, conversation_url)
+    await post(session, f"{conversation_url}/models", {
+        "code": model_code, "name": "llm-stand-in", "available": True, "default": True,
+        "max_web": 0, "max_doc": config.LOCAL_SOURCES_COUNT, "route": llm_url, "type": "chat"})
+    workspace = await post(session, f"{conversation_url}/workspaces", {
+        "name": f"load-test-{run_id}", "description": "load test workspace", "type_id": workspace_type_id,
+        "available_model_codes": [model_code], "answer_cache_enabled": False})
+    return SeededWorkspace(workspace_id=workspace["id"], model_code=model_code)
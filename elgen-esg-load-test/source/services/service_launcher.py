@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import os
+import pathlib
+import socket
+import subprocess
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+from configuration.config import DataBaseConfig, ServicesConfig
+
+logger = logging.getLogger(__name__)
+
+load_test_directory = pathlib.Path(__file__).parent.parent.parent
+
+CREATE_CONVERSATION_TABLES = ("from configuration.injection_container import DependencyContainer\n"
+                              "DependencyContainer().db_helpers().init_database()")
+
+
+class ServiceLaunchError(Exception):
+    """Raised when a service under test exits or does not answer in time"""
+
+
+def get_free_port(host: str) -> int:
+    with socket.socket() as free_socket:
+        free_socket.bind((host, 0))
+        return free_socket.getsockname()[1]
+
+
+async def start_stand_in(stand_in: web.Application, host: str) -> tuple[web.AppRunner, str]:
+    """Serves the stand-in on a free port of the event loop of the load test, returns its runner and url"""
+    runner = web.AppRunner(stand_in, access_log=None)
+    await runner.setup()
+    port = get_free_port(host)
+    await web.TCPSite(runner, host, port).start()
+    return runner, f"http://{host}:{port}"
+
+
+class ServiceProcess:
+    """A service under test run by uvicorn in a subprocess of its own interpreter, its output goes to a log file"""
+
+    def __init__(self, name: str, python: str, directory: str, app: str, host: str, environment: dict) -> None:
+        self.name = name
+        self.python = python
+        self.directory = (load_test_directory / directory).resolve()
+        self.app = app
+        self.host = host
+        self.port = get_free_port(host)
+        self.environment = {**os.environ, **{key: str(value) for key, value in environment.items()}}
+        self.log_path = pathlib.Path(tempfile.gettempdir()) / f"elgen-load-test-{self.name}-{self.port}.log"
+        self.process: subprocess.Popen | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> None:
+        statement = ("import uvicorn\n"
+                     f"uvicorn.run({self.app!r}, host={self.host!r}, port={self.port}, log_level='warning')")
+        with open(self.log_path, "w") as log_file:
+            self.process = subprocess.Popen([self.python, "-c", statement], cwd=self.directory, env=self.environment,
+                                            stdout=log_file, stderr=subprocess.STDOUT)
+        logger.info(f"{self.name} started on {self.url}, logs in {self.log_path}")
+
+    def get_last_logs(self, characters: int = 4000) -> str:
+        return self.log_path.read_text(errors="replace")[-characters:] if self.log_path.exists() else ""
+
+    async def wait_until_up(self, health_path: str, timeout: float) -> float:
+        """Seconds until the health path answers below 500"""
+        start_time = time.perf_counter()
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=1)) as session:
+            while time.perf_counter() - start_time < timeout:
+                if self.process.poll() is not None:
+                    raise ServiceLaunchError(f"{self.name} exited before answering:\n{self.get_last_logs()}")
+                try:
+                    async with session.get(f"{self.url}{health_path}") as response:
+                        if response.status < 500:
+                            return time.perf_counter() - start_time
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    pass
+                await asyncio.sleep(0.1)
+        raise ServiceLaunchError(f"{self.name} did not answer on {health_path} within {timeout} seconds:\n"
+                                 f"{self.get_last_logs()}")
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+def create_conversation_tables(services_config: ServicesConfig, db_config: DataBaseConfig) -> None:
+    """Creates the missing tables of the conversation service in the load test database"""
+    result = subprocess.run([services_config.CONVERSATION_SERVICE_PYTHON, "-c", CREATE_CONVERSATION_TABLES],
+                            cwd=(load_test_directory / services_config.CONVERSATION_SERVICE_DIRECTORY).resolve(),
+                            env={**os.environ, **{key: str(value) for key, value in db_config.dict().items()}},
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise ServiceLaunchError(f"Creating the conversation tables failed:\n{result.stderr[-4000:]}")
+
+
+def get_conversation_service(services_config: ServicesConfig, db_config: DataBaseConfig,
+                             sources_url: str) -> ServiceProcess:
+    return ServiceProcess(
+        name="conversation-service", python=services_config.CONVERSATION_SERVICE_PYTHON,
+        directory=services_config.CONVERSATION_SERVICE_DIRECTORY, app="main:app", host=services_config.HOST,
+        environment={**db_config.dict(), "SOURCES_SERVICE_URL": sources_url,
+                     "TRACE_EXPORTER": services_config.TRACE_EXPORTER})
+
+
+def get_bff(services_config: ServicesConfig, conversation_url: str, sources_url: str,
+            keycloak_url: str) -> ServiceProcess:
+    return ServiceProcess(
+        name="bff", python=services_config.BFF_PYTHON, directory=services_config.BFF_DIRECTORY, app="app:app",
+        host=services_config.HOST,
+        environment={"CONVERSATION_SERVICE_URL": conversation_url, "SOURCES_SERVICE_URL": sources_url,
+                     "SERVER_URL": keycloak_url, "TRACE_EXPORTER": services_config.TRACE_EXPORTER,
+                     # a single BFF process, its counters do not have to be shared
+                     "RATE_LIMIT_STORE": "memory"})
@@ -0,0 +1,105 @@
+import json
+import time
+from datetime import date
+from uuid import uuid4, uuid5, NAMESPACE_URL
+
+from aiohttp import web
+
+CLIENT_NAME = "elgen"
+# high enough for the daily conversations and questions limits of the BFF to never be reached during a run
+USER_LIMIT = "1000000"
+TOKEN_LIFESPAN = 3600
+
+
+def get_user_representation(user_id: str, username: str) -> dict:
+    """Keycloak admin representation of a user with the limit attributes read by the BFF"""
+    today = str(date.today())
+    return {
+        "id": user_id,
+        "username": username,
+        "email": f"{username}@example.com",
+        "firstName": username,
+        "lastName": "load-test",
+        "emailVerified": True,
+        "createdTimestamp": int(time.time() * 1000),
+        "attributes": {f"{attribute}{suffix}": [value] for attribute in ("conversations", "questions")
+                       for suffix, value in (("Date", today), ("Init", USER_LIMIT), ("Limit", USER_LIMIT))},
+        "clientRoles": {CLIENT_NAME: ["user"]},
+    }
+
+
+def get_token_info(user: dict, realm_url: str) -> dict:
+    """Introspection answer of an active token of the user"""
+    issued_at = int(time.time())
+    return {
+        "exp": issued_at + TOKEN_LIFESPAN, "iat": issued_at, "jti": str(uuid4()), "iss": realm_url,
+        "aud": "account", "sub": user["id"], "typ": "Bearer", "azp": CLIENT_NAME,
+        "session_state": str(uuid4()), "acr": "1", "allowed-origins": ["*"],
+        "realm_access": {"roles": ["default-roles-elgen", "offline_access", "uma_authorization"]},
+        "resource_access": {CLIENT_NAME: {"roles": user["clientRoles"][CLIENT_NAME]}},
+        "scope": "openid email profile", "sid": str(uuid4()), "email_verified": True,
+        "preferred_username": user["username"], "email": user["email"], "client_id": CLIENT_NAME,
+        "username": user["username"], "active": True,
+    }
+
+
+def create_keycloak_stand_in(sources_config: list[dict] | None = None) -> web.Application:
+    """
+    Stand-in of the Keycloak endpoints called by the BFF: the OpenID discovery, the token endpoint which signs in any
+    username with any password, the token introspection and the admin user and client resources, all kept in memory.
+    """
+    users: dict[str, dict] = {}
+    tokens: dict[str, str] = {}
+
+    def get_realm_url(request: web.Request) -> str:
+        return f"{request.scheme}://{request.host}/realms/{request.match_info['realm']}"
+
+    async def get_openid_configuration(request: web.Request) -> web.Response:
+        realm_url = get_realm_url(request)
+        return web.json_response({"issuer": realm_url,
+                                  "token_endpoint": f"{realm_url}/protocol/openid-connect/token",
+                                  "introspection_endpoint": f"{realm_url}/protocol/openid-connect/token/introspect"})
+
+    async def create_token(request: web.Request) -> web.Response:
+        form = await request.post()
+        username = form.get("username") or form.get("client_id") or "admin"
+        user_id = str(uuid5(NAMESPACE_URL, username))
+        users.setdefault(user_id, get_user_representation(user_id, username))
+        access_token = f"load-test-{uuid4()}"
+        tokens[access_token] = user_id
+        return web.json_response({"access_token": access_token, "refresh_token": f"load-test-refresh-{uuid4()}",
+                                  "token_type": "Bearer", "expires_in": TOKEN_LIFESPAN,
+                                  "refresh_expires_in": 2 * TOKEN_LIFESPAN})
+
+    async def introspect_token(request: web.Request) -> web.Response:
+        form = await request.post()
+        if (user_id := tokens.get(form.get("token"))) is None:
+            return web.json_response({"active": False})
+        return web.json_response(get_token_info(users[user_id], get_realm_url(request)))
+
+    async def get_user(request: web.Request) -> web.Response:
+        if (user := users.get(request.match_info["user_id"])) is None:
+            return web.json_response({"error": "User not found"}, status=404)
+        return web.json_response(user)
+
+    async def update_user(request: web.Request) -> web.Response:
+        if (user := users.get(request.match_info["user_id"])) is None:
+            return web.json_response({"error": "User not found"}, status=404)
+        body = await request.json()
+        user["attributes"].update(body.get("attributes") or {})
+        return web.Response(status=204)
+
+    async def get_client(request: web.Request) -> web.Response:
+        return web.json_response({"id": request.match_info["client_id"], "clientId": CLIENT_NAME,
+                                  "attributes": {"sourceConfig": json.dumps(sources_config or [])}})
+
+    keycloak_stand_in = web.Application()
+    keycloak_stand_in.router.add_get("/realms/{realm}/.well-known/openid-configuration", get_openid_configuration)
+    # the BFF asks the admin token on the discovered endpoint followed by a slash
+    for token_path in ("/token", "/token/"):
+        keycloak_stand_in.router.add_post(f"/realms/{{realm}}/protocol/openid-connect{token_path}", create_token)
+    keycloak_stand_in.router.add_post("/realms/{realm}/protocol/openid-connect/token/introspect", introspect_token)
+    keycloak_stand_in.router.add_get("/admin/realms/{realm}/users/{user_id}", get_user)
+    keycloak_stand_in.router.add_put("/admin/realms/{realm}/users/{user_id}", update_user)
+    keycloak_stand_in.router.add_get("/admin/realms/{realm}/clients/{client_id}", get_client)
+    return keycloak_stand_in
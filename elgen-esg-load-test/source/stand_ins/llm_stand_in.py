@@ -0,0 +1,48 @@
+import asyncio
+import json
+import time
+
+from aiohttp import web
+
+from configuration.config import LlmStandInConfig
+
+STREAMING_INFERENCE_PATH = "/inference/stream"
+
+
+def get_answer_tokens(prompt: str, tokens_count: int) -> list[str]:
+    """Deterministic answer of a prompt, the same prompt always gets the same tokens"""
+    words = prompt.split() or ["answer"]
+    offset = sum(map(ord, prompt)) % len(words)
+    return [f"{words[(offset + index) % len(words)]} " for index in range(tokens_count)]
+
+
+def create_llm_stand_in(config: LlmStandInConfig) -> web.Application:
+    """
+    Stand-in of the model service streaming endpoint: one JSON chunk per token, the first one after
+    FIRST_TOKEN_LATENCY, the next ones at TOKENS_PER_SECOND, then the DONE chunk with the whole answer.
+    """
+
+    async def stream_inference(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        start_time = time.perf_counter()
+        tokens = get_answer_tokens(body.get("prompt", ""), config.ANSWER_TOKENS)
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+
+        await asyncio.sleep(config.FIRST_TOKEN_LATENCY)
+        for index, token in enumerate(tokens):
+            if index:
+                await asyncio.sleep(1 / config.TOKENS_PER_SECOND)
+            await response.write(json.dumps({"status": "IN_PROGRESS", "data": token}).encode())
+        await response.write(json.dumps({"status": "DONE", "data": {
+            "response": "".join(tokens),
+            "prompt_length": len(body.get("prompt", "").split()),
+            "inference_time": time.perf_counter() - start_time,
+            "model_name": "llm-stand-in"}}).encode())
+        await response.write_eof()
+        return response
+
+    llm_stand_in = web.Application()
+    llm_stand_in.router.add_post(STREAMING_INFERENCE_PATH, stream_inference)
+    return llm_stand_in
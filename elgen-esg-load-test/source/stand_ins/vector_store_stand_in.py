@@ -0,0 +1,96 @@
+import math
+import random
+import re
+import zlib
+from datetime import datetime, timedelta
+from uuid import uuid5, NAMESPACE_URL
+
+from aiohttp import web
+
+from configuration.config import VectorStoreStandInConfig
+
+WORD_PATTERN = re.compile(r"\w+")
+TOPICS = ["carbon emissions", "water consumption", "waste recycling", "renewable energy", "employee diversity",
+          "board governance", "supply chain audits", "biodiversity", "community investment", "data privacy"]
+VOCABULARY = ["report", "target", "scope", "reduction", "policy", "annual", "disclosure", "risk", "strategy",
+              "measure", "indicator", "progress", "baseline", "compliance", "stakeholder", "initiative"]
+
+
+def embed(text: str, dimension: int) -> list[float]:
+    """Normalized hashed bag of words of the text, the cosine of two embeddings is their dot product"""
+    vector = [0.0] * dimension
+    for word in WORD_PATTERN.findall(text.lower()):
+        vector[zlib.crc32(word.encode()) % dimension] += 1
+    norm = math.sqrt(sum(value * value for value in vector)) or 1
+    return [value / norm for value in vector]
+
+
+def generate_documents(documents_count: int, seed: int = 0) -> list[str]:
+    """Deterministic ESG paragraphs standing for the chunks of the ingested files"""
+    generator = random.Random(seed)
+    return [f"{generator.choice(TOPICS).capitalize()}: " + " ".join(generator.choices(VOCABULARY, k=40))
+            for _ in range(documents_count)]
+
+
+def generate_question(index: int) -> str:
+    return f"What is the {TOPICS[index % len(TOPICS)]} {VOCABULARY[index % len(VOCABULARY)]} of the company?"
+
+
+class InMemoryVectorStore:
+    """Exact nearest neighbours search over the embeddings of the ingested paragraphs"""
+
+    def __init__(self, dimension: int) -> None:
+        self.dimension = dimension
+        self.documents: list[dict] = []
+        self.embeddings: list[list[float]] = []
+
+    def add(self, content: str, file_name: str) -> dict:
+        document_id = str(uuid5(NAMESPACE_URL, f"{file_name}/{len(self.documents)}"))
+        file_id = str(uuid5(NAMESPACE_URL, file_name))
+        document = {
+            "id": document_id,
+            "content": content,
+            "link": f"/files/{file_name}",
+            "fileId": file_id,
+            "fileName": file_name,
+            "creationTime": (datetime(2023, 1, 1) + timedelta(days=len(self.documents))).isoformat(),
+            "documentType": "pdf",
+            "downloadLink": f"/sources/v1/download/{file_id}",
+        }
+        self.documents.append(document)
+        self.embeddings.append(embed(content, self.dimension))
+        return document
+
+    def search(self, content: str, count: int) -> list[dict]:
+        query = embed(content, self.dimension)
+        scores = [sum(left * right for left, right in zip(query, embedding)) for embedding in self.embeddings]
+        ranking = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+        return [self.documents[index] for index in ranking[:count]]
+
+
+def create_vector_store_stand_in(config: VectorStoreStandInConfig) -> web.Application:
+    """
+    Stand-in of the sources service retrieval, backed by an in-memory vector store filled with generated paragraphs.
+    More paragraphs can be ingested with POST /documents.
+    """
+    vector_store = InMemoryVectorStore(config.EMBEDDING_DIMENSION)
+    for index, content in enumerate(generate_documents(config.DOCUMENTS_COUNT)):
+        vector_store.add(content, file_name=f"report-{index // 20}.pdf")
+
+    async def get_similar_documents(request: web.Request) -> web.Response:
+        body = await request.json()
+        count = int(request.query.get("local_sources_count", 1))
+        documents = vector_store.search(body["content"], count)
+        return web.json_response({"data": documents, "detail": "success" if documents else "failed"})
+
+    async def add_documents(request: web.Request) -> web.Response:
+        body = await request.json()
+        documents = [vector_store.add(document["content"], document.get("fileName", "uploaded.pdf"))
+                     for document in body]
+        return web.json_response({"data": documents, "detail": "success"}, status=201)
+
+    vector_store_stand_in = web.Application()
+    vector_store_stand_in["vector_store"] = vector_store
+    vector_store_stand_in.router.add_post("/sources/similar", get_similar_documents)
+    vector_store_stand_in.router.add_post("/documents", add_documents)
+    return vector_store_stand_in
@@ -0,0 +1,95 @@
+import json
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestClient, TestServer
+
+from configuration.config import LlmStandInConfig, VectorStoreStandInConfig
+from source.stand_ins.keycloak_stand_in import create_keycloak_stand_in
+from source.stand_ins.llm_stand_in import create_llm_stand_in, STREAMING_INFERENCE_PATH
+from source.stand_ins.vector_store_stand_in import create_vector_store_stand_in, embed
+
+REALM_PATH = "/realms/elgen/protocol/openid-connect"
+
+
+async def get_client(stand_in) -> TestClient:
+    client = TestClient(TestServer(stand_in))
+    await client.start_server()
+    return client
+
+
+@pytest_asyncio.fixture
+async def keycloak_client():
+    client = await get_client(create_keycloak_stand_in())
+    yield client
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_keycloak_signs_in_and_introspects(keycloak_client):
+    response = await keycloak_client.post(f"{REALM_PATH}/token", data={"username": "user", "password": "secret"})
+    access_token = (await response.json())["access_token"]
+
+    token_info = await (await keycloak_client.post(f"{REALM_PATH}/token/introspect",
+                                                   data={"token": access_token})).json()
+    assert token_info["active"] and token_info["resource_access"]["elgen"]["roles"] == ["user"]
+    inactive_token = await (await keycloak_client.post(f"{REALM_PATH}/token/introspect",
+                                                       data={"token": "unknown"})).json()
+    assert inactive_token == {"active": False}
+
+
+@pytest.mark.asyncio
+async def test_keycloak_keeps_the_user_attributes(keycloak_client):
+    response = await keycloak_client.post(f"{REALM_PATH}/token", data={"username": "user", "password": "secret"})
+    access_token = (await response.json())["access_token"]
+    token_info = await (await keycloak_client.post(f"{REALM_PATH}/token/introspect",
+                                                   data={"token": access_token})).json()
+    user_path = f"/admin/realms/elgen/users/{token_info['sub']}"
+
+    user = await (await keycloak_client.get(user_path)).json()
+    assert user["attributes"]["questionsLimit"] == user["attributes"]["questionsInit"]
+    response = await keycloak_client.put(user_path, json={"attributes": {"questionsLimit": ["7"]}})
+    assert response.status == 204
+    assert (await (await keycloak_client.get(user_path)).json())["attributes"]["questionsLimit"] == ["7"]
+    assert (await keycloak_client.get("/admin/realms/elgen/users/unknown")).status == 404
+
+
+@pytest.mark.asyncio
+async def test_llm_streams_one_chunk_per_token():
+    config = LlmStandInConfig(FIRST_TOKEN_LATENCY=0.2, TOKENS_PER_SECOND=100, ANSWER_TOKENS=5)
+    client = await get_client(create_llm_stand_in(config))
+    start_time = time.perf_counter()
+    response = await client.post(STREAMING_INFERENCE_PATH, json={"prompt": "what are the scope 3 emissions"})
+    chunks = []
+    async for chunk, _ in response.content.iter_chunks():
+        if not chunks:
+            ttft = time.perf_counter() - start_time
+        chunks.append(json.loads(chunk))
+    await client.close()
+
+    assert ttft >= config.FIRST_TOKEN_LATENCY
+    assert [chunk["status"] for chunk in chunks] == ["IN_PROGRESS"] * 5 + ["DONE"]
+    assert chunks[-1]["data"]["response"] == "".join(chunk["data"] for chunk in chunks[:-1])
+
+
+@pytest.mark.asyncio
+async def test_vector_store_ranks_the_closest_paragraph_first():
+    client = await get_client(create_vector_store_stand_in(VectorStoreStandInConfig(DOCUMENTS_COUNT=50)))
+    response = await client.post("/documents", json=[{"content": "Scope 3 emissions of the cement plants",
+                                                      "fileName": "cement.pdf"}])
+    added_document = (await response.json())["data"][0]
+    response = await client.post("/sources/similar", params={"local_sources_count": 3},
+                                 json={"content": "cement plants emissions"})
+    similar_documents = (await response.json())["data"]
+    await client.close()
+
+    assert len(similar_documents) == 3
+    assert similar_documents[0] == added_document
+    assert {"id", "content", "fileId", "fileName", "documentType", "downloadLink"} <= set(added_document)
+
+
+def test_embeddings_are_normalized():
+    embedding = embed("carbon carbon emissions", 64)
+    assert sum(value * value for value in embedding) == pytest.approx(1)
+    assert embed("", 64) == [0.0] * 64
@@ -0,0 +1,23 @@
+from source.helpers.statistics_helpers import get_percentile, get_report
+from source.schemas.report_schemas import ScenarioResult
+
+
+def test_percentile_nearest_rank():
+    values = [float(value) for value in range(100, 0, -1)]
+    assert get_percentile(values, 50) == 50
+    assert get_percentile(values, 99) == 99
+    assert get_percentile(values, 100) == 100
+    assert get_percentile([0.3], 99) == 0.3
+    assert get_percentile([], 50) is None
+
+
+def test_report_leaves_errors_out_of_the_latencies():
+    results = [ScenarioResult(virtual_user=0, ttft=0.1, total_latency=1),
+               ScenarioResult(virtual_user=1, ttft=0.3, total_latency=2),
+               ScenarioResult(virtual_user=1, error="answer: HTTP 502"),
+               ScenarioResult(virtual_user=0, error="answer: HTTP 502")]
+    report = get_report(results, concurrency=2, duration=2)
+    assert (report.scenarios, report.errors, report.error_samples) == (4, 2, {"answer: HTTP 502": 2})
+    assert report.throughput == 1
+    assert (report.ttft.p50, report.ttft.p99) == (0.1, 0.3)
+    assert report.total_latency.max == 2
@@ -1,21 +1,20 @@
 import logging
 
+from elgen_common.logging_conf import logging_config, setup_logging
+from elgen_common.logging_middleware import RouterLoggingMiddleware
 from fastapi import FastAPI
 from uvicorn import Server, Config
 
 from configuration.config import app_config
 from configuration.injection_container import DependencyContainer
-from configuration.logging_conf import logging_config
-from configuration.logging_middleware import RouterLoggingMiddleware
 from source.apis.health_check_api import health_check_router
 from source.apis.model_inference_api import router
 from source.helpers.blob_storage_helper import BlobStorageModelDownloader
 from source.middlewares.app_middlewares import middlewares
 from huggingface_hub import login as hf_login
 
+setup_logging()
 logger = logging.getLogger(__name__)
-handler = logging.StreamHandler()
-logger.addHandler(handler)
 
 
 def get_application() -> FastAPI:
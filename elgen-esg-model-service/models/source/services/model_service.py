@@ -1,11 +1,9 @@
 import logging
 import os
 import time
-from typing import Type
+from typing import Optional, Type, TYPE_CHECKING
 
-import torch
 from pydantic import ValidationError
-from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
 
 from configuration.config import offline_service_config, app_config, OfflineServiceConfig
 from source.exceptions.model_exception_handler import ResultParsingPredictionError, ModelLoadError, \
@@ -13,15 +11,28 @@ from source.exceptions.model_exception_handler import ResultParsingPredictionErr
 from source.schemas.model_answer_schema import ModelAnswer, ModelMetadata
 from source.services.abstract_model_services import LLMFactory
 
+if TYPE_CHECKING:
+    from transformers import AutoModelForCausalLM, AutoTokenizer, Pipeline
+
 logger = logging.getLogger(__name__)
 
 
 class LLMFactoryHuggingFace(LLMFactory):
+    """
+    torch and transformers are imported by the methods needing them, so importing the service, its router and the
+    health check stays fast, the model classes default to the transformers auto classes.
+    """
+
     def __init__(self, model_name: str, model_directory: str,
                  config: OfflineServiceConfig,
-                 model_class: Type[AutoModelForCausalLM] = AutoModelForCausalLM,
-                 tokenizer_class: Type[AutoTokenizer] = AutoTokenizer):
+                 model_class: Optional[Type["AutoModelForCausalLM"]] = None,
+                 tokenizer_class: Optional[Type["AutoTokenizer"]] = None):
         super().__init__()
+        if model_class is None or tokenizer_class is None:
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+
+            model_class = model_class or AutoModelForCausalLM
+            tokenizer_class = tokenizer_class or AutoTokenizer
         self.config = config
         self.model_name = model_name
         self.model_class = model_class
@@ -33,11 +44,13 @@ class LLMFactoryHuggingFace(LLMFactory):
         # we need to keep space for new tokens to be generated! TEHE!
         self.allowed_prompt_length = self.tokenizer.model_max_length - self.config.MAX_NEW_TOKENS
 
-    def load(self) -> AutoModelForCausalLM:
+    def load(self) -> "AutoModelForCausalLM":
         """
         Wrapper for the HuggingFace model loading and downloading function.
         :return: the loaded model.
         """
+        import torch
+
         if self.config.FOUR_BIT_LLM_QUANTIZATION:
             return self.model_class.from_pretrained(
                 self.model_name,
@@ -59,11 +72,14 @@ class LLMFactoryHuggingFace(LLMFactory):
             load_in_4bit=offline_service_config.FOUR_BIT_LLM_QUANTIZATION,
         )
 
-    def create_pipeline(self) -> pipeline:
+    def create_pipeline(self) -> "Pipeline":
         """
         Creates a HuggingFace pipeline for text generation using the selected model.
         :return: the created pipeline 
         """
+        import torch
+        from transformers import pipeline
+
         try:
             inference_pipeline = pipeline(
                 "text-generation",
@@ -113,7 +129,7 @@ class LLMFactoryHuggingFace(LLMFactory):
             raise ModelLoadError(
                 detail=f"Offline model {self.model_name} not loaded: {model_loading_error}"
             )
-        torch.cuda.empty_cache()
+        empty_cuda_cache()
         try:
             return results[0].get("generated_text")
         except (KeyError, ValueError) as parsing_error:
@@ -171,7 +187,7 @@ class LLMFactoryHuggingFace(LLMFactory):
                 detail=f"Offline model {self.model_name} not loaded: {model_loading_error}"
             )
 
-        torch.cuda.empty_cache()
+        empty_cuda_cache()
         model_answer["inference_time"] = time.time() - start_time
         try:
             model_answer["model_name"] = app_config.MODEL_NAME.split("/")[-1]
@@ -210,3 +226,10 @@ class LLMFactoryHuggingFace(LLMFactory):
         """
 
         return self.model is not None if app_config.LOAD_LOCAL_MODEL else True
+
+
+def empty_cuda_cache() -> None:
+    """Release the memory cached by torch after a generation, torch is already imported once the model is loaded"""
+    import torch
+
+    torch.cuda.empty_cache()
@@ -0,0 +1,19 @@
+from elgen_common.startup_profile import profile_imports
+
+MODEL_PACKAGES = {"torch", "transformers", "accelerate", "bitsandbytes", "xformers"}
+
+
+def get_imported_packages(module: str) -> set[str]:
+    return {import_time.package.split(".")[0] for import_time in profile_imports(module, offline=True)}
+
+
+def test_service_import_leaves_the_model_libraries_unimported():
+    """torch and transformers are imported when the model is loaded, not when the service and its routes are"""
+    assert not MODEL_PACKAGES & get_imported_packages("main")
+
+
+def test_model_service_import_leaves_the_model_libraries_unimported():
+    imported_packages = get_imported_packages("source.services.model_service")
+
+    assert "source" in imported_packages
+    assert not MODEL_PACKAGES & imported_packages
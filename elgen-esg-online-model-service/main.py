@@ -1,17 +1,16 @@
 import logging
 
+from elgen_common.logging_conf import logging_config, setup_logging
+from elgen_common.logging_middleware import RouterLoggingMiddleware
 from fastapi import FastAPI
 from uvicorn import Server, Config
 
 from configuration.injection_container import DependencyContainer
-from configuration.logging_conf import logging_config
-from configuration.logging_middleware import RouterLoggingMiddleware
 from source.apis.prediction_api import router
 from source.middlewares.app_middlewares import middlewares
 
+setup_logging()
 logger = logging.getLogger(__name__)
-handler = logging.StreamHandler()
-logger.addHandler(handler)
 
 
 def get_application() -> FastAPI:
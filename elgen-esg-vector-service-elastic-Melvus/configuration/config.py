@@ -15,6 +15,9 @@ class AppConfig(BaseSettings):
 
 class VectorDBConfig(BaseSettings):
     EMBEDDING_FUNCTION_NAME = Field(env="EMBEDDINGS_MODEL_NAME", default="all-distilroberta-v1")
+    EMBEDDING_MODEL_WARM_UP: bool = Field(env="EMBEDDING_MODEL_WARM_UP", default=True,
+                                          description="Load the embedding model in the background once the service "
+                                                      "started, otherwise the first embedding loads it")
     TOP_K = Field(env="TOP_K", default=2,
                   description="How many source documents to use in the query input for the model")
 
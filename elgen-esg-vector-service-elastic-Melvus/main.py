@@ -1,20 +1,22 @@
 import logging
+import threading
 
+from elgen_common.logging_conf import setup_logging
+from elgen_common.logging_middleware import RouterLoggingMiddleware
 from fastapi import FastAPI
 from uvicorn import run
 
-from configuration.config import app_config
+from configuration.config import app_config, vector_db_config
 from configuration.injection import DependencyContainer
-from configuration.logging_middleware import RouterLoggingMiddleware
 from source.api.elasticsearch_store_api import es_store_router
 from source.api.milvus_store_api import milvus_store_router
 from source.middlewares.app_middlewares import middlewares
 from source.middlewares.interceptors import GenericExceptionInterceptor
 from source.middlewares.observers import ProcessTimeMiddleware
+from source.utils.embedder_utils import warm_up_embedding_model
 
+setup_logging()
 logger = logging.getLogger(__name__)
-handler = logging.StreamHandler()
-logger.addHandler(handler)
 
 
 def get_application() -> FastAPI:
@@ -44,6 +46,14 @@ for middleware in [ProcessTimeMiddleware, GenericExceptionInterceptor]:
 app.include_router(milvus_store_router, tags=["milvus"])
 app.include_router(es_store_router, tags=["es"])
 
+
+@app.on_event("startup")
+def start_embedding_model_warm_up() -> None:
+    """The service starts answering while the embedding model loads in the background"""
+    if vector_db_config.EMBEDDING_MODEL_WARM_UP:
+        threading.Thread(target=warm_up_embedding_model, name="embedding-model-warm-up", daemon=True).start()
+
+
 if __name__ == '__main__':
     # Connect to the running milvus instance at the start of the application
     run("main:app", host=app.container.app_settings().APP_HOST, port=app.container.app_settings().APP_PORT,
@@ -2,6 +2,7 @@ import logging
 
 import numpy as np
 from elasticsearch import NotFoundError
+from elgen_common.tracing import traced, RETRIEVAL_SEARCH_SPAN
 from pydantic import ValidationError
 
 from configuration.config import vector_db_config
@@ -71,6 +72,7 @@ class EmbeddingIndexerService(VectorStoreService):
             logging.error(f'Failed To check existence of file {file_name}: {e}')
             raise ElasticsearchFetchDataError(f'Failed To check existence of file {e}')
 
+    @traced(RETRIEVAL_SEARCH_SPAN, {"retrieval.store": "elasticsearch"})
     def get_similar_documents(self, query: str, n_results: int, workspace_id: str) -> SimilarDocumentsOutput:
         """
 
@@ -1,12 +1,20 @@
+import logging
+import threading
+from typing import Optional, TYPE_CHECKING
+
 import numpy as np
-from huggingface_hub.utils import RepositoryNotFoundError
-from sentence_transformers import SentenceTransformer
 
 from configuration.config import vector_db_config, milvus_collection_config
 from source.exceptions.utils_exceptions import EmbeddingError, EmbeddingCompatibilityError, EmbeddingModelNotFoundError
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+def load_embedding_model(model_name: str) -> tuple["SentenceTransformer", int]:
+    from huggingface_hub.utils import RepositoryNotFoundError
+    from sentence_transformers import SentenceTransformer
 
-def load_embedding_model(model_name: str) -> tuple[SentenceTransformer, int]:
     try:
         embedding_model = SentenceTransformer(model_name)
     except RepositoryNotFoundError:
@@ -14,16 +22,39 @@ def load_embedding_model(model_name: str) -> tuple[SentenceTransformer, int]:
     return embedding_model, embedding_model.get_sentence_embedding_dimension()
 
 
-model, embedding_dimension = load_embedding_model(model_name=vector_db_config.EMBEDDING_FUNCTION_NAME)
+_embedding_model: Optional["SentenceTransformer"] = None
+_embedding_model_lock = threading.Lock()
+
 
-if milvus_collection_config.TEXT_VECTOR_FIELD_DIMENSION != embedding_dimension:
-    raise EmbeddingCompatibilityError(model_name=vector_db_config.EMBEDDING_FUNCTION_NAME,
-                                      embedding_dimension=embedding_dimension)
+def get_embedding_model() -> "SentenceTransformer":
+    """
+    The embedding model, sentence_transformers is only imported and the model loaded by the first call so the service
+    boots without them. Concurrent first calls wait for the same load, a failed load is tried again by the next call.
+    """
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_model_lock:
+            if _embedding_model is None:
+                embedding_model, embedding_dimension = load_embedding_model(
+                    model_name=vector_db_config.EMBEDDING_FUNCTION_NAME)
+                if milvus_collection_config.TEXT_VECTOR_FIELD_DIMENSION != embedding_dimension:
+                    raise EmbeddingCompatibilityError(model_name=vector_db_config.EMBEDDING_FUNCTION_NAME,
+                                                      embedding_dimension=embedding_dimension)
+                _embedding_model = embedding_model
+    return _embedding_model
+
+
+def warm_up_embedding_model() -> None:
+    """Load the embedding model ahead of the first embedding, run in a background thread at startup"""
+    try:
+        get_embedding_model()
+    except Exception as error:
+        logging.error(f"The embedding model warm up failed, the first embedding will load it again: {error}")
 
 
 def embed_text(text: str) -> np.ndarray:
     """Embed text into a ndarray"""
-    embeddings = model.encode([text])
+    embeddings = get_embedding_model().encode([text])
     try:
         return embeddings[0]
     except IndexError:
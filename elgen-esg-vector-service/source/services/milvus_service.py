@@ -2,6 +2,7 @@ import logging
 from typing import List
 
 import numpy as np
+from elgen_common.tracing import traced, RETRIEVAL_SEARCH_SPAN
 from pymilvus import Collection, SearchResult, MilvusException
 
 from configuration.config import MilvusCollectionConfig
@@ -31,6 +32,7 @@ class MilvusService(VectorStoreService):
         self.helper.collection.flush()  # Seal all segments in the collection.
         return result.insert_count
 
+    @traced(RETRIEVAL_SEARCH_SPAN, {"retrieval.store": "milvus"})
     def get_similar_documents(self, query: str, n_results: int) -> SimilarDocumentsOutput:
         """Get similar document to a certain query as follows:
         - embed the query
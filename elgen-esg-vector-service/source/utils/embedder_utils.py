@@ -1,15 +1,21 @@
 import logging
+import threading
+from typing import Optional, TYPE_CHECKING
 
 import numpy as np
 import openai
-from huggingface_hub.utils import RepositoryNotFoundError
-from sentence_transformers import SentenceTransformer
 
 from configuration.config import vector_db_config
 from source.exceptions.utils_exceptions import EmbeddingError, EmbeddingModelNotFoundError
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+def load_embedding_model(model_name: str) -> tuple["SentenceTransformer", int]:
+    from huggingface_hub.utils import RepositoryNotFoundError
+    from sentence_transformers import SentenceTransformer
 
-def load_embedding_model(model_name: str) -> tuple[SentenceTransformer, int]:
     try:
         embedding_model = SentenceTransformer(model_name)
     except RepositoryNotFoundError:
@@ -17,7 +23,31 @@ def load_embedding_model(model_name: str) -> tuple[SentenceTransformer, int]:
     return embedding_model, embedding_model.get_sentence_embedding_dimension()
 
 
-model, embedding_dimension = load_embedding_model(model_name=vector_db_config.EMBEDDING_FUNCTION_NAME)
+_embedding_model: Optional["SentenceTransformer"] = None
+_embedding_model_lock = threading.Lock()
+
+
+def get_embedding_model() -> "SentenceTransformer":
+    """
+    The embedding model, sentence_transformers is only imported and the model loaded by the first call so the service
+    boots without them. Concurrent first calls wait for the same load, a failed load is tried again by the next call.
+    """
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_model_lock:
+            if _embedding_model is None:
+                embedding_model, embedding_dimension = load_embedding_model(
+                    model_name=vector_db_config.EMBEDDING_FUNCTION_NAME)
+                _embedding_model = embedding_model
+    return _embedding_model
+
+
+def warm_up_embedding_model() -> None:
+    """Load the embedding model ahead of the first embedding, run in a background thread at startup"""
+    try:
+        get_embedding_model()
+    except Exception as error:
+        logging.error(f"The embedding model warm up failed, the first embedding will load it again: {error}")
 
 
 def openai_embedder(input: str, model: str = 'text-embedding-ada-002'):
@@ -40,7 +70,7 @@ def embed_text(text: str, openai: int) -> np.ndarray:
             raise EmbeddingError(detail=f"Could not get the first element of the returned embeddings using {vector_db_config.EMBEDDING_FUNCTION_NAME}") from error
 
     else:
-        embeddings = model.encode([text])
+        embeddings = get_embedding_model().encode([text])
     try:
         return embeddings[0]
     except IndexError:
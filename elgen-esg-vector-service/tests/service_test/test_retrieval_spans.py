@@ -0,0 +1,60 @@
+from unittest.mock import MagicMock
+
+import pytest
+from elgen_common.tracing import provider, tracer, RETRIEVAL_SEARCH_SPAN
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+
+from source.exceptions.service_exceptions import ElasticsearchFetchDataError
+from source.services import elasticsearch_service
+from source.services.elasticsearch_service import EmbeddingIndexerService
+from tests.test_data import MocksConstants
+
+
+@pytest.fixture(scope="module")
+def span_exporter():
+    exporter = InMemorySpanExporter()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    yield exporter
+    # the processor stays registered on the global provider but a shut down exporter drops the spans
+    exporter.shutdown()
+
+
+@pytest.fixture
+def spans(span_exporter, monkeypatch):
+    """Spans of the test, the query is embedded without loading the embedding model"""
+    monkeypatch.setattr(elasticsearch_service, "embed_text", lambda *args, **kwargs: [0.0, 1.0])
+    span_exporter.clear()
+    return span_exporter
+
+
+def get_search_span(spans):
+    search_span, = [span for span in spans.get_finished_spans() if span.name == RETRIEVAL_SEARCH_SPAN]
+    return search_span
+
+
+def test_elasticsearch_search_span(spans):
+    helper = MagicMock()
+    helper.search_vector.return_value = {"hits": {"hits": [{"_score": 0.9, "_source": {"content": "chunk"}}]}}
+
+    with tracer.start_as_current_span("request") as request_span:
+        EmbeddingIndexerService(helper).get_similar_documents(query="query", n_results=3,
+                                                               workspace_id=MocksConstants.workspace_id)
+
+    search_span = get_search_span(spans)
+    assert search_span.parent.span_id == request_span.get_span_context().span_id
+    assert search_span.attributes["retrieval.store"] == "elasticsearch"
+    assert search_span.status.status_code == StatusCode.UNSET
+
+
+def test_failed_elasticsearch_search_span(spans):
+    helper = MagicMock()
+    helper.search_vector.side_effect = ConnectionError("elasticsearch unreachable")
+
+    with pytest.raises(ElasticsearchFetchDataError):
+        EmbeddingIndexerService(helper).get_similar_documents(query="query", n_results=3,
+                                                               workspace_id=MocksConstants.workspace_id)
+
+    assert get_search_span(spans).status.status_code == StatusCode.ERROR
+
@@ -0,0 +1,57 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from elgen_common.startup_profile import profile_imports
+
+from source.utils import embedder_utils
+
+MODEL_PACKAGES = {"sentence_transformers", "transformers", "torch", "huggingface_hub"}
+
+
+@pytest.fixture
+def loaded_models(monkeypatch):
+    """Models loaded by the test, the load is slow enough for the concurrent calls to overlap"""
+    loaded_models = []
+
+    def load_embedding_model(model_name: str) -> tuple:
+        time.sleep(0.05)
+        if not loaded_models and model_name == "failing":
+            loaded_models.append(None)
+            raise OSError("model unavailable")
+        loaded_models.append(MagicMock())
+        return loaded_models[-1], 768
+
+    monkeypatch.setattr(embedder_utils, "load_embedding_model", load_embedding_model)
+    monkeypatch.setattr(embedder_utils, "_embedding_model", None)
+    return loaded_models
+
+
+def test_embedder_utils_import_leaves_the_model_libraries_unimported():
+    import_times = profile_imports("source.utils.embedder_utils", offline=True)
+
+    assert "source.utils.embedder_utils" in {import_time.package for import_time in import_times}
+    assert not MODEL_PACKAGES & {import_time.package.split(".")[0] for import_time in import_times}
+
+
+def test_concurrent_first_embeddings_load_the_model_once(loaded_models):
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(embedder_utils.get_embedding_model()))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loaded_models) == 1
+    assert models == loaded_models * 4
+
+
+def test_failed_load_is_tried_again(loaded_models, monkeypatch):
+    monkeypatch.setattr(embedder_utils.vector_db_config, "EMBEDDING_FUNCTION_NAME", "failing")
+
+    with pytest.raises(OSError):
+        embedder_utils.get_embedding_model()
+
+    assert embedder_utils.get_embedding_model() is loaded_models[-1]